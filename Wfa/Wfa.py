@@ -11,6 +11,35 @@ Contains the methods needed to execute WFA workflows remotely via REST protocol.
 *** IS NOT TESTED WITH Python 3.x ***
 '''
 
+import copy
+import random
+import threading
+import time
+import urllib
+import urllib2
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from WfaBind import getBinding
+from WfaCoalesce import DEFAULT_COALESCE_WINDOW, coalesceKey, singleFlight
+from WfaConcurrent import WfaExecutor, WfaTimeoutError
+from WfaJob import newJobDict, applyJobRecord, jobSimpleStatus
+from WfaJobMonitor import getJobMonitor
+from WfaMetrics import metrics
+from WfaSerializer import INPUT_XML_TEMPLATE, getSerializer
+from WfaTransport import WfaSession
+from WfaParse import parseJobStream, parseWorkflowDef, readResponse
+from WfaPoll import WfaPollState, pollJob
+from WfaResilience import WfaCircuitOpenError, getCircuitBreaker, policyFromDict
+from WfaSchedule import PRIORITY_URGENT, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_BULK, getScheduler
+from WfaWorkflowCache import workflowCache, uuidTable
+
+# Guards the journaled flag of job states, which the polling thread and the job monitor may set at the same time.
+_journalResultLock = threading.Lock()
+
 class Wfa(object):
     '''
     This class provides all the required methods needed to call a generic workflow, given a small 
@@ -38,6 +67,11 @@ class Wfa(object):
     ("OK"), a job is stopped prior to completion ("FAILED"), or a job completed ("DONE").  The "UNKNOWN" status is provided as a catch-all
     value.
     
+    executeWorkflow returns as soon as WFA has assigned the job ID.  To block until the job finishes, use waitForCompletion, which
+    polls the job with an exponential backoff (plus jitter) and returns the simple status as soon as the job reaches a terminal state.
+    When many jobs are in flight, use watchJob instead: it hands the job to the WfaJobMonitor of the server, which polls every 
+    watched job from a single thread and completes a future per job.
+    
     While the job is running, and at the conclusion of the job, state is maintained within a class dictionary: jobDict.  This dictionary
     stores such information as the jobId (WFA assigns this identifier), the current state of the job, the command number being executed
     and number of commands within the workflow, as well as any error codes and the values of any return parameters.
@@ -46,28 +80,42 @@ class Wfa(object):
     the input and return structures of the workflow as defined.  These methods, printWorkflowInputList and printWorkflowOutputList
     simply require:
         1.    Instantiation of the class
-        2.    Execution of a RESTful query using the getRestResponse method with the argument of the
-                instance of the workflowQueryURI generated as a result of the class instantiation.  This will return raw XML
-                back from the REST query
-        3.    Execution of either/both methods with the raw XML resulting from item #2 above as the argument to the method
+        2.    Execution of either/both methods.  With no argument the methods use the (cached) workflow definition.  
+                Raw XML from a RESTful query of the workflowQueryURI (using the getRestResponse method) may still be 
+                passed as the argument instead.
         
     The output will be the either the WFA variable name/data type/required status from WFA (in the case of InputList), or the name 
     of the return parameter (in the case of OutputList).  NOTE: The return parameter will ALWAYS be of type string.
     
+    Workflow definitions (UUID, execute link, input schema and return parameters) are kept in a process wide cache, keyed by 
+    server and workflow name, so repeated executions of the same workflow do not repeat the workflow query.  See 
+    WfaWorkflowCache.configureWorkflowCache for the TTL/LRU/revalidation settings, and invalidateWorkflow to drop an entry 
+    after a workflow has been changed on the server.  When wfaDict['wfaSchemaIndex'] names a schema index built from the 
+    .dar exports in Workflows/ (see WfaDarIndex), definitions found in the index are used without querying WFA at all; 
+    setting wfaVerifySchemaIndex confirms each index entry against WFA once per server, and the server's definition wins 
+    if they differ.
+    
     **** ENHANCEMENTS NEEDED ****
-    1.    Data type handling - currently only String and Numeric types are handled.  Tables, Enum, and Boolean WFA data types are 
-        currently not explicitly handled, although can be inserted if done correctly.  Enum values return a list of allowed values 
-        for the input.  If the input value does not match one of the values in the list, WFA will throw a 500 HTTP error (Bad Response).
-        Similarly for Boolean - it must be either 'true' or 'false' as a response.  Tables (Multi-Input) can be passed in the following 
-        format (as an example 3x3 table):
+    1.    Data type handling - the input schema of each workflow is compiled once into a serializer (see WfaSerializer) that 
+        validates Enum and Boolean values before submission, rather than letting WFA throw a 500 HTTP error (Bad Response).  Enum 
+        values must match one of the allowed values listed for the input; Boolean must be either 'true' or 'false' (or a Python bool).  
+        Tables (Multi-Input) can be passed either as a list of rows (each a list of column values) or in the following format 
+        (as an example 3x3 table):
         
         C1R1~C2R1~C3R1,C1R2~C2R2~C3R2,C1R3~C2R3~C3R3
         
         Data is entered as row dominant: rows are entered first, with columns separated by '~', with each individual row separated by a ','
-    2.    Exception handling - there is essentially no exception handling currently.  Definite need.
+        Other WFA types (e.g. Query) are passed through as text.
+    2.    Exception handling - every request is bounded by connect/read timeouts, GETs that fail transiently (connection 
+        errors, timeouts, 502/503/504) are retried with exponential backoff, and a circuit breaker per server refuses requests 
+        (WfaResilience.WfaCircuitOpenError) while WFA is down, probing it again every wfaBreakerReset seconds.  The execute 
+        POST is never retried, so a workflow is never started twice.  Other failures are still simply raised.
     3.    Simple credentials - the urllib2 library only uses simply credentials.  Need to investigate how this operates with Keystone.
-    4.    Allow for workflow UUIDs to be specified during instantiation vs. simply workflow names.
-    5.    Insert logging...
+    4.    Workflow UUIDs - a workflowUUID can be specified during instantiation instead of (or as well as) the workflow name.  The 
+        workflow is then fetched directly from /rest/workflows/{uuid}, skipping the slow ?name= search.  Names resolved once are 
+        remembered in the process wide resolution table (WfaWorkflowCache.uuidTable), which can also be preloaded or persisted.
+    5.    Insert logging...  Every REST call and job is already timed by WfaMetrics (latency by phase, request/byte/retry 
+        counts, queued/executing/per command job phases); WfaMetrics.WfaJobLogSink writes one structured log line per job.
     
     ***************************************************************************************************************************************
     Wfa class constructor
@@ -77,7 +125,38 @@ class Wfa(object):
             wfaUser : <wfa user to execute workflow> <mandatory> <string>
             wfaPw : <password for wfa user> <mandatory key> <string>
             wfaParamMap : <mapping of workflow parameters with appropriate values> <mandatory> <dictionary>
-            workflowName : <workflow name to execute> <mandatory> <string> 
+            workflowName : <workflow name to execute> <mandatory unless workflowUUID is given> <string> 
+            workflowUUID : <UUID of the workflow to execute> <optional> <string>
+            wfaPoolSize : <maximum connections held open to wfaServer> <optional> <int>
+            wfaPoolIdleTimeout : <seconds an idle pooled connection is kept> <optional> <int>
+            wfaPollInterval : <seconds before the first re-poll in waitForCompletion, default 0.5> <optional> <float>
+            wfaPollMaxInterval : <upper bound of the poll interval, default 10 in waitForCompletion, 30 in watchJob> <optional> <float>
+            wfaSchemaIndex : <path of the .dar schema index, built from Workflows/*.dar if missing or out of date> <optional> <string>
+            wfaVerifySchemaIndex : <confirm index entries against WFA once per server, default False> <optional> <boolean>
+            wfaConnectTimeout : <seconds allowed to connect to WFA, default 10> <optional> <float>
+            wfaReadTimeout : <seconds allowed for each wait on a WFA response, default 120> <optional> <float>
+            wfaRetries : <times a failed GET is retried, default 3> <optional> <int>
+            wfaRetryBackoff : <seconds before the first retry, doubled on each further retry, default 0.5> <optional> <float>
+            wfaRetryMaxBackoff : <upper bound of the delay between retries, default 8> <optional> <float>
+            wfaCompress : <ask WFA for gzip/deflate compressed responses, default True> <optional> <boolean>
+            wfaBreakerThreshold : <consecutive failures that open the circuit breaker of wfaServer, default 5> <optional> <int>
+            wfaBreakerReset : <seconds the breaker stays open before a probe request is let through, default 30> <optional> <float>
+            wfaCoalesce : <share the job of an identical execution in flight instead of starting another, default False 
+                           (True for WfaOs)> <optional> <boolean>
+            wfaCoalesceWindow : <seconds a successfully completed job keeps answering identical executions, default 0 (only jobs 
+                                 in flight are shared)> <optional> <float>
+            wfaJournal : <path of an SQLite job journal recording every submission and result - see WfaJournal> <optional> <string>
+            wfaSchedule : <submit jobs through the admission scheduler of wfaServer, default False> <optional> <boolean>
+            wfaPriority : <priority class of the job, 0 (urgent) to 3 (bulk), default 2 - see WfaSchedule> <optional> <int>
+            wfaTenant : <tenant the job is queued for fairly against other tenants, default wfaUser> <optional> <string>
+            wfaMaxInFlight : <upper bound of the jobs in flight the scheduler of wfaServer admits, default 64> <optional> <int>
+            wfaAdmitTimeout : <seconds a submission may wait for admission before WfaTimeoutError, default no limit> <optional> <float>
+        The pool, breaker and scheduler limit settings only take effect for the first instance that connects to a given wfaServer, as the 
+        connection pool and circuit breaker are shared by all instances talking to the same server.
+        
+        Each instance owns its own session (credentials plus a reference to the server's connection pool), so 
+        instances for different servers or users can be used from different threads at the same time.  A single 
+        instance tracks a single job and should not itself be shared between threads.
                     
         Job dictionary.  Maintains state of the workflow job during
         execution.  Key defintions are:
@@ -91,14 +170,33 @@ class Wfa(object):
                 Key: Parameter Name being returned by the workflow
                 Value: Value associated with the parameter name.
                 Only populated after successful completion.
+            pollCount - number of status polls issued by waitForCompletion
+            waitTime - wall clock seconds waitForCompletion spent waiting on the job
+            retryCount - number of requests for the job (execution and status polls) that were retried
+            timeoutCount - number of requests for the job that timed out
+            circuitRejects - number of requests for the job refused because the circuit breaker of wfaServer was open
+        The job dictionary is a WfaJob.WfaJobDict: a view over a slotted WfaJobState (jobDict.state) that holds the status
+        as a code and the progress and counters as integers.  The keys above read and write the record and keep their 
+        text values; jobDict.copy() returns a plain dictionary.
     '''
+    
+    # Instances carry no __dict__ - the attributes are fixed, which keeps them small and cheap to build and copy.
+    __slots__ = ('wfaDict', 'jobDict', 'workflowInputXml', 'wfaExecuteLink', 'workflowDef', 'workflowUUID', 
+                 'workflowQueryURI', '_baseURI', '_session', '_poll', '_flight', '_paramMap', '_ticket')
+    
+    # XML template and HTTP header options, shared by every instance
+    _baseXml = INPUT_XML_TEMPLATE
+    _workflowRestHeader = {
+                  'content-type' : 'application/xml'
+                  }
 
-    def __init__(self, wfaServer=None, workflowName=None, wfaUser=None, wfaPw=None, wfaParamMap=None, wfaDict=None):
-        import urllib
+    def __init__(self, wfaServer=None, workflowName=None, wfaUser=None, wfaPw=None, wfaParamMap=None, wfaDict=None,
+                 workflowUUID=None):
         
         # Instantiate class variable instances
         self.workflowInputXml = None
         self.wfaExecuteLink = None      
+        self.workflowDef = None
         
         
         if(wfaDict != None or type(wfaDict) == dict):
@@ -106,32 +204,16 @@ class Wfa(object):
         else:
             self.wfaDict = locals()
 
-        self.jobDict = {
-                        "jobSelfLink" : None,
-                        "jobId" : None,
-                        "jobStatus" : None,
-                        "jobError" : None,
-                        "wfCmdExecuting" : None,
-                        "wfCmdTotal" : None,
-                        "returnParams" : {}
-                        }
-        
-        # Setup XML template
-        self._baseXml = """\
-<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
-    <workflowInput>
-        <userInputValues>--vk--
-        </userInputValues>
-    </workflowInput>
-"""
+        self.jobDict = newJobDict()
+        self._poll = WfaPollState()
+        self._flight = None
+        self._paramMap = None
+        self._ticket = None
+        
         # Setup required URIs
         baseURI = "http://" + self.wfaDict['wfaServer'] + "/rest/workflows"
-        self.workflowQueryURI = baseURI + "?name=" + urllib.quote_plus(self.wfaDict['workflowName'])
-        
-        # Set HTTP Header options
-        self._workflowRestHeader = {
-                      'content-type' : 'application/xml'
-                      }        
+        self._baseURI = baseURI
+        self._setWorkflowQuery()
         
         # Build the connection for this instantiation
         self._buildConnection(baseURI, self.wfaDict['wfaUser'], self.wfaDict['wfaPw'])
@@ -139,39 +221,26 @@ class Wfa(object):
         return
     
     '''
-    getWfaJobStatus - get the raw job status and update the job dictionary
+    getWfaJobStatus - get the raw job status and update the job dictionary.  The poll is conditional where WFA supplies 
+    an ETag or Last-Modified, and a job document identical to the previous one is not parsed again (see WfaPoll).
     '''
     def getWfaJobStatus(self):
         
-        # get the raw data by issuing a query against WFA
-        jobXml = self.getRestResponse(self.jobDict['jobSelfLink'])
-        
-        '''
-        The XML structure is documented in the WFA REST API Guide, and will not be documented here.  Sufficed to say, each element
-        represents either an attribute or key value within the XML structure.
-        '''
-        self.jobDict['jobStatus'] = jobXml[1].find('jobStatus').text
-        
-        if(self.jobDict['wfCmdTotal'] == None):
-            if(jobXml[1].find('workflow-execution-progress').find('commands-number') != None):
-                self.jobDict['wfCmdTotal'] = jobXml[1].find('workflow-execution-progress').find('commands-number').text
+        # Query WFA and extract only the fields we track; an unchanged job leaves the job dictionary as it is.
+        record = pollJob(self._session, self.jobDict['jobSelfLink'], self._poll, self.jobDict)
+        if(record == None):
+            return
         
-        if(self.jobDict['wfCmdExecuting'] == None):
-            if(jobXml[1].find('workflow-execution-progress').find('current-command-index') != None):
-                self.jobDict['wfCmdExecuting'] = jobXml[1].find('workflow-execution-progress').find('current-command-index').text
-        
-        if(jobXml[1].find('errorMessage') != None):
-            self.jobDict['jobError'] = jobXml[1].find('errorMessage').text
-          
-        '''
-        Since there is a unknown number of return parameters, we simply loop until we run out, storing them all within
-        the sub-dictionary in the job dictionary.
-        '''  
-        returnParamList = jobXml[1].findall('returnParameters')
-        if(len(returnParamList) > 0):
-            for returnParams in returnParamList:
-                parameters = returnParams.find('returnParameters')
-                self.jobDict['returnParams'][parameters.get('key')] = parameters.get('value')
+        # The translation of the job record into the job dictionary is shared with WfaJobMonitor.
+        applyJobRecord(self.jobDict, record)
+        wfaStatus = jobSimpleStatus(self.jobDict)
+        metrics.jobObserved(self.wfaDict['wfaServer'], self.jobDict, wfaStatus)
+        if(wfaStatus == "DONE" or wfaStatus == "FAILED"):
+            if(self._ticket != None):
+                self._ticket.release()
+            self._journalResult(self.jobDict, wfaStatus)
+            if(self._flight != None):
+                singleFlight.finish(self._flight, wfaStatus)
         return
     
     '''
@@ -180,95 +249,166 @@ class Wfa(object):
     def getSimpleJobStatus(self):
         
         '''
-        There are three general catagories of state: bad, ok, and done.  We setup a list and then simply check to 
-        see if our current status is in the list, then return the appropriate simple status.
+        There are three general catagories of state: bad, ok, and done.  The mapping itself lives in WfaJob (a table indexed by status code)
+        so that WfaJobMonitor applies exactly the same translation.
         '''
-        badStatus = ["FAILED", "ABORTING", "CANCELED", "OBSOLETE"]
-        okStatus = ["PAUSED", "RUNNING", "PENDING", "SCHEDULED", "EXECUTING" ]
-        doneStatus = "COMPLETED"
         self.getWfaJobStatus()
-    
-        if(self.jobDict['jobStatus'] == None):
-            return("OK")
-        
-        if(self.jobDict['jobStatus'] in doneStatus):
-            return("DONE")
-        elif(self.jobDict['jobStatus'] in badStatus):
-            return("FAILED")
-        elif(self.jobDict['jobStatus'] in okStatus):
-            return("OK")
-        else:
-            return("UNKNOWN")
+        return(jobSimpleStatus(self.jobDict))
     
     '''
     _buildInputXml - build the XML required for workflow submission.
     
     This method is intended to be private as it requires arguements that can only be provided internally.
-    The input XML is the complete raw XML gathered from the initial REST query of WFA.  The wfaParamMap has the 
+    The workflow definition is the parsed result of the initial REST query of WFA.  The wfaParamMap has the 
     mapping between the variables needed by the workflow and the values to be passed. 
+    
+    Parameter name (WFA Parameter) is not in the map, this will currently fail.
+    However, if the map contains values not recogized by WFA, they will be silently skipped.
     '''
-    def _buildInputXml(self, wfaInputXml, wfaParamMap):
-        # Generate the list of input values to iterate against.
-        inputList = wfaInputXml[0].find('userInputList').findall('userInput')
-        xmlString = ""
-        # Iterate over all entries and build a XML key/value pair line.  Append the line to the existing collection 
-        # of lines.
-        for uInput in inputList:
-            wfaParamName = uInput.find('name').text
-            # Parameter name (WFA Parameter) is not in the map, this will currently fail.
-            # However, if the map contains values not recogized by WFA, they will be silently skipped
-            wfaParamValue = wfaParamMap[wfaParamName] 
-            if(wfaParamValue != None):
-                if(type(wfaParamValue) is not str):
-                    wfaParamValue = str(wfaParamValue)
-                xmlString = xmlString + "\n\t\t<userInputEntry key = \"" + wfaParamName + "\" value = \"" + wfaParamValue + "\"/>"
-        # Replace the token in the XML template with the generated lines.  
-        self.workflowInputXml = self._baseXml.replace('--vk--', xmlString)
+    def _buildInputXml(self, workflowDef, wfaParamMap):
+        # The serializer is compiled once per (cached) workflow definition and validates/escapes every value.
+        self.workflowInputXml = getSerializer(workflowDef).serialize(wfaParamMap)
+        self._paramMap = wfaParamMap
         return
     '''
     printWorkflowInputList - print out a list of the inputs to the requested workflow
     '''
-    def printWorkflowInputList(self, wfaInputXml):
-        inputList = wfaInputXml[0].find('userInputList').findall('userInput')
+    def printWorkflowInputList(self, wfaInputXml=None):
+        workflowDef = self._getWorkflowDef(wfaInputXml)
         print "Name\t\t\t\tType\t\tMandatory"
-        for uInput in inputList:
-            print uInput.find('name').text + "\t\t\t" + uInput.find('type').text + "\t\t" + uInput.find('mandatory').text
+        for uInput in workflowDef.inputs:
+            print uInput.name + "\t\t\t" + uInput.type + "\t\t" + str(uInput.mandatory).lower()
         return
     '''
     printWorkflowOutputList - print out a list of the return parameters currently defined by the workflow
     '''
-    def printWorkflowOutputList(self, wfaInputXml):
-        inputList = wfaInputXml[0].find('returnParameters').findall('returnParameter')
-        if(len(inputList) > 0):
+    def printWorkflowOutputList(self, wfaInputXml=None):
+        workflowDef = self._getWorkflowDef(wfaInputXml)
+        if(len(workflowDef.returnParams) > 0):
             print "Parameters Returned"
-            for returnParams in inputList:
-                print returnParams.find('name').text
+            for returnParam in workflowDef.returnParams:
+                print returnParam
+    
+    '''
+    getWorkflowDefinition - return the parsed definition of the workflow (a WfaWorkflowDef), from the schema index or 
+    the process wide cache when possible.  Setting refresh forces a new query of WFA.
+    '''
+    def getWorkflowDefinition(self, refresh=False):
+        if(refresh):
+            self.invalidateWorkflow()
+        elif(self.wfaDict.get('wfaSchemaIndex') != None):
+            workflowDef = self._getIndexedWorkflowDef()
+            if(workflowDef != None):
+                self.workflowDef = workflowDef
+                return(self.workflowDef)
+        wfaServer = self.wfaDict['wfaServer']
+        workflowName = self.wfaDict.get('workflowName')
+        try:
+            workflowDef = workflowCache.lookup(self._session, wfaServer, self._workflowKey(), self.workflowQueryURI)
+        except urllib2.HTTPError, e:
+            # A UUID taken from the resolution table may be stale (e.g. the workflow was re-imported) - fall back to the name.
+            if(e.code != 404 or self.wfaDict.get('workflowUUID') != None or self.workflowUUID == None or workflowName == None):
+                raise
+            uuidTable.remove(wfaServer, workflowName)
+            self._setWorkflowQuery()
+            workflowDef = workflowCache.lookup(self._session, wfaServer, self._workflowKey(), self.workflowQueryURI)
+        
+        # Remember the UUID so that later instances go straight to /rest/workflows/{uuid}
+        if(workflowName != None and workflowDef.uuid != None and self.workflowUUID != workflowDef.uuid):
+            uuidTable.put(wfaServer, workflowName, workflowDef.uuid)
+            self.workflowUUID = workflowDef.uuid
+        self.workflowDef = workflowDef
+        return(self.workflowDef)
+    
+    '''
+    _getIndexedWorkflowDef - return the definition of the workflow from the schema index, or None if the index does not 
+    hold it (or holds an entry that no longer matches the server).  With wfaVerifySchemaIndex set, the first use of an 
+    entry for a server compares it with the definition WFA returns.
+    '''
+    def _getIndexedWorkflowDef(self):
+        # Only loaded when an index is configured - it pulls in zipfile, mmap and marshal.
+        from WfaDarIndex import getSchemaIndex, sameSchema
+        wfaServer = self.wfaDict['wfaServer']
+        schemaIndex = getSchemaIndex(self.wfaDict['wfaSchemaIndex'])
+        workflowDef = schemaIndex.lookup(wfaServer, self.wfaDict.get('workflowName'), self.wfaDict.get('workflowUUID'))
+        if(workflowDef == None or not self.wfaDict.get('wfaVerifySchemaIndex')):
+            return(workflowDef)
+        
+        current = schemaIndex.isCurrent(wfaServer, workflowDef.name)
+        if(current == None):
+            remoteDef = workflowCache.lookup(self._session, wfaServer, self._workflowKey(), self.workflowQueryURI)
+            current = sameSchema(workflowDef, remoteDef)
+            schemaIndex.markCurrent(wfaServer, workflowDef.name, current)
+        if(not current):
+            return(None)
+        return(workflowDef)
+    
+    '''
+    invalidateWorkflow - drop the cached definition of this workflow so the next setupWorkflow queries WFA again
+    '''
+    def invalidateWorkflow(self):
+        workflowCache.invalidate(self.wfaDict['wfaServer'], self._workflowKey())
+        self.workflowDef = None
+        return
+    
+    '''
+    _setWorkflowQuery - set the workflow UUID (given, or from the resolution table) and the URI used to fetch the workflow.  
+    Fetching by UUID avoids the ?name= search.
+    '''
+    def _setWorkflowQuery(self):
+        workflowName = self.wfaDict.get('workflowName')
+        self.workflowUUID = self.wfaDict.get('workflowUUID')
+        if(self.workflowUUID == None and workflowName != None):
+            self.workflowUUID = uuidTable.get(self.wfaDict['wfaServer'], workflowName)
+        
+        if(self.workflowUUID != None):
+            self.workflowQueryURI = self._baseURI + "/" + urllib.quote(self.workflowUUID)
+        elif(workflowName != None):
+            self.workflowQueryURI = self._baseURI + "?name=" + urllib.quote_plus(workflowName)
+        else:
+            raise Exception("Either a workflowName or a workflowUUID is required")
+        return
+    
+    '''
+    _workflowKey - the key of this workflow in the definition cache: its name, or its UUID if no name was given
+    '''
+    def _workflowKey(self):
+        workflowName = self.wfaDict.get('workflowName')
+        if(workflowName != None):
+            return(workflowName)
+        return(self.workflowUUID)
+    
+    '''
+    _getWorkflowDef - use the raw workflow XML if it was supplied, otherwise the cached definition
+    '''
+    def _getWorkflowDef(self, wfaInputXml):
+        if(wfaInputXml != None):
+            return(parseWorkflowDef(wfaInputXml))
+        return(self.getWorkflowDefinition())
     
     '''
     _buildConnection - build the connection to be used for the RESTful API interaction
                         between this instance and WFA.
     
-    Note that a) this is intended to be a private method, and b) this uses urllib2 with simple username/password 
-    combinations - no pre-generated credential can be used with this library.
+    Note that a) this is intended to be a private method, and b) this uses simple username/password 
+    combinations - no pre-generated credential can be used.
+    
+    Connections come from a keep-alive pool shared by every instance talking to the same WFA server.  The
+    credential belongs to this instance's session only and is sent preemptively with every request, which 
+    avoids the 401 challenge round trip.
     '''
     def _buildConnection(self, baseURI, username, password):
-        import urllib2   
         if(username == None):
             username = "admin"
         if(password == None):
             password = "sp1Tfir3"
         
         # WFA does define a realm, but does not enforce it - so why use it!
-        pw_manager = urllib2.HTTPPasswordMgrWithDefaultRealm()
-        
-        # We establish a credential for the /workflow/rest path.  Any child paths
-        # using this credential will be honored.
-        pw_manager.add_password(None, baseURI , username, password)
-        handler = urllib2.HTTPBasicAuthHandler(pw_manager)
-        opener = urllib2.build_opener(handler)
-        
-        # Install this instance for the instance of this class.
-        urllib2.install_opener(opener)
+        self._session = WfaSession(self.wfaDict['wfaServer'], username, password, 
+                                   self.wfaDict.get('wfaPoolSize'), self.wfaDict.get('wfaPoolIdleTimeout'),
+                                   policyFromDict(self.wfaDict),
+                                   getCircuitBreaker(self.wfaDict['wfaServer'], self.wfaDict.get('wfaBreakerThreshold'),
+                                                     self.wfaDict.get('wfaBreakerReset')))
         return
     
     '''
@@ -292,53 +432,375 @@ class Wfa(object):
         elif(self.wfaDict['wfaParamMap'] != None and wfaParamMap == None):
             wfaParamMap = self.wfaDict['wfaParamMap']
                    
-        # wfaUUID = wfaXml[0].get('uuid')
-        # Get the raw XML from the initial query after opening the connection
-        wfaXml = self.getRestResponse(self.workflowQueryURI)
+        # Get the parsed workflow definition - only queried from WFA when it is not already cached
+        workflowDef = self.getWorkflowDefinition()
         
         # set the execution link.  This allows the executeWorkflow to simply operate without arguments.
-        self.wfaExecuteLink = self._getWfaActionLink('execute', wfaXml[0].findall('{http://www.w3.org/2005/Atom}link'))
+        self.wfaExecuteLink = workflowDef.executeLink
         
         # build our XML to submit as part of the workflow.
-        self._buildInputXml(wfaXml, wfaParamMap)
+        self._buildInputXml(workflowDef, wfaParamMap)
         return
     
     '''
-    executeWorkflow - execute the workflow that has been setup by setupWorkflow.
+    executeWorkflow - execute the workflow that has been setup by setupWorkflow.  Returns as soon as WFA has assigned
+    the job ID - use waitForCompletion or getSimpleJobStatus to follow the job.
+    
+    With wfaCoalesce set, an execution identical to one in flight (same server, workflow and input) starts no job of its 
+    own: the instance takes on the job dictionary of the running job, and waitForCompletion/watchJob report its outcome 
+    (see WfaCoalesce).  With wfaCoalesceWindow set, the same applies for that many seconds after an identical job 
+    completed successfully.
     '''
     def executeWorkflow(self):
-        from time import sleep
-        # Get the raw XML from the execution request.  This raw XML contains the initial job information
-        jobXml = self.getRestResponse(self.wfaExecuteLink, self.workflowInputXml, self._workflowRestHeader)
-        sleep(5)
+        self._flight = None
+        self._ticket = None
+        if(not self.wfaDict.get('wfaCoalesce')):
+            self._submitJob()
+            return
+        
+        key = coalesceKey(self.wfaDict['wfaServer'], self._workflowKey(), self.workflowInputXml)
+        window = self.wfaDict.get('wfaCoalesceWindow')
+        if(window == None):
+            window = DEFAULT_COALESCE_WINDOW
+        flight, leader = singleFlight.join(key, self, window)
+        self._flight = flight
+        if(not leader):
+            # Raises the leader's error if its submission failed.
+            self.jobDict = flight.submitted.result()
+            return
+        try:
+            self._submitJob()
+        except Exception, e:
+            singleFlight.failed(flight, e)
+            raise
+        singleFlight.submit(flight, self.jobDict)
+        # The flight has to settle even if nobody waits for the job, or later executions would join it forever.
+        self._trackFlight()
+        return
+    
+    '''
+    _trackFlight - have the server's WfaJobMonitor follow the shared job of a coalesced execution to its end, so that 
+    its outcome reaches every attached instance, and the flight is dropped, even if the leader is not waiting for it.  
+    The leader calls this as soon as its job has been submitted.
+    '''
+    def _trackFlight(self):
+        flight = self._flight
+        if(not singleFlight.track(flight)):
+            return
+        def tracked(future):
+            error = future.exception()
+            if(error != None):
+                singleFlight.failed(flight, error)
+            else:
+                self._journalResult(future.jobDict, future.result())
+                singleFlight.finish(flight, future.result())
+        self._monitor().watch(self.jobDict['jobId'], self.jobDict['jobSelfLink'], None, self.jobDict).addCallback(tracked)
+        return
+    
+    '''
+    _submitJob - POST the workflow input and record the job ID and self link in jobDict (and in the journal, if one is 
+    configured - before returning, so a job WFA has accepted is never lost to a crash of this process; if the journal 
+    cannot record it, its error is raised with jobDict already set).  With wfaSchedule set the POST waits for admission 
+    by the scheduler of the server, and the job holds its slot until it finishes.
+    '''
+    def _submitJob(self):
+        ticket = self._admit()
+        # The response to the execution request contains the initial job information
+        submitTime = time.time()
+        try:
+            response = self._session.urlopen(self.wfaExecuteLink, self.workflowInputXml, self._workflowRestHeader, self.jobDict)
+            record = readResponse(response, parseJobStream)
+        except Exception:
+            if(ticket != None):
+                ticket.release(False)
+            raise
         # Set the values in the job dictionary for future use.
-        self.jobDict['jobId'] = jobXml.get('jobId')
-        self.jobDict['jobSelfLink'] = self._getWfaActionLink('self', jobXml.findall('{http://www.w3.org/2005/Atom}link'))
+        self.jobDict['jobId'] = record.jobId
+        self.jobDict['jobSelfLink'] = record.links.get('self')
+        metrics.jobSubmitted(self.wfaDict['wfaServer'], record.jobId, self._workflowKey(), submitTime)
+        if(ticket != None):
+            # The slot is given back when the job finishes, whether or not anyone waits for it; a job the monitor 
+            # could not follow counts against the limit.
+            self._ticket = ticket
+            self._monitor().watch(record.jobId, self.jobDict['jobSelfLink'], None, self.jobDict).addCallback(
+                lambda future: ticket.release(future.exception() == None))
+        journal = self._journal()
+        if(journal != None):
+            journal.submitted(self.wfaDict['wfaServer'], record.jobId, self.jobDict['jobSelfLink'], 
+                              self.wfaDict.get('workflowName'), self._paramMap, self._shareName())
         return
     
+    '''
+    _admit - wait for the scheduler of the server to admit the job and return the WfaTicket, or None if the instance 
+    does not schedule its jobs
+    '''
+    def _admit(self):
+        if(not self.wfaDict.get('wfaSchedule')):
+            return(None)
+        scheduler = getScheduler(self.wfaDict['wfaServer'], None, self.wfaDict.get('wfaMaxInFlight'))
+        return(scheduler.acquire(self._priority(), self.wfaDict.get('wfaTenant') or self.wfaDict['wfaUser'], 
+                                 self._workflowKey(), self.wfaDict.get('wfaAdmitTimeout')))
+    
+    def _priority(self):
+        priority = self.wfaDict.get('wfaPriority')
+        if(priority == None):
+            priority = PRIORITY_NORMAL
+        return(priority)
+    
+    '''
+    _journal - the job journal named by wfaDict['wfaJournal'], or None
+    '''
+    def _journal(self):
+        path = self.wfaDict.get('wfaJournal')
+        if(path == None):
+            return(None)
+        # Loaded on first use - instances without a journal never pay for sqlite3.
+        from WfaJournal import getJournal
+        return(getJournal(path))
+    
+    '''
+    _journalResult - append the result of the job to the journal, if one is configured.  Every poll that sees the job 
+    finished, the tracking of a coalesced job and watchJob all report it, so the job state records that it was 
+    journaled and only the first report is appended.
+    '''
+    def _journalResult(self, jobDict, wfaStatus):
+        journal = self._journal()
+        if(journal == None):
+            return
+        state = getattr(jobDict, 'state', None)
+        if(state != None):
+            with _journalResultLock:
+                if(state.journaled):
+                    return
+                state.journaled = True
+        journal.finished(self.wfaDict['wfaServer'], jobDict['jobId'], wfaStatus, jobDict)
+        return
+    
+    '''
+    _shareName - the share the job works on, indexed by the journal.  Taken from wfaDict['shareName'] here; WfaOs finds it 
+    through the operation's parameter map.
+    '''
+    def _shareName(self):
+        return(self.wfaDict.get('shareName'))
+    
+    '''
+    waitForCompletion - poll the job until it reaches a terminal state and return the final simple status ("DONE" or 
+    "FAILED").
+    
+    The first poll is issued immediately; the interval then grows exponentially from wfaPollInterval up to 
+    wfaPollMaxInterval, with +/-20% jitter so that many waiting jobs do not poll in lock step.  Once the job has moved 
+    through a couple of commands the interval follows its command rate instead (half the observed time per command, 
+    within the same bounds), so long running jobs are polled less often.  If timeout (seconds) expires 
+    first, the last simple status ("OK" or "UNKNOWN") is returned.  If a callback is given it is called after every poll 
+    as callback(self, simpleStatus).  The number of polls and the time spent waiting are recorded in jobDict as pollCount 
+    and waitTime.  While the circuit breaker of the server is open a poll reports "UNKNOWN" and waiting carries on.
+    
+    For a coalesced execution (see executeWorkflow) that attached to another instance's job, the shared job is followed by 
+    the server's WfaJobMonitor instead; callback is then called once, with the final status.
+    '''
+    def waitForCompletion(self, timeout=None, callback=None):
+        if(self._flight != None and self._flight.leader is not self):
+            self._trackFlight()
+            try:
+                wfaStatus = self._flight.completed.result(timeout)
+            except WfaTimeoutError:
+                return(jobSimpleStatus(self.jobDict))
+            if(callback != None):
+                callback(self, wfaStatus)
+            return(wfaStatus)
+        
+        interval = self.wfaDict.get('wfaPollInterval') or 0.5
+        maxInterval = self.wfaDict.get('wfaPollMaxInterval') or 10.0
+        startTime = time.time()
+        
+        while(True):
+            try:
+                wfaStatus = self.getSimpleJobStatus()
+            except WfaCircuitOpenError:
+                # WFA is down - the job itself may well be fine, so keep waiting until the breaker lets a poll through.
+                wfaStatus = "UNKNOWN"
+            self.jobDict['pollCount'] = self.jobDict['pollCount'] + 1
+            self.jobDict['waitTime'] = time.time() - startTime
+            if(callback != None):
+                callback(self, wfaStatus)
+            if(wfaStatus == "DONE" or wfaStatus == "FAILED"):
+                return(wfaStatus)
+            
+            commandInterval = self._poll.interval(self.wfaDict.get('wfaPollInterval') or 0.5, maxInterval)
+            if(commandInterval != None):
+                interval = commandInterval
+            delay = interval * random.uniform(0.8, 1.2)
+            if(timeout != None):
+                remaining = timeout - (time.time() - startTime)
+                if(remaining <= 0):
+                    return(wfaStatus)
+                delay = min(delay, remaining)
+            metrics.jobSlept(self.wfaDict['wfaServer'], self.jobDict['jobId'], delay)
+            time.sleep(delay)
+            interval = min(interval * 2, maxInterval)
+    
+    '''
+    watchJob - hand the executed job to the shared WfaJobMonitor of this server and return a WfaFuture whose result is the 
+    final simple status.  This instance's jobDict is updated by the monitor thread as the job progresses.  If given, 
+    callback(jobDict, simpleStatus) is called when the job finishes.  A coalesced execution returns the future of the 
+    shared job.
+    '''
+    def watchJob(self, callback=None):
+        if(self._flight != None):
+            self._trackFlight()
+            future = self._flight.completed
+            if(callback != None):
+                def finished(future):
+                    if(future.exception() == None):
+                        callback(self.jobDict, future.result())
+                future.addCallback(finished)
+            return(future)
+        # The job may already be watched (a scheduled job is), so the callback is attached to the future rather than 
+        # passed to watch, which only takes it for a job it starts watching.
+        future = self._monitor().watch(self.jobDict['jobId'], self.jobDict['jobSelfLink'], None, self.jobDict)
+        if(callback != None):
+            def finished(future):
+                if(future.exception() == None):
+                    callback(future.jobDict, future.result())
+            future.addCallback(finished)
+        if(self.wfaDict.get('wfaJournal') != None):
+            def journaled(future):
+                if(future.exception() == None):
+                    self._journalResult(future.jobDict, future.result())
+            future.addCallback(journaled)
+        return(future)
+    
+    def _monitor(self):
+        return(getJobMonitor(self._session, self.wfaDict.get('wfaPollInterval'), self.wfaDict.get('wfaPollMaxInterval')))
+    
+    '''
+    newJob - return a new instance for another execution of the same workflow with a different parameter map.
+    
+    The new instance shares this instance's session and workflow definition and has its own (empty) jobDict.  Its input 
+    XML is built straight from the cached definition, so no REST call is made - it is ready for executeWorkflow.
+    '''
+    def newJob(self, wfaParamMap):
+        workflowDef = self.workflowDef
+        if(workflowDef == None):
+            workflowDef = self.getWorkflowDefinition()
+        job = copy.copy(self)
+        job.wfaDict = dict(self.wfaDict)
+        job.wfaDict['wfaParamMap'] = wfaParamMap
+        job.jobDict = newJobDict()
+        job._poll = WfaPollState()
+        job._flight = None
+        job._paramMap = None
+        job._ticket = None
+        job.wfaExecuteLink = workflowDef.executeLink
+        job._buildInputXml(workflowDef, wfaParamMap)
+        return(job)
+    
+    '''
+    jobHistory - iterate over the job history of the server, one row per job, paging through the jobs listing as the 
+    rows are consumed.  See WfaHistory.iterJobHistory for the filters and the rows, and WfaHistory.exportJobHistory to 
+    write the history to a file.
+    '''
+    def jobHistory(self, workflowName=None, status=None, since=None, until=None, afterJobId=None):
+        # WfaHistory brings in argparse, csv and json, so it is only imported when the history is read.
+        from WfaHistory import iterJobHistory
+        return(iterJobHistory(self._session, workflowName, status, since, until, afterJobId))
+    
     '''
     getRestResponse - generic method to return XML based on URIs passed to WFA.
     
+    This builds a complete ElementTree of the response and is meant for ad hoc queries.  The class itself reads job and 
+    workflow documents with the streaming parsers in WfaParse, which only extract the fields that are used.
+    
     This has two optional parameters, depending on if you are issuing a GET or a POST.  The optional 
     parameters are used for the POST to WFA of the XML needed to initiate execution of the workflow
     '''
     def getRestResponse(self, URL, data=None, headers=None):
-        import urllib2
-        try:
-            import xml.etree.cElementTree as ET
-        except ImportError:
-            import xml.etree.ElementTree as ET
-        
         # if the data is specified, then issue this as a POST otherwise treat as a GET    
-        if(data != None and headers != None):
-            request = urllib2.Request(URL, data, headers)
-        else:
-            request = URL
-        response = urllib2.urlopen(request).read()
+        if(data == None or headers == None):
+            data = None
+            headers = None
+        response = self._session.urlopen(URL, data, headers).read()
         
         # Translate the raw string XML to something that is usable on the way back out.
         return(ET.fromstring(response))
 
+'''
+Default workflow of every Manila operation, per platform (see WfaOs.setDefManilaWorkflows), and default parameter 
+map of every Manila operation (see WfaOs.getDefManilaParamMap).  The entries are tuples of pairs so that the shared 
+tables cannot be changed by accident; the WfaOs methods hand out dictionary copies.
+'''
+MANILA_WORKFLOWS = {
+                    '7m' : (
+                           ('create_share', 'os_create_nfs_share_7m'),
+                           ('delete_share', 'os_delete_nfs_share_7m'),
+                           ('create_snapshot', 'os_create_snapshot_7m'),
+                           ('delete_snapshot', 'os_delete_snapshot_7m'),
+                           ('create_share_snapshot', 'os_create_nfs_share_snapshot_7m'),
+                           ('delete_share_snapshot', 'os_delete_nfs_share_snapshot_7m'),
+                           ('grant_ip', 'os_grant_ip_7m'),
+                           ('deny_ip', 'os_deny_ip_7m')
+                           ),
+                    'cdot' : (
+                           ('create_share', 'os_create_nfs_share_cdot'),
+                           ('delete_share', 'os_delete_nfs_share_cdot'),
+                           ('create_snapshot', 'os_create_snapshot_cdot'),
+                           ('delete_snapshot', 'os_delete_snapshot_cdot'),
+                           ('create_share_snapshot', 'os_create_nfs_share_snapshot_cdot'),
+                           ('delete_share_snapshot', 'os_delete_nfs_share_snapshot_cdot'),
+                           ('grant_ip', 'os_grant_ip_cdot'),
+                           ('deny_ip', 'os_deny_ip_cdot')
+                           )
+                    }
+
+MANILA_PARAM_MAPS = {
+                     'create_share' : (
+                                      ('volSize', 'shareSize'),
+                                      ('volName', 'shareName'),
+                                      ('protocol', 'shareProto')
+                                      ),
+                     'delete_share' : (
+                                      ('volName', 'shareName'),
+                                      ),
+                     'create_snapshot' : (
+                                      ('snapName', 'snapID'),
+                                      ('volName', 'shareName')
+                                      ),
+                     'delete_snapshot' : (
+                                      ('snapName', 'snapID'),
+                                      ),
+                     'create_share_snapshot' : (
+                                      ('volSize', 'shareSize'),
+                                      ('volName', 'shareName'),
+                                      ('protocol', 'shareProto'),
+                                      ('snapName', 'snapID'),
+                                      ('sourceVolName', 'origShareName')
+                                      ),
+                     'grant_ip' : (
+                                      ('accessIP', 'shareIP'),
+                                      ('wolName', 'shareName'),
+                                      ('accessRule', 'accessType')
+                                      ),
+                     'deny_ip' : (
+                                      ('accessIP', 'shareIP'),
+                                      ('volName', 'shareName')
+                                      )
+                     }
+
+'''
+Priority class of every Manila operation (see WfaOs.setDefManilaPriorities and WfaSchedule).  Access changes are the 
+most urgent - a tenant is waiting on them - and bulk share-from-snapshot creation yields to everything else.
+'''
+MANILA_PRIORITIES = (
+                     ('deny_ip', PRIORITY_URGENT),
+                     ('grant_ip', PRIORITY_URGENT),
+                     ('delete_share', PRIORITY_HIGH),
+                     ('delete_snapshot', PRIORITY_HIGH),
+                     ('delete_share_snapshot', PRIORITY_HIGH),
+                     ('create_share', PRIORITY_NORMAL),
+                     ('create_snapshot', PRIORITY_NORMAL),
+                     ('create_share_snapshot', PRIORITY_BULK)
+                     )
+
 class WfaOs(Wfa):
     '''
     WfaOs - OpenStack child class for Wfa
@@ -378,6 +840,28 @@ class WfaOs(Wfa):
     method to append these values.  This is separate from the initialization of the parameter map as the sample values 
     must be evaluated against the standard OpenStack parameters that would be set as part of the driver.
     
+    Rather than evaluating the template values by hand, pass the OpenStack values (a dictionary, or an object carrying 
+    them as attributes) to bindParams: it fills in the parameter map, extra specs included, through the compiled 
+    binding of the operation (see WfaBind).  bindMany does the same for a whole list of requests.
+    
+    With wfaDict['wfaSchedule'] set, submissions go through the admission scheduler of the server (see WfaSchedule): 
+    each operation has a priority class (see setDefManilaPriorities; wfaDict['wfaPriority'] overrides it), tenants are 
+    served round robin within a class, and the number of jobs in flight on the server backs off when WFA slows down or 
+    fails.  By default jobs are submitted straight away.
+    
+    Identical executions (same operation and parameters) are coalesced by default: while such a job is running, another 
+    identical execution shares that job rather than starting a second one.  A finished job answers nothing more unless 
+    wfaDict['wfaCoalesceWindow'] keeps its successful result for a while.  Set wfaDict['wfaCoalesce'] to False to always 
+    start a new job.
+    
+    For bursts of the same operation (e.g. hundreds of create_share calls during tenant onboarding), use submitMany rather 
+    than one instance per call: it resolves the workflow once, builds every input from the cached workflow definition and 
+    runs the submissions through a bounded worker pool.
+    
+    Composite operations (e.g. create_share followed by grant_ip on the new share) are best run as a WfaChain: each step 
+    can take inputs from the return parameters of earlier steps, independent steps run in parallel and every step's 
+    workflow is resolved before the step is due.
+    
     ****************************************************************************************************************
     WfaOs class constructor
     
@@ -389,6 +873,10 @@ class WfaOs(Wfa):
             wfaPw : <password for wfa user> <mandatory key> <string>
             wfaPlatform : <Enum of either 7m or cdot> 
             workflowName : <workflow name - overrides default workflow name> <string> 
+            workflowUUID : <workflow UUID - skips the workflow name search> <string>
+            wfaResolveUUIDs : <if True, resolve the UUIDs of every default workflow of the platform once per server> <bool>
+            wfaUUIDTable : <path of a JSON file persisting the name -> UUID resolution table> <string>
+            wfaJournal : <path of an SQLite journal of submitted jobs and their results; see WfaJournal.reattachJobs> <string>
             wfaOperation : <Enum of defined OpenStack operations
                             Manila:
                             create_share, delete_share, create_snapshot, delete_snapshot, create_nfs_share_snapshot,
@@ -401,6 +889,8 @@ class WfaOs(Wfa):
                             WFA Parameter as defined in the workflow, matched with the 
                             associated value>
     '''
+    
+    __slots__ = ()
 
     def __init__(self, wfaDict=None):
 
@@ -424,9 +914,20 @@ class WfaOs(Wfa):
         elif(wfaDict['workflowName'] == None):
             self.wfaDict['workflowName'] = setWorkflows()[self.wfaDict['wfaOperation']]
         
+        # Retried and racing requests for the same operation share one job unless coalescing is turned off.
+        if(self.wfaDict.get('wfaCoalesce') == None):
+            self.wfaDict['wfaCoalesce'] = True
+        
+        # Pick up a persisted name -> UUID resolution table before the workflow query is set up.
+        if(self.wfaDict.get('wfaUUIDTable') != None):
+            uuidTable.loadOnce(self.wfaDict['wfaUUIDTable'])
+        
         # Instantiate the base class    
         Wfa.__init__(self, wfaDict = self.wfaDict)
         
+        if(self.wfaDict.get('wfaResolveUUIDs')):
+            self.resolveWorkflowUUIDs(setWorkflows)
+        
         # Install the generated parameter map.
         self.wfaDict['wfaParamMap'] = setWfaParamMap()
         return
@@ -440,77 +941,204 @@ class WfaOs(Wfa):
                 self.wfaDict['wfaParamMap'][spec] = self.wfaDict['wfaExtraSpec'][spec]
         return
     
+    '''
+    binding - the compiled WfaBind.WfaParamBinding of this instance's operation and extra specs
+    '''
+    def binding(self):
+        if(self.wfaDict['osProject'] != 'manila' or not self.wfaDict['wfaOperation'] in MANILA_PARAM_MAPS):
+            raise Exception("Operation " + str(self.wfaDict['wfaOperation']) + " not implemented")
+        return(getBinding(MANILA_PARAM_MAPS[self.wfaDict['wfaOperation']], self.wfaDict.get('wfaExtraSpec')))
+    
+    '''
+    bindParams - set the parameter map from osValues, a dictionary (or object) of the OpenStack values named by the 
+    operation's default parameter map, plus the extra specs.  Returns the parameter map.
+    '''
+    def bindParams(self, osValues):
+        self.wfaDict['wfaParamMap'] = self.binding().bind(osValues)
+        return(self.wfaDict['wfaParamMap'])
+    
+    '''
+    bindMany - return the parameter maps of a list of OpenStack value dictionaries (or objects), bound in one pass
+    '''
+    def bindMany(self, osValuesList):
+        return(self.binding().bindMany(osValuesList))
+    
+    '''
+    submitMany - execute operation once for every dictionary of OpenStack values in paramList and return the per-item 
+    results in input order.
+    
+    Each dictionary (or object) holds the OpenStack values named by the operation's default parameter map (e.g. 
+    shareName, shareSize, shareProto for create_share); the whole list is bound in one pass with the extra specs of 
+    this instance applied to every item (see bindMany).  The workflow name and definition of the operation are resolved 
+    once for the whole batch (a workflowName or workflowUUID set on this instance is not carried over to it).  At most 
+    maxInFlight jobs are submitted but not yet finished at any one time - further submissions wait for a running job to 
+    complete.  Job completion is tracked by the server's WfaJobMonitor.  If timeout (seconds) expires before every job 
+    has finished, submitMany returns without waiting for the rest.
+    
+    Each result is a dictionary:
+        status - the final simple status ("DONE" or "FAILED"), or "ERROR" if the item could not be submitted or tracked 
+                 (or was not submitted before the timeout, with a WfaTimeoutError).  A job still running when the 
+                 timeout expired has its last simple status ("OK" or "UNKNOWN"), as waitForCompletion returns.
+        jobDict - the job dictionary of the item (see the Wfa class documentation)
+        error - the exception raised for the item, or None
+    '''
+    def submitMany(self, operation, paramList, maxInFlight=8, timeout=None):
+        wfaDict = dict(self.wfaDict)
+        wfaDict['wfaOperation'] = operation
+        wfaDict['workflowName'] = None
+        wfaDict['workflowUUID'] = None
+        template = self.__class__(wfaDict)
+        wfaParamMaps = template.bindMany(paramList)
+        template.getWorkflowDefinition()
+        
+        deadline = None
+        if(timeout != None):
+            deadline = time.time() + timeout
+        results = [None] * len(paramList)
+        jobs = [None] * len(paramList)
+        # Number of jobs submitted (or being submitted) and not yet finished, guarded by changed.
+        inFlight = [0]
+        changed = threading.Condition()
+        executor = WfaExecutor(maxInFlight, name="WfaOs-submitMany")
+        
+        def finish(index, jobDict, wfaStatus, error):
+            with changed:
+                if(results[index] == None):
+                    results[index] = { 'status' : wfaStatus, 'jobDict' : jobDict, 'error' : error }
+                    inFlight[0] = inFlight[0] - 1
+                    changed.notifyAll()
+        
+        def tracked(index, job, future):
+            error = future.exception()
+            if(error != None):
+                finish(index, job.jobDict, "ERROR", error)
+            else:
+                finish(index, job.jobDict, future.result(), None)
+        
+        def submit(index, wfaParamMap):
+            job = None
+            try:
+                job = template.newJob(wfaParamMap)
+                jobs[index] = job
+                job.executeWorkflow()
+                job.watchJob().addCallback(lambda future: tracked(index, job, future))
+            except Exception, e:
+                jobDict = newJobDict()
+                if(job != None):
+                    jobDict = job.jobDict
+                finish(index, jobDict, "ERROR", e)
+        
+        def waitFor(ready):
+            # Called holding changed; False if the deadline passed first.
+            while(not ready()):
+                remaining = None
+                if(deadline != None):
+                    remaining = deadline - time.time()
+                    if(remaining <= 0):
+                        return(False)
+                changed.wait(remaining)
+            return(True)
+        
+        submissions = []
+        with changed:
+            for index in range(len(paramList)):
+                if(not waitFor(lambda: inFlight[0] < maxInFlight)):
+                    break
+                inFlight[0] = inFlight[0] + 1
+                submissions.append(executor.submit(submit, index, wfaParamMaps[index]))
+            waitFor(lambda: inFlight[0] == 0)
+            
+            # Only left to fill after a timeout: submissions still queued are dropped, and running jobs report their 
+            # last status.
+            for submission in submissions:
+                submission.cancel()
+            for index in range(len(results)):
+                if(results[index] != None):
+                    continue
+                job = jobs[index]
+                if(job != None and job.jobDict['jobId'] != None):
+                    jobDict = job.jobDict
+                    results[index] = { 'status' : jobSimpleStatus(jobDict), 'jobDict' : jobDict, 'error' : None }
+                else:
+                    results[index] = { 'status' : "ERROR", 'jobDict' : newJobDict(), 
+                                       'error' : WfaTimeoutError("Timed out before the job was submitted") }
+        executor.shutdown(False)
+        return(results)
+    
+    '''
+    resolveWorkflowUUIDs - fill the name -> UUID resolution table for every default workflow of this platform.
+    
+    This is done once per server and platform: each workflow name is looked up (which also caches its definition), so 
+    every later instance - for any operation - fetches its workflow by UUID.  Workflows not present on the server are 
+    skipped.  If wfaUUIDTable is set, the table is saved to that file afterwards.
+    '''
+    def resolveWorkflowUUIDs(self, setWorkflows=None):
+        if(setWorkflows == None):
+            setWorkflows = self.setDefManilaWorkflows
+        wfaServer = self.wfaDict['wfaServer']
+        filledKey = (wfaServer, self.wfaDict['osProject'], self.wfaDict['wfaPlatform'])
+        if(uuidTable.isFilled(filledKey)):
+            return
+        
+        for workflowName in sorted(set(setWorkflows().values())):
+            if(uuidTable.get(wfaServer, workflowName) != None):
+                continue
+            queryURI = self._baseURI + "?name=" + urllib.quote_plus(workflowName)
+            try:
+                workflowDef = workflowCache.lookup(self._session, wfaServer, workflowName, queryURI)
+            except Exception:
+                continue
+            if(workflowDef.uuid != None):
+                uuidTable.put(wfaServer, workflowName, workflowDef.uuid)
+        uuidTable.markFilled(filledKey)
+        
+        if(self.wfaDict.get('wfaUUIDTable') != None):
+            uuidTable.save(self.wfaDict['wfaUUIDTable'])
+        if(self.workflowUUID == None):
+            self._setWorkflowQuery()
+        return
+    
     '''
     setDefManilaWorkflows - set the workflow name for each platform type for Manila
+    
+    Returns a copy of the platform's entry in MANILA_WORKFLOWS, so the caller is free to change it.
     '''
     def setDefManilaWorkflows(self):
-        if(self.wfaDict['wfaPlatform'] == '7m'):
-            return( {
-                           'create_share' : 'os_create_nfs_share_7m',
-                           'delete_share' : 'os_delete_nfs_share_7m',
-                           'create_snapshot' : 'os_create_snapshot_7m',
-                           'delete_snapshot' : 'os_delete_snapshot_7m',
-                           'create_share_snapshot' : 'os_create_nfs_share_snapshot_7m',
-                           'delete_share_snapshot' : 'os_delete_nfs_share_snapshot_7m',
-                           'grant_ip' : 'os_grant_ip_7m',
-                           'deny_ip' : 'os_deny_ip_7m'
-                           })
-        elif(self.wfaDict['wfaPlatform'] == 'cdot'):
-            return( {
-                           'create_share' : 'os_create_nfs_share_cdot',
-                           'delete_share' : 'os_delete_nfs_share_cdot',
-                           'create_snapshot' : 'os_create_snapshot_cdot',
-                           'delete_snapshot' : 'os_delete_snapshot_cdot',
-                           'create_share_snapshot' : 'os_create_nfs_share_snapshot_cdot',
-                           'delete_share_snapshot' : 'os_delete_nfs_share_snapshot_cdot',
-                           'grant_ip' : 'os_grant_ip_cdot',
-                           'deny_ip' : 'os_deny_ip_cdot'
-                           })
-        else:
+        workflows = MANILA_WORKFLOWS.get(self.wfaDict['wfaPlatform'])
+        if(workflows == None):
             raise Exception("Invalid platform type")
+        return(dict(workflows))
+    
+    '''
+    setDefManilaPriorities - return the priority class of each Manila operation
+    
+    Returns a copy of MANILA_PRIORITIES, so the caller is free to change it.
+    '''
+    def setDefManilaPriorities(self):
+        return(dict(MANILA_PRIORITIES))
+    
+    def _priority(self):
+        # Looked up per call, as submitMany and WfaChain reuse the dictionary of an instance for other operations.
+        if(self.wfaDict.get('wfaPriority') == None and self.wfaDict['osProject'] == 'manila'):
+            return(self.setDefManilaPriorities().get(self.wfaDict['wfaOperation'], PRIORITY_NORMAL))
+        return(Wfa._priority(self))
+    
+    def _shareName(self):
+        # The WFA parameter the operation fills from the OpenStack shareName (volName, or wolName for grant_ip).
+        if(self._paramMap != None):
+            for wfaParam, osParam in MANILA_PARAM_MAPS.get(self.wfaDict['wfaOperation'], ()):
+                if(osParam == 'shareName'):
+                    return(self._paramMap.get(wfaParam))
+        return(Wfa._shareName(self))
     
     '''
     getDefManilaParamMap - return the default parameter map for the select Manila operation.
+    
+    Returns a copy of the operation's entry in MANILA_PARAM_MAPS, as the parameter map is filled in by the caller.
     '''    
     def getDefManilaParamMap(self):
-        if(self.wfaDict['wfaOperation'] == 'create_share'):
-            return({
-                    'volSize' : 'shareSize',
-                    'volName' : 'shareName',
-                    'protocol' : 'shareProto'
-                    })
-        elif(self.wfaDict['wfaOperation'] == 'delete_share'):
-            return({
-                    'volName' : 'shareName'
-                    })
-        elif(self.wfaDict['wfaOperation'] == 'create_snapshot'):
-            return({
-                   'snapName' : 'snapID',
-                   'volName' : 'shareName' 
-                    })
-        elif(self.wfaDict['wfaOperation'] == 'delete_snapshot'):
-            return({
-                   'snapName' : 'snapID'
-                    })
-        elif(self.wfaDict['wfaOperation'] == 'create_share_snapshot'):
-            return({
-                  'volSize' : 'shareSize',
-                  'volName' : 'shareName',
-                  'protocol' : 'shareProto',
-                  'snapName' : 'snapID',
-                  'sourceVolName' : 'origShareName' 
-                    })
-        elif(self.wfaDict['wfaOperation'] == 'grant_ip'):
-            return({
-                   'accessIP' : 'shareIP',
-                   'wolName' : 'shareName',
-                   'accessRule' : 'accessType' 
-                    })
-        elif(self.wfaDict['wfaOperation'] == 'deny_ip'):
-            return({
-                    'accessIP' : 'shareIP',
-                    'volName' : 'shareName'
-                    })
-        else:
+        paramMap = MANILA_PARAM_MAPS.get(self.wfaDict['wfaOperation'])
+        if(paramMap == None):
             return('Operation not implemented')
+        return(dict(paramMap))
     
\ No newline at end of file
@@ -0,0 +1,178 @@
+'''
+Created on Oct 16, 2026
+
+WfaAsync.py - non-blocking counterparts of the Wfa and WfaOs classes.
+Every REST interaction (setupWorkflow, executeWorkflow, getWfaJobStatus) is run on a small worker pool shared by all
+instances talking to the same server and returns a WfaFuture immediately.  Waiting for a job to finish does not
+occupy a worker at all - completion is tracked by the server's WfaJobMonitor - so a handful of threads can drive
+thousands of in-flight jobs.
+
+Python 2.7 has no asyncio, so the futures are thread based; result(), addCallback() and done() play the part of
+await, add_done_callback() and done().
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import threading
+
+from Wfa import Wfa, WfaOs
+from WfaConcurrent import WfaExecutor, WfaFuture, WfaTimeoutError
+
+# Default number of concurrent REST calls per WFA server.
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Process wide registry of executors, one per WFA server.
+_executorRegistry = {}
+_executorRegistryLock = threading.Lock()
+
+'''
+getServerExecutor - return the shared executor for wfaServer, creating it on first use.  maxConcurrency bounds the
+number of REST calls in progress against the server at any one time and only takes effect on creation.
+'''
+def getServerExecutor(wfaServer, maxConcurrency=None):
+    with _executorRegistryLock:
+        executor = _executorRegistry.get(wfaServer)
+        if(executor == None):
+            if(maxConcurrency == None):
+                maxConcurrency = DEFAULT_MAX_CONCURRENCY
+            executor = WfaExecutor(maxConcurrency, name="WfaAsync-" + wfaServer)
+            _executorRegistry[wfaServer] = executor
+        return(executor)
+
+class AsyncWfa(Wfa):
+    '''
+    AsyncWfa - Wfa whose REST methods return a WfaFuture instead of blocking.
+
+    Constructed exactly like Wfa.  The additional optional wfaDict key is:
+        wfaMaxConcurrency : <maximum REST calls in flight against wfaServer, default 8> <optional> <int>
+
+    Typical use:
+        wfa = AsyncWfa(wfaDict=myWfaDict)
+        done = wfa.run()                  # setup, execute and wait - all without blocking
+        ...
+        if(done.result() == "DONE"):
+            print wfa.jobDict['returnParams']
+
+    The futures of setupWorkflow/executeWorkflow/getWfaJobStatus resolve to None once the call has completed (the results
+    land in the instance as with Wfa); getSimpleJobStatus and completion resolve to the simple status.  As with Wfa, the
+    calls of one instance must be sequenced - wait for (or chain on) one future before issuing the next call.
+
+    Any of the futures can be cancelled (WfaFuture.cancel): a call still waiting for a worker is not made, a cancelled
+    run stops before its next step, and cancelling completion stops waiting for the job - the WFA job itself carries
+    on, and other waiters on it are not affected.
+    '''
+    
+    __slots__ = ('_executed',)
+
+    '''
+    setupWorkflow - see Wfa.setupWorkflow
+    '''
+    def setupWorkflow(self, wfaParamMap=None):
+        return(self._submit(Wfa.setupWorkflow, self, wfaParamMap))
+
+    '''
+    executeWorkflow - see Wfa.executeWorkflow.  The job ID is in jobDict once the future resolves.
+    '''
+    def executeWorkflow(self):
+        self._executed = self._submit(Wfa.executeWorkflow, self)
+        return(self._executed)
+
+    '''
+    getWfaJobStatus - see Wfa.getWfaJobStatus
+    '''
+    def getWfaJobStatus(self):
+        return(self._submit(Wfa.getWfaJobStatus, self))
+
+    '''
+    getSimpleJobStatus - see Wfa.getSimpleJobStatus
+    '''
+    def getSimpleJobStatus(self):
+        return(self._submit(Wfa.getSimpleJobStatus, self))
+
+    '''
+    completion - return a future that resolves to the final simple status ("DONE" or "FAILED") of the job.  May be
+    called before the executeWorkflow future has resolved; the job is handed to the WfaJobMonitor of the server as soon
+    as its ID is known.
+    '''
+    def completion(self):
+        executed = getattr(self, '_executed', None)
+        if(executed == None):
+            raise Exception("executeWorkflow has not been called")
+        return(_chain(executed, lambda ignored: self.watchJob()))
+
+    '''
+    waitForCompletion - blocking wait, kept for compatibility with Wfa.  Returns the final simple status, or "OK" if 
+    timeout expires first; callback(self, simpleStatus) is called once, when the job finishes.
+    '''
+    def waitForCompletion(self, timeout=None, callback=None):
+        try:
+            wfaStatus = self.completion().result(timeout)
+        except WfaTimeoutError:
+            return("OK")
+        if(callback != None):
+            callback(self, wfaStatus)
+        return(wfaStatus)
+
+    '''
+    run - setup, execute and wait for the workflow, returning the completion future
+    '''
+    def run(self, wfaParamMap=None):
+        def execute(ignored):
+            return(self.executeWorkflow())
+        def complete(ignored):
+            return(self.completion())
+        setup = self.setupWorkflow(wfaParamMap)
+        executed = _chain(setup, execute)
+        done = _chain(executed, complete)
+        # The steps are private to the run, so cancelling it cancels whichever of them has not happened yet.
+        _cancelWith(done, executed)
+        _cancelWith(executed, setup)
+        return(done)
+
+    def _submit(self, fn, *args):
+        executor = getServerExecutor(self.wfaDict['wfaServer'], self.wfaDict.get('wfaMaxConcurrency'))
+        return(executor.submit(fn, *args))
+
+class AsyncWfaOs(AsyncWfa, WfaOs):
+    '''
+    AsyncWfaOs - the non-blocking counterpart of WfaOs.  Constructed exactly like WfaOs (including appendExtraSpec);
+    the REST methods behave as described for AsyncWfa.
+    '''
+    __slots__ = ()
+
+'''
+_chain - return a future that follows the future returned by nextStep(result of first) once first succeeds.  A failure
+of either step fails the returned future; if the returned future is cancelled before first completes, nextStep is not
+called.
+'''
+def _chain(first, nextStep):
+    chained = WfaFuture()
+    def onFirst(future):
+        if(chained.done()):
+            return
+        try:
+            second = nextStep(future.result())
+        except Exception, e:
+            chained.setException(e)
+            return
+        second.addCallback(onSecond)
+    def onSecond(future):
+        try:
+            result = future.result()
+        except Exception, e:
+            chained.setException(e)
+            return
+        chained.setResult(result)
+    first.addCallback(onFirst)
+    return(chained)
+
+'''
+_cancelWith - cancel dependency if future is cancelled
+'''
+def _cancelWith(future, dependency):
+    def cancelled(future):
+        if(future.cancelled()):
+            dependency.cancel()
+    future.addCallback(cancelled)
+    return
@@ -0,0 +1,409 @@
+'''
+Created on Oct 16, 2026
+
+WfaBench.py - benchmarks for the Wfa client.
+
+    python WfaBench.py serializer [--rows N] [--columns N] [--repeat N]
+        Micro-benchmark of the workflow input serializer against the original string concatenation, for a workflow
+        with several large multi-row Table inputs.
+
+    python WfaBench.py jobs [--jobs 1,10,100,1000] [--paths wfa,wfaos,watch,batch] [--latency S] [--job-duration S]
+                            [--failure-rate F] [--pool-size N] [--no-compress]
+        End-to-end benchmark against a local WFA stand-in (WfaMock) seeded from Workflows/*.dar.  For every path and
+        number of concurrent jobs it reports submit latency, time to completion, status requests per job, requests per
+        second seen by the server, response bytes per job on the wire and the share saved by gzip (--no-compress
+        turns compression off on the server, for comparison) and the peak RSS of the client.  The paths are:
+            wfa - one Wfa instance and thread per job, waitForCompletion polling
+            wfaos - the same with WfaOs (delete_share)
+            watch - one Wfa instance per job, completion tracked by the shared WfaJobMonitor (watchJob)
+            batch - WfaOs.submitMany with every job in flight at once
+        Each run executes in a fresh interpreter, so the client's peak RSS and its caches are measured per run.
+
+    python WfaBench.py compress [--jobs N] [--repeat N]
+        Response compression against WfaMock: the workflow collection, the jobs listing (holding N jobs) and a job
+        document are fetched identity, gzip and deflate encoded, and read whole and in pieces of several sizes.  For
+        each it reports the bytes on the wire, the share saved and the read time per size, and checks that every read
+        returns exactly the identity body.  Exits with status 1 on a mismatch.
+
+    python WfaBench.py startup [--runs N] [--tree] [--import-budget MS] [--construct-budget US] [--record FILE]
+                               [--baseline FILE]
+        Cold start cost: the time to import the Wfa module in a fresh interpreter (median of the runs) and the time to
+        construct a Wfa and a WfaOs instance.  --tree prints the per-module breakdown in the layout of Python 3's
+        -X importtime (self and cumulative microseconds, nested by importer).  Exits with status 1 if a budget is
+        exceeded, so it can guard against regressions.  The default budgets hold for the reference machine only;
+        --record saves the measurement to a file, and --baseline budgets BASELINE_TOLERANCE times the measurement
+        saved there, so a check on any other machine compares against that machine's own numbers.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+import timeit
+
+from WfaParse import WfaUserInput, WfaWorkflowDef
+from WfaSerializer import INPUT_XML_TEMPLATE, WfaInputSerializer
+
+# Workflow (and matching WfaOs operation) driven by the end-to-end benchmark - it takes a single volName input.
+BENCH_WORKFLOW = 'os_delete_nfs_share_cdot'
+BENCH_OPERATION = 'delete_share'
+JOB_PATHS = ('wfa', 'wfaos', 'watch', 'batch')
+
+# Timing rounds of the serializer benchmark
+SERIALIZER_ROUNDS = 15
+
+# Default startup budgets - see benchStartup.  About 1.5 times the cold start measured on the reference machine
+# (import Wfa 64 ms, Wfa() and WfaOs() 15 us).
+IMPORT_BUDGET_MS = 95.0
+CONSTRUCT_BUDGET_US = 25.0
+
+# Budgets against a recorded baseline are the baseline times this
+BASELINE_TOLERANCE = 1.5
+
+'''
+Measured in a fresh interpreter by benchStartup.  Nothing but the import hook is loaded before Wfa, so the measurement
+is not flattered by modules the benchmark itself uses.  Prints one JSON line.
+'''
+_STARTUP_CLIENT = """
+import __builtin__, sys, time
+builtinImport = __builtin__.__import__
+modules = []
+stack = []
+def timedImport(name, *args, **kwargs):
+    if(name in sys.modules):
+        return(builtinImport(name, *args, **kwargs))
+    stack.append(0.0)
+    startTime = time.time()
+    try:
+        return(builtinImport(name, *args, **kwargs))
+    finally:
+        elapsed = time.time() - startTime
+        children = stack.pop()
+        if(stack):
+            stack[-1] = stack[-1] + elapsed
+        modules.append((name, len(stack), int((elapsed - children) * 1e6), int(elapsed * 1e6)))
+__builtin__.__import__ = timedImport
+startTime = time.time()
+import Wfa
+importTime = time.time() - startTime
+__builtin__.__import__ = builtinImport
+
+import json, timeit
+wfaDict = { 'wfaServer' : 'wfa.invalid', 'wfaUser' : 'bench', 'wfaPw' : 'bench', 'wfaParamMap' : None,
+            'workflowName' : 'os_create_nfs_share_cdot' }
+osDict = { 'wfaServer' : 'wfa.invalid', 'wfaUser' : 'bench', 'wfaPw' : 'bench', 'wfaOperation' : 'create_share',
+           'wfaPlatform' : 'cdot', 'osProject' : 'manila', 'wfaExtraSpec' : None }
+wfaTime = min(timeit.repeat(lambda: Wfa.Wfa(wfaDict=dict(wfaDict)), number=2000, repeat=3)) / 2000
+wfaOsTime = min(timeit.repeat(lambda: Wfa.WfaOs(dict(osDict)), number=2000, repeat=3)) / 2000
+print json.dumps({ 'importTime' : importTime, 'modules' : modules, 'wfaTime' : wfaTime, 'wfaOsTime' : wfaOsTime })
+"""
+
+'''
+legacyInputXml - the original Wfa._buildInputXml algorithm (repeated string concatenation), kept as the baseline.
+'''
+def legacyInputXml(workflowDef, wfaParamMap):
+    xmlString = ""
+    for uInput in workflowDef.inputs:
+        wfaParamValue = wfaParamMap[uInput.name]
+        if(wfaParamValue != None):
+            if(type(wfaParamValue) is not str):
+                wfaParamValue = str(wfaParamValue)
+            xmlString = xmlString + "\n\t\t<userInputEntry key = \"" + uInput.name + "\" value = \"" + wfaParamValue + "\"/>"
+    return(INPUT_XML_TEMPLATE.replace('--vk--', xmlString))
+
+'''
+benchSerializer - time both serializers on a workflow with a few scalar inputs and four Table inputs of rows x columns,
+and on the scalar inputs alone (the shape of the Manila workflows).  The legacy algorithm neither validates nor escapes
+the values, so its time is a floor rather than a like for like comparison; the ratio of the two is printed as measured.
+'''
+def benchSerializer(rows, columns, repeat):
+    inputs = [WfaUserInput('volName', 'String', True), WfaUserInput('volSize', 'Number', True),
+              WfaUserInput('protocol', 'Enum', True, ('cifs', 'nfs')), WfaUserInput('volExists', 'Boolean', False)]
+    wfaParamMap = { 'volName' : 'share01', 'volSize' : 10, 'protocol' : 'nfs', 'volExists' : 'false' }
+    scalarDef = WfaWorkflowDef('bench', None, None, tuple(inputs), ())
+    scalarParamMap = dict(wfaParamMap)
+    for table in range(4):
+        name = 'table' + str(table)
+        inputs.append(WfaUserInput(name, 'Table', False))
+        wfaParamMap[name] = ",".join(["~".join(["C%dR%d" % (column, row) for column in range(columns)])
+                                      for row in range(rows)])
+    workflowDef = WfaWorkflowDef('bench', None, None, tuple(inputs), ())
+
+    # Compilation happens once per workflow definition, outside of the timed loop.
+    compile = min(timeit.repeat(lambda: WfaInputSerializer(workflowDef), number=repeat, repeat=3))
+    size = len(WfaInputSerializer(workflowDef).serialize(wfaParamMap))
+    print "Input XML of %d bytes (%d table rows x %d columns, 4 tables)" % (size, rows, columns)
+    _timeSerializers(workflowDef, wfaParamMap, repeat)
+    print "Scalar inputs only (4 values)"
+    _timeSerializers(scalarDef, scalarParamMap, repeat * 20)
+    print "serializer compile\t%8.1f us (once per workflow)" % (compile / repeat * 1e6)
+    return
+
+def _timeSerializers(workflowDef, wfaParamMap, repeat):
+    serializer = WfaInputSerializer(workflowDef)
+    # The best of many rounds, so that a busy machine does not decide the ratio.
+    legacy = min(timeit.repeat(lambda: legacyInputXml(workflowDef, wfaParamMap), number=repeat,
+                               repeat=SERIALIZER_ROUNDS))
+    compiled = min(timeit.repeat(lambda: serializer.serialize(wfaParamMap), number=repeat, repeat=SERIALIZER_ROUNDS))
+    print "  legacy concatenation\t%8.2f us/call (no validation, no escaping)" % (legacy / repeat * 1e6)
+    print "  compiled serializer\t%8.2f us/call (validates and escapes; %.2fx the legacy time)" % (
+          compiled / repeat * 1e6, compiled / legacy)
+    return
+
+'''
+runJobsClient - the client side of one end-to-end run: drive jobs jobs through path against wfaServer and return the
+measurements.  Runs in its own interpreter (see benchJobs).
+'''
+def runJobsClient(wfaServer, path, jobs, poolSize):
+    # Imported here so that the serializer benchmark does not pay for the client modules.
+    from Wfa import Wfa, WfaOs
+    
+    wfaDict = { 'wfaServer' : wfaServer, 'wfaUser' : 'bench', 'wfaPw' : 'bench', 'wfaParamMap' : None,
+                'wfaPoolSize' : poolSize }
+    osDict = dict(wfaDict)
+    osDict.update({ 'wfaOperation' : BENCH_OPERATION, 'wfaPlatform' : 'cdot', 'osProject' : 'manila',
+                    'wfaExtraSpec' : None })
+    submitTimes = [None] * jobs
+    completionTimes = [None] * jobs
+    statuses = [None] * jobs
+    
+    def runJob(index):
+        wfaParamMap = { 'volName' : 'bench%05d' % index }
+        try:
+            if(path == 'wfaos'):
+                wfa = WfaOs(dict(osDict))
+            else:
+                wfa = Wfa(wfaDict=dict(wfaDict, workflowName=BENCH_WORKFLOW))
+            wfa.setupWorkflow(wfaParamMap)
+            startTime = time.time()
+            wfa.executeWorkflow()
+            submitTimes[index] = time.time() - startTime
+            if(path == 'watch'):
+                statuses[index] = wfa.watchJob().result()
+            else:
+                statuses[index] = wfa.waitForCompletion()
+            completionTimes[index] = time.time() - startTime
+        except Exception, e:
+            statuses[index] = "ERROR: " + str(e)
+        return
+    
+    startTime = time.time()
+    if(path == 'batch'):
+        template = WfaOs(dict(osDict))
+        results = template.submitMany(BENCH_OPERATION, [{ 'shareName' : 'bench%05d' % index } for index in range(jobs)],
+                                      jobs)
+        statuses = [result['status'] for result in results]
+        completionTimes = [time.time() - startTime] * jobs
+    else:
+        threads = [threading.Thread(target=runJob, args=(index,)) for index in range(jobs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wallTime = time.time() - startTime
+    
+    return({ 'wallTime' : wallTime,
+             'submitTimes' : [submitTime for submitTime in submitTimes if submitTime != None],
+             'completionTimes' : [completion for completion in completionTimes if completion != None],
+             'failed' : len([status for status in statuses if status != "DONE"]),
+             'peakRss' : resource.getrusage(resource.RUSAGE_SELF).ru_maxrss })
+
+'''
+benchJobs - run every path at every job count against a fresh WfaMock server and print one line per run
+'''
+def benchJobs(jobCounts, paths, latency, jobDuration, failureRate, poolSize, compress=True):
+    from WfaMock import WfaMockServer
+    
+    print "%-6s %6s %10s %10s %10s %10s %9s %9s %8s %6s %10s %7s" % ("path", "jobs", "submit p50", "submit p95",
+                                                                     "complete", "complete", "polls/job", "req/s",
+                                                                     "wire/job", "saved", "peak RSS", "failed")
+    print "%-6s %6s %10s %10s %10s %10s %9s %9s %8s %6s %10s %7s" % ("", "", "(ms)", "(ms)", "mean (s)", "max (s)", "",
+                                                                     "", "(KB)", "", "(MB)", "")
+    for jobs in jobCounts:
+        for path in paths:
+            mock = WfaMockServer(latency=latency, jobDuration=jobDuration, failureRate=failureRate,
+                                 compress=compress).start()
+            client = subprocess.Popen([sys.executable, os.path.abspath(__file__), 'jobs-client', mock.wfaServer, path,
+                                       str(jobs), str(poolSize)], stdout=subprocess.PIPE,
+                                      cwd=os.path.dirname(os.path.abspath(__file__)))
+            output = client.communicate()[0]
+            mock.stop()
+            if(client.returncode != 0):
+                print "%-6s %6d run failed (exit status %d)" % (path, jobs, client.returncode)
+                continue
+            run = json.loads(output.strip().splitlines()[-1])
+            
+            submitTimes = sorted(run['submitTimes'])
+            completionTimes = run['completionTimes']
+            polls = mock.stats['job'] + mock.stats['listing']
+            saved = 1.0 - float(mock.stats['bytesOut']) / max(mock.stats['bytesBody'], 1)
+            print "%-6s %6d %10s %10s %10.2f %10.2f %9.2f %9.0f %8.1f %5.0f%% %10.1f %7d" % (
+                path, jobs, _milliseconds(_percentile(submitTimes, 50)), _milliseconds(_percentile(submitTimes, 95)),
+                sum(completionTimes) / max(len(completionTimes), 1), max(completionTimes or [0]),
+                float(polls) / jobs, mock.stats['requests'] / run['wallTime'], mock.stats['bytesOut'] / 1024.0 / jobs,
+                saved * 100, run['peakRss'] / 1024.0, run['failed'])
+    return
+
+'''
+benchCompress - fetch a few WFA documents from WfaMock in every content coding, read them whole and in pieces, and
+print the bytes saved and read times.  Returns True if every read decoded to the identity body.
+'''
+def benchCompress(jobs, repeat, readSizes=(None, 16384, 1024, 64)):
+    from WfaMock import WfaMockServer
+    from WfaTransport import WfaSession, getConnectionPool
+    
+    # Jobs that finish at once, so the documents do not change between reads.
+    mock = WfaMockServer(jobDuration=0.0, etags=False).start()
+    workflow = mock.workflows[BENCH_WORKFLOW]
+    for index in range(jobs):
+        mock._newJob(workflow)
+    baseURI = "http://" + mock.wfaServer + "/rest/workflows"
+    documents = (('collection', baseURI), ('listing', baseURI + "/jobs"), ('job', baseURI + "/jobs/1"))
+    session = WfaSession(mock.wfaServer, 'bench', 'bench')
+    
+    def fetch(URL, encoding, readSize):
+        response = session.urlopen(URL, None, { 'Accept-Encoding' : encoding })
+        if(readSize == None):
+            return(response.read())
+        parts = []
+        while(True):
+            data = response.read(readSize)
+            if(data == ""):
+                return("".join(parts))
+            parts.append(data)
+    
+    print "%-10s %-8s %9s %9s %6s %s" % ("document", "encoding", "body", "wire", "saved",
+                                         " ".join(["%9s" % ("read " + str(size or "all")) for size in readSizes]))
+    print "%-10s %-8s %9s %9s %6s %s" % ("", "", "(bytes)", "(bytes)", "",
+                                         " ".join(["%9s" % "(ms)" for size in readSizes]))
+    correct = True
+    for name, URL in documents:
+        identity = fetch(URL, 'identity', None)
+        for encoding in ('identity', 'gzip', 'deflate'):
+            mock.resetStats()
+            body = fetch(URL, encoding, None)
+            wire = mock.stats['bytesOut']
+            matches = body == identity
+            readTimes = []
+            for readSize in readSizes:
+                startTime = time.time()
+                for run in range(repeat):
+                    matches = fetch(URL, encoding, readSize) == identity and matches
+                readTimes.append((time.time() - startTime) / repeat)
+            correct = correct and matches
+            readColumns = " ".join(["%9s" % _milliseconds(readTime) for readTime in readTimes])
+            print "%-10s %-8s %9d %9d %5.0f%% %s%s" % (name, encoding, len(identity), wire,
+                                                      (1.0 - float(wire) / max(len(identity), 1)) * 100, readColumns,
+                                                      ["  MISMATCH", ""][matches])
+    getConnectionPool(mock.wfaServer).evictIdle(True)
+    mock.stop()
+    return(correct)
+
+'''
+benchStartup - measure the cold start of the Wfa module over runs fresh interpreters and check it against the budgets.
+With a baseline file (written by an earlier run given record) the budgets are BASELINE_TOLERANCE times the times it
+holds instead.  Returns True if both budgets are met.
+'''
+def benchStartup(runs, tree, importBudget, constructBudget, baseline=None, record=None):
+    if(baseline != None):
+        with open(baseline) as baselineFile:
+            recorded = json.load(baselineFile)
+        importBudget = recorded['importTime'] * BASELINE_TOLERANCE
+        constructBudget = recorded['constructTime'] * BASELINE_TOLERANCE
+    results = []
+    for run in range(runs):
+        client = subprocess.Popen([sys.executable, '-c', _STARTUP_CLIENT], stdout=subprocess.PIPE,
+                                  cwd=os.path.dirname(os.path.abspath(__file__)))
+        output = client.communicate()[0]
+        if(client.returncode != 0):
+            print "startup run failed (exit status %d)" % client.returncode
+            return(False)
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    
+    results.sort(key=lambda result: result['importTime'])
+    median = results[len(results) // 2]
+    if(tree):
+        print "import time: self [us] | cumulative | imported package"
+        for name, depth, selfTime, cumulative in median['modules']:
+            print "import time: %9d | %10d | %s%s" % (selfTime, cumulative, "  " * depth, name)
+        print
+    
+    importTime = median['importTime'] * 1000
+    wfaTime = min([result['wfaTime'] for result in results]) * 1e6
+    wfaOsTime = min([result['wfaOsTime'] for result in results]) * 1e6
+    withinBudget = importTime <= importBudget and max(wfaTime, wfaOsTime) <= constructBudget
+    if(record != None):
+        with open(record, 'w') as recordFile:
+            json.dump({ 'importTime' : importTime, 'constructTime' : max(wfaTime, wfaOsTime) }, recordFile)
+    print "import Wfa\t%8.1f ms (median of %d, %d modules loaded)\tbudget %.1f ms" % (importTime, runs, 
+                                                                                   len(median['modules']), importBudget)
+    print "Wfa()\t\t%8.1f us\t\t\t\t\tbudget %.1f us" % (wfaTime, constructBudget)
+    print "WfaOs()\t\t%8.1f us\t\t\t\t\tbudget %.1f us" % (wfaOsTime, constructBudget)
+    if(not withinBudget):
+        print "OVER BUDGET"
+    return(withinBudget)
+
+def _percentile(values, percent):
+    if(len(values) == 0):
+        return(None)
+    return(values[min(len(values) - 1, int(len(values) * percent / 100.0))])
+
+def _milliseconds(seconds):
+    if(seconds == None):
+        return("-")
+    return("%.1f" % (seconds * 1000))
+
+if __name__ == '__main__':
+    if(len(sys.argv) == 6 and sys.argv[1] == 'jobs-client'):
+        print json.dumps(runJobsClient(sys.argv[2], sys.argv[3], int(sys.argv[4]), int(sys.argv[5])))
+        sys.stdout.flush()
+        # Skip interpreter teardown - pooled connections and monitor threads are still open and would only add noise.
+        os._exit(0)
+    
+
+    parser = argparse.ArgumentParser(description="Wfa client benchmarks")
+    subparsers = parser.add_subparsers(dest='bench')
+    serializerParser = subparsers.add_parser('serializer', help="workflow input serializer micro-benchmark")
+    serializerParser.add_argument('--rows', type=int, default=1000)
+    serializerParser.add_argument('--columns', type=int, default=3)
+    serializerParser.add_argument('--repeat', type=int, default=1000)
+    jobsParser = subparsers.add_parser('jobs', help="end-to-end benchmark against a local WFA stand-in")
+    jobsParser.add_argument('--jobs', default='1,10,100,1000', help="comma separated numbers of concurrent jobs")
+    jobsParser.add_argument('--paths', default=",".join(JOB_PATHS), help="comma separated subset of " +
+                            ", ".join(JOB_PATHS))
+    jobsParser.add_argument('--latency', type=float, default=0.005, help="seconds added to every WFA response")
+    jobsParser.add_argument('--job-duration', type=float, default=2.0, help="seconds each job runs")
+    jobsParser.add_argument('--failure-rate', type=float, default=0.0, help="fraction of jobs that fail")
+    jobsParser.add_argument('--pool-size', type=int, default=8, help="connections per WFA server")
+    jobsParser.add_argument('--no-compress', action='store_true', help="serve uncompressed responses")
+    compressParser = subparsers.add_parser('compress', help="response compression: bytes saved and decoding")
+    compressParser.add_argument('--jobs', type=int, default=1000, help="jobs in the jobs listing")
+    compressParser.add_argument('--repeat', type=int, default=20, help="reads timed per document and read size")
+    startupParser = subparsers.add_parser('startup', help="import and construction time of the Wfa module")
+    startupParser.add_argument('--runs', type=int, default=5, help="fresh interpreters to measure")
+    startupParser.add_argument('--tree', action='store_true', help="print the per-module import times")
+    startupParser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET_MS, help="milliseconds")
+    startupParser.add_argument('--construct-budget', type=float, default=CONSTRUCT_BUDGET_US, help="microseconds")
+    startupParser.add_argument('--record', help="save the measurement to this file")
+    startupParser.add_argument('--baseline', help="budget against the measurement saved in this file")
+    args = parser.parse_args()
+
+    if(args.bench == 'serializer'):
+        benchSerializer(args.rows, args.columns, args.repeat)
+    elif(args.bench == 'jobs'):
+        benchJobs([int(jobs) for jobs in args.jobs.split(',')], args.paths.split(','), args.latency, args.job_duration,
+                  args.failure_rate, args.pool_size, not args.no_compress)
+    elif(args.bench == 'compress'):
+        if(not benchCompress(args.jobs, args.repeat)):
+            sys.exit(1)
+    elif(args.bench == 'startup'):
+        if(not benchStartup(args.runs, args.tree, args.import_budget, args.construct_budget, args.baseline,
+                            args.record)):
+            sys.exit(1)
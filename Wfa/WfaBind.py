@@ -0,0 +1,95 @@
+'''
+Created on Oct 16, 2026
+
+WfaBind.py - compiled binding of OpenStack values to WFA workflow parameters.
+The default parameter map of a WfaOs operation names, for each WFA parameter, the OpenStack value it takes
+(volName <- shareName, volSize <- shareSize...).  A WfaParamBinding turns that map and the extra specs of the
+instance into a fixed list of (WFA parameter, OpenStack name) pairs and a fixed set of extra spec values, once, and
+then binds any number of requests - a dictionary or an object with the values as attributes - to complete WFA
+parameter maps without looking at the templates again.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import threading
+from collections import OrderedDict
+
+# Most compiled bindings kept by getBinding; the least recently used is evicted first.
+MAX_BINDINGS = 256
+
+class WfaParamBinding(object):
+    '''
+    WfaParamBinding - a compiled parameter map.
+        pairs - ((WFA parameter, OpenStack name), ...) in the order of the parameter map
+        extraSpec - ((WFA parameter, value), ...) set on every bound map, after (and over) the mapped values
+
+    bind(values) returns the WFA parameter map of one request; an OpenStack value missing from values binds to None
+    (which the workflow serializer leaves out).  bindMany(valuesList) binds a list of requests in one pass.
+    '''
+    __slots__ = ('pairs', 'extraSpec')
+
+    def __init__(self, paramMap, extraSpec=None):
+        if(type(paramMap) == dict):
+            paramMap = paramMap.items()
+        self.pairs = tuple([(wfaParam, osParam) for wfaParam, osParam in paramMap])
+        self.extraSpec = ()
+        if(type(extraSpec) == dict):
+            self.extraSpec = tuple(extraSpec.items())
+        return
+
+    def bind(self, values):
+        if(isinstance(values, dict)):
+            get = values.get
+        else:
+            get = lambda name: getattr(values, name, None)
+        wfaParamMap = dict([(wfaParam, get(osParam)) for wfaParam, osParam in self.pairs])
+        wfaParamMap.update(self.extraSpec)
+        return(wfaParamMap)
+
+    def bindMany(self, valuesList):
+        pairs = self.pairs
+        extraSpec = self.extraSpec
+        wfaParamMaps = []
+        append = wfaParamMaps.append
+        for values in valuesList:
+            if(isinstance(values, dict)):
+                get = values.get
+            else:
+                get = lambda name, values=values: getattr(values, name, None)
+            wfaParamMap = dict([(wfaParam, get(osParam)) for wfaParam, osParam in pairs])
+            wfaParamMap.update(extraSpec)
+            append(wfaParamMap)
+        return(wfaParamMaps)
+
+# Process wide registry of compiled bindings, keyed by the parameter map and extra specs they were compiled from, in
+# least recently used order.
+_bindingRegistry = OrderedDict()
+_bindingRegistryLock = threading.Lock()
+
+'''
+getBinding - return the compiled binding of paramMap (a dictionary, or a tuple of pairs such as the entries of
+MANILA_PARAM_MAPS) with extraSpec.  Bindings are compiled once and shared; the registry keeps the MAX_BINDINGS most
+recently used, as every distinct set of extra specs compiles a binding of its own.  Extra specs with unhashable values
+are compiled on every call.
+'''
+def getBinding(paramMap, extraSpec=None):
+    if(type(paramMap) == dict):
+        paramMap = tuple(sorted(paramMap.items()))
+    extraItems = ()
+    if(type(extraSpec) == dict):
+        extraItems = tuple(sorted(extraSpec.items()))
+    key = (paramMap, extraItems)
+    try:
+        hash(key)
+    except TypeError:
+        return(WfaParamBinding(paramMap, extraSpec))
+    with _bindingRegistryLock:
+        binding = _bindingRegistry.pop(key, None)
+        if(binding == None):
+            binding = WfaParamBinding(paramMap, extraSpec)
+        # Re-insert to mark the binding as the most recently used.
+        _bindingRegistry[key] = binding
+        while(len(_bindingRegistry) > MAX_BINDINGS):
+            _bindingRegistry.popitem(False)
+        return(binding)
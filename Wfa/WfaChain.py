@@ -0,0 +1,221 @@
+'''
+Created on Oct 16, 2026
+
+WfaChain.py - multi-step WfaOs operations run as one pipelined chain.
+A composite Manila operation such as "create a share and grant access to it" is a chain of steps, each one a WfaOs
+operation.  A step may take its inputs from the return parameters of earlier steps (see fromStep), and runs as soon
+as the steps it depends on have completed - steps that do not depend on each other run in parallel.  The workflow of
+every step is resolved, and its input serializer compiled, as soon as the chain starts, so by the time a step's
+inputs are known all that is left is to build its input XML and POST it.
+
+    chain = WfaChain(wfaDict)
+    chain.step('create', 'create_share', { 'shareName' : 'share1', 'shareSize' : '10', 'shareProto' : 'nfs' })
+    chain.step('grant', 'grant_ip', { 'shareIP' : '10.0.0.5', 'accessType' : 'rw' },
+               wfaParams={ 'volName' : fromStep('create', 'export_path') })
+    results = chain.run()
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import threading
+import time
+
+from Wfa import WfaOs
+from WfaConcurrent import WfaExecutor, WfaTimeoutError
+from WfaJob import newJobDict
+from WfaSerializer import getSerializer
+
+class WfaStepRef(object):
+    '''
+    WfaStepRef - a step input taken from the return parameter param of the earlier step named step (see fromStep)
+    '''
+    __slots__ = ('step', 'param')
+
+    def __init__(self, step, param):
+        self.step = step
+        self.param = param
+        return
+
+    def __repr__(self):
+        return("fromStep(" + repr(self.step) + ", " + repr(self.param) + ")")
+
+'''
+fromStep - a step input whose value is the return parameter param of the step named step.  The step it is used in
+depends on that step.
+'''
+def fromStep(step, param):
+    return(WfaStepRef(step, param))
+
+class _Step(object):
+    __slots__ = ('name', 'operation', 'osParams', 'wfaParams', 'after', 'dependents', 'waiting', 'job', 'result')
+
+    def __init__(self, name, operation, osParams, wfaParams, after):
+        self.name = name
+        self.operation = operation
+        self.osParams = osParams
+        self.wfaParams = wfaParams
+        self.after = after
+        self.dependents = []
+        self.waiting = len(after)
+        self.job = None
+        self.result = None
+        return
+
+class WfaChain(object):
+    '''
+    WfaChain - a set of WfaOs operations and the order they have to run in.
+
+        wfaDict - as for WfaOs (server, credentials, platform, project, extra specs...), without the operation
+        maxWorkers - most steps running at the same time
+
+        step(name, operation, osParams, wfaParams=None, after=()) - add a step and return its name.
+            osParams - the OpenStack values of the operation, as for WfaOs.submitMany
+            wfaParams - WFA parameters set directly, on top of those mapped from osParams and the extra specs
+            after - names of steps that have to complete first, besides those referenced through fromStep
+            Values of osParams and wfaParams may be fromStep references.  A step can only depend on steps added
+            before it, so a chain never has a cycle.
+        run(timeout=None) - run the chain and return { step name : result }.
+
+    Each result is a dictionary, as for WfaOs.submitMany:
+        status - the final simple status ("DONE" or "FAILED"), "ERROR" if the step could not be submitted or followed,
+                 or "SKIPPED" if a step it depends on did not complete successfully
+        jobDict - the job dictionary of the step's job (see the Wfa class documentation)
+        error - the exception raised for the step, or None
+    '''
+
+    def __init__(self, wfaDict, maxWorkers=8):
+        self.wfaDict = wfaDict
+        self.maxWorkers = maxWorkers
+        self._steps = []
+        self._byName = {}
+        return
+
+    def step(self, name, operation, osParams, wfaParams=None, after=()):
+        if(name in self._byName):
+            raise Exception("Step " + name + " is already part of the chain")
+        depends = list(after)
+        for value in osParams.values() + (wfaParams or {}).values():
+            if(isinstance(value, WfaStepRef)):
+                depends.append(value.step)
+        for dependency in depends:
+            if(not dependency in self._byName):
+                raise Exception("Step " + name + " depends on unknown step " + str(dependency))
+        depends = sorted(set(depends))
+        step = _Step(name, operation, osParams, wfaParams or {}, depends)
+        for dependency in depends:
+            self._byName[dependency].dependents.append(step)
+        self._steps.append(step)
+        self._byName[name] = step
+        return(name)
+
+    '''
+    run - run every step and return their results.  With a timeout, WfaTimeoutError is raised if the chain has not
+    finished within timeout seconds (steps already running carry on).
+    '''
+    def run(self, timeout=None):
+        for step in self._steps:
+            step.waiting = len(step.after)
+            step.job = None
+            step.result = None
+        executor = WfaExecutor(self.maxWorkers, name="WfaChain")
+        cond = threading.Condition()
+        remaining = [len(self._steps)]
+
+        # Resolve every workflow of the chain up front, one per operation, in parallel with the steps that can start.
+        templates = {}
+        for step in self._steps:
+            if(not step.operation in templates):
+                templates[step.operation] = executor.submit(self._prepare, step.operation)
+
+        # Every step is settled exactly once, whatever fails on the way, so that remaining reaches 0.
+        def settle(step, wfaStatus, jobDict, error):
+            ready = []
+            with cond:
+                if(step.result != None):
+                    return
+                step.result = { 'status' : wfaStatus, 'jobDict' : jobDict, 'error' : error }
+                for dependent in step.dependents:
+                    dependent.waiting = dependent.waiting - 1
+                    if(dependent.waiting == 0):
+                        ready.append(dependent)
+                remaining[0] = remaining[0] - 1
+                cond.notify_all()
+            for dependent in ready:
+                start(dependent)
+
+        def start(step):
+            try:
+                executor.submit(runStep, step)
+            except Exception, e:
+                settle(step, "ERROR", newJobDict(), e)
+
+        def runStep(step):
+            try:
+                executeStep(step)
+            except Exception, e:
+                settle(step, "ERROR", newJobDict(), e)
+
+        def executeStep(step):
+            for dependency in step.after:
+                if(self._byName[dependency].result['status'] != "DONE"):
+                    settle(step, "SKIPPED", newJobDict(), None)
+                    return
+            try:
+                job = templates[step.operation].result().newJob(self._paramMap(templates[step.operation].result(),
+                                                                                step))
+                step.job = job
+                job.executeWorkflow()
+                wfaStatus = job.waitForCompletion()
+            except Exception, e:
+                jobDict = newJobDict()
+                if(step.job != None):
+                    jobDict = step.job.jobDict
+                settle(step, "ERROR", jobDict, e)
+                return
+            settle(step, wfaStatus, job.jobDict, None)
+
+        # The first steps are picked before any is started - once one settles, its dependents are started by settle.
+        for step in [step for step in self._steps if step.waiting == 0]:
+            start(step)
+
+        deadline = None
+        if(timeout != None):
+            deadline = time.time() + timeout
+        with cond:
+            while(remaining[0] > 0):
+                if(deadline == None):
+                    cond.wait()
+                else:
+                    left = deadline - time.time()
+                    if(left <= 0):
+                        executor.shutdown(False)
+                        raise WfaTimeoutError("Timed out waiting for WfaChain")
+                    cond.wait(left)
+        executor.shutdown(False)
+        return(dict([(step.name, step.result) for step in self._steps]))
+
+    def _prepare(self, operation):
+        wfaDict = dict(self.wfaDict)
+        wfaDict['wfaOperation'] = operation
+        wfaDict['workflowName'] = None
+        template = WfaOs(wfaDict)
+        template.binding()
+        getSerializer(template.getWorkflowDefinition())
+        return(template)
+
+    def _paramMap(self, template, step):
+        # The operation's compiled binding, applied to the step's values once fromStep references are resolved.
+        osValues = dict([(name, self._resolve(value)) for name, value in step.osParams.items()])
+        wfaParamMap = template.binding().bind(osValues)
+        for wfaParam in step.wfaParams:
+            wfaParamMap[wfaParam] = self._resolve(step.wfaParams[wfaParam])
+        return(wfaParamMap)
+
+    def _resolve(self, value):
+        if(not isinstance(value, WfaStepRef)):
+            return(value)
+        returnParams = self._byName[value.step].result['jobDict']['returnParams']
+        if(not value.param in returnParams):
+            raise Exception("Step " + value.step + " returned no parameter " + value.param)
+        return(returnParams[value.param])
@@ -0,0 +1,361 @@
+'''
+Created on Oct 16, 2026
+
+WfaCluster.py - run workflows across several WFA servers that carry the same workflows.
+A WfaCluster is given a list of servers (e.g. appliances that all have the os_*_cdot workflows of Workflows/*.dar
+imported) and sends each new execution to the least loaded healthy one.  Load is the number of jobs a node has in
+flight (submitted through any cluster in the process and not yet seen to finish), weighted by its recent response
+time; a node whose circuit breaker is open is left out until its breaker lets a probe through.  Once a job has been
+submitted every status poll for it goes to the node that owns it.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import errno
+import random
+import socket
+import threading
+import time
+
+from Wfa import Wfa
+from WfaJob import jobSimpleStatus
+from WfaResilience import CLOSED, OPEN, WfaCircuitOpenError, getCircuitBreaker, isTransient
+
+# Weight of the newest sample in the running latency of a node.
+LATENCY_WEIGHT = 0.3
+# Added to the latency of every node, so that load still counts between nodes that have not answered yet.
+LATENCY_FLOOR = 0.01
+# Jobs not seen to finish within this many seconds stop counting towards the load of their node.
+DEFAULT_STALE_AFTER = 6 * 3600
+
+class WfaNode(object):
+    '''
+    WfaNode - the load of one WFA server, shared by every cluster in the process (see getClusterNode).
+        wfaServer - the server
+        latency - running average of the seconds its execute and status requests took, None before the first one
+        submitting - executions being submitted right now
+        jobs - jobId : submit time of the jobs in flight
+    '''
+
+    def __init__(self, wfaServer, staleAfter=DEFAULT_STALE_AFTER):
+        self.wfaServer = wfaServer
+        self.staleAfter = staleAfter
+        self.latency = None
+        self.submitting = 0
+        self.jobs = {}
+        self._lock = threading.Lock()
+        return
+
+    '''
+    inFlight - number of jobs submitted (or being submitted) to the node and not yet finished
+    '''
+    def inFlight(self):
+        now = time.time()
+        with self._lock:
+            for jobId in [jobId for jobId, submitTime in self.jobs.items() if now - submitTime > self.staleAfter]:
+                del self.jobs[jobId]
+            return(self.submitting + len(self.jobs))
+
+    '''
+    score - expected cost of sending one more job to the node: its jobs in flight (plus this one) times its latency
+    '''
+    def score(self):
+        return((self.inFlight() + 1) * ((self.latency or 0.0) + LATENCY_FLOOR))
+
+    '''
+    healthy - True if the circuit breaker of the node is closed
+    '''
+    def healthy(self):
+        return(getCircuitBreaker(self.wfaServer).state == CLOSED)
+
+    '''
+    probable - True if the breaker of an unhealthy node would let a probe request through now
+    '''
+    def probable(self):
+        breaker = getCircuitBreaker(self.wfaServer)
+        return(breaker.state != OPEN or time.time() - breaker.openedAt >= breaker.resetTimeout)
+
+    def observe(self, seconds):
+        with self._lock:
+            if(self.latency == None):
+                self.latency = seconds
+            else:
+                self.latency = LATENCY_WEIGHT * seconds + (1 - LATENCY_WEIGHT) * self.latency
+        return
+
+    def reserve(self):
+        with self._lock:
+            self.submitting = self.submitting + 1
+        return
+
+    def submitted(self, jobId):
+        with self._lock:
+            self.submitting = self.submitting - 1
+            if(jobId != None):
+                self.jobs[str(jobId)] = time.time()
+        return
+
+    def finished(self, jobId):
+        with self._lock:
+            self.jobs.pop(str(jobId), None)
+        return
+
+# Process wide registry of nodes, one per WFA server.
+_nodeRegistry = {}
+_nodeRegistryLock = threading.Lock()
+
+'''
+getClusterNode - return the shared WfaNode of wfaServer, creating it on first use
+'''
+def getClusterNode(wfaServer):
+    with _nodeRegistryLock:
+        node = _nodeRegistry.get(wfaServer)
+        if(node == None):
+            node = WfaNode(wfaServer)
+            _nodeRegistry[wfaServer] = node
+        return(node)
+
+'''
+pickNode - return the healthy node with the lowest score, or - if no node is healthy - one whose breaker would let a
+probe through.  Ties are broken at random.  Raises WfaCircuitOpenError if every node is refusing requests.
+'''
+def pickNode(nodes):
+    candidates = [node for node in nodes if node.healthy()]
+    if(len(candidates) == 0):
+        candidates = [node for node in nodes if node.probable()]
+    if(len(candidates) == 0):
+        retryAfter = min([getCircuitBreaker(node.wfaServer).resetTimeout -
+                          (time.time() - getCircuitBreaker(node.wfaServer).openedAt) for node in nodes])
+        raise WfaCircuitOpenError(",".join([node.wfaServer for node in nodes]), max(0.0, retryAfter))
+    scored = [(node.score(), random.random(), node) for node in candidates]
+    return(min(scored)[2])
+
+class WfaCluster(object):
+    '''
+    WfaCluster - a Wfa (or WfaOs) front end for several WFA servers.
+
+    Constructed with the wfaDict of the class it fronts, with wfaServers (a list of servers) in place of wfaServer:
+        cluster = WfaCluster(dict(osDict, wfaServers=['wfa1', 'wfa2', 'wfa3']), WfaOs)
+        cluster.wfaDict['wfaParamMap']['volName'] = 'share1'
+        cluster.setupWorkflow()
+        cluster.executeWorkflow()
+        cluster.waitForCompletion()
+
+    One instance of wfaClass is built per server, from a copy of the cluster's wfaDict with wfaServer set.  The
+    parameter map installed by the class (e.g. the Manila map of WfaOs) is available as wfaDict['wfaParamMap'].
+
+    setupWorkflow prepares the workflow input on the best node at the time.  executeWorkflow picks the node again -
+    load may have moved since - and, if preparing the job there fails transiently or the request is refused without
+    reaching WFA (circuit open, connection refused), moves on to the next best node; an execution that may have reached
+    WFA is never repeated.  The job status methods (getWfaJobStatus, getSimpleJobStatus, waitForCompletion,
+    watchJob) always go to the node that owns the job; jobDict and wfaServer are those of the job.  As with Wfa, one
+    cluster instance tracks one job - use newJob for further executions.
+    '''
+    __slots__ = ('wfaDict', 'nodes', '_templates', '_job', '_node', '_wfaParamMap')
+
+    def __init__(self, wfaDict, wfaClass=Wfa):
+        if(not wfaDict.get('wfaServers')):
+            raise Exception("wfaServers must list at least one WFA server")
+        self.wfaDict = wfaDict
+        self.nodes = []
+        self._templates = {}
+        for wfaServer in wfaDict['wfaServers']:
+            nodeDict = dict(wfaDict)
+            del nodeDict['wfaServers']
+            nodeDict['wfaServer'] = wfaServer
+            self._templates[wfaServer] = wfaClass(wfaDict=nodeDict)
+            self.nodes.append(getClusterNode(wfaServer))
+        if(wfaDict.get('wfaParamMap') == None):
+            wfaDict['wfaParamMap'] = self._templates[self.nodes[0].wfaServer].wfaDict.get('wfaParamMap')
+        self._job = None
+        self._node = None
+        self._wfaParamMap = None
+        return
+
+    '''
+    wfaServer - the server that owns the job (or that setupWorkflow picked), None before setupWorkflow
+    '''
+    @property
+    def wfaServer(self):
+        if(self._node == None):
+            return(None)
+        return(self._node.wfaServer)
+
+    '''
+    jobDict - the job dictionary of the job (see the Wfa class documentation), None before setupWorkflow
+    '''
+    @property
+    def jobDict(self):
+        if(self._job == None):
+            return(None)
+        return(self._job.jobDict)
+
+    '''
+    setupWorkflow - prepare the workflow input on the best node (the next best, if fetching the workflow definition
+    from it fails transiently).  See Wfa.setupWorkflow.
+    '''
+    def setupWorkflow(self, wfaParamMap=None):
+        if(wfaParamMap == None):
+            wfaParamMap = self.wfaDict.get('wfaParamMap')
+        if(wfaParamMap == None):
+            raise Exception("No WFA Parameters defined")
+        self._wfaParamMap = wfaParamMap
+        tried = set()
+        node = pickNode(self.nodes)
+        while(True):
+            try:
+                self._prepare(node)
+            except Exception, e:
+                # Only a node without the workflow definition cached queries WFA here - a GET, safe to try elsewhere.
+                if(not isTransient(e) and not isinstance(e, WfaCircuitOpenError)):
+                    raise
+                tried.add(node.wfaServer)
+                node = self._nextNode(tried, e)
+                continue
+            return
+
+    '''
+    executeWorkflow - submit the prepared workflow.  See Wfa.executeWorkflow.
+    '''
+    def executeWorkflow(self):
+        if(self._job == None):
+            raise Exception("setupWorkflow has not been called")
+        tried = set()
+        node = pickNode(self.nodes)
+        while(True):
+            node.reserve()
+            if(node is not self._node):
+                try:
+                    self._prepare(node)
+                except Exception, e:
+                    node.submitted(None)
+                    # Nothing has been submitted yet: as in setupWorkflow, a transient failure moves on to the next
+                    # node.
+                    if(not isTransient(e) and not isinstance(e, WfaCircuitOpenError)):
+                        raise
+                    tried.add(node.wfaServer)
+                    node = self._nextNode(tried, e)
+                    continue
+            startTime = time.time()
+            try:
+                self._job.executeWorkflow()
+            except Exception, e:
+                node.submitted(None)
+                if(not _notSent(e)):
+                    raise
+                tried.add(node.wfaServer)
+                node = self._nextNode(tried, e)
+                continue
+            node.submitted(self._job.jobDict['jobId'])
+            node.observe(time.time() - startTime)
+            return
+
+    '''
+    getWfaJobStatus - see Wfa.getWfaJobStatus.  The request goes to the node that owns the job.
+    '''
+    def getWfaJobStatus(self):
+        startTime = time.time()
+        self._owner().getWfaJobStatus()
+        self._node.observe(time.time() - startTime)
+        self._checkFinished(jobSimpleStatus(self._job.jobDict))
+        return
+
+    '''
+    getSimpleJobStatus - see Wfa.getSimpleJobStatus.  The request goes to the node that owns the job.
+    '''
+    def getSimpleJobStatus(self):
+        startTime = time.time()
+        wfaStatus = self._owner().getSimpleJobStatus()
+        self._node.observe(time.time() - startTime)
+        self._checkFinished(wfaStatus)
+        return(wfaStatus)
+
+    '''
+    waitForCompletion - see Wfa.waitForCompletion.  Polls the node that owns the job.
+    '''
+    def waitForCompletion(self, timeout=None, callback=None):
+        wfaStatus = self._owner().waitForCompletion(timeout, callback)
+        self._checkFinished(wfaStatus)
+        return(wfaStatus)
+
+    '''
+    watchJob - see Wfa.watchJob.  The job is watched by the WfaJobMonitor of the node that owns it.
+    '''
+    def watchJob(self, callback=None):
+        node = self._node
+        def finished(jobDict, wfaStatus):
+            node.finished(jobDict['jobId'])
+            if(callback != None):
+                callback(jobDict, wfaStatus)
+        return(self._owner().watchJob(finished))
+
+    '''
+    newJob - return a new cluster instance for another execution with a different parameter map.  The per node
+    instances (and so their workflow definitions and sessions) are shared; the node is picked by its setupWorkflow,
+    which newJob calls.
+    '''
+    def newJob(self, wfaParamMap):
+        job = WfaCluster.__new__(WfaCluster)
+        job.wfaDict = self.wfaDict
+        job.nodes = self.nodes
+        job._templates = self._templates
+        job._job = None
+        job._node = None
+        job._wfaParamMap = None
+        job.setupWorkflow(wfaParamMap)
+        return(job)
+
+    '''
+    getWorkflowDefinition - the workflow definition, as held by the best node (see Wfa.getWorkflowDefinition)
+    '''
+    def getWorkflowDefinition(self, refresh=False):
+        return(self._templates[pickNode(self.nodes).wfaServer].getWorkflowDefinition(refresh))
+
+    '''
+    printWorkflowInputList - see Wfa.printWorkflowInputList
+    '''
+    def printWorkflowInputList(self, wfaInputXml=None):
+        self._templates[pickNode(self.nodes).wfaServer].printWorkflowInputList(wfaInputXml)
+        return
+
+    '''
+    printWorkflowOutputList - see Wfa.printWorkflowOutputList
+    '''
+    def printWorkflowOutputList(self, wfaInputXml=None):
+        self._templates[pickNode(self.nodes).wfaServer].printWorkflowOutputList(wfaInputXml)
+        return
+
+    def _prepare(self, node):
+        # The template of the node keeps the workflow definition, so only the first job on a node queries WFA for it.
+        job = self._templates[node.wfaServer].newJob(self._wfaParamMap)
+        self._node = node
+        self._job = job
+        return
+
+    def _nextNode(self, tried, error=None):
+        nodes = [node for node in self.nodes if node.wfaServer not in tried]
+        if(len(nodes) == 0):
+            if(error != None):
+                raise error
+            raise WfaCircuitOpenError(",".join(sorted(tried)), 0.0)
+        return(pickNode(nodes))
+
+    def _owner(self):
+        if(self._job == None or self._job.jobDict['jobId'] == None):
+            raise Exception("executeWorkflow has not been called")
+        return(self._job)
+
+    def _checkFinished(self, wfaStatus):
+        if(wfaStatus == "DONE" or wfaStatus == "FAILED"):
+            self._node.finished(self._job.jobDict['jobId'])
+        return
+
+'''
+_notSent - True if exception shows the execute request never reached WFA, so it is safe to send it to another node
+'''
+def _notSent(exception):
+    if(isinstance(exception, WfaCircuitOpenError)):
+        return(True)
+    return(isinstance(exception, socket.error) and not isinstance(exception, socket.timeout) and
+           exception.errno == errno.ECONNREFUSED)
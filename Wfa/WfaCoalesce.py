@@ -0,0 +1,158 @@
+'''
+Created on Oct 16, 2026
+
+WfaCoalesce.py - single-flight execution of identical workflow requests.
+Manila retries and racing API workers often ask for the same operation with the same parameters (a delete_share of
+the same share, a grant_ip of the same address) while the first job is still running.  With coalescing enabled (see
+the wfaCoalesce key of the Wfa class) an execution identical to one in flight - same server, workflow and workflow
+input - does not start a second WFA job: it attaches to the running job and shares its job dictionary and outcome.  Once
+the job has finished the next identical execution runs again, unless a window is asked for (see the wfaCoalesceWindow
+key): a job that completed successfully then keeps answering identical executions for that many seconds.  A window only
+suits operations that no other workflow undoes in the meantime - grant_ip, deny_ip, grant_ip of the same address has
+to run three jobs.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import threading
+import time
+
+from WfaConcurrent import WfaFuture
+
+# Seconds a successful result keeps answering identical executions - by default only executions in flight are shared.
+DEFAULT_COALESCE_WINDOW = 0.0
+
+class WfaFlight(object):
+    '''
+    WfaFlight - one WFA job shared by identical executions.
+        key - see coalesceKey
+        leader - the instance that submitted the job
+        submitted - WfaFuture resolving to the job dictionary once WFA has accepted the job
+        completed - WfaFuture resolving to the final simple status ("DONE" or "FAILED")
+        window - seconds the flight keeps answering identical executions once its job completed successfully
+        finishedAt - when the job finished, None while it is running
+        joined - number of executions that attached to the job instead of starting their own
+        tracked - True once the job has been handed to a WfaJobMonitor
+    '''
+    __slots__ = ('key', 'leader', 'submitted', 'completed', 'window', 'finishedAt', 'joined', 'tracked')
+
+    def __init__(self, key, leader, window=DEFAULT_COALESCE_WINDOW):
+        self.key = key
+        self.leader = leader
+        self.window = window
+        self.submitted = WfaFuture()
+        self.completed = WfaFuture()
+        self.finishedAt = None
+        self.joined = 0
+        self.tracked = False
+        return
+
+'''
+coalesceKey - the key identical executions share: the server, the workflow and the workflow input XML (which is built
+by the workflow's serializer in input order, so equal parameter maps give equal input)
+'''
+def coalesceKey(wfaServer, workflowKey, workflowInputXml):
+    return((wfaServer, workflowKey, workflowInputXml))
+
+class WfaSingleFlight(object):
+    '''
+    WfaSingleFlight - the process wide table of flights (see singleFlight).
+
+    join returns the flight an execution should use and whether it is the leader - the one that has to submit the
+    job (and report submit or failed).  Whoever learns the outcome of the job reports it with finish; the others wait
+    on the flight's futures.  A flight is dropped as soon as its job finishes or its submission fails, so a later
+    execution really runs again; only a flight whose job completed successfully with a window given to join is kept,
+    for window seconds.
+    '''
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.stats = { 'leaders' : 0, 'joined' : 0, 'reused' : 0 }
+        return
+
+    '''
+    join - return (flight, leader) for key, where execution is the instance asking.  A finished flight older than
+    window seconds is replaced; a new flight keeps its successful result for window seconds.
+    '''
+    def join(self, key, execution, window=DEFAULT_COALESCE_WINDOW):
+        now = time.time()
+        with self._lock:
+            flight = self._flights.get(key)
+            if(flight != None and (flight.finishedAt == None or now - flight.finishedAt < window)):
+                flight.joined = flight.joined + 1
+                if(flight.finishedAt == None):
+                    self.stats['joined'] = self.stats['joined'] + 1
+                else:
+                    self.stats['reused'] = self.stats['reused'] + 1
+                return((flight, False))
+            self._expire(now, window)
+            flight = WfaFlight(key, execution, window)
+            self._flights[key] = flight
+            self.stats['leaders'] = self.stats['leaders'] + 1
+            return((flight, True))
+
+    '''
+    submit - record that the leader's job has been accepted by WFA
+    '''
+    def submit(self, flight, jobDict):
+        # As with the futures of WfaJobMonitor, the job dictionary is also reachable from the completion future.
+        flight.completed.jobDict = jobDict
+        flight.submitted.setResult(jobDict)
+        return
+
+    '''
+    failed - record that the leader could not submit the job, or that tracking it failed.  The error is passed on to
+    every execution attached to the flight.
+    '''
+    def failed(self, flight, exception):
+        if(not self._settle(flight, None)):
+            return
+        if(not flight.submitted.done()):
+            flight.submitted.setException(exception)
+        flight.completed.setException(exception)
+        return
+
+    '''
+    finish - record the final simple status of the job.  Only the first report counts.
+    '''
+    def finish(self, flight, wfaStatus):
+        if(self._settle(flight, wfaStatus)):
+            flight.completed.setResult(wfaStatus)
+        return
+
+    '''
+    track - return True if the caller is the first to ask for the job of flight to be tracked
+    '''
+    def track(self, flight):
+        with self._lock:
+            if(flight.tracked):
+                return(False)
+            flight.tracked = True
+            return(True)
+
+    '''
+    pending - number of flights currently held (running, or finished within their window)
+    '''
+    def pending(self):
+        with self._lock:
+            return(len(self._flights))
+
+    def _settle(self, flight, wfaStatus):
+        # Only a successful job with a window is kept to answer later identical executions.
+        with self._lock:
+            if(flight.completed.done() or flight.finishedAt != None):
+                return(False)
+            flight.finishedAt = time.time()
+            if((wfaStatus != "DONE" or flight.window <= 0) and self._flights.get(flight.key) is flight):
+                del self._flights[flight.key]
+            return(True)
+
+    def _expire(self, now, window):
+        for key in [key for key, flight in self._flights.items()
+                    if flight.finishedAt != None and now - flight.finishedAt >= window]:
+            del self._flights[key]
+        return
+
+singleFlight = WfaSingleFlight()
@@ -0,0 +1,208 @@
+'''
+Created on Oct 16, 2026
+
+WfaConcurrent.py - small concurrency primitives used to track WFA work that completes in the background.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import logging
+import Queue
+import sys
+import threading
+
+_log = logging.getLogger(__name__)
+
+class WfaTimeoutError(Exception):
+    '''
+    WfaTimeoutError - raised when waiting on a WfaFuture times out
+    '''
+    pass
+
+class WfaCancelledError(Exception):
+    '''
+    WfaCancelledError - raised when waiting on a WfaFuture that has been cancelled
+    '''
+    pass
+
+class WfaFuture(object):
+    '''
+    WfaFuture - the eventual result of a piece of WFA work (a job, a submission...).
+
+    The producer calls setResult or setException exactly once; consumers either block on result() or register
+    a callback with addCallback.  Callbacks are run as callback(future) in the thread that completes the future
+    (or immediately, if the future is already complete).  A consumer may cancel a future that has not completed: it
+    then fails with WfaCancelledError, and whatever the producer reports later is dropped.
+    '''
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._result = None
+        self._excInfo = None
+        self._callbacks = []
+        self._cancelled = False
+        return
+
+    '''
+    done - True once a result or exception has been set
+    '''
+    def done(self):
+        return(self._event.is_set())
+
+    '''
+    result - wait (up to timeout seconds, or forever) for the result.  If the work failed, its exception is re-raised.
+    '''
+    def result(self, timeout=None):
+        if(not self._event.wait(timeout)):
+            raise WfaTimeoutError("Timed out waiting for WFA result")
+        if(self._excInfo != None):
+            raise self._excInfo[0], self._excInfo[1], self._excInfo[2]
+        return(self._result)
+
+    '''
+    exception - wait for completion and return the exception raised by the work, or None
+    '''
+    def exception(self, timeout=None):
+        if(not self._event.wait(timeout)):
+            raise WfaTimeoutError("Timed out waiting for WFA result")
+        if(self._excInfo != None):
+            return(self._excInfo[1])
+        return(None)
+
+    '''
+    cancel - fail the future with WfaCancelledError unless it has already completed.  Returns True if it was cancelled.
+    Work already running is not interrupted - its outcome is simply not reported.
+    '''
+    def cancel(self):
+        return(self._complete(None, (WfaCancelledError, WfaCancelledError("WFA work cancelled"), None), True))
+
+    '''
+    cancelled - True if the future was cancelled
+    '''
+    def cancelled(self):
+        return(self._cancelled)
+
+    '''
+    addCallback - run callback(future) once the future completes
+    '''
+    def addCallback(self, callback):
+        with self._lock:
+            if(not self._event.is_set()):
+                self._callbacks.append(callback)
+                return
+        self._runCallback(callback)
+        return
+
+    def setResult(self, result):
+        self._complete(result, None)
+        return
+
+    '''
+    setException - fail the future.  excInfo defaults to the exception currently being handled.
+    '''
+    def setException(self, exception, excInfo=None):
+        if(excInfo == None):
+            excInfo = sys.exc_info()
+            if(excInfo[1] is not exception):
+                excInfo = (type(exception), exception, None)
+        self._complete(None, excInfo)
+        return
+
+    def _complete(self, result, excInfo, cancelling=False):
+        with self._lock:
+            if(self._event.is_set()):
+                # A cancelled future drops the late report of its producer; a future cancelled late stays as it is.
+                if(self._cancelled or cancelling):
+                    return(False)
+                raise Exception("WfaFuture already completed")
+            self._cancelled = cancelling
+            self._result = result
+            self._excInfo = excInfo
+            self._event.set()
+            callbacks = self._callbacks
+            self._callbacks = []
+        for callback in callbacks:
+            self._runCallback(callback)
+        return(True)
+
+    def _runCallback(self, callback):
+        # A failing consumer must not break the producer (usually a shared poller thread).
+        try:
+            callback(self)
+        except Exception:
+            _log.exception("WfaFuture callback failed")
+        return
+
+class WfaExecutor(object):
+    '''
+    WfaExecutor - a fixed size pool of worker threads that runs submitted calls and reports through WfaFutures.
+
+        maxWorkers - number of worker threads, i.e. the maximum number of calls running at the same time
+        maxQueue - number of calls allowed to wait for a worker.  When the queue is full, submit blocks until a
+                   worker frees up, which gives callers natural backpressure.  0 means unbounded.
+
+    Workers are started on demand and are daemon threads, so an idle executor does not keep the process alive.
+    '''
+
+    def __init__(self, maxWorkers, maxQueue=0, name="WfaExecutor"):
+        self.maxWorkers = maxWorkers
+        self.name = name
+        self._queue = Queue.Queue(maxQueue)
+        self._lock = threading.Lock()
+        self._workers = []
+        self._shutdown = False
+        return
+
+    '''
+    submit - schedule fn(*args, **kwargs) and return a WfaFuture for its return value
+    '''
+    def submit(self, fn, *args, **kwargs):
+        if(self._shutdown):
+            raise Exception("WfaExecutor has been shut down")
+        future = WfaFuture()
+        self._startWorker()
+        self._queue.put((future, fn, args, kwargs))
+        return(future)
+
+    '''
+    shutdown - stop accepting work and let the workers exit once the queue is drained.  If wait is set, block
+    until they have.
+    '''
+    def shutdown(self, wait=True):
+        with self._lock:
+            self._shutdown = True
+            workers = list(self._workers)
+        for worker in workers:
+            self._queue.put(None)
+        if(wait):
+            for worker in workers:
+                worker.join()
+        return
+
+    def _startWorker(self):
+        with self._lock:
+            if(len(self._workers) >= self.maxWorkers):
+                return
+            worker = threading.Thread(target=self._work, name=self.name + "-" + str(len(self._workers)))
+            worker.daemon = True
+            self._workers.append(worker)
+        worker.start()
+        return
+
+    def _work(self):
+        while(True):
+            item = self._queue.get()
+            if(item == None):
+                return
+            future, fn, args, kwargs = item
+            if(future.done()):
+                # Cancelled while it was queued.
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except Exception, e:
+                future.setException(e)
+            else:
+                future.setResult(result)
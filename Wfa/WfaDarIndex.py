@@ -0,0 +1,230 @@
+'''
+Created on Oct 16, 2026
+
+WfaDarIndex.py - offline workflow schema index built from WFA .dar exports.
+The .dar files in Workflows/ are zip archives holding the TabularWorkflow definitions of the OpenStack workflows.
+This module indexes them into a compact on-disk file (workflow name, UUID, inputs with their types, enum values and
+mandatory flags, and return parameters) which is memory mapped at startup.  With the index in place, setupWorkflow,
+printWorkflowInputList and printWorkflowOutputList are served without a network round trip; WFA only needs to be
+asked to confirm that the index is still current (see the wfaVerifySchemaIndex key of the Wfa class).
+
+    python WfaDarIndex.py build <index file> <dar file> [<dar file> ...]
+    python WfaDarIndex.py list <index file>
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import glob
+import marshal
+import mmap
+import os
+import struct
+import sys
+import threading
+import zipfile
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+from WfaParse import WfaUserInput, WfaWorkflowDef
+
+'''
+Index file layout:
+    INDEX_MAGIC
+    directory length - unsigned 64 bit little endian
+    directory - marshal of { 'names' : { name : (offset, length) }, 'uuids' : { uuid : name } }
+    entries - marshal of (name, uuid, ((input name, type, mandatory, allowed values), ...), (return parameter, ...))
+Offsets are relative to the end of the directory.  Entries are only decoded when they are looked up.
+'''
+INDEX_MAGIC = "WFAIDX1\n"
+_LENGTH = struct.Struct("<Q")
+
+XSI_TYPE = '{http://www.w3.org/2001/XMLSchema-instance}type'
+
+# The .dar exports shipped with the project
+DEFAULT_DAR_PATHS = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Workflows', '*.dar')))
+
+'''
+readDarWorkflows - yield (name, uuid, inputs, returnParams) for every TabularWorkflow in a .dar archive
+'''
+def readDarWorkflows(darPath):
+    darFile = zipfile.ZipFile(darPath)
+    try:
+        for member in darFile.namelist():
+            if(not member.startswith('TabularWorkflow_')):
+                continue
+            workflowXml = ET.fromstring(darFile.read(member))
+            inputs = []
+            for uInput in workflowXml.iter('user-input'):
+                inputType = uInput.find('user-input-type')
+                wfaType = "String"
+                allowedValues = ()
+                if(inputType != None):
+                    wfaType = _wfaTypeName(inputType.get(XSI_TYPE))
+                    if(inputType.get('enumValues')):
+                        allowedValues = tuple([value.strip() for value in inputType.get('enumValues').split(',')])
+                inputs.append((uInput.get('name').lstrip('$'), wfaType, uInput.get('mandatory') == 'true', allowedValues))
+            returnParams = tuple([returnParam.get('name') for returnParam in workflowXml.iter('return-parameter')])
+            yield((workflowXml.get('name'), workflowXml.findtext('uuid'), tuple(inputs), returnParams))
+    finally:
+        darFile.close()
+    return
+
+'''
+buildDarIndex - index every workflow found in darPaths into indexPath.  A workflow present in several archives is
+indexed once.  Returns the number of workflows indexed.
+'''
+def buildDarIndex(darPaths, indexPath):
+    names = {}
+    uuids = {}
+    entries = []
+    offset = 0
+    for darPath in darPaths:
+        for entry in readDarWorkflows(darPath):
+            if(entry[0] in names):
+                continue
+            data = marshal.dumps(entry)
+            names[entry[0]] = (offset, len(data))
+            uuids[entry[1]] = entry[0]
+            entries.append(data)
+            offset = offset + len(data)
+
+    directory = marshal.dumps({ 'names' : names, 'uuids' : uuids })
+    tmpPath = indexPath + ".tmp"
+    with open(tmpPath, 'wb') as indexFile:
+        indexFile.write(INDEX_MAGIC)
+        indexFile.write(_LENGTH.pack(len(directory)))
+        indexFile.write(directory)
+        for data in entries:
+            indexFile.write(data)
+    os.rename(tmpPath, indexPath)
+    return(len(entries))
+
+class WfaDarIndex(object):
+    '''
+    WfaDarIndex - a memory mapped schema index written by buildDarIndex.
+
+    lookup returns a WfaWorkflowDef for a workflow name or UUID on a given server.  The execute link is derived from
+    the UUID (POST /rest/workflows/{uuid}/jobs), so no query of WFA is needed.  Decoded definitions are kept per
+    server, so each is decoded (and its serializer compiled) only once.
+    '''
+
+    def __init__(self, indexPath):
+        self.indexPath = indexPath
+        with open(indexPath, 'rb') as indexFile:
+            self._map = mmap.mmap(indexFile.fileno(), 0, access=mmap.ACCESS_READ)
+        if(self._map[:len(INDEX_MAGIC)] != INDEX_MAGIC):
+            raise Exception("Not a WFA schema index: " + indexPath)
+        start = len(INDEX_MAGIC)
+        directoryLength = _LENGTH.unpack(self._map[start:start + _LENGTH.size])[0]
+        start = start + _LENGTH.size
+        directory = marshal.loads(self._map[start:start + directoryLength])
+        self._names = directory['names']
+        self._uuids = directory['uuids']
+        self._entriesStart = start + directoryLength
+        self._defs = {}
+        # (server, name) : True/False once the entry has been compared with the server's definition
+        self._verified = {}
+        self._lock = threading.Lock()
+        return
+
+    '''
+    names - the names of every indexed workflow
+    '''
+    def names(self):
+        return(sorted(self._names.keys()))
+
+    '''
+    lookup - return the WfaWorkflowDef of workflowName (or, if no name is given, of workflowUUID) for wfaServer, or None
+    if the workflow is not in the index.
+    '''
+    def lookup(self, wfaServer, workflowName=None, workflowUUID=None):
+        if(workflowName == None):
+            workflowName = self._uuids.get(workflowUUID)
+        if(workflowName == None or workflowName not in self._names):
+            return(None)
+        key = (wfaServer, workflowName)
+        with self._lock:
+            workflowDef = self._defs.get(key)
+            if(workflowDef == None):
+                workflowDef = self._decode(wfaServer, workflowName)
+                self._defs[key] = workflowDef
+        if(workflowUUID != None and workflowDef.uuid != workflowUUID):
+            return(None)
+        return(workflowDef)
+
+    '''
+    isCurrent - True/False if the entry of workflowName has been confirmed against (or found to differ from) the
+    definition on wfaServer, None if it has not been checked yet.
+    '''
+    def isCurrent(self, wfaServer, workflowName):
+        return(self._verified.get((wfaServer, workflowName)))
+
+    '''
+    markCurrent - record the outcome of comparing the entry of workflowName with the definition on wfaServer
+    '''
+    def markCurrent(self, wfaServer, workflowName, current):
+        self._verified[(wfaServer, workflowName)] = current
+        return
+
+    def _decode(self, wfaServer, workflowName):
+        offset, length = self._names[workflowName]
+        start = self._entriesStart + offset
+        name, uuid, inputs, returnParams = marshal.loads(self._map[start:start + length])
+        executeLink = "http://" + wfaServer + "/rest/workflows/" + uuid + "/jobs"
+        return(WfaWorkflowDef(name, uuid, executeLink,
+                              tuple([WfaUserInput(*uInput) for uInput in inputs]), returnParams))
+
+'''
+sameSchema - True if two definitions describe the same inputs (names, types, mandatory flags) and return parameters
+'''
+def sameSchema(firstDef, secondDef):
+    def schema(workflowDef):
+        return(tuple([(uInput.name, (uInput.type or "").lower(), uInput.mandatory) for uInput in workflowDef.inputs]),
+               tuple(workflowDef.returnParams))
+    return(firstDef.uuid == secondDef.uuid and schema(firstDef) == schema(secondDef))
+
+# Process wide registry of opened indexes, one per index file.
+_indexRegistry = {}
+_indexRegistryLock = threading.Lock()
+
+'''
+getSchemaIndex - return the opened index at indexPath.  If the file is missing, or older than any of darPaths, it is
+(re)built from darPaths first (by default the .dar exports shipped in Workflows/).
+'''
+def getSchemaIndex(indexPath, darPaths=None):
+    with _indexRegistryLock:
+        index = _indexRegistry.get(indexPath)
+        if(index == None):
+            if(darPaths == None):
+                darPaths = DEFAULT_DAR_PATHS
+            if(not os.path.exists(indexPath) or
+               any([os.path.getmtime(darPath) > os.path.getmtime(indexPath) for darPath in darPaths])):
+                buildDarIndex(darPaths, indexPath)
+            index = WfaDarIndex(indexPath)
+            _indexRegistry[indexPath] = index
+        return(index)
+
+def _wfaTypeName(xsiType):
+    # e.g. stringUserInputType -> String, enumUserInputType -> Enum
+    if(xsiType == None):
+        return("String")
+    name = xsiType.replace('UserInputType', '')
+    return(name[:1].upper() + name[1:])
+
+if __name__ == '__main__':
+    if(len(sys.argv) >= 4 and sys.argv[1] == 'build'):
+        print "Indexed " + str(buildDarIndex(sys.argv[3:], sys.argv[2])) + " workflows into " + sys.argv[2]
+    elif(len(sys.argv) == 3 and sys.argv[1] == 'list'):
+        index = WfaDarIndex(sys.argv[2])
+        for workflowName in index.names():
+            workflowDef = index.lookup('localhost', workflowName)
+            print workflowDef.name + "\t" + workflowDef.uuid
+            for uInput in workflowDef.inputs:
+                print "\t" + uInput.name + "\t" + uInput.type + "\t" + str(uInput.mandatory).lower() + \
+                    "\t" + ", ".join(uInput.allowedValues)
+    else:
+        print __doc__
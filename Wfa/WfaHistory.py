@@ -0,0 +1,340 @@
+'''
+Created on Oct 16, 2026
+
+WfaHistory.py - streaming export of the WFA job history.
+iterJobHistory walks the WFA jobs listing page by page (after=<last job ID>&limit=<page size>), parsing each page
+incrementally, and yields one row per job: status, start and end time, duration and return parameters.  Filters on
+workflow name, status and start time are sent to WFA as query parameters and applied again on the client, so a server
+that ignores some of them still yields the right jobs.  exportJobHistory writes the rows to a JSON lines or CSV file
+as they arrive - memory use does not grow with the number of jobs - and picks up where the previous export of the file
+stopped, so a nightly export only fetches the jobs that finished since the previous one.  loadJobTable keeps the
+history in memory instead, in a compact WfaJobTable.
+
+    python WfaHistory.py <wfaServer> <wfaUser> <wfaPw> <output file> [--csv] [--workflow NAME] [--status STATUS]
+                         [--since EPOCH] [--until EPOCH] [--page-size N] [--no-resume]
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import argparse
+import calendar
+import csv
+import itertools
+import json
+import os
+import time
+import urllib
+import urllib2
+
+from WfaJob import WfaJobState, WfaJobTable, applyJobState, simpleJobStatus
+from WfaParse import iterJobRecords, parseJobStream, readResponse
+
+DEFAULT_PAGE_SIZE = 500
+
+# Columns of an exported row, in CSV column order.  returnParams is a dictionary (JSON text in CSV files).
+HISTORY_FIELDS = ('jobId', 'workflowName', 'workflowUUID', 'jobStatus', 'errorMessage', 'startTime', 'endTime',
+                  'duration', 'returnParams')
+
+# Formats WFA reports job times in: ISO 8601 (UTC) and the appliance's local "Oct 16, 2026 10:15:00 AM".
+_UTC_TIME_FORMATS = ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S")
+_LOCAL_TIME_FORMATS = ("%b %d, %Y %I:%M:%S %p",)
+
+# Suffix of the file, next to an export, that records where a resumed export carries on.
+RESUME_SUFFIX = ".resume"
+
+'''
+iterJobHistory - yield a row (a dictionary with the keys of HISTORY_FIELDS) for every job in the jobs listing of the
+server of session, in job ID order.
+
+    workflowName - only jobs of this workflow
+    status - only jobs in this raw WFA status (e.g. "COMPLETED"), or in any of a tuple of them
+    since, until - only jobs started within [since, until) (epoch seconds)
+    afterJobId - only jobs after this one, e.g. the last one of a previous export
+    unfinished - a list: jobs that have not finished are not yielded but their job IDs appended to it
+    pageSize - jobs requested per page
+
+Start and end times are the epoch seconds of the times WFA reports (None if it reports none or in an unknown format).
+Each page is parsed and its response closed before its rows are yielded, so a slow consumer does not hold a connection.
+'''
+def iterJobHistory(session, workflowName=None, status=None, since=None, until=None, afterJobId=None, unfinished=None,
+                   pageSize=DEFAULT_PAGE_SIZE):
+    if(isinstance(status, basestring)):
+        status = (status,)
+    # An unfinished job has to reach the client to be set aside, so the status is then filtered here only.
+    filters = _listingFilters(workflowName, status, since, until, unfinished == None)
+    for record in _listedJobs(session, filters, afterJobId, pageSize):
+        if(unfinished != None and not _isFinished(record)):
+            unfinished.append(record.jobId)
+            continue
+        row = historyRow(record)
+        if(_matches(row, workflowName, status, since, until)):
+            yield row
+    return
+
+'''
+loadJobTable - store the jobs in the jobs listing of the server of session in a WfaJobTable (a new one unless table is
+given) and return the table.  A job already in the table is replaced, so loading again refreshes it; pass the highest
+job ID loaded as afterJobId to add only the jobs started since.  The filters are those of iterJobHistory.
+'''
+def loadJobTable(session, table=None, workflowName=None, status=None, since=None, until=None, afterJobId=None,
+                 pageSize=DEFAULT_PAGE_SIZE):
+    if(table == None):
+        table = WfaJobTable()
+    if(isinstance(status, basestring)):
+        status = (status,)
+    for record in _listedJobs(session, _listingFilters(workflowName, status, since, until, True), afterJobId, pageSize):
+        if(not _matches(historyRow(record), workflowName, status, since, until)):
+            continue
+        state = WfaJobState()
+        state.jobId = record.jobId
+        state.jobSelfLink = record.links.get('self')
+        applyJobState(state, record)
+        table.add(state)
+    return(table)
+
+'''
+historyRow - the export row of a WfaJobRecord
+'''
+def historyRow(record):
+    startTime = parseJobTime(record.startTime)
+    endTime = parseJobTime(record.endTime)
+    duration = None
+    if(startTime != None and endTime != None):
+        duration = endTime - startTime
+    return({ 'jobId' : record.jobId, 'workflowName' : record.workflowName, 'workflowUUID' : record.workflowUUID,
+             'jobStatus' : record.jobStatus, 'errorMessage' : record.errorMessage, 'startTime' : startTime,
+             'endTime' : endTime, 'duration' : duration, 'returnParams' : dict(record.returnParams) })
+
+'''
+parseJobTime - epoch seconds of a job time as WFA reports it, or None
+'''
+def parseJobTime(text):
+    if(text == None):
+        return(None)
+    text = text.strip()
+    fraction = 0.0
+    utcText = text.rstrip('Z')
+    if('.' in utcText):
+        utcText, digits = utcText.rsplit('.', 1)
+        if(digits.isdigit()):
+            fraction = float("0." + digits)
+    for timeFormat in _UTC_TIME_FORMATS:
+        try:
+            return(calendar.timegm(time.strptime(utcText, timeFormat)) + fraction)
+        except ValueError:
+            pass
+    for timeFormat in _LOCAL_TIME_FORMATS:
+        try:
+            return(time.mktime(time.strptime(text, timeFormat)))
+        except ValueError:
+            pass
+    return(None)
+
+'''
+exportJobHistory - append the job history to path, as JSON lines (format 'jsonl') or CSV (format 'csv'), and return the
+number of jobs written.  The filters are those of iterJobHistory.
+
+With resume set only finished jobs are exported, and the export carries on from where the previous one stopped: the
+jobs listing is read after the last job it listed, and the jobs that had not finished then (a running, paused or
+scheduled job) are looked up again one by one and exported once they have.  A job that does not finish therefore never
+holds back the jobs after it.  Where to carry on is kept in path + RESUME_SUFFIX; without that file the export carries
+on after the last job in path.
+'''
+def exportJobHistory(session, path, format='jsonl', resume=True, workflowName=None, status=None, since=None, until=None,
+                     pageSize=DEFAULT_PAGE_SIZE):
+    if(isinstance(status, basestring)):
+        status = (status,)
+    afterJobId = None
+    pending = []
+    unfinished = None
+    if(resume):
+        afterJobId, pending = resumePoint(path, format)
+        unfinished = []
+    newFile = not os.path.exists(path) or os.path.getsize(path) == 0
+    count = 0
+    with open(path, 'ab') as output:
+        if(format == 'csv'):
+            writer = csv.writer(output)
+            if(newFile):
+                writer.writerow(HISTORY_FIELDS)
+        rows = iterJobHistory(session, workflowName, status, since, until, afterJobId, unfinished, pageSize)
+        if(resume):
+            rows = itertools.chain(_finishedRows(session, pending, unfinished, workflowName, status, since, until), rows)
+        for row in rows:
+            if(format == 'csv'):
+                writer.writerow([_csvValue(row[field]) for field in HISTORY_FIELDS])
+            else:
+                output.write(json.dumps(row, sort_keys=True) + "\n")
+            count = count + 1
+            if(afterJobId == None or _jobKey(row['jobId']) > _jobKey(afterJobId)):
+                afterJobId = row['jobId']
+    if(resume):
+        for jobId in unfinished:
+            if(afterJobId == None or _jobKey(jobId) > _jobKey(afterJobId)):
+                afterJobId = jobId
+        _saveResumePoint(path, afterJobId, unfinished)
+    return(count)
+
+'''
+resumePoint - where a resumed export of path carries on: (the job ID to read the jobs listing after, the list of job
+IDs that had not finished).  Both come from path + RESUME_SUFFIX, or from the last job in path if there is no such file.
+'''
+def resumePoint(path, format='jsonl'):
+    if(not os.path.exists(path) or os.path.getsize(path) == 0):
+        return((None, []))
+    if(os.path.exists(path + RESUME_SUFFIX)):
+        with open(path + RESUME_SUFFIX, 'rb') as resumeFile:
+            state = json.load(resumeFile)
+        return((state['afterJobId'], state['unfinished']))
+    return((lastExportedJobId(path, format), []))
+
+'''
+lastExportedJobId - the job ID of the last row of an export file, or None if it holds none.  Only the end of the file
+is read.
+'''
+def lastExportedJobId(path, format='jsonl'):
+    if(not os.path.exists(path)):
+        return(None)
+    with open(path, 'rb') as exported:
+        exported.seek(0, os.SEEK_END)
+        end = exported.tell()
+        size = 4096
+        while(True):
+            start = max(0, end - size)
+            exported.seek(start)
+            lines = exported.read(end - start).rstrip("\r\n").split("\n")
+            if(len(lines) > 1 or start == 0):
+                break
+            size = size * 2
+    line = lines[-1].strip()
+    if(line == ""):
+        return(None)
+    if(format == 'csv'):
+        jobId = csv.reader([line]).next()[0]
+        if(jobId == HISTORY_FIELDS[0]):
+            return(None)
+        return(jobId)
+    return(json.loads(line)['jobId'])
+
+def _listingFilters(workflowName, status, since, until, withStatus):
+    filters = []
+    if(workflowName != None):
+        filters.append(('workflow_name', workflowName))
+    if(status != None and withStatus):
+        filters.extend([('status', name) for name in status])
+    if(since != None):
+        filters.append(('since', since))
+    if(until != None):
+        filters.append(('until', until))
+    return(filters)
+
+def _listedJobs(session, filters, afterJobId, pageSize):
+    # The WfaJobRecord of every job in the listing after afterJobId, page by page.  A page is read whole and its
+    # response closed before its records are handed out.
+    listingURI = "http://" + session.wfaServer + "/rest/workflows/jobs"
+    cursor = afterJobId
+    while(True):
+        query = [('limit', pageSize)]
+        if(cursor != None):
+            query.append(('after', cursor))
+        pageStart = cursor
+        advanced = False
+        response = session.urlopen(listingURI + "?" + urllib.urlencode(query + filters))
+        records = readResponse(response, lambda stream: list(iterJobRecords(stream)))
+        for record in records:
+            # A server that does not page sends jobs seen before - skip them.
+            if(pageStart != None and _jobKey(record.jobId) <= _jobKey(pageStart)):
+                continue
+            if(cursor == None or _jobKey(record.jobId) > _jobKey(cursor)):
+                cursor = record.jobId
+                advanced = True
+            yield record
+        if(len(records) < pageSize or not advanced):
+            return
+
+def _saveResumePoint(path, afterJobId, unfinished):
+    tmpPath = path + RESUME_SUFFIX + ".tmp"
+    with open(tmpPath, 'wb') as resumeFile:
+        json.dump({ 'afterJobId' : afterJobId, 'unfinished' : unfinished }, resumeFile, sort_keys=True)
+    os.rename(tmpPath, path + RESUME_SUFFIX)
+    return
+
+def _finishedRows(session, jobIds, unfinished, workflowName, status, since, until):
+    # Look the jobs up again: yield the rows of those that have finished, put the others back into unfinished.
+    for jobId in jobIds:
+        jobURI = "http://" + session.wfaServer + "/rest/workflows/jobs/" + urllib.quote(str(jobId))
+        try:
+            record = readResponse(session.urlopen(jobURI), parseJobStream)
+        except urllib2.HTTPError, e:
+            if(e.code == 404):
+                # The job is gone from WFA - there is nothing left to export.
+                continue
+            raise
+        if(not _isFinished(record)):
+            unfinished.append(jobId)
+            continue
+        row = historyRow(record)
+        if(_matches(row, workflowName, status, since, until)):
+            yield row
+    return
+
+def _isFinished(record):
+    wfaStatus = simpleJobStatus(record.jobStatus)
+    return(wfaStatus == "DONE" or wfaStatus == "FAILED")
+
+def _jobKey(jobId):
+    # WFA job IDs are numbers - compare them as such.
+    try:
+        return((0, int(jobId), ""))
+    except (TypeError, ValueError):
+        return((1, 0, str(jobId)))
+
+def _matches(row, workflowName, status, since, until):
+    if(workflowName != None and row['workflowName'] != None and row['workflowName'] != workflowName):
+        return(False)
+    if(status != None and not row['jobStatus'] in status):
+        return(False)
+    if(row['startTime'] != None):
+        if(since != None and row['startTime'] < since):
+            return(False)
+        if(until != None and row['startTime'] >= until):
+            return(False)
+    return(True)
+
+def _csvValue(value):
+    if(value == None):
+        return("")
+    if(type(value) == dict):
+        return(json.dumps(value, sort_keys=True))
+    if(type(value) == unicode):
+        return(value.encode('utf-8'))
+    return(value)
+
+if __name__ == '__main__':
+    from WfaResilience import getCircuitBreaker, policyFromDict
+    from WfaTransport import WfaSession
+
+    parser = argparse.ArgumentParser(description="Export the WFA job history")
+    parser.add_argument('wfaServer')
+    parser.add_argument('wfaUser')
+    parser.add_argument('wfaPw')
+    parser.add_argument('output')
+    parser.add_argument('--csv', action='store_true', help="write CSV rather than JSON lines")
+    parser.add_argument('--workflow', help="only jobs of this workflow")
+    parser.add_argument('--status', action='append', help="only jobs in this WFA status (repeatable)")
+    parser.add_argument('--since', type=float, help="only jobs started at or after this time (epoch seconds)")
+    parser.add_argument('--until', type=float, help="only jobs started before this time (epoch seconds)")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('--no-resume', action='store_true', help="export everything, not just the jobs after the "
+                        "last one in the output file")
+    args = parser.parse_args()
+
+    session = WfaSession(args.wfaServer, args.wfaUser, args.wfaPw, None, None, policyFromDict({}),
+                         getCircuitBreaker(args.wfaServer))
+    exportFormat = 'jsonl'
+    if(args.csv):
+        exportFormat = 'csv'
+    count = exportJobHistory(session, args.output, exportFormat, not args.no_resume, args.workflow, args.status,
+                             args.since, args.until, args.page_size)
+    print "Exported " + str(count) + " jobs to " + args.output
@@ -0,0 +1,533 @@
+'''
+Created on Oct 16, 2026
+
+WfaJob.py - WFA job state helpers.
+The job state layout and the translation of WFA job documents into it, shared by the Wfa class and anything else that
+tracks jobs (e.g. WfaJobMonitor).
+
+Job state is held in a WfaJobState: a slotted record with the status as a small integer code (see JOB_STATUS_NAMES)
+and the command progress and counters as integers.  The jobDict the Wfa class has always exposed is a WfaJobDict - a
+view over a WfaJobState that reads and writes the record, presenting the values as text as before.  WfaJobTable keeps
+the state of many jobs (e.g. the job history of a Manila backend, loaded by WfaHistory.loadJobTable) in typed arrays,
+one column per field.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import array
+import collections
+
+# There are three general catagories of state: bad, ok, and done.
+BAD_STATUS = ("FAILED", "ABORTING", "CANCELED", "OBSOLETE")
+OK_STATUS = ("PAUSED", "RUNNING", "PENDING", "SCHEDULED", "EXECUTING")
+DONE_STATUS = "COMPLETED"
+
+# Status codes.  Code 0 is a job with no status yet; a status WFA reports that is not listed here is stored as
+# STATUS_OTHER along with its text.
+JOB_STATUS_NAMES = (None, "SCHEDULED", "PENDING", "RUNNING", "EXECUTING", "PAUSED", "COMPLETED", "FAILED", "ABORTING",
+                    "CANCELED", "OBSOLETE")
+STATUS_NONE = 0
+STATUS_OTHER = len(JOB_STATUS_NAMES)
+JOB_STATUS_CODES = dict([(name, code) for code, name in enumerate(JOB_STATUS_NAMES)])
+
+def _simpleStatusName(jobStatus):
+    if(jobStatus == None):
+        return("OK")
+    if(jobStatus == DONE_STATUS):
+        return("DONE")
+    elif(jobStatus in BAD_STATUS):
+        return("FAILED")
+    elif(jobStatus in OK_STATUS):
+        return("OK")
+    return("UNKNOWN")
+
+# Simple status by status code, worked out once.
+SIMPLE_STATUS = tuple([_simpleStatusName(name) for name in JOB_STATUS_NAMES]) + ("UNKNOWN",)
+_SIMPLE_BY_NAME = dict(zip(JOB_STATUS_NAMES, SIMPLE_STATUS))
+
+'''
+statusCode - the code of a raw WFA job status (STATUS_OTHER for a status with no code of its own)
+'''
+def statusCode(jobStatus):
+    return(JOB_STATUS_CODES.get(jobStatus, STATUS_OTHER))
+
+class WfaJobState(object):
+    '''
+    WfaJobState - the state of one job.
+        jobSelfLink, jobError - text, or None
+        jobId - int (text if WFA ever assigns a non numeric id), or None
+        status - status code (see JOB_STATUS_NAMES); statusText holds the raw status when status is STATUS_OTHER
+        cmdExecuting, cmdTotal - int, or None until WFA reports them
+        returnParams - dict of return parameter name : value, or None if there are none
+        pollCount, retryCount, timeoutCount, circuitRejects - int
+        waitTime - float
+        journaled - True once the result of the job has been appended to a job journal (see WfaJournal)
+    '''
+    __slots__ = ('jobSelfLink', 'jobId', 'status', 'statusText', 'jobError', 'cmdExecuting', 'cmdTotal',
+                 'returnParams', 'pollCount', 'waitTime', 'retryCount', 'timeoutCount', 'circuitRejects', 'journaled')
+
+    def __init__(self):
+        self.jobSelfLink = None
+        self.jobId = None
+        self.status = STATUS_NONE
+        self.statusText = None
+        self.jobError = None
+        self.cmdExecuting = None
+        self.cmdTotal = None
+        self.returnParams = None
+        self.pollCount = 0
+        self.waitTime = 0.0
+        self.retryCount = 0
+        self.timeoutCount = 0
+        self.circuitRejects = 0
+        self.journaled = False
+        return
+
+    '''
+    jobStatus - the raw WFA status text
+    '''
+    def jobStatus(self):
+        if(self.status == STATUS_OTHER):
+            return(self.statusText)
+        return(JOB_STATUS_NAMES[self.status])
+
+    '''
+    setJobStatus - store a raw WFA status
+    '''
+    def setJobStatus(self, jobStatus):
+        self.status = JOB_STATUS_CODES.get(jobStatus, STATUS_OTHER)
+        if(self.status == STATUS_OTHER):
+            self.statusText = jobStatus
+        else:
+            self.statusText = None
+        return
+
+    '''
+    simpleStatus - "OK", "FAILED", "DONE" or "UNKNOWN" (see simpleJobStatus)
+    '''
+    def simpleStatus(self):
+        return(SIMPLE_STATUS[self.status])
+
+def _toInt(value):
+    if(value == None or isinstance(value, (int, long))):
+        return(value)
+    return(int(value))
+
+def _toText(value):
+    if(value == None):
+        return(None)
+    return(str(value))
+
+def _toJobId(value):
+    if(isinstance(value, basestring) and value.isdigit()):
+        return(int(value))
+    return(value)
+
+def _getReturnParams(state):
+    # The view hands out the dictionary itself, so callers can keep filling it in as before.
+    if(state.returnParams == None):
+        state.returnParams = {}
+    return(state.returnParams)
+
+def _setReturnParams(state, value):
+    state.returnParams = value
+    return
+
+def _setJobStatus(state, value):
+    state.setJobStatus(value)
+    return
+
+def _field(attribute, toView, toState):
+    def getter(state):
+        return(toView(getattr(state, attribute)))
+    def setter(state, value):
+        setattr(state, attribute, toState(value))
+        return
+    return((getter, setter))
+
+def _same(value):
+    return(value)
+
+# jobDict key : (read from state, write to state)
+_JOB_FIELDS = {
+    "jobSelfLink" : _field('jobSelfLink', _same, _same),
+    "jobId" : _field('jobId', _toText, _toJobId),
+    "jobStatus" : (WfaJobState.jobStatus, _setJobStatus),
+    "jobError" : _field('jobError', _same, _same),
+    "wfCmdExecuting" : _field('cmdExecuting', _toText, _toInt),
+    "wfCmdTotal" : _field('cmdTotal', _toText, _toInt),
+    "returnParams" : (_getReturnParams, _setReturnParams),
+    "pollCount" : _field('pollCount', _same, _same),
+    "waitTime" : _field('waitTime', _same, _same),
+    "retryCount" : _field('retryCount', _same, _same),
+    "timeoutCount" : _field('timeoutCount', _same, _same),
+    "circuitRejects" : _field('circuitRejects', _same, _same)
+    }
+JOB_DICT_KEYS = ("jobSelfLink", "jobId", "jobStatus", "jobError", "wfCmdExecuting", "wfCmdTotal", "returnParams",
+                 "pollCount", "waitTime", "retryCount", "timeoutCount", "circuitRejects")
+
+class WfaJobDict(collections.MutableMapping):
+    '''
+    WfaJobDict - the job dictionary of the Wfa class, as a view over a WfaJobState (the state attribute).
+
+    Reading and writing the keys documented for the Wfa class reads and writes the record: jobId, wfCmdExecuting and
+    wfCmdTotal are returned as text as they always have been, and jobStatus as the raw WFA status.  Keys outside the
+    documented set are kept in a plain dictionary alongside the record.  It is a MutableMapping, so update, pop,
+    setdefault and comparison with a dictionary work as on a dictionary.  The documented keys are always present:
+    deleting one resets it to its value in a new job dictionary.  json only encodes real dictionaries - use copy().
+    '''
+    __slots__ = ('state', '_extra')
+
+    def __init__(self, state=None):
+        if(state == None):
+            state = WfaJobState()
+        self.state = state
+        self._extra = None
+        return
+
+    def __getitem__(self, key):
+        field = _JOB_FIELDS.get(key)
+        if(field != None):
+            return(field[0](self.state))
+        if(self._extra == None):
+            raise KeyError(key)
+        return(self._extra[key])
+
+    def __setitem__(self, key, value):
+        field = _JOB_FIELDS.get(key)
+        if(field != None):
+            field[1](self.state, value)
+        else:
+            if(self._extra == None):
+                self._extra = {}
+            self._extra[key] = value
+        return
+
+    def __delitem__(self, key):
+        field = _JOB_FIELDS.get(key)
+        if(field != None):
+            _resetField(self.state, field)
+        elif(self._extra == None):
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+        return
+
+    def __contains__(self, key):
+        return(key in _JOB_FIELDS or (self._extra != None and key in self._extra))
+
+    def __eq__(self, other):
+        if(not isinstance(other, collections.Mapping)):
+            return(NotImplemented)
+        return(dict(self.items()) == dict(other.items()))
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if(equal is NotImplemented):
+            return(equal)
+        return(not equal)
+
+    def __iter__(self):
+        return(iter(self.keys()))
+
+    def __len__(self):
+        return(len(self.keys()))
+
+    def __repr__(self):
+        return(repr(self.copy()))
+
+    def get(self, key, default=None):
+        if(key in self):
+            return(self[key])
+        return(default)
+
+    def keys(self):
+        if(self._extra == None):
+            return(list(JOB_DICT_KEYS))
+        return(list(JOB_DICT_KEYS) + self._extra.keys())
+
+    def items(self):
+        return([(key, self[key]) for key in self.keys()])
+
+    def values(self):
+        return([self[key] for key in self.keys()])
+
+    '''
+    clear - reset the record and drop the keys outside the documented set
+    '''
+    def clear(self):
+        for field in _JOB_FIELDS.values():
+            _resetField(self.state, field)
+        self._extra = None
+        return
+
+    '''
+    popitem - remove and return a key outside the documented set (the documented keys cannot be removed)
+    '''
+    def popitem(self):
+        if(not self._extra):
+            raise KeyError("popitem(): no keys outside the documented set")
+        return(self._extra.popitem())
+
+    '''
+    copy - a plain dictionary of the current values
+    '''
+    def copy(self):
+        jobDict = dict(self.items())
+        jobDict['returnParams'] = dict(jobDict['returnParams'])
+        return(jobDict)
+
+def _resetField(state, field):
+    # The value of a new record - read from a fresh one, so that no dictionary is shared between jobs.
+    field[1](state, field[0](WfaJobState()))
+    return
+
+'''
+newJobDict - return an empty job dictionary (see the Wfa class documentation for the key definitions)
+'''
+def newJobDict():
+    return(WfaJobDict())
+
+'''
+applyJobRecord - update a job dictionary from a WfaJobRecord (see WfaParse.iterJobRecords).
+
+A WfaJobDict has its record updated directly; a plain dictionary gets the values as text, as the job dictionary always
+had them.
+'''
+def applyJobRecord(jobDict, record):
+    if(isinstance(jobDict, WfaJobDict)):
+        applyJobState(jobDict.state, record)
+        return
+
+    jobDict['jobStatus'] = record.jobStatus
+
+    # Progress is taken from every document, so that it follows the job as it moves through its commands.
+    if(record.commandsNumber != None):
+        jobDict['wfCmdTotal'] = str(record.commandsNumber)
+
+    if(record.currentCommandIndex != None):
+        jobDict['wfCmdExecuting'] = str(record.currentCommandIndex)
+
+    if(record.errorMessage != None):
+        jobDict['jobError'] = record.errorMessage
+
+    # Since there is a unknown number of return parameters, store them all within the sub-dictionary.
+    for name, value in record.returnParams:
+        jobDict['returnParams'][name] = value
+    return
+
+'''
+applyJobState - update a WfaJobState from a WfaJobRecord
+'''
+def applyJobState(state, record):
+    state.setJobStatus(record.jobStatus)
+
+    if(record.commandsNumber != None):
+        state.cmdTotal = int(record.commandsNumber)
+
+    if(record.currentCommandIndex != None):
+        state.cmdExecuting = int(record.currentCommandIndex)
+
+    if(record.errorMessage != None):
+        state.jobError = record.errorMessage
+
+    if(record.returnParams):
+        if(state.returnParams == None):
+            state.returnParams = {}
+        for name, value in record.returnParams:
+            state.returnParams[name] = value
+    return
+
+'''
+simpleJobStatus - translate a raw WFA job status into "OK", "FAILED", "DONE" or "UNKNOWN".  A job with no status
+yet is treated as "OK".
+'''
+def simpleJobStatus(jobStatus):
+    return(_SIMPLE_BY_NAME.get(jobStatus, "UNKNOWN"))
+
+'''
+jobSimpleStatus - the simple status of a job dictionary, read from the status code when it is a WfaJobDict
+'''
+def jobSimpleStatus(jobDict):
+    if(isinstance(jobDict, WfaJobDict)):
+        return(SIMPLE_STATUS[jobDict.state.status])
+    return(simpleJobStatus(jobDict['jobStatus']))
+
+# Stored in the progress columns of WfaJobTable for progress WFA has not reported yet.
+_NO_VALUE = -1
+
+class WfaJobTable(object):
+    '''
+    WfaJobTable - the state of many jobs, stored column wise in typed arrays.
+
+    A job costs a few dozen bytes for its id, status, progress, counters and wait time.  Self links are stored as an
+    index into a small table of link prefixes (a link is normally the server's job URI followed by the job id); error
+    messages, return parameters and the text of uncoded statuses are stored only for the jobs that have them.  Job
+    ids must be numeric, as WFA assigns them.
+
+        add(state) - store a WfaJobState (replacing any job with the same id)
+        update(jobId, record) - apply a WfaJobRecord to a stored job
+        get(jobId) - a WfaJobState with the stored values (changes to it are not stored until add is called with it)
+        jobDict(jobId) - a WfaJobDict over get(jobId)
+        status(jobId), simpleStatus(jobId) - the status code and simple status
+        discard(jobId) - drop a job
+        counts() - number of jobs by simple status
+    '''
+
+    def __init__(self):
+        self._rows = {}
+        self._jobIds = array.array('l')
+        self._status = array.array('B')
+        self._cmdExecuting = array.array('h')
+        self._cmdTotal = array.array('h')
+        self._pollCount = array.array('l')
+        self._retryCount = array.array('l')
+        self._timeoutCount = array.array('l')
+        self._circuitRejects = array.array('l')
+        self._waitTime = array.array('d')
+        self._linkPrefix = array.array('H')
+        self._prefixes = [None]
+        self._prefixIndex = { None : 0 }
+        # row : value, only for the jobs that have one
+        self._links = {}
+        self._statusText = {}
+        self._errors = {}
+        self._returnParams = {}
+        return
+
+    def __len__(self):
+        return(len(self._jobIds))
+
+    def __contains__(self, jobId):
+        return(_toJobId(jobId) in self._rows)
+
+    def __iter__(self):
+        return(iter(self._jobIds.tolist()))
+
+    def add(self, state):
+        jobId = _toJobId(state.jobId)
+        if(not isinstance(jobId, (int, long))):
+            raise ValueError("WfaJobTable needs a numeric job id, not " + repr(state.jobId))
+        row = self._rows.get(jobId)
+        if(row == None):
+            row = len(self._jobIds)
+            self._jobIds.append(jobId)
+            for column in (self._status, self._cmdExecuting, self._cmdTotal, self._pollCount, self._retryCount,
+                           self._timeoutCount, self._circuitRejects, self._linkPrefix):
+                column.append(0)
+            self._waitTime.append(0.0)
+            self._rows[jobId] = row
+        self._store(row, state)
+        return
+
+    def update(self, jobId, record):
+        state = self.get(jobId)
+        applyJobState(state, record)
+        self._store(self._rows[_toJobId(jobId)], state)
+        return
+
+    def get(self, jobId):
+        row = self._rows[_toJobId(jobId)]
+        state = WfaJobState()
+        state.jobId = self._jobIds[row]
+        state.status = self._status[row]
+        state.statusText = self._statusText.get(row)
+        state.jobError = self._errors.get(row)
+        state.cmdExecuting = self._optional(self._cmdExecuting[row])
+        state.cmdTotal = self._optional(self._cmdTotal[row])
+        returnParams = self._returnParams.get(row)
+        if(returnParams != None):
+            state.returnParams = dict(returnParams)
+        state.pollCount = self._pollCount[row]
+        state.retryCount = self._retryCount[row]
+        state.timeoutCount = self._timeoutCount[row]
+        state.circuitRejects = self._circuitRejects[row]
+        state.waitTime = self._waitTime[row]
+        state.jobSelfLink = self._links.get(row)
+        if(state.jobSelfLink == None and self._linkPrefix[row] != 0):
+            state.jobSelfLink = self._prefixes[self._linkPrefix[row]] + str(state.jobId)
+        return(state)
+
+    def jobDict(self, jobId):
+        return(WfaJobDict(self.get(jobId)))
+
+    def status(self, jobId):
+        return(self._status[self._rows[_toJobId(jobId)]])
+
+    def simpleStatus(self, jobId):
+        return(SIMPLE_STATUS[self.status(jobId)])
+
+    def discard(self, jobId):
+        row = self._rows.pop(_toJobId(jobId), None)
+        if(row == None):
+            return
+        # Move the last row into the freed one so the columns stay dense.
+        last = len(self._jobIds) - 1
+        for column in (self._jobIds, self._status, self._cmdExecuting, self._cmdTotal, self._pollCount,
+                       self._retryCount, self._timeoutCount, self._circuitRejects, self._waitTime, self._linkPrefix):
+            column[row] = column[last]
+            column.pop()
+        for sparse in (self._links, self._statusText, self._errors, self._returnParams):
+            sparse.pop(row, None)
+            if(last in sparse):
+                sparse[row] = sparse.pop(last)
+        if(row != last):
+            self._rows[self._jobIds[row]] = row
+        return
+
+    def counts(self):
+        counts = {}
+        for code in set(self._status):
+            counts[SIMPLE_STATUS[code]] = counts.get(SIMPLE_STATUS[code], 0) + self._status.count(code)
+        return(counts)
+
+    def _store(self, row, state):
+        self._status[row] = state.status
+        self._setSparse(self._statusText, row, state.statusText)
+        self._setSparse(self._errors, row, state.jobError)
+        self._cmdExecuting[row] = self._column(state.cmdExecuting)
+        self._cmdTotal[row] = self._column(state.cmdTotal)
+        if(state.returnParams):
+            self._returnParams[row] = tuple(state.returnParams.items())
+        else:
+            self._returnParams.pop(row, None)
+        self._pollCount[row] = state.pollCount
+        self._retryCount[row] = state.retryCount
+        self._timeoutCount[row] = state.timeoutCount
+        self._circuitRejects[row] = state.circuitRejects
+        self._waitTime[row] = state.waitTime
+
+        link = state.jobSelfLink
+        self._links.pop(row, None)
+        self._linkPrefix[row] = 0
+        if(link != None):
+            suffix = str(self._jobIds[row])
+            if(link.endswith(suffix)):
+                prefix = intern(link[:-len(suffix)])
+                index = self._prefixIndex.get(prefix)
+                if(index == None):
+                    index = len(self._prefixes)
+                    self._prefixes.append(prefix)
+                    self._prefixIndex[prefix] = index
+                self._linkPrefix[row] = index
+            else:
+                self._links[row] = link
+        return
+
+    def _setSparse(self, sparse, row, value):
+        if(value == None):
+            sparse.pop(row, None)
+        else:
+            sparse[row] = value
+        return
+
+    def _column(self, value):
+        if(value == None):
+            return(_NO_VALUE)
+        return(value)
+
+    def _optional(self, value):
+        if(value == _NO_VALUE):
+            return(None)
+        return(value)
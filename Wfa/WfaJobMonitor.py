@@ -0,0 +1,291 @@
+'''
+Created on Oct 16, 2026
+
+WfaJobMonitor.py - track many WFA jobs on one server with a single poller.
+Instead of every Wfa instance running its own polling loop against its own jobSelfLink, jobs are handed to the
+monitor of their server.  One background thread polls all of them - in a single request through the WFA jobs
+listing when it is available - and completes a WfaFuture (and optional callback) per job once it reaches a
+terminal state.  Polling cost therefore grows with the number of servers rather than the number of jobs.  Polls are
+conditional where WFA supports it (see WfaPoll), and jobs polled individually are polled at the pace of their commands.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import logging
+import threading
+import time
+import urllib
+import urllib2
+
+from WfaConcurrent import WfaFuture
+from WfaJob import newJobDict, applyJobRecord, jobSimpleStatus
+from WfaMetrics import metrics
+from WfaParse import iterJobRecords, readResponse
+from WfaPoll import WfaPollState, pollJob
+from WfaResilience import WfaCircuitOpenError
+
+_log = logging.getLogger(__name__)
+
+# Defaults - see WfaJobMonitor
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_MAX_POLL_INTERVAL = 30.0
+DEFAULT_LISTING_THRESHOLD = 5
+DEFAULT_MAX_ERRORS = 5
+
+class _WatchedJob(object):
+    __slots__ = ('jobId', 'jobSelfLink', 'jobDict', 'future', 'callback', 'errors', 'poll', 'nextPollAt')
+
+    def __init__(self, jobId, jobSelfLink, jobDict, callback):
+        self.jobId = jobId
+        self.jobSelfLink = jobSelfLink
+        self.jobDict = jobDict
+        self.future = WfaFuture()
+        self.future.jobDict = jobDict
+        self.callback = callback
+        self.errors = 0
+        self.poll = WfaPollState()
+        self.nextPollAt = 0.0
+        return
+
+class WfaJobMonitor(object):
+    '''
+    WfaJobMonitor - poll many jobs of one WFA server from a single background thread.
+
+        session - WfaSession used for all polling requests
+        pollInterval - seconds between polling rounds
+        listingThreshold - once at least this many jobs are watched, statuses are fetched in one request from
+                           the WFA jobs listing (/rest/workflows/jobs), bounded to the span of the watched job IDs so
+                           that the server's older history is never read.  If the server does not provide the listing
+                           the monitor falls back to fetching each job's self link over the pooled connection.
+        maxErrors - consecutive polling failures after which a job's future is failed with the last error
+        maxPollInterval - upper bound of the time between polls of a job.  Once a job has moved through a couple of
+                          commands it is only polled again after half the time its commands are observed to take
+                          (see WfaPoll.WfaPollState.interval), within pollInterval and maxPollInterval.
+
+    Status translation uses the same mapping as Wfa.getSimpleJobStatus.  The monitor thread exits when there is
+    nothing left to watch and is restarted by the next watch().
+    '''
+
+    def __init__(self, session, pollInterval=DEFAULT_POLL_INTERVAL, listingThreshold=DEFAULT_LISTING_THRESHOLD,
+                 maxErrors=DEFAULT_MAX_ERRORS, maxPollInterval=DEFAULT_MAX_POLL_INTERVAL):
+        self.session = session
+        self.pollInterval = pollInterval
+        self.maxPollInterval = max(pollInterval, maxPollInterval)
+        self.listingThreshold = listingThreshold
+        self.maxErrors = maxErrors
+        self.listingURI = "http://" + session.wfaServer + "/rest/workflows/jobs"
+
+        # None until the listing has been tried, then True/False
+        self.listingAvailable = None
+        # Validators of the last listing, and the ids of the jobs it held
+        self._listingPoll = WfaPollState()
+        self._listingJobIds = frozenset()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        return
+
+    '''
+    watch - start tracking a job and return a WfaFuture.
+
+    The future's result is the final simple status ("DONE" or "FAILED"); its jobDict attribute holds the job
+    dictionary, which is updated on every poll.  Pass an existing jobDict (e.g. a Wfa instance's) to have it
+    updated in place.  If given, callback(jobDict, simpleStatus) is called once the job finishes.
+    '''
+    def watch(self, jobId, jobSelfLink=None, callback=None, jobDict=None):
+        jobId = str(jobId)
+        if(jobSelfLink == None):
+            jobSelfLink = self.listingURI + "/" + jobId
+        if(jobDict == None):
+            jobDict = newJobDict()
+            jobDict['jobId'] = jobId
+            jobDict['jobSelfLink'] = jobSelfLink
+
+        with self._lock:
+            watched = self._jobs.get(jobId)
+            if(watched != None):
+                return(watched.future)
+            watched = _WatchedJob(jobId, jobSelfLink, jobDict, callback)
+            self._jobs[jobId] = watched
+            if(self._thread == None):
+                self._thread = threading.Thread(target=self._run, name="WfaJobMonitor-" + self.session.wfaServer)
+                self._thread.daemon = True
+                self._thread.start()
+        return(watched.future)
+
+    '''
+    unwatch - stop tracking a job.  Its future is left incomplete.
+    '''
+    def unwatch(self, jobId):
+        with self._lock:
+            self._jobs.pop(str(jobId), None)
+        return
+
+    '''
+    pending - number of jobs currently being tracked
+    '''
+    def pending(self):
+        with self._lock:
+            return(len(self._jobs))
+
+    '''
+    pollOnce - run a single polling round over every tracked job.  Called by the monitor thread, but may also be
+    called directly to drive the monitor synchronously.
+    '''
+    def pollOnce(self):
+        with self._lock:
+            watchedJobs = dict(self._jobs)
+        if(len(watchedJobs) == 0):
+            return
+
+        # Jobs whose commands are slow are not due at every round - see maxPollInterval.
+        now = time.time()
+        dueJobs = dict([(jobId, watched) for jobId, watched in watchedJobs.items() if watched.nextPollAt <= now])
+        if(len(dueJobs) == 0):
+            return
+
+        remaining = dueJobs
+        if(len(watchedJobs) >= self.listingThreshold and self.listingAvailable != False):
+            remaining = self._pollListing(watchedJobs, dueJobs)
+
+        for watched in remaining.values():
+            try:
+                record = pollJob(self.session, watched.jobSelfLink, watched.poll, watched.jobDict)
+            except WfaCircuitOpenError:
+                # WFA is down; that is no reason to give up on the job.
+                continue
+            except Exception, e:
+                self._recordError(watched, e)
+                continue
+            if(record == None):
+                watched.errors = 0
+                continue
+            self._update(watched, record)
+        return
+
+    '''
+    _pollListing - update every watched job found in one fetch of the jobs listing, due or not, returning the due jobs
+    still to be polled individually.  A listing that has not changed since the last one only answers for the jobs that
+    last one updated - a job watched since then is polled on its own.
+    '''
+    def _pollListing(self, watchedJobs, dueJobs):
+        remaining = dict(dueJobs)
+        applied = set()
+        def applyListing(stream):
+            # Records are applied as they are parsed - the listing is never held in memory as a whole.
+            for record in iterJobRecords(stream):
+                remaining.pop(record.jobId, None)
+                watched = watchedJobs.get(record.jobId)
+                if(watched != None):
+                    applied.add(record.jobId)
+                    self._update(watched, record)
+        try:
+            response = self.session.urlopen(self._listingRequest(watchedJobs), None, self._listingPoll.requestHeaders())
+            if(response.status == 304):
+                # Nothing listed has changed - only the jobs the listing did not hold need polling.
+                response.read()
+                self._listingPoll.notModified = self._listingPoll.notModified + 1
+                self.listingAvailable = True
+                return(dict([(jobId, watched) for jobId, watched in remaining.items()
+                             if jobId not in self._listingJobIds]))
+            self._listingPoll.etag = response.getheader('ETag')
+            self._listingPoll.lastModified = response.getheader('Last-Modified')
+            readResponse(response, applyListing)
+        except urllib2.HTTPError, e:
+            if(e.code in (400, 404, 405, 501)):
+                _log.info("WFA jobs listing not available on %s (HTTP %d), polling jobs individually",
+                          self.session.wfaServer, e.code)
+                self.listingAvailable = False
+            return(remaining)
+        except WfaCircuitOpenError:
+            return(remaining)
+        except Exception:
+            _log.exception("WFA jobs listing failed on %s", self.session.wfaServer)
+            return(remaining)
+
+        self.listingAvailable = True
+        self._listingJobIds = frozenset(applied)
+        return(remaining)
+
+    '''
+    _listingRequest - the URI of the listing of the watched jobs: the jobs from the oldest watched one on, limited to the
+    span of their IDs, so the cost of a round follows the watched jobs rather than the server's whole history
+    '''
+    def _listingRequest(self, watchedJobs):
+        try:
+            jobIds = [int(jobId) for jobId in watchedJobs]
+        except ValueError:
+            return(self.listingURI)
+        first = min(jobIds)
+        last = max(jobIds)
+        return(self.listingURI + "?" + urllib.urlencode((('after', first - 1), ('limit', last - first + 1))))
+
+    def _update(self, watched, record):
+        applyJobRecord(watched.jobDict, record)
+        now = time.time()
+        watched.poll.observeProgress(record.currentCommandIndex, now)
+        interval = watched.poll.interval(self.pollInterval, self.maxPollInterval)
+        if(interval != None):
+            watched.nextPollAt = now + interval
+        watched.errors = 0
+        wfaStatus = jobSimpleStatus(watched.jobDict)
+        metrics.jobObserved(self.session.wfaServer, watched.jobDict, wfaStatus)
+        if(wfaStatus == "DONE" or wfaStatus == "FAILED"):
+            self._finish(watched)
+            watched.future.setResult(wfaStatus)
+            if(watched.callback != None):
+                try:
+                    watched.callback(watched.jobDict, wfaStatus)
+                except Exception:
+                    _log.exception("WfaJobMonitor callback failed for job %s", watched.jobId)
+        return
+
+    def _recordError(self, watched, exception):
+        watched.errors = watched.errors + 1
+        if(watched.errors >= self.maxErrors):
+            self._finish(watched)
+            watched.future.setException(exception)
+        return
+
+    def _finish(self, watched):
+        with self._lock:
+            if(self._jobs.get(watched.jobId) is watched):
+                del self._jobs[watched.jobId]
+        return
+
+    def _run(self):
+        while(True):
+            with self._lock:
+                if(len(self._jobs) == 0):
+                    self._thread = None
+                    return
+            startTime = time.time()
+            try:
+                self.pollOnce()
+            except Exception:
+                _log.exception("WfaJobMonitor polling round failed on %s", self.session.wfaServer)
+            delay = self.pollInterval - (time.time() - startTime)
+            if(delay > 0):
+                time.sleep(delay)
+
+# Process wide registry of monitors, one per server and user.
+_monitorRegistry = {}
+_monitorRegistryLock = threading.Lock()
+
+'''
+getJobMonitor - return the shared monitor for the server (and user) of session, creating it on first use.  The poll
+intervals only take effect when the monitor is created.
+'''
+def getJobMonitor(session, pollInterval=None, maxPollInterval=None):
+    key = (session.wfaServer, session.username)
+    with _monitorRegistryLock:
+        monitor = _monitorRegistry.get(key)
+        if(monitor == None):
+            if(pollInterval == None):
+                pollInterval = DEFAULT_POLL_INTERVAL
+            if(maxPollInterval == None):
+                maxPollInterval = DEFAULT_MAX_POLL_INTERVAL
+            monitor = WfaJobMonitor(session, pollInterval, maxPollInterval=maxPollInterval)
+            _monitorRegistry[key] = monitor
+        return(monitor)
@@ -0,0 +1,359 @@
+'''
+Created on Oct 16, 2026
+
+WfaJournal.py - a local, crash safe journal of the WFA jobs started by this host.
+Every job submitted by a Wfa instance with wfaDict['wfaJournal'] set is appended to an SQLite journal (server, job
+ID and self link, workflow, parameter map, share name) before executeWorkflow returns, and its final result is
+appended once the job finishes.  After a restart reattachJobs hands every job the journal still shows as unfinished
+to the WfaJobMonitor of its server - nothing has to be rediscovered from WFA.
+
+Appends are queued and written by one thread, which commits whatever has queued up in a single transaction; with
+synchronous=FULL each commit is fsync'ed, so under load many records share one fsync.  A submission waits until its
+record is durable, and gets the error if the commit failed; a result does not (if it is lost, the job is simply
+reattached and its result fetched again), but the next flush raises the error.
+
+    python WfaJournal.py unfinished <journal>
+    python WfaJournal.py job <journal> <jobId>
+    python WfaJournal.py share <journal> <shareName>
+    python WfaJournal.py compact <journal> [<retention seconds>]
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import json
+import logging
+import Queue
+import sqlite3
+import sys
+import threading
+import time
+
+_log = logging.getLogger(__name__)
+
+# Most records written in one transaction.
+DEFAULT_BATCH_SIZE = 512
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS events (seq INTEGER PRIMARY KEY AUTOINCREMENT, time REAL NOT NULL, kind TEXT NOT NULL, "
+    "wfaServer TEXT NOT NULL, jobId TEXT NOT NULL, jobSelfLink TEXT, workflowName TEXT, shareName TEXT, status TEXT, "
+    "payload TEXT)",
+    "CREATE INDEX IF NOT EXISTS events_job ON events (jobId, wfaServer)",
+    "CREATE INDEX IF NOT EXISTS events_share ON events (shareName)"
+    )
+
+# Kinds of record: a job accepted by WFA, the final result of a job, and the two folded together by compact.
+SUBMITTED = "submitted"
+FINISHED = "finished"
+COMPACTED = "compacted"
+
+_COLUMNS = "seq, time, kind, wfaServer, jobId, jobSelfLink, workflowName, shareName, status, payload"
+_INSERT = ("INSERT INTO events (time, kind, wfaServer, jobId, jobSelfLink, workflowName, shareName, status, payload) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+class _Append(object):
+    __slots__ = ('row', 'written', 'error')
+
+    def __init__(self, row, wait):
+        self.row = row
+        self.written = None
+        self.error = None
+        if(wait):
+            self.written = threading.Event()
+        return
+
+    def wait(self):
+        self.written.wait()
+        if(self.error != None):
+            raise self.error
+        return
+
+class WfaJournal(object):
+    '''
+    WfaJournal - an SQLite job journal (see getJournal for the shared instance of a file).
+
+        submitted(...) - append a job accepted by WFA; by default returns once the record is on disk
+        finished(...) - append the final result of a job
+        flush() - wait until everything appended so far is on disk; raises the error of a failed commit
+        unfinished(wfaServer=None) - the jobs submitted but not finished
+        job(jobId, wfaServer=None) - one job, or None
+        jobsForShare(shareName) - every job recorded for a share, oldest first
+        compact(retention=None) - fold each finished job into one record; drop finished jobs older than retention
+
+    Jobs are returned as dictionaries with the keys wfaServer, jobId, jobSelfLink, workflowName, shareName,
+    paramMap, submitTime, status (the final simple status, None while unfinished), jobStatus, jobError, returnParams
+    and finishTime.  Lookups by job ID and by share name are served from indexes.
+    '''
+
+    def __init__(self, path, batchSize=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batchSize = batchSize
+        conn = self._connect()
+        try:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+        finally:
+            conn.close()
+        self._queue = Queue.Queue()
+        # The error of a failed commit of records nobody waited for, held for the next flush.
+        self._unreported = None
+        self._errorLock = threading.Lock()
+        self._readConn = self._connect()
+        self._readLock = threading.Lock()
+        self._writer = threading.Thread(target=self._write, name="WfaJournal-" + path)
+        self._writer.daemon = True
+        self._writer.start()
+        return
+
+    '''
+    submitted - append a job accepted by WFA.  With wait set (the default) the call returns once the record has been
+    committed to disk, and raises the error of the commit if it failed.
+    '''
+    def submitted(self, wfaServer, jobId, jobSelfLink, workflowName=None, paramMap=None, shareName=None, wait=True):
+        payload = json.dumps({ 'paramMap' : paramMap })
+        self._append((time.time(), SUBMITTED, wfaServer, str(jobId), jobSelfLink, workflowName, shareName, None,
+                      payload), wait)
+        return
+
+    '''
+    finished - append the final result of a job: its simple status ("DONE" or "FAILED") and, from jobDict, its raw
+    status, error and return parameters
+    '''
+    def finished(self, wfaServer, jobId, wfaStatus, jobDict=None, wait=False):
+        result = {}
+        if(jobDict != None):
+            result = { 'jobStatus' : jobDict['jobStatus'], 'jobError' : jobDict['jobError'],
+                       'returnParams' : dict(jobDict['returnParams']) }
+        self._append((time.time(), FINISHED, wfaServer, str(jobId), None, None, None, wfaStatus, json.dumps(result)),
+                     wait)
+        return
+
+    '''
+    flush - return once every record appended so far has been committed.  Raises the error of a commit that failed since
+    the previous flush and took records nobody waited for (results, or submissions appended without wait).
+    '''
+    def flush(self):
+        self._sync()
+        with self._errorLock:
+            error = self._unreported
+            self._unreported = None
+        if(error != None):
+            raise error
+        return
+
+    def unfinished(self, wfaServer=None):
+        query = ("SELECT " + _COLUMNS + " FROM events s WHERE kind = '" + SUBMITTED + "' AND NOT EXISTS "
+                 "(SELECT 1 FROM events f WHERE f.jobId = s.jobId AND f.wfaServer = s.wfaServer AND f.kind = '" +
+                 FINISHED + "')")
+        arguments = ()
+        if(wfaServer != None):
+            query = query + " AND wfaServer = ?"
+            arguments = (wfaServer,)
+        return(self._jobs(self._select(query + " ORDER BY seq", arguments)))
+
+    def job(self, jobId, wfaServer=None):
+        query = "SELECT " + _COLUMNS + " FROM events WHERE jobId = ?"
+        arguments = (str(jobId),)
+        if(wfaServer != None):
+            query = query + " AND wfaServer = ?"
+            arguments = arguments + (wfaServer,)
+        jobs = self._jobs(self._select(query + " ORDER BY seq", arguments))
+        if(len(jobs) == 0):
+            return(None)
+        return(jobs[-1])
+
+    def jobsForShare(self, shareName):
+        # A result record carries no share name - fetch the records of every job the share's submissions name.
+        rows = self._select("SELECT " + _COLUMNS + " FROM events WHERE jobId IN (SELECT jobId FROM events WHERE "
+                            "shareName = ?) ORDER BY seq", (shareName,))
+        return([job for job in self._jobs(rows) if job['shareName'] == shareName])
+
+    '''
+    compact - fold the submission and result records of every finished job into a single record, and drop finished
+    jobs that finished more than retention seconds ago (if given).  Returns the number of records removed.
+    '''
+    def compact(self, retention=None):
+        self._sync()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            before = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            # EXISTS rather than a row value IN, which needs SQLite 3.15.
+            rows = conn.execute("SELECT " + _COLUMNS + " FROM events WHERE kind != '" + COMPACTED + "' AND EXISTS "
+                                "(SELECT 1 FROM events f WHERE f.jobId = events.jobId AND f.wfaServer = "
+                                "events.wfaServer AND f.kind = '" + FINISHED + "') ORDER BY seq").fetchall()
+            folded = []
+            for job in self._jobs(rows):
+                payload = json.dumps({ 'paramMap' : job['paramMap'], 'jobStatus' : job['jobStatus'],
+                                       'jobError' : job['jobError'], 'returnParams' : job['returnParams'],
+                                       'submitTime' : job['submitTime'] })
+                folded.append((job['finishTime'], COMPACTED, job['wfaServer'], job['jobId'], job['jobSelfLink'],
+                               job['workflowName'], job['shareName'], job['status'], payload))
+            conn.executemany("DELETE FROM events WHERE seq = ?", [(row[0],) for row in rows])
+            conn.executemany(_INSERT, folded)
+            if(retention != None):
+                conn.execute("DELETE FROM events WHERE kind = '" + COMPACTED + "' AND time < ?",
+                             (time.time() - retention,))
+            after = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            conn.commit()
+        except:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return(before - after)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        return(conn)
+
+    def _append(self, row, wait):
+        append = _Append(row, wait)
+        self._queue.put(append)
+        if(wait):
+            append.wait()
+        return
+
+    def _sync(self):
+        # Wait for the records appended so far to be written, or to fail.
+        append = _Append(None, True)
+        self._queue.put(append)
+        append.written.wait()
+        return
+
+    def _write(self):
+        conn = self._connect()
+        while(True):
+            batch = [self._queue.get()]
+            # Everything that queued up while the previous commit was in progress goes into this one.
+            while(len(batch) < self.batchSize):
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Queue.Empty:
+                    break
+            error = None
+            try:
+                conn.executemany(_INSERT, [append.row for append in batch if append.row != None])
+                conn.commit()
+            except Exception, e:
+                _log.exception("WfaJournal write to %s failed", self.path)
+                conn.rollback()
+                error = e
+                if([append for append in batch if append.row != None and append.written == None] != []):
+                    with self._errorLock:
+                        if(self._unreported == None):
+                            self._unreported = e
+            for append in batch:
+                if(append.written != None):
+                    append.error = error
+                    append.written.set()
+
+    def _select(self, query, arguments):
+        self._sync()
+        with self._readLock:
+            return(self._readConn.execute(query, arguments).fetchall())
+
+    def _jobs(self, rows):
+        # Merge the records of each job, in the order they were written.
+        jobs = {}
+        order = []
+        for seq, recordTime, kind, wfaServer, jobId, jobSelfLink, workflowName, shareName, status, payload in rows:
+            key = (wfaServer, jobId)
+            job = jobs.get(key)
+            if(job == None):
+                job = { 'wfaServer' : wfaServer, 'jobId' : jobId, 'jobSelfLink' : None, 'workflowName' : None,
+                        'shareName' : None, 'paramMap' : None, 'submitTime' : None, 'status' : None,
+                        'jobStatus' : None, 'jobError' : None, 'returnParams' : None, 'finishTime' : None }
+                jobs[key] = job
+                order.append(key)
+            payload = json.loads(payload or "{}")
+            if(kind == SUBMITTED or kind == COMPACTED):
+                job['jobSelfLink'] = jobSelfLink
+                job['workflowName'] = workflowName
+                job['shareName'] = shareName
+                job['paramMap'] = payload.get('paramMap')
+                job['submitTime'] = payload.get('submitTime', recordTime)
+            if(kind == FINISHED or kind == COMPACTED):
+                job['status'] = status
+                job['jobStatus'] = payload.get('jobStatus')
+                job['jobError'] = payload.get('jobError')
+                job['returnParams'] = payload.get('returnParams')
+                job['finishTime'] = recordTime
+        return([jobs[key] for key in order])
+
+# Process wide registry of open journals, one per file.
+_journalRegistry = {}
+_journalRegistryLock = threading.Lock()
+
+'''
+getJournal - return the shared journal of path, opening (and if need be creating) it on first use
+'''
+def getJournal(path):
+    with _journalRegistryLock:
+        journal = _journalRegistry.get(path)
+        if(journal == None):
+            journal = WfaJournal(path)
+            _journalRegistry[path] = journal
+        return(journal)
+
+'''
+reattachJobs - resume tracking every unfinished job of the journal named by wfaDict['wfaJournal'] (or of journalPath).
+
+Each job is handed to the WfaJobMonitor of its server, using the credentials and request settings of wfaDict; the
+monitors then poll the jobs in bulk through the jobs listing.  The result of each job is appended to the journal as it
+finishes, and callback(job, jobDict, simpleStatus) is called if given.  Returns { (wfaServer, jobId) : WfaFuture }.
+'''
+def reattachJobs(wfaDict, journalPath=None, callback=None):
+    # Loaded here rather than at the top, so the journal itself can be used without the REST stack.
+    from WfaJob import newJobDict
+    from WfaJobMonitor import getJobMonitor
+    from WfaResilience import getCircuitBreaker, policyFromDict
+    from WfaTransport import WfaSession
+
+    if(journalPath == None):
+        journalPath = wfaDict['wfaJournal']
+    journal = getJournal(journalPath)
+    sessions = {}
+    futures = {}
+    for job in journal.unfinished():
+        wfaServer = job['wfaServer']
+        session = sessions.get(wfaServer)
+        if(session == None):
+            session = WfaSession(wfaServer, wfaDict.get('wfaUser') or "admin", wfaDict.get('wfaPw') or "sp1Tfir3",
+                                 wfaDict.get('wfaPoolSize'), wfaDict.get('wfaPoolIdleTimeout'), policyFromDict(wfaDict),
+                                 getCircuitBreaker(wfaServer, wfaDict.get('wfaBreakerThreshold'),
+                                                   wfaDict.get('wfaBreakerReset')))
+            sessions[wfaServer] = session
+        jobDict = newJobDict()
+        jobDict['jobId'] = job['jobId']
+        jobDict['jobSelfLink'] = job['jobSelfLink']
+        def finished(jobDict, wfaStatus, job=job):
+            journal.finished(job['wfaServer'], job['jobId'], wfaStatus, jobDict)
+            if(callback != None):
+                callback(job, jobDict, wfaStatus)
+        monitor = getJobMonitor(session, wfaDict.get('wfaPollInterval'), wfaDict.get('wfaPollMaxInterval'))
+        futures[(wfaServer, job['jobId'])] = monitor.watch(job['jobId'], job['jobSelfLink'], finished, jobDict)
+    return(futures)
+
+if __name__ == '__main__':
+    if(len(sys.argv) >= 3 and sys.argv[1] in ('unfinished', 'job', 'share', 'compact')):
+        journal = WfaJournal(sys.argv[2])
+        if(sys.argv[1] == 'compact'):
+            retention = None
+            if(len(sys.argv) > 3):
+                retention = float(sys.argv[3])
+            print "Removed " + str(journal.compact(retention)) + " records"
+        else:
+            if(sys.argv[1] == 'unfinished'):
+                jobs = journal.unfinished()
+            elif(sys.argv[1] == 'job'):
+                jobs = [job for job in [journal.job(sys.argv[3])] if job != None]
+            else:
+                jobs = journal.jobsForShare(sys.argv[3])
+            for job in jobs:
+                print json.dumps(job, sort_keys=True)
+    else:
+        print __doc__
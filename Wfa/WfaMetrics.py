@@ -0,0 +1,424 @@
+'''
+Created on Oct 16, 2026
+
+WfaMetrics.py - instrumentation of the WFA REST calls and of the jobs they drive.
+Every request issued through the pooled transport is timed by phase - waiting for a pooled connection, connecting,
+waiting for the server's response headers, and reading (and parsing) the body - and counted with its status, bytes
+and retries, per server and endpoint.  Jobs are timed by phase as well: queued (SCHEDULED/PENDING), executing, each
+command of wfCmdTotal, and the time the client spent sleeping between polls.
+
+The process wide registry (metrics) can be read in three ways:
+    metrics.snapshot() - the current counters and histograms as nested dictionaries
+    metrics.prometheusText() - the same in the Prometheus text exposition format
+    metrics.addJobSink(sink) - sink(summary) is called with a dictionary per finished job; WfaJobLogSink writes
+                               each summary as a single JSON log line
+
+Recording costs a few time.time() calls and one short lock per request; metrics.enabled = False turns it off.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import bisect
+import logging
+import threading
+import time
+
+_log = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets, the last bucket is unbounded.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+# Request phases, in the order they happen
+REQUEST_PHASES = ('pool', 'connect', 'server', 'read', 'total')
+
+# Job states attributed to the queued phase, all other non-terminal states count as executing.
+QUEUED_STATUS = (None, "SCHEDULED", "PENDING")
+
+class WfaHistogram(object):
+    '''
+    WfaHistogram - cumulative-on-read latency histogram with fixed bucket bounds
+    '''
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        return
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        return
+
+    '''
+    toDict - the histogram as { 'count', 'sum', 'buckets' : [(upper bound, cumulative count), ...] }
+    '''
+    def toDict(self):
+        buckets = []
+        total = 0
+        for index in range(len(self.bounds)):
+            total = total + self.counts[index]
+            buckets.append((self.bounds[index], total))
+        buckets.append((float('inf'), self.count))
+        return({ 'count' : self.count, 'sum' : self.sum, 'buckets' : buckets })
+
+class WfaRequestTimer(object):
+    '''
+    WfaRequestTimer - the timings of a single request, filled in by the transport and recorded when the response has
+    been read (or the request failed).  Times are time.time() values.  bytesIn counts the body bytes received (as
+    sent, possibly compressed), bytesDecoded the bytes they decoded to.
+    '''
+    __slots__ = ('wfaServer', 'endpoint', 'startTime', 'poolTime', 'connectTime', 'headersTime', 'bytesOut', 'bytesIn',
+                 'bytesDecoded', 'status')
+
+    def __init__(self, wfaServer, endpoint, bytesOut):
+        self.wfaServer = wfaServer
+        self.endpoint = endpoint
+        self.startTime = time.time()
+        self.poolTime = None
+        self.connectTime = None
+        self.headersTime = None
+        self.bytesOut = bytesOut
+        self.bytesIn = 0
+        self.bytesDecoded = 0
+        self.status = None
+        return
+
+class _EndpointStats(object):
+    __slots__ = ('histograms', 'statuses', 'errors', 'retries', 'bytesIn', 'bytesDecoded', 'bytesOut')
+
+    def __init__(self, bounds):
+        self.histograms = dict([(phase, WfaHistogram(bounds)) for phase in REQUEST_PHASES])
+        self.statuses = {}
+        self.errors = 0
+        self.retries = 0
+        self.bytesIn = 0
+        self.bytesDecoded = 0
+        self.bytesOut = 0
+        return
+
+class _JobTimer(object):
+    __slots__ = ('workflowName', 'submitTime', 'lastTime', 'lastPhase', 'lastCommand', 'phases', 'commands',
+                 'pollSleep')
+
+    def __init__(self, workflowName, submitTime):
+        self.workflowName = workflowName
+        self.submitTime = submitTime
+        self.lastTime = submitTime
+        self.lastPhase = 'queued'
+        self.lastCommand = None
+        self.phases = { 'queued' : 0.0, 'executing' : 0.0 }
+        self.commands = {}
+        self.pollSleep = 0.0
+        return
+
+class WfaMetrics(object):
+    '''
+    WfaMetrics - registry of request and job metrics.  See the module documentation.
+
+    Job phases are attributed at polling resolution: the time between two observations of a job is credited to the
+    state (and command) seen at the earlier one.
+    '''
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.enabled = True
+        self.bounds = bounds
+        self._lock = threading.Lock()
+        self._jobSinks = []
+        self.reset()
+        return
+
+    '''
+    reset - drop every recorded value (job sinks are kept)
+    '''
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+            self._jobPhases = {}
+            self._jobCounts = {}
+            self._jobs = {}
+        return
+
+    '''
+    startRequest - return a WfaRequestTimer for a request about to be issued, or None when metrics are disabled
+    '''
+    def startRequest(self, wfaServer, method, path, bytesOut=0):
+        if(not self.enabled):
+            return(None)
+        return(WfaRequestTimer(wfaServer, endpointOf(method, path), bytesOut))
+
+    '''
+    finishRequest - record a request once its response has been read.  status is None if no response was received.
+    '''
+    def finishRequest(self, timer, status):
+        if(timer == None):
+            return
+        now = time.time()
+        phases = [('total', now - timer.startTime)]
+        if(timer.poolTime != None):
+            phases.append(('pool', timer.poolTime - timer.startTime))
+            if(timer.connectTime != None):
+                phases.append(('connect', timer.connectTime - timer.poolTime))
+            if(timer.headersTime != None):
+                phases.append(('server', timer.headersTime - (timer.connectTime or timer.poolTime)))
+                phases.append(('read', now - timer.headersTime))
+
+        with self._lock:
+            stats = self._endpointStats(timer.wfaServer, timer.endpoint)
+            for phase, seconds in phases:
+                stats.histograms[phase].observe(seconds)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            if(status == None or status >= 400):
+                stats.errors += 1
+            stats.bytesIn += timer.bytesIn
+            stats.bytesDecoded += timer.bytesDecoded
+            stats.bytesOut += timer.bytesOut
+        return
+
+    '''
+    retry - count a request that had to be re-issued
+    '''
+    def retry(self, timer):
+        if(timer == None):
+            return
+        with self._lock:
+            self._endpointStats(timer.wfaServer, timer.endpoint).retries += 1
+        return
+
+    '''
+    retryRequest - count a request that is about to be re-issued, when no WfaRequestTimer is at hand
+    '''
+    def retryRequest(self, wfaServer, method, path):
+        if(not self.enabled):
+            return
+        with self._lock:
+            self._endpointStats(wfaServer, endpointOf(method, path)).retries += 1
+        return
+
+    '''
+    jobSubmitted - start timing a job that WFA has just accepted
+    '''
+    def jobSubmitted(self, wfaServer, jobId, workflowName=None, submitTime=None):
+        if(not self.enabled or jobId == None):
+            return
+        if(submitTime == None):
+            submitTime = time.time()
+        with self._lock:
+            self._jobs[(wfaServer, str(jobId))] = _JobTimer(workflowName, submitTime)
+        return
+
+    '''
+    jobSlept - add seconds the client slept before polling the job again
+    '''
+    def jobSlept(self, wfaServer, jobId, seconds):
+        if(not self.enabled):
+            return
+        with self._lock:
+            jobTimer = self._jobs.get((wfaServer, str(jobId)))
+            if(jobTimer != None):
+                jobTimer.pollSleep += seconds
+        return
+
+    '''
+    jobObserved - account for a fresh status of a job (a job dictionary just updated from WFA).  When the job has
+    reached a terminal state its phase timings are recorded and its summary is handed to the job sinks.
+    '''
+    def jobObserved(self, wfaServer, jobDict, simpleStatus):
+        if(not self.enabled):
+            return
+        now = time.time()
+        key = (wfaServer, str(jobDict['jobId']))
+        with self._lock:
+            jobTimer = self._jobs.get(key)
+            if(jobTimer == None):
+                return
+            elapsed = now - jobTimer.lastTime
+            jobTimer.phases[jobTimer.lastPhase] += elapsed
+            if(jobTimer.lastCommand != None):
+                jobTimer.commands[jobTimer.lastCommand] = jobTimer.commands.get(jobTimer.lastCommand, 0.0) + elapsed
+            jobTimer.lastTime = now
+            if(jobDict['jobStatus'] in QUEUED_STATUS):
+                jobTimer.lastPhase = 'queued'
+            else:
+                jobTimer.lastPhase = 'executing'
+                jobTimer.lastCommand = jobDict['wfCmdExecuting']
+
+            if(simpleStatus != "DONE" and simpleStatus != "FAILED"):
+                return
+            del self._jobs[key]
+            total = now - jobTimer.submitTime
+            for phase, seconds in (('queued', jobTimer.phases['queued']), ('executing', jobTimer.phases['executing']),
+                                   ('total', total), ('pollSleep', jobTimer.pollSleep)):
+                histogram = self._jobPhases.get(phase)
+                if(histogram == None):
+                    histogram = self._jobPhases[phase] = WfaHistogram(self.bounds)
+                histogram.observe(seconds)
+            self._jobCounts[(wfaServer, simpleStatus)] = self._jobCounts.get((wfaServer, simpleStatus), 0) + 1
+            sinks = list(self._jobSinks)
+
+        summary = { 'wfaServer' : wfaServer, 'workflowName' : jobTimer.workflowName, 'jobId' : jobDict['jobId'],
+                    'status' : simpleStatus, 'jobStatus' : jobDict['jobStatus'], 'jobError' : jobDict['jobError'],
+                    'wfCmdTotal' : jobDict['wfCmdTotal'], 'total' : round(total, 6),
+                    'queued' : round(jobTimer.phases['queued'], 6), 'executing' : round(jobTimer.phases['executing'], 6),
+                    'commands' : dict([(command, round(seconds, 6)) for command, seconds in jobTimer.commands.items()]),
+                    'pollSleep' : round(jobTimer.pollSleep, 6), 'pollCount' : jobDict.get('pollCount') }
+        for sink in sinks:
+            try:
+                sink(summary)
+            except Exception:
+                _log.exception("WfaMetrics job sink failed")
+        return
+
+    '''
+    addJobSink - call sink(summary) for every finished job (see jobObserved for the summary keys)
+    '''
+    def addJobSink(self, sink):
+        with self._lock:
+            self._jobSinks.append(sink)
+        return
+
+    '''
+    removeJobSink - stop calling sink
+    '''
+    def removeJobSink(self, sink):
+        with self._lock:
+            if(sink in self._jobSinks):
+                self._jobSinks.remove(sink)
+        return
+
+    '''
+    snapshot - return a copy of everything recorded:
+        requests - { (server, endpoint) : { 'latency' : { phase : histogram dict }, 'statuses' : { status : count },
+                                            'errors', 'retries', 'bytesIn', 'bytesDecoded', 'bytesOut' } }
+                   (bytesIn counts response bytes as received, bytesDecoded after gzip/deflate decoding)
+        jobPhases - { phase : histogram dict } for queued, executing, total and pollSleep
+        jobs - { (server, simple status) : count }
+        jobsInFlight - number of jobs being timed
+    '''
+    def snapshot(self):
+        with self._lock:
+            requests = {}
+            for key, stats in self._endpoints.items():
+                requests[key] = { 'latency' : dict([(phase, histogram.toDict())
+                                                    for phase, histogram in stats.histograms.items()]),
+                                  'statuses' : dict(stats.statuses), 'errors' : stats.errors,
+                                  'retries' : stats.retries, 'bytesIn' : stats.bytesIn,
+                                  'bytesDecoded' : stats.bytesDecoded, 'bytesOut' : stats.bytesOut }
+            return({ 'requests' : requests,
+                     'jobPhases' : dict([(phase, histogram.toDict()) for phase, histogram in self._jobPhases.items()]),
+                     'jobs' : dict(self._jobCounts), 'jobsInFlight' : len(self._jobs) })
+
+    '''
+    prometheusText - return the metrics in the Prometheus text exposition format
+    '''
+    def prometheusText(self):
+        snapshot = self.snapshot()
+        lines = []
+        def histogram(name, labels, values):
+            for bound, count in values['buckets']:
+                lines.append(name + "_bucket{" + labels + ",le=\"" + _formatBound(bound) + "\"} " + str(count))
+            lines.append(name + "_sum{" + labels + "} " + repr(values['sum']))
+            lines.append(name + "_count{" + labels + "} " + str(values['count']))
+
+        requests = sorted(snapshot['requests'].items())
+        lines.append("# HELP wfa_request_duration_seconds WFA REST request latency by phase")
+        lines.append("# TYPE wfa_request_duration_seconds histogram")
+        for (wfaServer, endpoint), stats in requests:
+            for phase in REQUEST_PHASES:
+                histogram("wfa_request_duration_seconds", _labels(server=wfaServer, endpoint=endpoint, phase=phase),
+                          stats['latency'][phase])
+        lines.append("# HELP wfa_requests_total WFA REST requests by response status")
+        lines.append("# TYPE wfa_requests_total counter")
+        for (wfaServer, endpoint), stats in requests:
+            for status, count in sorted(stats['statuses'].items()):
+                lines.append("wfa_requests_total{" + _labels(server=wfaServer, endpoint=endpoint,
+                                                             status=str(status or "none")) + "} " + str(count))
+        for name, key, text in (("wfa_request_retries_total", 'retries', "WFA REST requests re-issued"),
+                                ("wfa_request_bytes_sent_total", 'bytesOut', "Bytes of WFA REST request bodies"),
+                                ("wfa_request_bytes_received_total", 'bytesIn', "Bytes of WFA REST response bodies"),
+                                ("wfa_request_bytes_decoded_total", 'bytesDecoded',
+                                 "Bytes of WFA REST response bodies after content decoding")):
+            lines.append("# HELP " + name + " " + text)
+            lines.append("# TYPE " + name + " counter")
+            for (wfaServer, endpoint), stats in requests:
+                lines.append(name + "{" + _labels(server=wfaServer, endpoint=endpoint) + "} " + str(stats[key]))
+
+        lines.append("# HELP wfa_job_phase_seconds WFA job time by phase")
+        lines.append("# TYPE wfa_job_phase_seconds histogram")
+        for phase, values in sorted(snapshot['jobPhases'].items()):
+            histogram("wfa_job_phase_seconds", _labels(phase=phase), values)
+        lines.append("# HELP wfa_jobs_total Finished WFA jobs by simple status")
+        lines.append("# TYPE wfa_jobs_total counter")
+        for (wfaServer, status), count in sorted(snapshot['jobs'].items()):
+            lines.append("wfa_jobs_total{" + _labels(server=wfaServer, status=status) + "} " + str(count))
+        lines.append("# HELP wfa_jobs_in_flight WFA jobs submitted and not yet seen finished")
+        lines.append("# TYPE wfa_jobs_in_flight gauge")
+        lines.append("wfa_jobs_in_flight " + str(snapshot['jobsInFlight']))
+        return("\n".join(lines) + "\n")
+
+    def _endpointStats(self, wfaServer, endpoint):
+        stats = self._endpoints.get((wfaServer, endpoint))
+        if(stats == None):
+            stats = self._endpoints[(wfaServer, endpoint)] = _EndpointStats(self.bounds)
+        return(stats)
+
+class WfaJobLogSink(object):
+    '''
+    WfaJobLogSink - job sink writing every job summary as one JSON log line (at INFO, to the WfaMetrics logger
+    unless another logger is given)
+    '''
+
+    def __init__(self, logger=None):
+        # json is only needed once a log sink is in use, so it is not imported with the module.
+        import json
+        if(logger == None):
+            logger = _log
+        self.logger = logger
+        self._dumps = json.dumps
+        return
+
+    def __call__(self, summary):
+        self.logger.info(self._dumps(summary, sort_keys=True))
+        return
+
+'''
+endpointOf - classify a request into one of: workflow_query (?name= search), workflow_list, workflow (by UUID),
+execute, job_status, job_listing or other.
+'''
+def endpointOf(method, path):
+    query = path.find('?')
+    if(query >= 0):
+        resource = path[:query].rstrip('/')
+    else:
+        resource = path.rstrip('/')
+    if(method == "POST"):
+        if(resource.endswith('/jobs')):
+            return("execute")
+        return("other")
+    if(resource.endswith('/rest/workflows')):
+        if(query >= 0):
+            return("workflow_query")
+        return("workflow_list")
+    if(resource.endswith('/rest/workflows/jobs')):
+        return("job_listing")
+    if('/rest/workflows/jobs/' in resource):
+        return("job_status")
+    if('/rest/workflows/' in resource):
+        return("workflow")
+    return("other")
+
+def _labels(**labels):
+    return(",".join([name + "=\"" + str(value).replace('\\', '\\\\').replace('"', '\\"') + "\""
+                     for name, value in sorted(labels.items())]))
+
+def _formatBound(bound):
+    if(bound == float('inf')):
+        return("+Inf")
+    return(repr(bound))
+
+# Process wide registry used by the transport and the Wfa classes.
+metrics = WfaMetrics()
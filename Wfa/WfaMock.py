@@ -0,0 +1,441 @@
+'''
+Created on Oct 16, 2026
+
+WfaMock.py - a local stand-in for the WFA REST interface, for development and benchmarking without an appliance.
+The workflows it knows are read from the .dar exports in Workflows/, and it serves:
+    GET  /rest/workflows[?name=<name>]      workflow collection (all workflows, or the one named)
+    GET  /rest/workflows/{uuid}             workflow document
+    POST /rest/workflows/{uuid}/jobs        start a job
+    GET  /rest/workflows/jobs               jobs listing, in job ID order; takes the optional query parameters
+                                            after=<jobId> and limit=<n> (paging), workflow_name=<name> and
+                                            status=<status> (filters), since/until=<epoch seconds> (start time window)
+    GET  /rest/workflows/jobs/{jobId}       job document
+Jobs progress through their commands in real time and finish after the configured duration, either COMPLETED (with a
+value for every return parameter) or FAILED.  Every request needs an Authorization header (any credential is accepted);
+the user each request authenticated as is recorded, by request path and by job.
+GET responses carry an ETag, and a matching If-None-Match is answered with 304 Not Modified.  Responses are gzip or
+deflate encoded when the request's Accept-Encoding allows it.  Connections are kept alive, and optionally closed after
+sitting idle for a while, as the appliance's web server does.
+
+    python WfaMock.py [--port N] [--latency S] [--job-duration S] [--failure-rate F] [--error-rate F] [--no-etags]
+                      [--no-compress] [--keep-alive-timeout S]
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import argparse
+import base64
+import BaseHTTPServer
+import random
+import SocketServer
+import threading
+import time
+import urllib
+import urlparse
+import zlib
+from xml.sax.saxutils import escape, quoteattr
+
+from WfaDarIndex import DEFAULT_DAR_PATHS, readDarWorkflows
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+
+class _MockJob(object):
+    __slots__ = ('jobId', 'workflow', 'startTime', 'failed', 'returnParams')
+
+    def __init__(self, jobId, workflow, startTime, failed, returnParams):
+        self.jobId = jobId
+        self.workflow = workflow
+        self.startTime = startTime
+        self.failed = failed
+        self.returnParams = returnParams
+        return
+
+class WfaMockServer(object):
+    '''
+    WfaMockServer - a WFA REST stand-in running in a background thread.
+
+        host, port - address to listen on.  Port 0 picks a free port; wfaServer holds the resulting "host:port".
+        latency - seconds added to every response
+        jobDuration - seconds from submission until a job finishes
+        failureRate - fraction of jobs that end FAILED instead of COMPLETED
+        errorRate - fraction of requests answered with HTTP 503 (transient server errors)
+        commands - number of commands reported for every workflow
+        darPaths - .dar exports to serve the workflows of (default: Workflows/*.dar)
+        seed - random seed, for repeatable failure and error patterns
+        etags - send ETags and honour If-None-Match
+        compress - encode responses with gzip or deflate when the client accepts it
+        keepAliveTimeout - seconds a connection may wait for its next request before the server closes it (None: never)
+
+    stats holds request counters by kind ('workflow', 'execute', 'job', 'listing', 'error') plus 'requests',
+    'bytesOut' (response body bytes sent), 'bytesBody' (the same before encoding), 'compressed' (responses sent
+    encoded), 'notModified' (GETs answered with 304), 'connections' (connections accepted) and 'peakConnections' (most
+    connections open at once); resetStats clears them.
+
+    users maps each request path (with its query) to the set of users it was requested by, None standing for a request
+    without Basic credentials; jobUsers maps each job ID to the user that started the job.
+    '''
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jobDuration=1.0, failureRate=0.0, errorRate=0.0,
+                 commands=4, darPaths=None, seed=None, etags=True, compress=True, keepAliveTimeout=None):
+        self.latency = latency
+        self.jobDuration = jobDuration
+        self.failureRate = failureRate
+        self.errorRate = errorRate
+        self.commands = commands
+        self.etags = etags
+        self.compress = compress
+        self.keepAliveTimeout = keepAliveTimeout
+        self.openConnections = 0
+
+        self.workflows = {}
+        self._byUUID = {}
+        if(darPaths == None):
+            darPaths = DEFAULT_DAR_PATHS
+        for darPath in darPaths:
+            for name, uuid, inputs, returnParams in readDarWorkflows(darPath):
+                self.workflows[name] = (name, uuid, inputs, returnParams)
+                self._byUUID[uuid] = self.workflows[name]
+
+        self.jobs = {}
+        self.jobUsers = {}
+        self._nextJobId = 1
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.resetStats()
+
+        self._httpd = _MockHTTPServer((host, port), _MockHandler)
+        self._httpd.mock = self
+        self.wfaServer = host + ":" + str(self._httpd.server_address[1])
+        self._thread = None
+        return
+
+    '''
+    start - serve requests from a daemon thread.  Returns the server, so WfaMockServer(...).start() can be chained.
+    '''
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="WfaMock-" + self.wfaServer)
+        self._thread.daemon = True
+        self._thread.start()
+        return(self)
+
+    '''
+    stop - stop serving and close the listening socket
+    '''
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        return
+
+    '''
+    resetStats - zero the request counters and forget the users recorded by request path
+    '''
+    def resetStats(self):
+        with self._lock:
+            self.users = {}
+            self.stats = { 'requests' : 0, 'bytesOut' : 0, 'bytesBody' : 0, 'compressed' : 0, 'workflow' : 0,
+                           'execute' : 0, 'job' : 0, 'listing' : 0, 'error' : 0, 'notModified' : 0, 'connections' : 0,
+                           'peakConnections' : self.openConnections }
+        return
+
+    def _count(self, kind, size, notModified=False, bodySize=None):
+        if(bodySize == None):
+            bodySize = size
+        with self._lock:
+            self.stats['requests'] = self.stats['requests'] + 1
+            self.stats['bytesOut'] = self.stats['bytesOut'] + size
+            self.stats['bytesBody'] = self.stats['bytesBody'] + bodySize
+            if(bodySize != size):
+                self.stats['compressed'] = self.stats['compressed'] + 1
+            self.stats[kind] = self.stats[kind] + 1
+            if(notModified):
+                self.stats['notModified'] = self.stats['notModified'] + 1
+        return
+
+    def _authenticated(self, path, user):
+        with self._lock:
+            self.users.setdefault(path, set()).add(user)
+        return
+
+    def _connected(self, opened):
+        with self._lock:
+            if(opened):
+                self.openConnections = self.openConnections + 1
+                self.stats['connections'] = self.stats['connections'] + 1
+                self.stats['peakConnections'] = max(self.stats['peakConnections'], self.openConnections)
+            else:
+                self.openConnections = self.openConnections - 1
+        return
+
+    def _isError(self):
+        with self._lock:
+            return(self.errorRate > 0 and self._random.random() < self.errorRate)
+
+    def _newJob(self, workflow, user=None):
+        with self._lock:
+            jobId = self._nextJobId
+            self._nextJobId = jobId + 1
+            failed = self.failureRate > 0 and self._random.random() < self.failureRate
+            returnParams = tuple([(name, "mock-" + name + "-" + str(jobId)) for name in workflow[3]])
+            job = _MockJob(str(jobId), workflow, time.time(), failed, returnParams)
+            self.jobs[job.jobId] = job
+            self.jobUsers[job.jobId] = user
+        return(job)
+
+    def _workflowXml(self, workflow, withNamespace=True):
+        name, uuid, inputs, returnParams = workflow
+        parts = ["<workflow"]
+        if(withNamespace):
+            parts.append(" xmlns:atom=\"" + ATOM_NS + "\"")
+        parts.append(" uuid=" + quoteattr(uuid) + "><name>" + escape(name) + "</name><userInputList>")
+        for inputName, inputType, mandatory, allowedValues in inputs:
+            parts.append("<userInput><name>" + escape(inputName) + "</name><type>" + inputType + "</type><mandatory>" +
+                         str(mandatory).lower() + "</mandatory>")
+            if(allowedValues):
+                parts.append("<allowedValues>" + "".join(["<value>" + escape(value) + "</value>"
+                                                          for value in allowedValues]) + "</allowedValues>")
+            parts.append("</userInput>")
+        parts.append("</userInputList><returnParameters>")
+        for returnParam in returnParams:
+            parts.append("<returnParameter><name>" + escape(returnParam) + "</name></returnParameter>")
+        parts.append("</returnParameters><atom:link rel=\"execute\" href=\"http://" + self.wfaServer +
+                     "/rest/workflows/" + uuid + "/jobs\"/></workflow>")
+        return("".join(parts))
+
+    def _jobStatus(self, job, now):
+        if(now - job.startTime < self.jobDuration):
+            if(now - job.startTime < self.jobDuration / (self.commands + 1)):
+                return("SCHEDULED")
+            return("EXECUTING")
+        if(job.failed):
+            return("FAILED")
+        return("COMPLETED")
+
+    '''
+    _listing - the jobs of a listing request, in job ID order, filtered and paged by its query parameters
+    '''
+    def _listing(self, query, now):
+        with self._lock:
+            jobs = self.jobs.values()
+        jobs.sort(key=lambda job: int(job.jobId))
+        after = query.get('after')
+        if(after != None):
+            jobs = [job for job in jobs if int(job.jobId) > int(after[0])]
+        workflowNames = query.get('workflow_name')
+        if(workflowNames != None):
+            jobs = [job for job in jobs if job.workflow[0] in workflowNames]
+        statuses = query.get('status')
+        if(statuses != None):
+            jobs = [job for job in jobs if self._jobStatus(job, now) in statuses]
+        if(query.get('since') != None):
+            jobs = [job for job in jobs if job.startTime >= float(query['since'][0])]
+        if(query.get('until') != None):
+            jobs = [job for job in jobs if job.startTime < float(query['until'][0])]
+        if(query.get('limit') != None):
+            jobs = jobs[:int(query['limit'][0])]
+        return(jobs)
+
+    def _jobXml(self, job, now, withNamespace=True):
+        elapsed = now - job.startTime
+        errorMessage = ""
+        returnParams = ""
+        times = "<startTime>" + _isoTime(job.startTime) + "</startTime>"
+        status = self._jobStatus(job, now)
+        if(status == "FAILED" or status == "COMPLETED"):
+            times = times + "<endTime>" + _isoTime(job.startTime + self.jobDuration) + "</endTime>"
+            if(status == "FAILED"):
+                errorMessage = "<errorMessage>Mock failure of job " + job.jobId + "</errorMessage>"
+            else:
+                returnParams = "".join(["<returnParameters key=" + quoteattr(name) + " value=" + quoteattr(value) + "/>"
+                                        for name, value in job.returnParams])
+            commandIndex = self.commands
+        elif(status == "SCHEDULED"):
+            commandIndex = 0
+        else:
+            commandIndex = int(elapsed / self.jobDuration * (self.commands + 1))
+        namespace = ""
+        if(withNamespace):
+            namespace = " xmlns:atom=\"" + ATOM_NS + "\""
+        return("<job" + namespace + " jobId=\"" + job.jobId + "\"><workflow name=" + quoteattr(job.workflow[0]) +
+               " uuid=\"" + job.workflow[1] + "\"/><jobStatus><jobStatus>" + status + "</jobStatus>" + errorMessage + times +
+               "<workflow-execution-progress><current-command-index>" + str(commandIndex) +
+               "</current-command-index><commands-number>" + str(self.commands) +
+               "</commands-number></workflow-execution-progress><returnParameters>" + returnParams +
+               "</returnParameters></jobStatus><atom:link rel=\"self\" href=\"http://" + self.wfaServer +
+               "/rest/workflows/jobs/" + job.jobId + "\"/></job>")
+
+'''
+_acceptedEncoding - the content coding to answer an Accept-Encoding header with: gzip, deflate or None
+'''
+def _acceptedEncoding(acceptEncoding):
+    accepted = {}
+    for part in (acceptEncoding or "").split(','):
+        fields = part.strip().split(';')
+        quality = 1.0
+        for field in fields[1:]:
+            if(field.strip().startswith('q=')):
+                try:
+                    quality = float(field.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+        accepted[fields[0].strip().lower()] = quality
+    for encoding in ("gzip", "deflate"):
+        if(accepted.get(encoding, 0.0) > 0):
+            return(encoding)
+    return(None)
+
+'''
+_basicUser - the user name of a Basic Authorization header, or None if there is no (well formed) Basic credential
+'''
+def _basicUser(authorization):
+    if(authorization == None or not authorization.startswith("Basic ")):
+        return(None)
+    try:
+        credential = base64.b64decode(authorization[6:].strip())
+    except TypeError:
+        return(None)
+    return(credential.split(":", 1)[0])
+
+def _isoTime(seconds):
+    return(time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + ".%03dZ" % (int(seconds * 1000) % 1000))
+
+class _MockHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+class _MockHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Buffer each response so headers and body leave in one write (unbuffered writes stall on delayed ACKs).
+    wbufsize = -1
+
+    def log_message(self, format, *args):
+        return
+
+    def setup(self):
+        # The socket timeout bounds the wait for the next request on a kept alive connection.
+        self.timeout = self.server.mock.keepAliveTimeout
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.mock._connected(True)
+        return
+
+    def finish(self):
+        try:
+            BaseHTTPServer.BaseHTTPRequestHandler.finish(self)
+        finally:
+            self.server.mock._connected(False)
+        return
+
+    def do_GET(self):
+        self._dispatch(None)
+        return
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self._dispatch(self.rfile.read(length))
+        return
+
+    def _dispatch(self, body):
+        mock = self.server.mock
+        if(mock.latency > 0):
+            time.sleep(mock.latency)
+        user = _basicUser(self.headers.get('Authorization'))
+        mock._authenticated(self.path, user)
+        if(user == None):
+            self._reply(401, "", 'error', { 'WWW-Authenticate' : 'Basic realm="WFA"' })
+            return
+        if(mock._isError()):
+            self._reply(503, "", 'error')
+            return
+
+        url = urlparse.urlparse(self.path)
+        path = url.path.rstrip('/').split('/')[1:]
+        if(path[:2] != ['rest', 'workflows']):
+            self._reply(404, "", 'error')
+            return
+        path = path[2:]
+
+        if(body != None):
+            workflow = None
+            if(len(path) == 2 and path[1] == 'jobs'):
+                workflow = mock._byUUID.get(path[0])
+            if(workflow == None):
+                self._reply(404, "", 'error')
+                return
+            job = mock._newJob(workflow, user)
+            self._reply(201, mock._jobXml(job, job.startTime), 'execute')
+        elif(len(path) == 0):
+            names = urlparse.parse_qs(url.query).get('name')
+            if(names != None):
+                workflows = [mock.workflows[name] for name in names if name in mock.workflows]
+            else:
+                workflows = sorted(mock.workflows.values())
+            self._reply(200, "<collection xmlns:atom=\"" + ATOM_NS + "\">" +
+                        "".join([mock._workflowXml(workflow, False) for workflow in workflows]) + "</collection>",
+                        'workflow')
+        elif(path == ['jobs']):
+            now = time.time()
+            jobs = mock._listing(urlparse.parse_qs(url.query), now)
+            self._reply(200, "<collection xmlns:atom=\"" + ATOM_NS + "\">" +
+                        "".join([mock._jobXml(job, now, False) for job in jobs]) + "</collection>", 'listing')
+        elif(len(path) == 2 and path[0] == 'jobs' and path[1] in mock.jobs):
+            self._reply(200, mock._jobXml(mock.jobs[path[1]], time.time()), 'job')
+        elif(len(path) == 1 and urllib.unquote(path[0]) in mock._byUUID):
+            self._reply(200, mock._workflowXml(mock._byUUID[urllib.unquote(path[0])]), 'workflow')
+        else:
+            self._reply(404, "", 'error')
+        return
+
+    def _reply(self, status, body, kind, headers=None):
+        mock = self.server.mock
+        if(status == 200 and mock.etags and self.command == 'GET'):
+            etag = '"%08x"' % (zlib.crc32(body) & 0xffffffff)
+            headers = dict(headers or {}, ETag=etag)
+            if(self.headers.get('If-None-Match') == etag):
+                status = 304
+                body = ""
+        bodySize = len(body)
+        encoding = None
+        if(mock.compress and body != ""):
+            encoding = _acceptedEncoding(self.headers.get('Accept-Encoding'))
+            if(encoding == "gzip"):
+                encoder = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+                body = encoder.compress(body) + encoder.flush()
+            elif(encoding == "deflate"):
+                body = zlib.compress(body, 6)
+        mock._count(kind, len(body), status == 304, bodySize)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/xml')
+        if(mock.compress):
+            self.send_header('Vary', 'Accept-Encoding')
+        if(encoding != None):
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(body)))
+        if(headers != None):
+            for name in headers:
+                self.send_header(name, headers[name])
+        self.end_headers()
+        self.wfile.write(body)
+        return
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local WFA REST stand-in")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--job-duration', type=float, default=1.0, help="seconds until a job finishes")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="fraction of jobs that fail")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with HTTP 503")
+    parser.add_argument('--no-etags', action='store_true', help="send no ETags and never answer 304")
+    parser.add_argument('--no-compress', action='store_true', help="never gzip/deflate encode responses")
+    parser.add_argument('--keep-alive-timeout', type=float, help="seconds before an idle connection is closed")
+    args = parser.parse_args()
+
+    mock = WfaMockServer(args.host, args.port, args.latency, args.job_duration, args.failure_rate, args.error_rate,
+                         etags=not args.no_etags, compress=not args.no_compress,
+                         keepAliveTimeout=args.keep_alive_timeout)
+    print "WFA mock serving " + ", ".join(sorted(mock.workflows.keys())) + " on " + mock.wfaServer
+    try:
+        mock._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -30,17 +30,12 @@ shareSize = 10
 shareProto = 'nfs'
 wfa = WfaOs(myWfaDict)
 
-for param in wfa.wfaDict['wfaParamMap']:
-    wfa.wfaDict['wfaParamMap'][param] = eval(wfa.wfaDict['wfaParamMap'][param]) 
-
-wfa.appendExtraSpec()
+# Bind the OpenStack values (and the extra specs) to the workflow parameters of the operation.
+wfa.bindParams({ 'shareName' : shareName, 'shareSize' : shareSize, 'shareProto' : shareProto })
 
 # How to get the workflow parameters that are possible...
-# We get the raw XML here...
-wfaXml = wfa.getRestResponse(wfa.workflowQueryURI)
-
-# Then use it to get both sets of information.
-wfa.printWorkflowInputList(wfaXml)
-wfa.printWorkflowOutputList(wfaXml)
+# The workflow definition is queried once and cached, so setupWorkflow below does not query it again.
+wfa.printWorkflowInputList()
+wfa.printWorkflowOutputList()
 
 
@@ -0,0 +1,255 @@
+'''
+Created on Oct 16, 2026
+
+WfaParse.py - streaming parsers for WFA REST responses.
+Rather than reading a whole response into a string and building a full ElementTree, the parsers here consume the
+response incrementally (iterparse), pick out only the fields the client uses and clear every element as soon as it
+has been looked at.  They return compact records instead of trees.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+ATOM_LINK = '{http://www.w3.org/2005/Atom}link'
+
+class WfaJobRecord(object):
+    '''
+    WfaJobRecord - the fields of a WFA <job> document used by the client.
+        jobId - WFA assigned job identifier
+        jobStatus - raw WFA job status (e.g. EXECUTING, COMPLETED)
+        errorMessage - error text, or None
+        currentCommandIndex - index of the executing command (int), or None if not reported
+        commandsNumber - number of commands in the workflow (int), or None if not reported
+        returnParams - tuple of (name, value) pairs
+        links - dictionary of atom link rel -> href (e.g. 'self')
+        workflowName, workflowUUID - the workflow the job runs, if reported
+        startTime, endTime - start and end time of the job as WFA reports them (text), or None
+    '''
+    __slots__ = ('jobId', 'jobStatus', 'errorMessage', 'currentCommandIndex', 'commandsNumber', 'returnParams', 'links',
+                 'workflowName', 'workflowUUID', 'startTime', 'endTime')
+
+    def __init__(self, jobId=None):
+        self.jobId = jobId
+        self.jobStatus = None
+        self.errorMessage = None
+        self.currentCommandIndex = None
+        self.commandsNumber = None
+        self.returnParams = ()
+        self.links = {}
+        self.workflowName = None
+        self.workflowUUID = None
+        self.startTime = None
+        self.endTime = None
+        return
+
+class WfaUserInput(object):
+    '''
+    WfaUserInput - a single entry of a workflow's userInputList.
+        name - WFA parameter name
+        type - WFA data type (String, Number, Boolean, Enum, Table...)
+        mandatory - True if WFA requires a value
+        allowedValues - tuple of permitted values (Enum inputs), otherwise an empty tuple
+    '''
+    __slots__ = ('name', 'type', 'mandatory', 'allowedValues')
+
+    def __init__(self, name, type, mandatory, allowedValues=()):
+        self.name = name
+        self.type = type
+        self.mandatory = mandatory
+        self.allowedValues = allowedValues
+        return
+
+class WfaWorkflowDef(object):
+    '''
+    WfaWorkflowDef - the parsed, immutable facts about a workflow that are needed to execute it.
+        name - the human readable workflow name
+        uuid - WFA assigned workflow UUID
+        executeLink - URI the workflow input is POSTed to
+        inputs - tuple of WfaUserInput, in the order WFA lists them
+        returnParams - tuple of return parameter names
+        etag/lastModified - validators returned with the definition, used for revalidation
+        serializer - the compiled input serializer, created on first use (see WfaSerializer.getSerializer)
+    '''
+    __slots__ = ('name', 'uuid', 'executeLink', 'inputs', 'returnParams', 'etag', 'lastModified', 'serializer')
+
+    def __init__(self, name, uuid, executeLink, inputs, returnParams, etag=None, lastModified=None):
+        self.name = name
+        self.uuid = uuid
+        self.executeLink = executeLink
+        self.inputs = inputs
+        self.returnParams = returnParams
+        self.etag = etag
+        self.lastModified = lastModified
+        self.serializer = None
+        return
+
+'''
+readResponse - run parser over a pooled response and make sure the response is fully consumed afterwards, so that
+its connection goes back to the pool.  If the parser fails the connection is discarded.
+'''
+def readResponse(response, parser):
+    try:
+        result = parser(response)
+        response.read()
+    finally:
+        response.close()
+    return(result)
+
+'''
+iterJobRecords - yield a WfaJobRecord for every <job> element in stream, which may hold a single job document or a
+<collection> of them (the jobs listing).
+'''
+def iterJobRecords(stream):
+    path = []
+    root = None
+    record = None
+    returnParams = None
+
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if(event == 'start'):
+            if(root == None):
+                root = elem
+            path.append(elem.tag)
+            if(elem.tag == 'job' and record == None):
+                record = WfaJobRecord(elem.get('jobId'))
+                returnParams = []
+            continue
+
+        tag = path.pop()
+        if(record == None):
+            continue
+        parent = None
+        if(len(path) > 0):
+            parent = path[-1]
+
+        if(parent == 'jobStatus'):
+            if(tag == 'jobStatus'):
+                record.jobStatus = elem.text
+            elif(tag == 'errorMessage'):
+                record.errorMessage = elem.text
+            elif(tag == 'startTime'):
+                record.startTime = elem.text
+            elif(tag == 'endTime'):
+                record.endTime = elem.text
+        elif(parent == 'workflow-execution-progress'):
+            if(tag == 'current-command-index'):
+                record.currentCommandIndex = _toInt(elem.text)
+            elif(tag == 'commands-number'):
+                record.commandsNumber = _toInt(elem.text)
+        elif(parent == 'returnParameters' and tag == 'returnParameters'):
+            if(elem.get('key') != None):
+                returnParams.append((elem.get('key'), elem.get('value')))
+        elif(parent == 'job' and tag == ATOM_LINK):
+            record.links[elem.get('rel')] = elem.get('href')
+        elif(parent == 'job' and tag == 'workflow'):
+            record.workflowName = elem.get('name')
+            record.workflowUUID = elem.get('uuid')
+
+        if(tag == 'job'):
+            record.returnParams = tuple(returnParams)
+            yield record
+            record = None
+            returnParams = None
+            # Drop everything parsed so far - the record holds all we need.
+            root.clear()
+        else:
+            elem.clear()
+    return
+
+'''
+parseJobStream - return the WfaJobRecord of a single job document
+'''
+def parseJobStream(stream):
+    for record in iterJobRecords(stream):
+        return(record)
+    raise Exception("No job in WFA response")
+
+'''
+parseWorkflowStream - build a WfaWorkflowDef from a workflow query response.  The stream may hold the <collection>
+returned by a ?name= query (the first workflow is used) or a single <workflow> document.
+'''
+def parseWorkflowStream(stream, etag=None, lastModified=None):
+    path = []
+    found = False
+    name = None
+    uuid = None
+    executeLink = None
+    inputs = []
+    returnParams = []
+    inputFields = None
+    allowedValues = None
+
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if(event == 'start'):
+            path.append(elem.tag)
+            if(elem.tag == 'workflow' and not found):
+                found = True
+                uuid = elem.get('uuid')
+            elif(elem.tag == 'userInput'):
+                inputFields = {}
+                allowedValues = []
+            continue
+
+        tag = path.pop()
+        parent = None
+        if(len(path) > 0):
+            parent = path[-1]
+
+        if(parent == 'userInput'):
+            if(tag in ('name', 'type', 'mandatory')):
+                inputFields[tag] = elem.text
+        elif(parent == 'allowedValues' and tag == 'value'):
+            allowedValues.append(elem.text)
+        elif(tag == 'userInput'):
+            mandatory = inputFields.get('mandatory')
+            inputs.append(WfaUserInput(inputFields.get('name'), inputFields.get('type'),
+                                       mandatory != None and mandatory.lower() == 'true', tuple(allowedValues)))
+        elif(parent == 'returnParameter' and tag == 'name'):
+            returnParams.append(elem.text)
+        elif(parent == 'workflow'):
+            if(tag == 'name'):
+                name = elem.text
+            elif(tag == ATOM_LINK and elem.get('rel') == 'execute'):
+                executeLink = elem.get('href')
+
+        if(tag == 'workflow'):
+            break
+        elem.clear()
+
+    if(not found):
+        raise Exception("Workflow not found")
+    return(WfaWorkflowDef(name, uuid, executeLink, tuple(inputs), tuple(returnParams), etag, lastModified))
+
+'''
+parseWorkflowDef - build a WfaWorkflowDef from an already parsed workflow query (an ElementTree element, e.g. the
+result of Wfa.getRestResponse).
+'''
+def parseWorkflowDef(wfaXml, etag=None, lastModified=None):
+    return(parseWorkflowStream(_TreeStream(wfaXml), etag, lastModified))
+
+def _toInt(text):
+    if(text == None):
+        return(None)
+    try:
+        return(int(text))
+    except ValueError:
+        return(None)
+
+class _TreeStream(object):
+    '''
+    _TreeStream - present an element as a readable stream so that trees and responses share one parser.
+    '''
+    def __init__(self, elem):
+        self._data = ET.tostring(elem)
+    def read(self, amt=None):
+        data = self._data
+        if(amt == None):
+            self._data = ""
+            return(data)
+        self._data = data[amt:]
+        return(data[:amt])
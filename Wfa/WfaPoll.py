@@ -0,0 +1,116 @@
+'''
+Created on Oct 16, 2026
+
+WfaPoll.py - change aware job status polling.
+A job document only changes when the job moves on, yet a naive poll fetches and parses all of it every time.  Polls
+made through pollJob are conditional (If-None-Match/If-Modified-Since) when WFA has returned an ETag or Last-Modified
+for the job, and a body that comes back identical to the last one (same length and CRC) is not parsed again - the
+job document is small, so it is read whole for the comparison rather than streamed into the parser.  The
+WfaPollState of the job also follows its progress - the time between changes of the current command index - so that
+callers can poll long running jobs less often (see WfaPollState.interval).
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import time
+import zlib
+from cStringIO import StringIO
+
+from WfaParse import parseJobStream
+
+# Weight of the newest observation in the running estimate of the time a command takes.
+COMMAND_TIME_WEIGHT = 0.5
+
+class WfaPollState(object):
+    '''
+    WfaPollState - what is known about a job between polls.
+        etag, lastModified - validators of the last job document, sent back on the next poll
+        fingerprint - (length, CRC32) of the last job document body
+        commandIndex, progressTime - the last current command index seen and when it was first seen
+        commandTime - running estimate of the seconds one command takes, None until the index has moved twice
+        notModified, unchanged - polls answered with 304, and polls whose body matched the fingerprint
+    '''
+    __slots__ = ('etag', 'lastModified', 'fingerprint', 'commandIndex', 'progressTime', 'commandTime', 'notModified',
+                 'unchanged')
+
+    def __init__(self):
+        self.etag = None
+        self.lastModified = None
+        self.fingerprint = None
+        self.commandIndex = None
+        self.progressTime = None
+        self.commandTime = None
+        self.notModified = 0
+        self.unchanged = 0
+        return
+
+    '''
+    requestHeaders - the conditional request headers for the next poll, or None if there are no validators
+    '''
+    def requestHeaders(self):
+        if(self.etag == None and self.lastModified == None):
+            return(None)
+        headers = {}
+        if(self.etag != None):
+            headers['If-None-Match'] = self.etag
+        if(self.lastModified != None):
+            headers['If-Modified-Since'] = self.lastModified
+        return(headers)
+
+    '''
+    observeProgress - account for the current command index of a fresh job document
+    '''
+    def observeProgress(self, commandIndex, now=None):
+        if(commandIndex == None or commandIndex == self.commandIndex):
+            return
+        if(now == None):
+            now = time.time()
+        commandIndex = int(commandIndex)
+        if(self.commandIndex != None and self.progressTime != None and commandIndex > self.commandIndex):
+            seconds = (now - self.progressTime) / (commandIndex - self.commandIndex)
+            if(self.commandTime == None):
+                self.commandTime = seconds
+            else:
+                self.commandTime = COMMAND_TIME_WEIGHT * seconds + (1 - COMMAND_TIME_WEIGHT) * self.commandTime
+        self.commandIndex = commandIndex
+        self.progressTime = now
+        return
+
+    '''
+    interval - seconds until the job is worth polling again, given the observed command rate: half the time a command
+    takes, bounded by minInterval and maxInterval.  None while there is no estimate yet.
+    '''
+    def interval(self, minInterval, maxInterval):
+        if(self.commandTime == None):
+            return(None)
+        return(max(minInterval, min(self.commandTime / 2, maxInterval)))
+
+'''
+pollJob - GET a job document through session and return its WfaJobRecord, or None if the job has not changed since
+the last poll made with pollState.  As with WfaSession.urlopen, jobDict (if given) collects the retry counters.
+
+Unlike the jobs listing, which grows with the number of jobs and is only ever parsed as a stream, a job document is
+read whole before it is parsed: it is a kilobyte or so, and having the body lets an unchanged one be recognised by its
+length and CRC32 and not parsed at all.
+'''
+def pollJob(session, jobSelfLink, pollState, jobDict=None):
+    response = session.urlopen(jobSelfLink, None, pollState.requestHeaders(), jobDict)
+    try:
+        body = response.read()
+    finally:
+        response.close()
+    if(response.status == 304):
+        pollState.notModified = pollState.notModified + 1
+        return(None)
+
+    pollState.etag = response.getheader('ETag')
+    pollState.lastModified = response.getheader('Last-Modified')
+    fingerprint = (len(body), zlib.crc32(body))
+    if(fingerprint == pollState.fingerprint):
+        pollState.unchanged = pollState.unchanged + 1
+        return(None)
+    record = parseJobStream(StringIO(body))
+    pollState.fingerprint = fingerprint
+    pollState.observeProgress(record.currentCommandIndex)
+    return(record)
@@ -0,0 +1,188 @@
+'''
+Created on Oct 16, 2026
+
+WfaResilience.py - timeouts, retries and circuit breaking for WFA REST requests.
+Every request made through a WfaSession is bounded by a connect and a read timeout.  Requests that are safe to
+repeat (GETs) are retried with exponential backoff on connection errors, timeouts and 502/503/504 responses; a POST
+- which starts a job - is never re-sent once it has reached the server.  A circuit breaker per server stops requests
+from being sent at all while WFA is down, and lets a single probe through from time to time to find out whether it
+is back.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import httplib
+import random
+import socket
+import threading
+import time
+import urllib2
+
+# Defaults used when the wfaDict does not specify them - see WfaRequestPolicy and WfaCircuitBreaker.
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 120.0
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_RETRY_MAX_BACKOFF = 8.0
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET = 30.0
+
+# Responses that mean the server (or a proxy in front of it) is temporarily unable to answer.
+RETRY_STATUS = (502, 503, 504)
+
+# Circuit breaker states
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+class WfaCircuitOpenError(urllib2.URLError):
+    '''
+    WfaCircuitOpenError - raised instead of sending a request while the circuit breaker of its server is open
+    '''
+
+    def __init__(self, wfaServer, retryAfter):
+        urllib2.URLError.__init__(self, "WFA server " + wfaServer + " is unavailable (circuit open, next probe in " +
+                                  "%.1f" % retryAfter + "s)")
+        self.wfaServer = wfaServer
+        self.retryAfter = retryAfter
+        return
+
+class WfaRequestPolicy(object):
+    '''
+    WfaRequestPolicy - how the requests of a session are bounded and retried.
+        connectTimeout - seconds allowed to establish a connection
+        readTimeout - seconds allowed for each wait on the server (the response headers, each read of the body)
+        retries - number of times a GET is re-issued after a transient failure
+        backoff - seconds before the first retry, doubled for every further retry (with +/-20% jitter)
+        maxBackoff - upper bound of the delay between retries
+        compress - ask the server for gzip/deflate encoded responses (decoded by the transport as they are read)
+    '''
+    __slots__ = ('connectTimeout', 'readTimeout', 'retries', 'backoff', 'maxBackoff', 'compress')
+
+    def __init__(self, connectTimeout=DEFAULT_CONNECT_TIMEOUT, readTimeout=DEFAULT_READ_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_RETRY_BACKOFF, maxBackoff=DEFAULT_RETRY_MAX_BACKOFF, compress=True):
+        self.connectTimeout = connectTimeout
+        self.readTimeout = readTimeout
+        self.retries = retries
+        self.backoff = backoff
+        self.maxBackoff = maxBackoff
+        self.compress = compress
+        return
+
+    '''
+    delay - seconds to wait before retry number attempt (starting at 0)
+    '''
+    def delay(self, attempt):
+        return(min(self.backoff * (2 ** attempt), self.maxBackoff) * random.uniform(0.8, 1.2))
+
+class WfaCircuitBreaker(object):
+    '''
+    WfaCircuitBreaker - fail fast while a WFA server is down.
+
+    The breaker is CLOSED while requests succeed.  After threshold consecutive failures (connection errors, timeouts
+    and 502/503/504 responses - any other response shows the server is up) it OPENs and every request is refused
+    with WfaCircuitOpenError for resetTimeout seconds.  It then goes HALF_OPEN and lets one request through as a
+    probe: if that succeeds the breaker closes again, otherwise it re-opens for another resetTimeout.
+    '''
+
+    def __init__(self, wfaServer, threshold=DEFAULT_BREAKER_THRESHOLD, resetTimeout=DEFAULT_BREAKER_RESET):
+        self.wfaServer = wfaServer
+        self.threshold = threshold
+        self.resetTimeout = resetTimeout
+        self.state = CLOSED
+        self.failures = 0
+        self.openedAt = None
+        self._probing = False
+        self._lock = threading.Lock()
+        return
+
+    '''
+    allow - return if a request may be sent now, otherwise raise WfaCircuitOpenError
+    '''
+    def allow(self):
+        with self._lock:
+            if(self.state == CLOSED):
+                return
+            now = time.time()
+            if(self.state == OPEN and now - self.openedAt >= self.resetTimeout):
+                self.state = HALF_OPEN
+            if(self.state == HALF_OPEN and not self._probing):
+                self._probing = True
+                return
+            raise WfaCircuitOpenError(self.wfaServer, max(0.0, self.resetTimeout - (now - self.openedAt)))
+
+    '''
+    success - record a request that reached a working server
+    '''
+    def success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+        return
+
+    '''
+    failure - record a request that failed because of the server or the network
+    '''
+    def failure(self):
+        with self._lock:
+            self.failures = self.failures + 1
+            if(self.state == HALF_OPEN or self.failures >= self.threshold):
+                self.state = OPEN
+                self.openedAt = time.time()
+            self._probing = False
+        return
+
+'''
+isTransient - True if exception is a failure worth retrying (and counted by the circuit breaker).  Other HTTP errors
+- including the 500 WFA answers bad input with - come from a working server and would only fail again.
+'''
+def isTransient(exception):
+    if(isinstance(exception, urllib2.HTTPError)):
+        return(exception.code in RETRY_STATUS)
+    return(isinstance(exception, (socket.error, httplib.HTTPException)) and
+           not isinstance(exception, WfaCircuitOpenError))
+
+'''
+isTimeout - True if exception is a connect or read timeout
+'''
+def isTimeout(exception):
+    return(isinstance(exception, socket.timeout))
+
+'''
+policyFromDict - build the request policy described by the wfaDict keys wfaConnectTimeout, wfaReadTimeout,
+wfaRetries, wfaRetryBackoff, wfaRetryMaxBackoff and wfaCompress (see the Wfa class documentation)
+'''
+def policyFromDict(wfaDict):
+    def setting(key, default):
+        value = wfaDict.get(key)
+        if(value == None):
+            return(default)
+        return(value)
+    return(WfaRequestPolicy(setting('wfaConnectTimeout', DEFAULT_CONNECT_TIMEOUT),
+                            setting('wfaReadTimeout', DEFAULT_READ_TIMEOUT),
+                            setting('wfaRetries', DEFAULT_RETRIES),
+                            setting('wfaRetryBackoff', DEFAULT_RETRY_BACKOFF),
+                            setting('wfaRetryMaxBackoff', DEFAULT_RETRY_MAX_BACKOFF),
+                            setting('wfaCompress', True)))
+
+# Process wide registry of circuit breakers, one per WFA server.
+_breakerRegistry = {}
+_breakerRegistryLock = threading.Lock()
+
+'''
+getCircuitBreaker - return the circuit breaker of wfaServer, creating it on first use.  The settings only take effect
+when the breaker is created.
+'''
+def getCircuitBreaker(wfaServer, threshold=None, resetTimeout=None):
+    with _breakerRegistryLock:
+        breaker = _breakerRegistry.get(wfaServer)
+        if(breaker == None):
+            if(threshold == None):
+                threshold = DEFAULT_BREAKER_THRESHOLD
+            if(resetTimeout == None):
+                resetTimeout = DEFAULT_BREAKER_RESET
+            breaker = WfaCircuitBreaker(wfaServer, threshold, resetTimeout)
+            _breakerRegistry[wfaServer] = breaker
+        return(breaker)
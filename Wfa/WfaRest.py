@@ -14,8 +14,6 @@ if __name__ == '__main__':
 
 # Import the class (obviously)
 from Wfa import Wfa
-from time import sleep
-cycleTime = 5
 
 # Map wfa parameters to internal variables...
 wfaParamMap = {
@@ -45,12 +43,9 @@ for paramKey in wfaParamMap:
 wfa = Wfa(wfaServer = "cyberman", workflowName = "Create an NFS Volume", wfaUser = "admin", wfaPw = "sp1Tfir3", wfaParamMap = newWfaParamMap)
 
 # How to get the workflow parameters that are possible...
-# We get the raw XML here...
-wfaXml = wfa.getRestResponse(wfa.workflowQueryURI)
-
-# Then use it to get both sets of information.
-wfa.printWorkflowInputList(wfaXml)
-wfa.printWorkflowOutputList(wfaXml)
+# The workflow definition is queried once and cached, so setupWorkflow below does not query it again.
+wfa.printWorkflowInputList()
+wfa.printWorkflowOutputList()
 
 # How to execute a workflow.
 # Old form - still valid
@@ -58,15 +53,14 @@ wfa.printWorkflowOutputList(wfaXml)
 wfa.setupWorkflow()
 wfa.executeWorkflow()
 
-# Get the initial status (simple status)
-wfaStatus = wfa.getSimpleJobStatus()
-
-# This simply shows how you can query the job status until completion (and even after...)
-# We use the job dictionary to get the job ID from WFA of this instance.
-while(wfaStatus == "OK"):
-    wfaStatus = wfa.getSimpleJobStatus()
+# This simply shows how you can wait on the job status until completion.  The callback is run after every
+# poll - we use the job dictionary to get the job ID from WFA of this instance.
+def printStatus(wfa, wfaStatus):
     print "Current status for job " + wfa.jobDict['jobId'] + ": " + wfaStatus
-    sleep(cycleTime)
+
+wfaStatus = wfa.waitForCompletion(callback = printStatus)
+print "Job " + wfa.jobDict['jobId'] + " took " + str(wfa.jobDict['pollCount']) + " polls over " + \
+    str(round(wfa.jobDict['waitTime'], 1)) + " seconds"
 
 # An example of handling success/failure.
 if(wfaStatus == 'FAILED'):
@@ -0,0 +1,230 @@
+'''
+Created on Oct 16, 2026
+
+WfaSchedule.py - client side admission control of WFA job submissions.
+Submitting every job the moment it is asked for just moves the queue into WFA, where an urgent deny_ip waits behind
+hundreds of bulk jobs.  With scheduling enabled (see the wfaSchedule key of the Wfa class) a job is only submitted
+once the WfaScheduler of its server admits it: at most limit jobs of a server are in flight (submitted and not yet
+finished), and waiting submissions are admitted by priority class, round robin across tenants within a class.
+
+The limit adjusts itself AIMD style.  It starts at the maximum, so a healthy server is not throttled at all, and
+halves when a submission fails, a job cannot be followed, or a job takes more than LATENCY_TOLERANCE times the usual
+latency of its workflow - at most once per generation of admitted jobs, so one slow burst does not collapse it.  It
+grows back by 1/limit for every job that finishes in good time (about one per limit jobs).
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import collections
+import threading
+import time
+
+from WfaConcurrent import WfaTimeoutError
+from WfaMetrics import WfaHistogram
+
+# Priority classes, most urgent first.
+PRIORITY_URGENT = 0
+PRIORITY_HIGH = 1
+PRIORITY_NORMAL = 2
+PRIORITY_BULK = 3
+PRIORITY_NAMES = ('urgent', 'high', 'normal', 'bulk')
+
+DEFAULT_MAX_LIMIT = 64
+MIN_LIMIT = 1
+DECREASE_FACTOR = 0.5
+
+# A job slower than this multiple of its workflow's usual latency signals that WFA is congested.
+LATENCY_TOLERANCE = 2.0
+# Weights of a new latency sample in the usual latency of a workflow: below it (quickly) and above it (slowly).
+BASELINE_DOWN_WEIGHT = 0.5
+BASELINE_UP_WEIGHT = 0.05
+
+# A waiting submission moves up one priority class for every AGING_INTERVAL seconds it has waited, so bulk work is
+# delayed but never starved.
+AGING_INTERVAL = 30.0
+
+class WfaTicket(object):
+    '''
+    WfaTicket - the admission of one job submission.
+        priority, tenant, key - as passed to WfaScheduler.acquire (key names the workflow)
+        queuedAt, admittedAt - when the submission asked for admission and when it was admitted
+        released - True once the ticket has been handed back
+    '''
+    __slots__ = ('priority', 'tenant', 'key', 'queuedAt', 'admittedAt', 'released', '_event', '_scheduler')
+
+    def __init__(self, scheduler, priority, tenant, key):
+        self._scheduler = scheduler
+        self.priority = priority
+        self.tenant = tenant
+        self.key = key
+        self.queuedAt = time.time()
+        self.admittedAt = None
+        self.released = False
+        self._event = None
+        return
+
+    '''
+    release - hand the ticket back: ok is False if the submission failed.  Only the first release counts.
+    '''
+    def release(self, ok=True):
+        self._scheduler.release(self, ok)
+        return
+
+class WfaScheduler(object):
+    '''
+    WfaScheduler - the admission queue of one WFA server (see getScheduler).
+
+        acquire(priority, tenant, key, timeout=None) - wait to be admitted and return a WfaTicket; raises
+                                                       WfaTimeoutError if not admitted within timeout seconds
+        release(ticket, ok) - a job finished (or could not be submitted)
+        stats() - the current limit, jobs in flight, queue depths, and admission wait times per priority class
+    '''
+
+    def __init__(self, wfaServer, initialLimit=None, maxLimit=DEFAULT_MAX_LIMIT):
+        self.wfaServer = wfaServer
+        self.maxLimit = max(MIN_LIMIT, maxLimit)
+        if(initialLimit == None):
+            initialLimit = self.maxLimit
+        self.limit = float(max(MIN_LIMIT, min(initialLimit, self.maxLimit)))
+        self.inFlight = 0
+        self._lock = threading.Lock()
+        # Per priority class: tenant -> waiting tickets, and the tenants with waiting tickets in round robin order.
+        self._waiting = [{} for name in PRIORITY_NAMES]
+        self._turns = [collections.deque() for name in PRIORITY_NAMES]
+        self._queued = 0
+        self._baselines = {}
+        self._decreasedAt = 0.0
+        self._waitTimes = [WfaHistogram() for name in PRIORITY_NAMES]
+        self._counts = { 'admitted' : 0, 'timeouts' : 0, 'increases' : 0, 'decreases' : 0 }
+        return
+
+    def acquire(self, priority, tenant, key=None, timeout=None):
+        priority = max(0, min(priority, len(PRIORITY_NAMES) - 1))
+        ticket = WfaTicket(self, priority, tenant, key)
+        with self._lock:
+            if(self._queued == 0 and self.inFlight < int(self.limit)):
+                self._admit(ticket, ticket.queuedAt)
+                return(ticket)
+            ticket._event = threading.Event()
+            waiting = self._waiting[priority].get(tenant)
+            if(waiting == None):
+                waiting = collections.deque()
+                self._waiting[priority][tenant] = waiting
+                self._turns[priority].append(tenant)
+            waiting.append(ticket)
+            self._queued = self._queued + 1
+        if(ticket._event.wait(timeout)):
+            return(ticket)
+        with self._lock:
+            if(ticket.admittedAt != None):
+                return(ticket)
+            self._remove(ticket)
+            self._counts['timeouts'] = self._counts['timeouts'] + 1
+        raise WfaTimeoutError("Timed out waiting for admission to " + self.wfaServer)
+
+    def release(self, ticket, ok=True):
+        now = time.time()
+        with self._lock:
+            if(ticket.released or ticket.admittedAt == None):
+                return
+            ticket.released = True
+            self.inFlight = self.inFlight - 1
+            latency = now - ticket.admittedAt
+            baseline = self._baselines.get(ticket.key)
+            congested = not ok or (baseline != None and latency > baseline * LATENCY_TOLERANCE)
+            if(ok):
+                if(baseline == None):
+                    baseline = latency
+                elif(latency < baseline):
+                    baseline = BASELINE_DOWN_WEIGHT * latency + (1 - BASELINE_DOWN_WEIGHT) * baseline
+                else:
+                    baseline = BASELINE_UP_WEIGHT * latency + (1 - BASELINE_UP_WEIGHT) * baseline
+                self._baselines[ticket.key] = baseline
+            if(congested):
+                # Only jobs admitted since the last decrease reflect the current limit.
+                if(ticket.admittedAt > self._decreasedAt):
+                    self.limit = max(MIN_LIMIT, self.limit * DECREASE_FACTOR)
+                    self._decreasedAt = now
+                    self._counts['decreases'] = self._counts['decreases'] + 1
+            elif(self.limit < self.maxLimit):
+                self.limit = min(self.maxLimit, self.limit + 1.0 / self.limit)
+                self._counts['increases'] = self._counts['increases'] + 1
+            self._dispatch(now)
+        return
+
+    def stats(self):
+        with self._lock:
+            queued = {}
+            waitTime = {}
+            for priority in range(len(PRIORITY_NAMES)):
+                queued[PRIORITY_NAMES[priority]] = sum([len(waiting) for waiting in self._waiting[priority].values()])
+                waitTime[PRIORITY_NAMES[priority]] = self._waitTimes[priority].toDict()
+            stats = { 'limit' : self.limit, 'inFlight' : self.inFlight, 'queued' : queued, 'waitTime' : waitTime }
+            stats.update(self._counts)
+            return(stats)
+
+    def _admit(self, ticket, now):
+        ticket.admittedAt = now
+        self.inFlight = self.inFlight + 1
+        self._counts['admitted'] = self._counts['admitted'] + 1
+        self._waitTimes[ticket.priority].observe(now - ticket.queuedAt)
+        return
+
+    def _dispatch(self, now):
+        while(self._queued > 0 and self.inFlight < int(self.limit)):
+            priority = self._nextClass(now)
+            turns = self._turns[priority]
+            tenant = turns.popleft()
+            waiting = self._waiting[priority][tenant]
+            ticket = waiting.popleft()
+            if(len(waiting) > 0):
+                turns.append(tenant)
+            else:
+                del self._waiting[priority][tenant]
+            self._queued = self._queued - 1
+            self._admit(ticket, now)
+            ticket._event.set()
+        return
+
+    def _nextClass(self, now):
+        # The class whose next ticket has the best priority once aged.
+        best = None
+        bestPriority = None
+        for priority in range(len(PRIORITY_NAMES)):
+            turns = self._turns[priority]
+            if(len(turns) == 0):
+                continue
+            ticket = self._waiting[priority][turns[0]][0]
+            aged = priority - int((now - ticket.queuedAt) / AGING_INTERVAL)
+            if(best == None or aged < bestPriority):
+                best = priority
+                bestPriority = aged
+        return(best)
+
+    def _remove(self, ticket):
+        waiting = self._waiting[ticket.priority].get(ticket.tenant)
+        waiting.remove(ticket)
+        if(len(waiting) == 0):
+            del self._waiting[ticket.priority][ticket.tenant]
+            self._turns[ticket.priority].remove(ticket.tenant)
+        self._queued = self._queued - 1
+        return
+
+# Process wide registry of schedulers, one per WFA server.
+_schedulerRegistry = {}
+_schedulerRegistryLock = threading.Lock()
+
+'''
+getScheduler - return the scheduler of wfaServer, creating it on first use.  The limit starts at maxLimit unless an
+initialLimit is given; both only take effect when the scheduler is created.
+'''
+def getScheduler(wfaServer, initialLimit=None, maxLimit=None):
+    with _schedulerRegistryLock:
+        scheduler = _schedulerRegistry.get(wfaServer)
+        if(scheduler == None):
+            if(maxLimit == None):
+                maxLimit = DEFAULT_MAX_LIMIT
+            scheduler = WfaScheduler(wfaServer, initialLimit, maxLimit)
+            _schedulerRegistry[wfaServer] = scheduler
+        return(scheduler)
@@ -0,0 +1,148 @@
+'''
+Created on Oct 16, 2026
+
+WfaSerializer.py - precompiled serializers for workflow input XML.
+A workflow's input schema is compiled once into a WfaInputSerializer, which knows the order, WFA type and allowed
+values of every input, validates Enum and Boolean values before anything is sent to WFA, escapes every value and
+produces the submission XML in a single join.  Escaping a value that holds nothing to escape (as nearly every value,
+and every large Table, does) costs a scan of it but no copy.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import re
+
+# The workflow input document.  The user input entries replace the --vk-- token.
+INPUT_XML_TEMPLATE = """\
+<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+    <workflowInput>
+        <userInputValues>--vk--
+        </userInputValues>
+    </workflowInput>
+"""
+
+# Characters escaped in attribute values, and the longest value checked for them with the expression - see _escapeAttr
+_ESCAPED = re.compile('[&<>"\n\r\t]')
+_searchEscaped = _ESCAPED.search
+_SEARCH_LIMIT = 128
+
+# Input kinds, derived from the WFA type name
+STRING = 0
+BOOLEAN = 1
+ENUM = 2
+TABLE = 3
+
+class WfaInputError(ValueError):
+    '''
+    WfaInputError - raised when a parameter value is not acceptable for its WFA input type
+    '''
+    pass
+
+class WfaInputSerializer(object):
+    '''
+    WfaInputSerializer - the compiled form of a workflow's input schema (WfaWorkflowDef.inputs).
+
+    serialize(wfaParamMap) returns the workflow input XML, with one entry per workflow input in the order WFA lists
+    them.  As before, every workflow input must have a key in the map (a missing key raises KeyError), inputs mapped
+    to None are left out and map keys unknown to the workflow are ignored.  Values are converted as follows:
+        String, Number and other types - str() of the value
+        Boolean - True/False or 'true'/'false' (any case); anything else raises WfaInputError
+        Enum - must be one of the values WFA lists for the input (when it lists any), otherwise WfaInputError
+        Table - either the WFA text form 'C1R1~C2R1,C1R2~C2R2' or a list of rows, each a list of column values
+    '''
+
+    def __init__(self, workflowDef):
+        head, tail = INPUT_XML_TEMPLATE.split('--vk--')
+        self._head = head
+        self._tail = tail
+
+        # (parameter name, entry prefix, kind, allowed values) per input
+        fields = []
+        for uInput in workflowDef.inputs:
+            prefix = "\n\t\t<userInputEntry key = \"" + _escapeAttr(uInput.name) + "\" value = \""
+            fields.append((uInput.name, prefix, _kindOf(uInput.type), frozenset(uInput.allowedValues)))
+        self._fields = tuple(fields)
+        return
+
+    '''
+    serialize - return the workflow input XML for wfaParamMap
+    '''
+    def serialize(self, wfaParamMap):
+        parts = [self._head]
+        append = parts.append
+        for name, prefix, kind, allowedValues in self._fields:
+            value = wfaParamMap[name]
+            if(value == None):
+                continue
+            if(kind == BOOLEAN):
+                value = _toBoolean(name, value)
+            elif(kind == TABLE):
+                value = _toTable(value)
+            else:
+                value = _toText(value)
+                if(kind == ENUM and allowedValues and value not in allowedValues):
+                    raise WfaInputError("Value '" + value + "' of " + name + " is not one of: " +
+                                        ", ".join(sorted(allowedValues)))
+            append(prefix)
+            # The check of _escapeAttr, inlined: most values are short and have nothing to escape.
+            if(len(value) > _SEARCH_LIMIT or _searchEscaped(value) != None):
+                value = _escapeAttr(value)
+            append(value)
+            append("\"/>")
+        append(self._tail)
+        return("".join(parts))
+
+'''
+getSerializer - return the serializer of workflowDef, compiling it on first use.  The serializer is kept on the
+definition, so a cached definition is only ever compiled once.
+'''
+def getSerializer(workflowDef):
+    serializer = workflowDef.serializer
+    if(serializer == None):
+        serializer = WfaInputSerializer(workflowDef)
+        workflowDef.serializer = serializer
+    return(serializer)
+
+'''
+_escapeAttr - escape text for a double quoted XML attribute: the XML specials, plus quotes and whitespace characters so
+they survive the round trip.  Text with nothing to escape is returned as it is: a short value is checked with a single
+regular expression search, a long one (e.g. a large Table) by the replaces themselves - str.replace finds a character
+with memchr and hands back the string itself when it is not there, where the expression steps through the value a
+character at a time.
+'''
+def _escapeAttr(text):
+    if(len(text) <= _SEARCH_LIMIT and _searchEscaped(text) == None):
+        return(text)
+    return(text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+           .replace("\n", "&#10;").replace("\r", "&#13;").replace("\t", "&#9;"))
+
+def _kindOf(wfaType):
+    wfaType = (wfaType or "").lower()
+    if(wfaType == 'boolean'):
+        return(BOOLEAN)
+    elif(wfaType == 'enum'):
+        return(ENUM)
+    elif(wfaType.startswith('table')):
+        return(TABLE)
+    return(STRING)
+
+def _toText(value):
+    if(type(value) is str):
+        return(value)
+    if(type(value) is unicode):
+        return(value.encode('utf-8'))
+    return(str(value))
+
+def _toBoolean(name, value):
+    if(value is True or value is False):
+        return(str(value).lower())
+    text = _toText(value).lower()
+    if(text != 'true' and text != 'false'):
+        raise WfaInputError("Value '" + _toText(value) + "' of " + name + " is not a Boolean (true/false)")
+    return(text)
+
+def _toTable(value):
+    if(isinstance(value, (list, tuple))):
+        return(",".join(["~".join([_toText(column) for column in row]) for row in value]))
+    return(_toText(value))
@@ -0,0 +1,510 @@
+'''
+Created on Oct 16, 2026
+
+WfaTransport.py - pooled HTTP transport for the WFA REST API.
+Keeps persistent (keep-alive) connections to each WFA server so that workflow lookups, execute
+POSTs and job status polls do not open a new TCP connection - and repeat the Basic-auth 401
+challenge - on every call.  Responses are requested gzip/deflate encoded and decoded chunk by chunk
+as they are read, so parsers consume the decoded stream without the body ever being held whole (the
+one exception is the small job document of a status poll, see WfaPoll.pollJob).
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import base64
+import collections
+import httplib
+import select
+import socket
+import threading
+import time
+import urllib2
+import urlparse
+import zlib
+
+from WfaMetrics import metrics
+from WfaResilience import WfaCircuitOpenError, WfaRequestPolicy, getCircuitBreaker, isTimeout, isTransient
+
+# Defaults used when the wfaDict does not specify the pool settings.
+DEFAULT_POOL_SIZE = 8
+DEFAULT_IDLE_TIMEOUT = 60
+
+# Port a URL without one stands for, by scheme.
+DEFAULT_PORTS = { 'http' : 80, 'https' : 443 }
+
+# Content codings the transport decodes, and bytes read from the socket per decoding step.
+ACCEPT_ENCODING = "gzip, deflate"
+DECODE_CHUNK = 16384
+
+'''
+makeBasicAuth - build the value of a preemptive HTTP Basic Authorization header.
+
+WFA always answers an unauthenticated request with a 401 challenge, so sending the credential with the
+first request saves a full round trip on every call.
+'''
+def makeBasicAuth(username, password):
+    return("Basic " + base64.b64encode(username + ":" + password))
+
+class WfaPooledResponse(object):
+    '''
+    WfaPooledResponse - a thin wrapper around the httplib response that hands the connection back to the
+    pool once the body has been completely read (or discards it if the response is closed early).  A gzip or
+    deflate encoded body is decoded as it is read; read() always returns decoded bytes.
+    '''
+
+    def __init__(self, pool, key, conn, response, timer=None):
+        self.status = response.status
+        self.reason = response.reason
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self._timer = timer
+        self._decoder = None
+        # Decoded bytes not read yet: chunks as the decoder produced them, the read offset into the first one and the
+        # number of bytes they hold from there on.
+        self._decoded = collections.deque()
+        self._offset = 0
+        self._pending = 0
+        encoding = (response.getheader('Content-Encoding') or "").strip().lower()
+        if(encoding == "gzip" or encoding == "x-gzip"):
+            self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif(encoding == "deflate"):
+            self._decoder = _DeflateDecoder()
+        return
+
+    '''
+    getheader - return the value of a response header, or default if it is not present
+    '''
+    def getheader(self, name, default=None):
+        return(self._response.getheader(name, default))
+
+    '''
+    read - read the response body (or up to amt bytes of it).  The connection is returned to the pool
+    as soon as the body is exhausted.
+    '''
+    def read(self, amt=None):
+        if(self._decoder != None):
+            return(self._readDecoded(amt))
+        if(self._conn == None):
+            return("")
+        try:
+            data = self._response.read(amt)
+        except:
+            self._release(False)
+            raise
+        if(self._timer != None):
+            self._timer.bytesIn += len(data)
+            self._timer.bytesDecoded += len(data)
+        if(self._response.isclosed() or amt == None or (amt > 0 and data == "")):
+            self._release(not self._response.will_close)
+        return(data)
+
+    def _readDecoded(self, amt):
+        # Decode just enough of the body to answer the read; what is left over waits in _decoded.
+        while(self._conn != None and (amt == None or self._pending < amt)):
+            rawAmt = None
+            if(amt != None):
+                rawAmt = DECODE_CHUNK
+            try:
+                data = self._response.read(rawAmt)
+                done = self._response.isclosed() or rawAmt == None or data == ""
+                decoded = self._decoder.decompress(data)
+                if(done):
+                    decoded = decoded + self._decoder.flush()
+            except:
+                self._release(False)
+                raise
+            if(self._timer != None):
+                self._timer.bytesIn += len(data)
+                self._timer.bytesDecoded += len(decoded)
+            if(decoded != ""):
+                self._decoded.append(decoded)
+                self._pending = self._pending + len(decoded)
+            if(done):
+                self._release(not self._response.will_close)
+        if(amt == None or amt > self._pending):
+            amt = self._pending
+        # Every decoded byte is copied once on its way out, however small the reads.
+        parts = []
+        needed = amt
+        while(needed > 0):
+            chunk = self._decoded[0]
+            available = len(chunk) - self._offset
+            if(available <= needed):
+                if(self._offset > 0):
+                    chunk = chunk[self._offset:]
+                parts.append(chunk)
+                self._decoded.popleft()
+                self._offset = 0
+                needed = needed - available
+            else:
+                parts.append(chunk[self._offset:self._offset + needed])
+                self._offset = self._offset + needed
+                needed = 0
+        self._pending = self._pending - amt
+        if(len(parts) == 1):
+            return(parts[0])
+        return("".join(parts))
+
+    '''
+    close - release the connection.  A partially read response cannot be reused, so the connection is
+    dropped instead of being returned to the pool.
+    '''
+    def close(self):
+        if(self._conn != None):
+            self._release(self._response.isclosed() and not self._response.will_close)
+        return
+
+    def _release(self, reusable):
+        conn = self._conn
+        self._conn = None
+        if(conn != None):
+            metrics.finishRequest(self._timer, self.status)
+            self._pool._checkin(self._key, conn, reusable)
+        return
+
+class WfaConnectionPool(object):
+    '''
+    WfaConnectionPool - a bounded pool of persistent HTTP connections to a single WFA server.
+
+    The pool is thread safe and is intended to be shared by every Wfa/WfaOs instance that talks to the same
+    wfaServer (see getConnectionPool).  Credentials are not a property of the pool - each request carries the
+    Authorization header of the instance issuing it.
+
+        maxSize - maximum number of connections open to the server at any one time.  Requests beyond this
+                  wait for a connection to be returned.
+        idleTimeout - number of seconds an unused connection is kept before it is evicted.
+    '''
+
+    def __init__(self, wfaServer, maxSize=DEFAULT_POOL_SIZE, idleTimeout=DEFAULT_IDLE_TIMEOUT):
+        self.wfaServer = wfaServer
+        self.maxSize = maxSize
+        self.idleTimeout = idleTimeout
+
+        # Idle connections, keyed by (scheme, netloc), stored as [connection, time last used]
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxSize)
+        return
+
+    '''
+    urlopen - issue a request through the pool and return a WfaPooledResponse.
+
+    If data is specified the request is issued as a POST, otherwise as a GET.  As with urllib2.urlopen,
+    an HTTP status of 400 and above raises urllib2.HTTPError.  If a policy (WfaRequestPolicy) is given, its
+    connect and read timeouts apply to the request.
+    '''
+    def urlopen(self, URL, data=None, headers=None, authorization=None, policy=None):
+        parts = urlparse.urlsplit(URL)
+        key = (parts.scheme or "http", parts.netloc)
+        path = parts.path or "/"
+        if(parts.query):
+            path = path + "?" + parts.query
+        method = "GET"
+        if(data != None):
+            method = "POST"
+
+        requestHeaders = {}
+        if(headers != None):
+            requestHeaders.update(headers)
+        if(authorization != None):
+            requestHeaders['Authorization'] = authorization
+        if((policy == None or policy.compress) and not 'Accept-Encoding' in requestHeaders):
+            requestHeaders['Accept-Encoding'] = ACCEPT_ENCODING
+
+        timer = metrics.startRequest(self.wfaServer, method, path, len(data or ""))
+        self._slots.acquire()
+        if(timer != None):
+            timer.poolTime = time.time()
+        try:
+            conn, reused = self._checkout(key)
+            try:
+                response = self._send(conn, method, path, data, requestHeaders, timer, policy)
+            except socket.timeout:
+                # A server that did not answer in time is not a stale connection - leave retrying to the session.
+                conn.close()
+                raise
+            except (httplib.HTTPException, socket.error):
+                conn.close()
+                '''
+                The server is free to close a keep-alive connection while it sits idle in the pool.  _checkout skips
+                connections already closed, but the server may still close one just as it is reused.  A GET is
+                simply re-issued on a fresh connection; a POST is only re-issued if it never made it onto the wire.
+                '''
+                if(not reused or (method == "POST" and getattr(conn, '_wfaSent', False))):
+                    raise
+                metrics.retry(timer)
+                conn = self._newConnection(key)
+                try:
+                    response = self._send(conn, method, path, data, requestHeaders, timer, policy)
+                except:
+                    conn.close()
+                    raise
+        except:
+            self._slots.release()
+            metrics.finishRequest(timer, None)
+            raise
+
+        pooled = WfaPooledResponse(self, key, conn, response, timer)
+        if(response.status >= 400):
+            body = pooled.read()
+            raise urllib2.HTTPError(URL, response.status, response.reason, response.msg, _StringFile(body))
+        return(pooled)
+
+    '''
+    evictIdle - close every idle connection that has not been used within idleTimeout seconds.  When force
+    is set all idle connections are closed.
+    '''
+    def evictIdle(self, force=False):
+        now = time.time()
+        evicted = []
+        with self._lock:
+            for key in self._idle.keys():
+                keep = []
+                for entry in self._idle[key]:
+                    if(force or now - entry[1] > self.idleTimeout):
+                        evicted.append(entry[0])
+                    else:
+                        keep.append(entry)
+                self._idle[key] = keep
+        for conn in evicted:
+            conn.close()
+        return(len(evicted))
+
+    '''
+    idleCount - number of idle connections currently held by the pool
+    '''
+    def idleCount(self):
+        with self._lock:
+            return(sum([len(entries) for entries in self._idle.values()]))
+
+    def _send(self, conn, method, path, data, headers, timer=None, policy=None):
+        conn._wfaSent = False
+        if(conn.sock == None and (timer != None or policy != None)):
+            # Connect explicitly, so that connection setup is bounded and timed apart from the server's response.
+            if(policy != None):
+                conn.timeout = policy.connectTimeout
+            conn.connect()
+            if(timer != None):
+                timer.connectTime = time.time()
+        if(policy != None):
+            conn.sock.settimeout(policy.readTimeout)
+        conn.putrequest(method, path, skip_accept_encoding=True)
+        for name in headers:
+            conn.putheader(name, headers[name])
+        if(data != None):
+            conn.putheader('Content-Length', str(len(data)))
+        # Headers and body go out in a single send, avoiding the Nagle/delayed ACK stall of a separate body write.
+        conn.endheaders(data)
+        conn._wfaSent = True
+        response = conn.getresponse()
+        if(timer != None):
+            timer.headersTime = time.time()
+        return(response)
+
+    def _checkout(self, key):
+        self.evictIdle()
+        stale = []
+        conn = None
+        with self._lock:
+            entries = self._idle.get(key)
+            while(entries and conn == None):
+                conn = entries.pop()[0]
+                if(not _isOpen(conn)):
+                    stale.append(conn)
+                    conn = None
+        for staleConn in stale:
+            staleConn.close()
+        if(conn != None):
+            return(conn, True)
+        return(self._newConnection(key), False)
+
+    def _checkin(self, key, conn, reusable):
+        try:
+            if(reusable):
+                with self._lock:
+                    self._idle.setdefault(key, []).append([conn, time.time()])
+            else:
+                conn.close()
+        finally:
+            self._slots.release()
+        return
+
+    def _newConnection(self, key):
+        if(key[0] == "https"):
+            return(httplib.HTTPSConnection(key[1]))
+        return(httplib.HTTPConnection(key[1]))
+
+class WfaSession(object):
+    '''
+    WfaSession - the transport owned by a single Wfa instance.
+
+    A session binds one set of credentials to the shared connection pool of a WFA server.  Nothing is
+    installed process wide (as urllib2.install_opener did), so any number of instances - for different
+    servers or different users - can issue requests from different threads at the same time without
+    their credentials crossing over.
+
+    The credential is only sent to wfaServer itself: a request for a URL naming another host or port (e.g. a link
+    in a WFA response pointing elsewhere) goes out without it, as urllib2's password manager limited it to the base URI.
+
+    Requests are bounded by the timeouts of policy (a WfaRequestPolicy) and go through the circuit breaker
+    of the server (see WfaResilience).  A GET that fails transiently is retried as the policy allows; a POST
+    is never re-sent.
+    '''
+
+    def __init__(self, wfaServer, username, password, maxSize=None, idleTimeout=None, policy=None, breaker=None):
+        self.wfaServer = wfaServer
+        self.username = username
+        self._authorization = makeBasicAuth(username, password)
+        self._pool = getConnectionPool(wfaServer, maxSize, idleTimeout)
+        if(policy == None):
+            policy = WfaRequestPolicy()
+        if(breaker == None):
+            breaker = getCircuitBreaker(wfaServer)
+        self.policy = policy
+        self.breaker = breaker
+        return
+
+    '''
+    urlopen - issue a request with this session's credentials.  See WfaConnectionPool.urlopen.
+
+    If a jobDict is given, the retries, timeouts and circuit breaker refusals met by the request are added to
+    its retryCount, timeoutCount and circuitRejects counters.
+    '''
+    def urlopen(self, URL, data=None, headers=None, jobDict=None):
+        authorization = None
+        if(_sameServer(URL, self.wfaServer)):
+            authorization = self._authorization
+        attempt = 0
+        while(True):
+            try:
+                self.breaker.allow()
+            except WfaCircuitOpenError:
+                _countIn(jobDict, 'circuitRejects')
+                raise
+            try:
+                response = self._pool.urlopen(URL, data, headers, authorization, self.policy)
+            except Exception, e:
+                if(not isTransient(e)):
+                    # The server answered (or the failure is ours) - it is up as far as the breaker is concerned.
+                    self.breaker.success()
+                    raise
+                self.breaker.failure()
+                if(isTimeout(e)):
+                    _countIn(jobDict, 'timeoutCount')
+                if(data != None or attempt >= self.policy.retries):
+                    raise
+                _countIn(jobDict, 'retryCount')
+                metrics.retryRequest(self.wfaServer, "GET", urlparse.urlsplit(URL).path)
+                time.sleep(self.policy.delay(attempt))
+                attempt = attempt + 1
+                continue
+            self.breaker.success()
+            return(response)
+
+'''
+_sameServer - whether URL is on wfaServer: the same host and port, a wfaServer without a port standing for the default
+port of the URL's scheme
+'''
+def _sameServer(URL, wfaServer):
+    parts = urlparse.urlsplit(URL)
+    server = urlparse.urlsplit("//" + wfaServer)
+    try:
+        port = parts.port
+        serverPort = server.port
+    except ValueError:
+        return(False)
+    if(parts.hostname == None or parts.hostname != server.hostname):
+        return(False)
+    defaultPort = DEFAULT_PORTS.get(parts.scheme or "http")
+    return((port or defaultPort) == (serverPort or defaultPort))
+
+'''
+_isOpen - whether an idle connection may still be used.  Nothing is due on an idle connection, so a socket with
+something to read has been closed by the server (or is out of step with it); a POST sent on it would be lost.
+'''
+def _isOpen(conn):
+    if(conn.sock == None):
+        return(True)
+    try:
+        readable = select.select([conn.sock], [], [], 0)[0]
+    except (select.error, socket.error, ValueError):
+        return(False)
+    return(not readable)
+
+def _countIn(jobDict, key):
+    if(jobDict != None):
+        jobDict[key] = jobDict.get(key, 0) + 1
+    return
+
+class _DeflateDecoder(object):
+    '''
+    _DeflateDecoder - decoder of the deflate content coding, which servers send either zlib wrapped (as the HTTP
+    specification has it) or as a raw deflate stream.  The first chunk decides which.
+    '''
+    __slots__ = ('_decoder', '_started')
+
+    def __init__(self):
+        self._decoder = zlib.decompressobj(zlib.MAX_WBITS)
+        self._started = False
+        return
+
+    def decompress(self, data):
+        if(self._started or data == ""):
+            return(self._decoder.decompress(data))
+        self._started = True
+        try:
+            return(self._decoder.decompress(data))
+        except zlib.error:
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            return(self._decoder.decompress(data))
+
+    def flush(self):
+        return(self._decoder.flush())
+
+class _StringFile(object):
+    '''
+    _StringFile - minimal file object carrying an error body for urllib2.HTTPError
+    '''
+    def __init__(self, body):
+        self._body = body
+    def read(self, amt=None):
+        body = self._body
+        self._body = ""
+        return(body)
+    def readline(self):
+        return(self.read())
+    def close(self):
+        return
+
+# Process wide registry of pools, one per WFA server.
+_poolRegistry = {}
+_poolRegistryLock = threading.Lock()
+
+'''
+getConnectionPool - return the shared pool for wfaServer, creating it on first use.  The pool settings
+only take effect when the pool is created.
+'''
+def getConnectionPool(wfaServer, maxSize=None, idleTimeout=None):
+    with _poolRegistryLock:
+        pool = _poolRegistry.get(wfaServer)
+        if(pool == None):
+            if(maxSize == None):
+                maxSize = DEFAULT_POOL_SIZE
+            if(idleTimeout == None):
+                idleTimeout = DEFAULT_IDLE_TIMEOUT
+            pool = WfaConnectionPool(wfaServer, maxSize, idleTimeout)
+            _poolRegistry[wfaServer] = pool
+        return(pool)
+
+'''
+closeConnectionPools - close every idle pooled connection in the process (e.g. prior to exit or fork).
+'''
+def closeConnectionPools():
+    with _poolRegistryLock:
+        pools = _poolRegistry.values()
+    for pool in pools:
+        pool.evictIdle(True)
+    return
@@ -0,0 +1,233 @@
+'''
+Created on Oct 16, 2026
+
+WfaWorkflowCache.py - process wide cache of parsed WFA workflow definitions.
+setupWorkflow only needs a handful of facts about a workflow (its UUID, the execute link, the input
+schema and the return parameters), yet finding them costs a full workflow query and parse.  This module
+keeps those facts, keyed by (wfaServer, workflowName), so that repeated executions of the same workflow
+skip the query entirely.  It also holds the name -> UUID resolution table, which lets a workflow be fetched
+by UUID instead of through the name search.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from WfaParse import WfaUserInput, WfaWorkflowDef, parseWorkflowDef, parseWorkflowStream, readResponse
+
+# Defaults for the process wide cache - see configureWorkflowCache.
+DEFAULT_TTL = 300
+DEFAULT_MAX_ENTRIES = 128
+
+class WfaWorkflowCache(object):
+    '''
+    WfaWorkflowCache - thread safe TTL/LRU cache of WfaWorkflowDef objects.
+
+        ttl - seconds a definition is trusted before it is fetched (or revalidated) again
+        maxEntries - number of definitions kept; the least recently used is evicted first
+        revalidate - when True, an expired definition is revalidated with a conditional GET
+                     (If-None-Match/If-Modified-Since) instead of being dropped.  A 304 reply simply
+                     renews the entry without transferring or parsing the workflow again.
+    '''
+
+    def __init__(self, ttl=DEFAULT_TTL, maxEntries=DEFAULT_MAX_ENTRIES, revalidate=False):
+        self.ttl = ttl
+        self.maxEntries = maxEntries
+        self.revalidate = revalidate
+
+        # (wfaServer, workflowName) -> [WfaWorkflowDef, time fetched]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        return
+
+    '''
+    lookup - return the definition for workflowName on wfaServer, querying WFA through session (a WfaSession)
+    with queryURI only when there is no fresh entry.
+    '''
+    def lookup(self, session, wfaServer, workflowName, queryURI):
+        key = (wfaServer, workflowName)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if(entry != None):
+                # Re-insert to mark the entry as the most recently used.
+                self._entries[key] = entry
+                if(now - entry[1] < self.ttl):
+                    return(entry[0])
+
+        headers = None
+        if(entry != None and self.revalidate):
+            headers = {}
+            if(entry[0].etag != None):
+                headers['If-None-Match'] = entry[0].etag
+            if(entry[0].lastModified != None):
+                headers['If-Modified-Since'] = entry[0].lastModified
+
+        response = session.urlopen(queryURI, None, headers)
+        if(response.status == 304 and entry != None):
+            response.read()
+            workflowDef = entry[0]
+        else:
+            etag = response.getheader('ETag')
+            lastModified = response.getheader('Last-Modified')
+            workflowDef = readResponse(response, lambda stream: parseWorkflowStream(stream, etag, lastModified))
+        self.put(wfaServer, workflowName, workflowDef)
+        return(workflowDef)
+
+    '''
+    put - store a definition, evicting the least recently used entries beyond maxEntries
+    '''
+    def put(self, wfaServer, workflowName, workflowDef):
+        key = (wfaServer, workflowName)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = [workflowDef, time.time()]
+            while(len(self._entries) > self.maxEntries):
+                self._entries.popitem(False)
+        return
+
+    '''
+    invalidate - drop the cached definition of workflowName on wfaServer, or every definition of wfaServer
+    when no workflowName is given.
+    '''
+    def invalidate(self, wfaServer, workflowName=None):
+        with self._lock:
+            for key in self._entries.keys():
+                if(key[0] == wfaServer and (workflowName == None or key[1] == workflowName)):
+                    del self._entries[key]
+        return
+
+    '''
+    clear - drop every cached definition
+    '''
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        return
+
+# The process wide cache used by every Wfa instance.
+workflowCache = WfaWorkflowCache()
+
+'''
+configureWorkflowCache - change the settings of the process wide cache.  Only the supplied settings are changed.
+'''
+def configureWorkflowCache(ttl=None, maxEntries=None, revalidate=None):
+    if(ttl != None):
+        workflowCache.ttl = ttl
+    if(maxEntries != None):
+        workflowCache.maxEntries = maxEntries
+    if(revalidate != None):
+        workflowCache.revalidate = revalidate
+    return
+
+class WfaUUIDTable(object):
+    '''
+    WfaUUIDTable - thread safe table resolving workflow names to workflow UUIDs.
+
+    With the UUID known, a workflow is fetched directly from /rest/workflows/{uuid} instead of through the (slow)
+    ?name= search.  Entries are kept per WFA server; entries stored without a server apply to every server (workflow
+    UUIDs are preserved when the same .dar export is imported on several servers).  The table can be preloaded from a
+    dictionary, persisted to a JSON file with save and read back with load.
+    '''
+
+    def __init__(self):
+        # (wfaServer or None, workflowName) -> workflow UUID
+        self._uuids = {}
+        self._filled = set()
+        self._lock = threading.Lock()
+        return
+
+    '''
+    get - return the UUID of workflowName on wfaServer, or None if it is not known
+    '''
+    def get(self, wfaServer, workflowName):
+        with self._lock:
+            uuid = self._uuids.get((wfaServer, workflowName))
+            if(uuid == None):
+                uuid = self._uuids.get((None, workflowName))
+            return(uuid)
+
+    def put(self, wfaServer, workflowName, uuid):
+        with self._lock:
+            self._uuids[(wfaServer, workflowName)] = uuid
+        return
+
+    '''
+    remove - forget the UUID of workflowName on wfaServer (e.g. after WFA reported it as unknown)
+    '''
+    def remove(self, wfaServer, workflowName):
+        with self._lock:
+            self._uuids.pop((wfaServer, workflowName), None)
+            self._uuids.pop((None, workflowName), None)
+        return
+
+    '''
+    preload - add a dictionary of workflowName -> UUID, for wfaServer or (by default) for every server
+    '''
+    def preload(self, uuids, wfaServer=None):
+        with self._lock:
+            for workflowName in uuids:
+                self._uuids[(wfaServer, workflowName)] = uuids[workflowName]
+        return
+
+    '''
+    isFilled/markFilled - track which (wfaServer, group) combinations, e.g. a WfaOs platform, have been resolved
+    '''
+    def isFilled(self, key):
+        with self._lock:
+            return(key in self._filled)
+
+    def markFilled(self, key):
+        with self._lock:
+            self._filled.add(key)
+        return
+
+    '''
+    loadOnce - load path unless it has already been loaded into this table
+    '''
+    def loadOnce(self, path):
+        if(self.isFilled(('file', path))):
+            return
+        self.load(path)
+        self.markFilled(('file', path))
+        return
+
+    '''
+    save - write the table to path as JSON: { wfaServer (or "*" for every server) : { workflowName : UUID } }
+    '''
+    def save(self, path):
+        # json is only needed when a table file is in use, so it is not imported with the module.
+        import json
+        tables = {}
+        with self._lock:
+            for (wfaServer, workflowName), uuid in self._uuids.items():
+                tables.setdefault(wfaServer or "*", {})[workflowName] = uuid
+        tmpPath = path + ".tmp"
+        with open(tmpPath, 'w') as tableFile:
+            json.dump(tables, tableFile, indent=1, sort_keys=True)
+        os.rename(tmpPath, path)
+        return
+
+    '''
+    load - merge a table written by save.  A missing file is ignored.
+    '''
+    def load(self, path):
+        if(not os.path.exists(path)):
+            return
+        import json
+        with open(path) as tableFile:
+            tables = json.load(tableFile)
+        for wfaServer in tables:
+            uuids = dict([(str(name), str(uuid)) for name, uuid in tables[wfaServer].items()])
+            if(wfaServer == "*"):
+                self.preload(uuids)
+            else:
+                self.preload(uuids, str(wfaServer))
+        return
+
+# The process wide name -> UUID resolution table.
+uuidTable = WfaUUIDTable()
@@ -0,0 +1,11 @@
+'''
+Created on Oct 16, 2026
+
+tests - tests of the Wfa client, run against a local WfaMock server (no WFA appliance is needed).
+
+    cd Wfa
+    python -m unittest discover -s tests -t .
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
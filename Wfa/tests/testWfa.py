@@ -0,0 +1,140 @@
+'''
+Created on Oct 17, 2026
+
+testWfa.py - Wfa.waitForCompletion against WfaMock: the exponential poll backoff and its jitter, the timeout, the
+callback after every poll, and waiting through an open circuit.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import random
+import time
+import unittest
+
+import Wfa as wfaModule
+from Wfa import Wfa
+from WfaMetrics import metrics
+from WfaMock import WfaMockServer
+from WfaResilience import getCircuitBreaker
+from WfaTransport import getConnectionPool
+
+DELETE_SHARE = 'os_delete_nfs_share_cdot'
+
+class _NoJitter(object):
+
+    def uniform(self, low, high):
+        return(1.0)
+
+class WaitCase(unittest.TestCase):
+    jobDuration = 1.0
+    failureRate = 0.0
+    # Without commands the mock keeps the job SCHEDULED until it finishes, so no command rate is observed.
+    commands = 0
+
+    def setUp(self):
+        self.mock = WfaMockServer(jobDuration=self.jobDuration, failureRate=self.failureRate,
+                                  commands=self.commands).start()
+        self.delays = []
+        # Jobs of other tests may still be waiting in the background; only the sleeps for this server are recorded.
+        def jobSlept(wfaServer, jobId, seconds):
+            if(wfaServer == self.mock.wfaServer):
+                self.delays.append(seconds)
+        metrics.jobSlept = jobSlept
+        return
+
+    def tearDown(self):
+        del metrics.jobSlept
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        return
+
+    def _execute(self, interval, maxInterval):
+        wfa = Wfa(wfaDict={ 'wfaServer' : self.mock.wfaServer, 'wfaUser' : 'user', 'wfaPw' : 'pw',
+                            'workflowName' : DELETE_SHARE, 'wfaParamMap' : { 'volName' : 'share1' },
+                            'wfaPollInterval' : interval, 'wfaPollMaxInterval' : maxInterval })
+        wfa.setupWorkflow()
+        wfa.executeWorkflow()
+        return(wfa)
+
+class TestBackoff(WaitCase):
+
+    def testIntervalDoubles(self):
+        wfa = self._execute(0.05, 0.4)
+        wfaModule.random = _NoJitter()
+        try:
+            self.assertEqual(wfa.waitForCompletion(10), "DONE")
+        finally:
+            wfaModule.random = random
+        self.assertEqual(self.delays[:4], [0.05, 0.1, 0.2, 0.4])
+        self.assertEqual(set(self.delays[4:]), set([0.4]))
+        self.assertEqual(wfa.jobDict['pollCount'], len(self.delays) + 1)
+        self.assertEqual(self.mock.stats['job'], wfa.jobDict['pollCount'])
+        self.assertTrue(wfa.jobDict['waitTime'] >= sum(self.delays))
+        return
+
+    def testJitter(self):
+        wfa = self._execute(0.05, 0.4)
+        self.assertEqual(wfa.waitForCompletion(10), "DONE")
+        expected = [min(0.05 * 2 ** index, 0.4) for index in range(len(self.delays))]
+        for delay, interval in zip(self.delays, expected):
+            self.assertTrue(0.8 * interval <= delay <= 1.2 * interval)
+        # Not every delay is exactly the interval.
+        self.assertNotEqual(self.delays, expected)
+        return
+
+class TestTimeout(WaitCase):
+    jobDuration = 60
+
+    def testTimeout(self):
+        wfa = self._execute(0.1, 0.1)
+        startTime = time.time()
+        self.assertEqual(wfa.waitForCompletion(0.35), "OK")
+        self.assertTrue(time.time() - startTime < 0.6)
+        # The last sleep is cut short to end at the timeout.
+        self.assertTrue(sum(self.delays) <= 0.35 + 0.001)
+        self.assertTrue(self.delays[-1] < 0.08)
+        self.assertEqual(wfa.jobDict['jobStatus'], "SCHEDULED")
+        self.assertEqual(wfa.jobDict['pollCount'], len(self.delays) + 1)
+        return
+
+class TestCircuitOpen(WaitCase):
+    jobDuration = 60
+
+    def testWaitingCarriesOn(self):
+        wfa = self._execute(0.02, 0.02)
+        self.mock.jobs[wfa.jobDict['jobId']].startTime -= self.mock.jobDuration
+        breaker = getCircuitBreaker(self.mock.wfaServer)
+        breaker.resetTimeout = 0.1
+        for failure in range(breaker.threshold):
+            breaker.failure()
+        statuses = []
+        # Polls refused by the open breaker report UNKNOWN and waiting carries on until a probe gets through.
+        self.assertEqual(wfa.waitForCompletion(10, lambda wfa, status: statuses.append(status)), "DONE")
+        self.assertEqual(statuses[-1], "DONE")
+        self.assertTrue(len(statuses) > 2)
+        self.assertEqual(set(statuses[:-1]), set(["UNKNOWN"]))
+        self.assertEqual(self.mock.stats['job'], 1)
+        return
+
+class TestCallback(WaitCase):
+    jobDuration = 0.3
+    failureRate = 1.0
+    commands = 4
+
+    def testCalledAfterEveryPoll(self):
+        wfa = self._execute(0.02, 0.05)
+        calls = []
+        self.assertEqual(wfa.waitForCompletion(10, lambda job, status: calls.append((job, status,
+                                                                                     job.jobDict['jobStatus']))),
+                         "FAILED")
+        self.assertEqual(len(calls), wfa.jobDict['pollCount'])
+        self.assertTrue(all([job is wfa for job, status, jobStatus in calls]))
+        self.assertEqual(calls[0][1:], ("OK", "SCHEDULED"))
+        self.assertTrue(("OK", "EXECUTING") in [call[1:] for call in calls])
+        self.assertEqual(calls[-1][1:], ("FAILED", "FAILED"))
+        self.assertEqual(wfa.jobDict['jobError'], "Mock failure of job " + wfa.jobDict['jobId'])
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+'''
+Created on Oct 16, 2026
+
+testWfaAsync.py - AsyncWfa and AsyncWfaOs against WfaMock: completion, failures and cancellation.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import time
+import unittest
+import urllib2
+
+from WfaAsync import AsyncWfa, AsyncWfaOs
+from WfaConcurrent import WfaCancelledError
+from WfaMock import WfaMockServer
+from WfaTransport import getConnectionPool
+
+WORKFLOW_NAME = 'os_delete_nfs_share_cdot'
+JOBS = 20
+
+class _MockTestCase(unittest.TestCase):
+    latency = 0.0
+    jobDuration = 0.2
+    failureRate = 0.0
+
+    def setUp(self):
+        self.mock = WfaMockServer(latency=self.latency, jobDuration=self.jobDuration,
+                                  failureRate=self.failureRate).start()
+        return
+
+    def tearDown(self):
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        return
+
+    def wfaDict(self, volName, **extra):
+        wfaDict = { 'wfaServer' : self.mock.wfaServer, 'wfaUser' : 'user', 'wfaPw' : 'pw',
+                    'workflowName' : WORKFLOW_NAME, 'wfaParamMap' : { 'volName' : volName },
+                    'wfaPollInterval' : 0.05, 'wfaPollMaxInterval' : 0.1 }
+        wfaDict.update(extra)
+        return(wfaDict)
+
+class TestCompletion(_MockTestCase):
+
+    def testRunCompletesManyJobs(self):
+        jobs = [AsyncWfa(wfaDict=self.wfaDict('vol' + str(index), wfaMaxConcurrency=4)) for index in range(JOBS)]
+        futures = [job.run() for job in jobs]
+        self.assertEqual([future.result(30) for future in futures], ["DONE"] * JOBS)
+        self.assertEqual(len(set([job.jobDict['jobId'] for job in jobs])), JOBS)
+        self.assertEqual(self.mock.stats['execute'], JOBS)
+        for job in jobs:
+            self.assertEqual(job.jobDict['jobStatus'], "COMPLETED")
+            self.assertEqual(dict(job.jobDict['returnParams']), dict(self.mock.jobs[job.jobDict['jobId']].returnParams))
+        return
+
+    def testStepByStep(self):
+        wfa = AsyncWfa(wfaDict=self.wfaDict('vol1'))
+        self.assertEqual(wfa.setupWorkflow().result(10), None)
+        executed = wfa.executeWorkflow()
+        # completion may be asked for before the execution has resolved.
+        completion = wfa.completion()
+        self.assertEqual(executed.result(10), None)
+        self.assertTrue(wfa.jobDict['jobId'] != None)
+        self.assertEqual(completion.result(10), "DONE")
+        self.assertEqual(wfa.getSimpleJobStatus().result(10), "DONE")
+        return
+
+    def testCompletionBeforeExecute(self):
+        wfa = AsyncWfa(wfaDict=self.wfaDict('vol1'))
+        self.assertRaises(Exception, wfa.completion)
+        return
+
+    def testAsyncWfaOs(self):
+        wfa = AsyncWfaOs({ 'wfaServer' : self.mock.wfaServer, 'wfaUser' : 'user', 'wfaPw' : 'pw', 'wfaParamMap' : None,
+                           'wfaOperation' : 'delete_share', 'osProject' : 'manila', 'wfaPlatform' : 'cdot',
+                           'wfaPollInterval' : 0.05 })
+        self.assertEqual(wfa.wfaDict['workflowName'], WORKFLOW_NAME)
+        wfaParamMap = wfa.bindParams({ 'shareName' : 'share1' })
+        self.assertEqual(wfa.run(wfaParamMap).result(10), "DONE")
+        self.assertEqual(self.mock.jobs[wfa.jobDict['jobId']].workflow[0], WORKFLOW_NAME)
+        return
+
+class TestFailure(_MockTestCase):
+    failureRate = 1.0
+
+    def testFailedJob(self):
+        wfa = AsyncWfa(wfaDict=self.wfaDict('vol1'))
+        self.assertEqual(wfa.run().result(10), "FAILED")
+        self.assertTrue(wfa.jobDict['jobError'] != None)
+        return
+
+    def testUnknownWorkflow(self):
+        wfa = AsyncWfa(wfaDict=self.wfaDict('vol1', workflowName='no_such_workflow'))
+        done = wfa.run()
+        self.assertTrue(done.exception(10) != None)
+        self.assertRaises(Exception, done.result)
+        self.assertEqual(self.mock.stats['execute'], 0)
+        return
+
+    def testExecuteRefused(self):
+        wfa = AsyncWfa(wfaDict=self.wfaDict('vol1'))
+        self.assertEqual(wfa.setupWorkflow().result(10), None)
+        # Every request is answered with HTTP 503 from here on; a POST is never re-sent.
+        self.mock.errorRate = 1.0
+        executed = wfa.executeWorkflow()
+        self.assertEqual(executed.exception(10).code, 503)
+        self.assertRaises(urllib2.HTTPError, wfa.completion().result, 10)
+        self.assertEqual(self.mock.stats['execute'], 0)
+        return
+
+class TestCancellation(_MockTestCase):
+    latency = 0.2
+    jobDuration = 1.0
+
+    def testCancelCompletion(self):
+        wfa = AsyncWfa(wfaDict=self.wfaDict('vol1'))
+        completion = wfa.run()
+        self.assertTrue(completion.cancel())
+        self.assertTrue(completion.cancelled())
+        self.assertRaises(WfaCancelledError, completion.result, 1)
+        # A cancelled run stops before it submits the job.
+        time.sleep(self.latency * 4)
+        self.assertEqual(self.mock.stats['execute'], 0)
+        return
+
+    def testCancelWaitLeavesTheJobRunning(self):
+        wfa = AsyncWfa(wfaDict=self.wfaDict('vol1'))
+        wfa.setupWorkflow().result(10)
+        wfa.executeWorkflow().result(10)
+        completion = wfa.completion()
+        watched = wfa.watchJob()
+        self.assertTrue(completion.cancel())
+        self.assertRaises(WfaCancelledError, completion.result)
+        # The job and its other waiters are not affected.
+        self.assertEqual(watched.result(10), "DONE")
+        self.assertFalse(completion.cancel())
+        self.assertTrue(completion.cancelled())
+        return
+
+    def testCancelQueuedCall(self):
+        first = AsyncWfa(wfaDict=self.wfaDict('vol1', wfaMaxConcurrency=1))
+        second = AsyncWfa(wfaDict=self.wfaDict('vol2', wfaMaxConcurrency=1))
+        busy = first.setupWorkflow()
+        queued = second.setupWorkflow()
+        self.assertTrue(queued.cancel())
+        self.assertEqual(busy.result(10), None)
+        # The single worker takes calls in order: once a later call has run, the cancelled one would have too.
+        self.assertEqual(first.setupWorkflow().result(10), None)
+        self.assertEqual(second.workflowInputXml, None)
+        self.assertRaises(WfaCancelledError, queued.result)
+        return
+
+    def testCancelAfterCompletion(self):
+        wfa = AsyncWfa(wfaDict=self.wfaDict('vol1'))
+        setup = wfa.setupWorkflow()
+        self.assertEqual(setup.result(10), None)
+        self.assertFalse(setup.cancel())
+        self.assertFalse(setup.cancelled())
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+'''
+Created on Oct 16, 2026
+
+testWfaBind.py - compiled parameter bindings and their bounded registry.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import unittest
+
+import WfaBind
+from WfaBind import getBinding
+
+PARAM_MAP = (('volName', 'shareName'), ('volSize', 'shareSize'))
+
+class TestBindingRegistry(unittest.TestCase):
+
+    def setUp(self):
+        with WfaBind._bindingRegistryLock:
+            WfaBind._bindingRegistry.clear()
+        return
+
+    def testBind(self):
+        binding = getBinding(PARAM_MAP, { 'aggrName' : 'aggr1' })
+        self.assertEqual(binding.bind({ 'shareName' : 'share1' }),
+                         { 'volName' : 'share1', 'volSize' : None, 'aggrName' : 'aggr1' })
+        self.assertEqual(binding.bindMany([{ 'shareName' : 'a' }, { 'shareSize' : '10' }]),
+                         [{ 'volName' : 'a', 'volSize' : None, 'aggrName' : 'aggr1' },
+                          { 'volName' : None, 'volSize' : '10', 'aggrName' : 'aggr1' }])
+        return
+
+    def testShared(self):
+        binding = getBinding(PARAM_MAP, { 'aggrName' : 'aggr1' })
+        self.assertTrue(getBinding(PARAM_MAP, { 'aggrName' : 'aggr1' }) is binding)
+        self.assertTrue(getBinding(dict(PARAM_MAP)) is getBinding(dict(PARAM_MAP)))
+        return
+
+    def testBounded(self):
+        first = getBinding(PARAM_MAP, { 'aggrName' : 'aggr0' })
+        recent = getBinding(PARAM_MAP, { 'aggrName' : 'aggr1' })
+        for index in range(2, WfaBind.MAX_BINDINGS * 3):
+            getBinding(PARAM_MAP, { 'aggrName' : 'aggr' + str(index) })
+            # Kept in use, so never the least recently used.
+            self.assertTrue(getBinding(PARAM_MAP, { 'aggrName' : 'aggr1' }) is recent)
+        self.assertEqual(len(WfaBind._bindingRegistry), WfaBind.MAX_BINDINGS)
+        self.assertFalse(getBinding(PARAM_MAP, { 'aggrName' : 'aggr0' }) is first)
+        return
+
+    def testUnhashableExtraSpec(self):
+        binding = getBinding(PARAM_MAP, { 'exportPolicy' : ['rw', 'ro'] })
+        self.assertEqual(binding.bind({})['exportPolicy'], ['rw', 'ro'])
+        self.assertEqual(len(WfaBind._bindingRegistry), 0)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+'''
+Created on Oct 17, 2026
+
+testWfaChain.py - WfaChain runs against WfaMock: steps ordered by their dependencies, inputs taken from earlier
+steps, skipped dependents, the timeout, and steps that could not be started.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import time
+import unittest
+
+import WfaChain as chainModule
+from WfaChain import WfaChain, fromStep
+from WfaConcurrent import WfaExecutor, WfaTimeoutError
+from WfaMock import WfaMockServer
+from WfaSerializer import WfaInputError
+from WfaTransport import getConnectionPool
+
+EXTRA_SPEC = { 'clusName' : 'cluster1', 'vserverName' : 'vserver1', 'aggrName' : 'aggr1', 'volExists' : False,
+               'protocol' : 'nfs' }
+CREATE = { 'shareName' : 'share1', 'shareSize' : '10', 'shareProto' : 'nfs' }
+GRANT = { 'shareIP' : '10.0.0.5', 'accessType' : 'rw' }
+
+class ChainCase(unittest.TestCase):
+    jobDuration = 0.3
+
+    def setUp(self):
+        self.mock = WfaMockServer(jobDuration=self.jobDuration).start()
+        wfaDict = { 'wfaServer' : self.mock.wfaServer, 'wfaUser' : 'user', 'wfaPw' : 'pw', 'osProject' : 'manila',
+                    'wfaPlatform' : 'cdot', 'wfaExtraSpec' : EXTRA_SPEC, 'wfaPollInterval' : 0.05,
+                    'wfaPollMaxInterval' : 0.1 }
+        self.chain = WfaChain(wfaDict)
+        return
+
+    def tearDown(self):
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        return
+
+class TestChain(ChainCase):
+
+    def _mockJob(self, results, name):
+        return(self.mock.jobs[results[name]['jobDict']['jobId']])
+
+    def testDependencyOrder(self):
+        self.chain.step('create', 'create_share', CREATE)
+        self.chain.step('grant', 'grant_ip', GRANT, wfaParams={ 'volName' : fromStep('create', 'export_path') })
+        self.chain.step('other', 'delete_share', { 'shareName' : 'share2' })
+        self.chain.step('cleanup', 'delete_share', { 'shareName' : 'share3' }, after=('grant', 'other'))
+        results = self.chain.run(10)
+
+        self.assertEqual(dict([(name, result['status']) for name, result in results.items()]),
+                         { 'create' : "DONE", 'grant' : "DONE", 'other' : "DONE", 'cleanup' : "DONE" })
+        create = self._mockJob(results, 'create')
+        grant = self._mockJob(results, 'grant')
+        self.assertEqual((create.workflow[0], grant.workflow[0]), ('os_create_nfs_share_cdot', 'os_grant_ip_cdot'))
+        # A step starts once the steps it depends on have completed; independent steps run side by side.
+        self.assertTrue(grant.startTime >= create.startTime + self.jobDuration)
+        self.assertTrue(self._mockJob(results, 'other').startTime < create.startTime + self.jobDuration)
+        self.assertTrue(self._mockJob(results, 'cleanup').startTime >= grant.startTime + self.jobDuration)
+        # The grant took the export path the create returned.
+        self.assertTrue("mock-export_path-" + create.jobId in self.chain._byName['grant'].job.workflowInputXml)
+        self.assertEqual(self.mock.stats['execute'], 4)
+        return
+
+    def testStepsDependOnlyOnEarlierSteps(self):
+        self.assertRaises(Exception, self.chain.step, 'grant', 'grant_ip', GRANT,
+                          { 'volName' : fromStep('create', 'export_path') })
+        self.chain.step('create', 'create_share', CREATE)
+        self.assertRaises(Exception, self.chain.step, 'create', 'create_share', CREATE)
+        self.assertEqual(self.chain._byName['create'].dependents, [])
+        return
+
+    def testFailuresSkipTheirDependents(self):
+        self.chain.step('bad', 'grant_ip', { 'shareIP' : '10.0.0.5', 'accessType' : 'everything' },
+                        wfaParams={ 'volName' : 'share1' })
+        self.chain.step('after', 'delete_share', { 'shareName' : 'share1' }, after=('bad',))
+        self.chain.step('afterThat', 'delete_share', { 'shareName' : 'share1' }, after=('after',))
+        self.chain.step('delete', 'delete_share', { 'shareName' : 'share2' })
+        # delete returns no export_path, so the step using it cannot be bound.
+        self.chain.step('unbound', 'grant_ip', GRANT, wfaParams={ 'volName' : fromStep('delete', 'export_path') })
+        results = self.chain.run(10)
+
+        self.assertEqual(results['bad']['status'], "ERROR")
+        self.assertTrue(isinstance(results['bad']['error'], WfaInputError))
+        self.assertEqual([results[name]['status'] for name in ('after', 'afterThat')], ["SKIPPED", "SKIPPED"])
+        self.assertEqual(results['after']['error'], None)
+        self.assertEqual(results['delete']['status'], "DONE")
+        self.assertEqual(results['unbound']['status'], "ERROR")
+        self.assertTrue("export_path" in str(results['unbound']['error']))
+        self.assertEqual(self.mock.stats['execute'], 1)
+        return
+
+    def testStepThatCannotBeStartedSettles(self):
+        class RefusingExecutor(WfaExecutor):
+            def submit(self, fn, *args, **kwargs):
+                if(args and getattr(args[0], 'name', None) == 'grant'):
+                    raise Exception("no worker for grant")
+                return(WfaExecutor.submit(self, fn, *args, **kwargs))
+        self.chain.step('create', 'create_share', CREATE)
+        self.chain.step('grant', 'grant_ip', GRANT, wfaParams={ 'volName' : fromStep('create', 'export_path') })
+        self.chain.step('cleanup', 'delete_share', { 'shareName' : 'share1' }, after=('grant',))
+        chainModule.WfaExecutor = RefusingExecutor
+        try:
+            results = self.chain.run(10)
+        finally:
+            chainModule.WfaExecutor = WfaExecutor
+        self.assertEqual([results[name]['status'] for name in ('create', 'grant', 'cleanup')],
+                         ["DONE", "ERROR", "SKIPPED"])
+        self.assertEqual(str(results['grant']['error']), "no worker for grant")
+        return
+
+class TestChainTimeout(ChainCase):
+    jobDuration = 2.0
+
+    def testTimeout(self):
+        self.chain.step('create', 'create_share', CREATE)
+        self.chain.step('grant', 'grant_ip', GRANT, wfaParams={ 'volName' : fromStep('create', 'export_path') })
+        startTime = time.time()
+        self.assertRaises(WfaTimeoutError, self.chain.run, 0.3)
+        self.assertTrue(time.time() - startTime < 1.5)
+        # The running step carries on; the grant never started.
+        self.assertEqual(self.mock.stats['execute'], 1)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+'''
+Created on Oct 17, 2026
+
+testWfaCluster.py - WfaCluster against two WfaMock servers: executions spread by load, status requests pinned to the
+node that owns the job, and failover when a node cannot take the job.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import time
+import unittest
+
+from WfaCluster import WfaCluster, getClusterNode
+from WfaMock import WfaMockServer
+from WfaTransport import getConnectionPool
+
+DELETE_SHARE = 'os_delete_nfs_share_cdot'
+
+class TestCluster(unittest.TestCase):
+
+    def setUp(self):
+        self.mocks = [WfaMockServer(jobDuration=0.3).start() for index in range(2)]
+        self.servers = [mock.wfaServer for mock in self.mocks]
+        wfaDict = { 'wfaServers' : self.servers, 'wfaUser' : 'user', 'wfaPw' : 'pw', 'workflowName' : DELETE_SHARE,
+                    'wfaParamMap' : { 'volName' : 'share1' }, 'wfaRetries' : 0, 'wfaPollInterval' : 0.05,
+                    'wfaPollMaxInterval' : 0.1 }
+        self.cluster = WfaCluster(wfaDict)
+        self.stopped = set()
+        return
+
+    def tearDown(self):
+        for mock in self.mocks:
+            getConnectionPool(mock.wfaServer).evictIdle(True)
+            if(not mock in self.stopped):
+                mock.stop()
+        return
+
+    def _load(self, index, jobs):
+        # Pretend jobs are in flight on a node, so the other one is preferred.
+        node = getClusterNode(self.servers[index])
+        for job in range(jobs):
+            node.jobs['load-' + str(job)] = time.time()
+        return
+
+    def _unload(self, index):
+        node = getClusterNode(self.servers[index])
+        for jobId in [jobId for jobId in node.jobs.keys() if jobId.startswith('load-')]:
+            node.finished(jobId)
+        return
+
+    def testExecutionsAreSpreadByLoad(self):
+        self.cluster.setupWorkflow()
+        jobs = [self.cluster.newJob({ 'volName' : 'share' + str(index) }) for index in range(6)]
+        for job in jobs:
+            job.executeWorkflow()
+        # Both nodes take a share; how much depends on the latency each has shown.
+        executed = [mock.stats['execute'] for mock in self.mocks]
+        self.assertEqual(sum(executed), 6)
+        self.assertTrue(min(executed) > 0)
+        self.assertEqual([getClusterNode(server).inFlight() for server in self.servers], executed)
+        for job in jobs:
+            self.assertEqual(job.waitForCompletion(10), "DONE")
+        self.assertEqual([getClusterNode(server).inFlight() for server in self.servers], [0, 0])
+        return
+
+    def testBusyNodeIsPassedOver(self):
+        self._load(0, 20)
+        self.cluster.setupWorkflow()
+        jobs = [self.cluster.newJob({ 'volName' : 'share' + str(index) }) for index in range(3)]
+        for job in jobs:
+            job.executeWorkflow()
+        self.assertEqual([job.wfaServer for job in jobs], [self.servers[1]] * 3)
+        self.assertEqual(self.mocks[0].stats['execute'], 0)
+        for job in jobs:
+            self.assertEqual(job.waitForCompletion(10), "DONE")
+        return
+
+    def testStatusGoesToTheOwner(self):
+        self._load(1, 2)
+        self.cluster.setupWorkflow()
+        self.cluster.executeWorkflow()
+        self.assertEqual(self.cluster.wfaServer, self.servers[0])
+        # The other node becomes the better choice, but the job stays where it runs.
+        self._unload(1)
+        self._load(0, 2)
+        self.assertEqual(self.cluster.waitForCompletion(10), "DONE")
+        jobId = self.cluster.jobDict['jobId']
+        self.assertTrue(jobId in self.mocks[0].jobs)
+        self.assertTrue(self.mocks[0].stats['job'] > 0)
+        self.assertEqual((self.mocks[1].stats['execute'], self.mocks[1].stats['job']), (0, 0))
+        return
+
+    def testFailoverWhenANodeIsDown(self):
+        self._load(1, 2)
+        self.cluster.setupWorkflow()
+        self.assertEqual(self.cluster.wfaServer, self.servers[0])
+        self.mocks[0].stop()
+        self.stopped.add(self.mocks[0])
+        getConnectionPool(self.servers[0]).evictIdle(True)
+        # The execute request is refused without reaching WFA, so it goes to the other node.
+        self.cluster.executeWorkflow()
+        self.assertEqual(self.cluster.wfaServer, self.servers[1])
+        self.assertTrue(self.cluster.jobDict['jobId'] in self.mocks[1].jobs)
+        self.assertEqual(self.cluster.waitForCompletion(10), "DONE")
+        self.assertEqual(getClusterNode(self.servers[0]).submitting, 0)
+        return
+
+    def testFailoverWhenPreparingFails(self):
+        self._load(0, 2)
+        self.cluster.setupWorkflow()
+        self.assertEqual(self.cluster.wfaServer, self.servers[1])
+        # The least loaded node now answers 503 to the workflow lookup the job needs there.
+        self._unload(0)
+        self._load(1, 2)
+        self.mocks[0].errorRate = 1.0
+        self.cluster.executeWorkflow()
+        self.assertEqual(self.mocks[0].stats['error'], 1)
+        self.assertEqual(self.mocks[0].stats['execute'], 0)
+        self.assertEqual(self.cluster.wfaServer, self.servers[1])
+        self.assertTrue(self.cluster.jobDict['jobId'] in self.mocks[1].jobs)
+        self.assertEqual(self.cluster.waitForCompletion(10), "DONE")
+        self.assertEqual(getClusterNode(self.servers[0]).submitting, 0)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
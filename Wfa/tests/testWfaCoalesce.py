@@ -0,0 +1,103 @@
+'''
+Created on Oct 17, 2026
+
+testWfaCoalesce.py - coalesced executions against WfaMock: identical executions in flight share one job, and a flight
+settles once its job finishes even when nobody waits for it.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import time
+import unittest
+
+from Wfa import Wfa
+from WfaCoalesce import singleFlight
+from WfaMock import WfaMockServer
+from WfaTransport import getConnectionPool
+
+DELETE_SHARE = 'os_delete_nfs_share_cdot'
+GRANT_IP = 'os_grant_ip_cdot'
+DENY_IP = 'os_deny_ip_cdot'
+
+class TestCoalesce(unittest.TestCase):
+
+    def setUp(self):
+        self.mock = WfaMockServer(jobDuration=0.3).start()
+        return
+
+    def tearDown(self):
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        return
+
+    def wfa(self, workflowName, wfaParamMap, **extra):
+        wfaDict = { 'wfaServer' : self.mock.wfaServer, 'wfaUser' : 'user', 'wfaPw' : 'pw', 'workflowName' : workflowName,
+                    'wfaParamMap' : wfaParamMap, 'wfaCoalesce' : True, 'wfaPollInterval' : 0.05,
+                    'wfaPollMaxInterval' : 0.1 }
+        wfaDict.update(extra)
+        wfa = Wfa(wfaDict=wfaDict)
+        wfa.setupWorkflow()
+        return(wfa)
+
+    def _waitForSettle(self, flight):
+        deadline = time.time() + 10
+        while(flight.finishedAt == None and time.time() < deadline):
+            time.sleep(0.05)
+        self.assertTrue(flight.finishedAt != None)
+        return
+
+    def testIdenticalExecutionsShareOneJob(self):
+        leader = self.wfa(DELETE_SHARE, { 'volName' : 'share1' })
+        follower = self.wfa(DELETE_SHARE, { 'volName' : 'share1' })
+        other = self.wfa(DELETE_SHARE, { 'volName' : 'share2' })
+        for wfa in (leader, follower, other):
+            wfa.executeWorkflow()
+        self.assertEqual(follower.jobDict['jobId'], leader.jobDict['jobId'])
+        self.assertNotEqual(other.jobDict['jobId'], leader.jobDict['jobId'])
+        self.assertEqual([wfa.waitForCompletion(10) for wfa in (leader, follower, other)], ["DONE"] * 3)
+        self.assertEqual(self.mock.stats['execute'], 2)
+        return
+
+    def testUnwatchedLeaderSettles(self):
+        # The leader fires and forgets: its job is still followed to the end, so the flight does not outlive it.
+        leader = self.wfa(DELETE_SHARE, { 'volName' : 'share1' })
+        leader.executeWorkflow()
+        flight = leader._flight
+        self._waitForSettle(flight)
+        self.assertEqual(flight.completed.result(1), "DONE")
+        self.assertFalse(flight.key in singleFlight._flights)
+
+        again = self.wfa(DELETE_SHARE, { 'volName' : 'share1' })
+        again.executeWorkflow()
+        self.assertNotEqual(again.jobDict['jobId'], leader.jobDict['jobId'])
+        self.assertEqual(again.waitForCompletion(10), "DONE")
+        self.assertEqual(self.mock.stats['execute'], 2)
+        return
+
+    def testGrantDenyGrantRunsThreeJobs(self):
+        grant = { 'accessIP' : '10.0.0.1', 'protocol' : 'nfs', 'volName' : 'share1', 'accessRule' : 'rw' }
+        deny = { 'accessIP' : '10.0.0.1', 'volName' : 'share1' }
+        jobIds = []
+        for workflowName, wfaParamMap in ((GRANT_IP, grant), (DENY_IP, deny), (GRANT_IP, grant)):
+            wfa = self.wfa(workflowName, wfaParamMap)
+            wfa.executeWorkflow()
+            self._waitForSettle(wfa._flight)
+            jobIds.append(wfa.jobDict['jobId'])
+        self.assertEqual(len(set(jobIds)), 3)
+        self.assertEqual(self.mock.stats['execute'], 3)
+        return
+
+    def testWindowKeepsASuccessfulResult(self):
+        first = self.wfa(DELETE_SHARE, { 'volName' : 'share1' }, wfaCoalesceWindow=30)
+        first.executeWorkflow()
+        self.assertEqual(first.waitForCompletion(10), "DONE")
+        second = self.wfa(DELETE_SHARE, { 'volName' : 'share1' }, wfaCoalesceWindow=30)
+        second.executeWorkflow()
+        self.assertEqual(second.jobDict['jobId'], first.jobDict['jobId'])
+        self.assertEqual(second.waitForCompletion(1), "DONE")
+        self.assertEqual(self.mock.stats['execute'], 1)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+'''
+Created on Oct 16, 2026
+
+testWfaCompress.py - gzip and deflate encoded responses from WfaMock: bytes saved on the wire, and bodies decoded
+exactly whatever the size of the reads.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import unittest
+import zlib
+
+from WfaMock import WfaMockServer
+from WfaParse import iterJobRecords, readResponse
+from WfaTransport import WfaSession, _DeflateDecoder, getConnectionPool
+
+WORKFLOW_NAME = 'os_delete_nfs_share_cdot'
+JOBS = 300
+READ_SIZES = (None, 16384, 4096, 1000, 64, 1)
+
+class TestCompressedResponses(unittest.TestCase):
+
+    def setUp(self):
+        # Jobs that finish at once, so the listing does not change between reads.
+        self.mock = WfaMockServer(jobDuration=0.0, etags=False).start()
+        for index in range(JOBS):
+            self.mock._newJob(self.mock.workflows[WORKFLOW_NAME])
+        self.session = WfaSession(self.mock.wfaServer, "user", "pw")
+        self.listingURI = "http://" + self.mock.wfaServer + "/rest/workflows/jobs"
+        self.identity = self._fetch('identity', None)
+        return
+
+    def tearDown(self):
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        return
+
+    def _fetch(self, encoding, readSize):
+        response = self.session.urlopen(self.listingURI, None, { 'Accept-Encoding' : encoding })
+        if(readSize == None):
+            return(response.read())
+        parts = []
+        while(True):
+            data = response.read(readSize)
+            if(data == ""):
+                return("".join(parts))
+            self.assertTrue(len(data) <= readSize)
+            parts.append(data)
+
+    def testBytesSaved(self):
+        for encoding in ('gzip', 'deflate'):
+            self.mock.resetStats()
+            self.assertEqual(self._fetch(encoding, None), self.identity)
+            self.assertEqual(self.mock.stats['compressed'], 1)
+            self.assertEqual(self.mock.stats['bytesBody'], len(self.identity))
+            self.assertTrue(self.mock.stats['bytesOut'] * 10 < len(self.identity))
+        return
+
+    def testDecodedExactlyInPieces(self):
+        for encoding in ('gzip', 'deflate'):
+            for readSize in READ_SIZES:
+                self.assertEqual(self._fetch(encoding, readSize), self.identity, encoding + " " + str(readSize))
+        # Every connection went back to the pool once its body was read.
+        self.assertEqual(getConnectionPool(self.mock.wfaServer).idleCount(), 1)
+        return
+
+    def testStreamingParse(self):
+        response = self.session.urlopen(self.listingURI)
+        jobIds = readResponse(response, lambda stream: [record.jobId for record in iterJobRecords(stream)])
+        self.assertEqual(jobIds, [str(index + 1) for index in range(JOBS)])
+        return
+
+    def testRawDeflate(self):
+        # Some servers send the deflate coding without its zlib wrapper.
+        encoder = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        raw = encoder.compress(self.identity) + encoder.flush()
+        decoder = _DeflateDecoder()
+        decoded = [decoder.decompress(raw[start:start + 512]) for start in range(0, len(raw), 512)]
+        self.assertEqual("".join(decoded) + decoder.flush(), self.identity)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+'''
+Created on Oct 17, 2026
+
+testWfaDarIndex.py - the schema index built from the bundled Workflows/*.dar exports: building and reading it back,
+rebuilding an index older than its archives, and Wfa definitions served from the index with and without confirming
+them against WfaMock.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from Wfa import Wfa
+from WfaDarIndex import (DEFAULT_DAR_PATHS, WfaDarIndex, _indexRegistry, _indexRegistryLock, buildDarIndex,
+                         getSchemaIndex, readDarWorkflows)
+from WfaMock import WfaMockServer
+from WfaTransport import getConnectionPool
+from WfaWorkflowCache import workflowCache
+
+DELETE_SHARE = 'os_delete_nfs_share_cdot'
+GRANT_IP = 'os_grant_ip_cdot'
+
+class IndexCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.indexPath = os.path.join(self.directory, "schema.idx")
+        self.workflows = dict([(entry[0], entry) for darPath in DEFAULT_DAR_PATHS
+                               for entry in readDarWorkflows(darPath)])
+        return
+
+    def tearDown(self):
+        # Opened indexes are kept process wide, one per path.
+        with _indexRegistryLock:
+            for indexPath in _indexRegistry.keys():
+                if(indexPath.startswith(self.directory)):
+                    del _indexRegistry[indexPath]
+        shutil.rmtree(self.directory)
+        return
+
+class TestDarIndex(IndexCase):
+
+    def testBuildAndLookup(self):
+        self.assertTrue(GRANT_IP in self.workflows)
+        # Both workflow archives hold the same workflows; each is indexed once.
+        self.assertEqual(buildDarIndex(DEFAULT_DAR_PATHS, self.indexPath), len(self.workflows))
+        self.assertFalse(os.path.exists(self.indexPath + ".tmp"))
+        index = WfaDarIndex(self.indexPath)
+        self.assertEqual(index.names(), sorted(self.workflows.keys()))
+
+        for name, uuid, inputs, returnParams in self.workflows.values():
+            workflowDef = index.lookup("wfa1:80", name)
+            self.assertEqual((workflowDef.name, workflowDef.uuid, workflowDef.returnParams), (name, uuid, returnParams))
+            self.assertEqual([(uInput.name, uInput.type, uInput.mandatory, uInput.allowedValues)
+                              for uInput in workflowDef.inputs], list(inputs))
+            self.assertEqual(workflowDef.executeLink, "http://wfa1:80/rest/workflows/" + uuid + "/jobs")
+        self.assertEqual(dict([(uInput.name, uInput.allowedValues) for uInput in
+                               index.lookup("wfa1:80", GRANT_IP).inputs])['accessRule'], ('rw', 'ro', 'su'))
+        return
+
+    def testLookupByUUIDAndPerServer(self):
+        buildDarIndex(DEFAULT_DAR_PATHS, self.indexPath)
+        index = WfaDarIndex(self.indexPath)
+        uuid = self.workflows[DELETE_SHARE][1]
+        workflowDef = index.lookup("wfa1:80", DELETE_SHARE)
+        # Decoded once per server.
+        self.assertTrue(index.lookup("wfa1:80", workflowUUID=uuid) is workflowDef)
+        self.assertTrue(index.lookup("wfa1:80", DELETE_SHARE, uuid) is workflowDef)
+        self.assertEqual(index.lookup("wfa2:80", DELETE_SHARE).executeLink,
+                         "http://wfa2:80/rest/workflows/" + uuid + "/jobs")
+        self.assertEqual(index.lookup("wfa1:80", DELETE_SHARE, self.workflows[GRANT_IP][1]), None)
+        self.assertEqual(index.lookup("wfa1:80", 'os_unknown_cdot'), None)
+        self.assertEqual(index.lookup("wfa1:80", workflowUUID='unknown-uuid'), None)
+        return
+
+    def testNotAnIndex(self):
+        with open(self.indexPath, 'wb') as indexFile:
+            indexFile.write("something else entirely")
+        self.assertRaises(Exception, WfaDarIndex, self.indexPath)
+        return
+
+    def testFreshness(self):
+        darPath = os.path.join(self.directory, "workflows.dar")
+        shutil.copy(DEFAULT_DAR_PATHS[-1], darPath)
+        # A missing index is built.
+        index = getSchemaIndex(self.indexPath, [darPath])
+        self.assertEqual(index.names(), sorted(self.workflows.keys()))
+        self.assertTrue(getSchemaIndex(self.indexPath, [darPath]) is index)
+
+        # An index at least as new as its archives is used as it is.
+        builtAt = int(time.time()) - 60
+        os.utime(darPath, (builtAt - 60, builtAt - 60))
+        os.utime(self.indexPath, (builtAt, builtAt))
+        with _indexRegistryLock:
+            del _indexRegistry[self.indexPath]
+        getSchemaIndex(self.indexPath, [darPath])
+        self.assertEqual(os.path.getmtime(self.indexPath), builtAt)
+
+        # An archive exported after the index was built brings a rebuild.
+        os.utime(darPath, (builtAt + 30, builtAt + 30))
+        with _indexRegistryLock:
+            del _indexRegistry[self.indexPath]
+        index = getSchemaIndex(self.indexPath, [darPath])
+        self.assertTrue(os.path.getmtime(self.indexPath) > builtAt + 30)
+        self.assertEqual(index.names(), sorted(self.workflows.keys()))
+        return
+
+class TestIndexedWorkflows(IndexCase):
+
+    def setUp(self):
+        IndexCase.setUp(self)
+        self.mock = WfaMockServer().start()
+        return
+
+    def tearDown(self):
+        workflowCache.invalidate(self.mock.wfaServer)
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        IndexCase.tearDown(self)
+        return
+
+    def _wfa(self, **extra):
+        wfaDict = { 'wfaServer' : self.mock.wfaServer, 'wfaUser' : 'user', 'wfaPw' : 'pw',
+                    'workflowName' : DELETE_SHARE, 'wfaParamMap' : { 'volName' : 'share1' },
+                    'wfaSchemaIndex' : self.indexPath }
+        wfaDict.update(extra)
+        return(Wfa(wfaDict=wfaDict))
+
+    def testServedFromTheIndex(self):
+        wfa = self._wfa()
+        wfa.setupWorkflow()
+        self.assertEqual(self.mock.stats['workflow'], 0)
+        self.assertEqual(wfa.workflowDef.uuid, self.mock.workflows[DELETE_SHARE][1])
+        wfa.executeWorkflow()
+        self.assertEqual(self.mock.stats['execute'], 1)
+        return
+
+    def testVerifiedOncePerServer(self):
+        for attempt in range(2):
+            wfa = self._wfa(wfaVerifySchemaIndex=True)
+            wfa.setupWorkflow()
+        self.assertEqual(self.mock.stats['workflow'], 1)
+        self.assertTrue(getSchemaIndex(self.indexPath).isCurrent(self.mock.wfaServer, DELETE_SHARE))
+        return
+
+    def testServerDefinitionWins(self):
+        # The workflow on the server has gained an input since the archives were exported.
+        name, uuid, inputs, returnParams = self.mock.workflows[DELETE_SHARE]
+        self.mock.workflows[DELETE_SHARE] = (name, uuid, inputs + (('force', 'Boolean', False, ()),), returnParams)
+        workflowDef = self._wfa(wfaVerifySchemaIndex=True).getWorkflowDefinition()
+        self.assertEqual(getSchemaIndex(self.indexPath).isCurrent(self.mock.wfaServer, DELETE_SHARE), False)
+        self.assertEqual([uInput.name for uInput in workflowDef.inputs][-1], 'force')
+        self.assertEqual(self.mock.stats['workflow'], 1)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
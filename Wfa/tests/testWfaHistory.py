@@ -0,0 +1,142 @@
+'''
+Created on Oct 17, 2026
+
+testWfaHistory.py - the job history against WfaMock: paging and filters, resumed exports that carry on past jobs
+that have not finished, and the history loaded into a job table.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from WfaHistory import RESUME_SUFFIX, exportJobHistory, iterJobHistory, loadJobTable
+from WfaMock import WfaMockServer
+from WfaTransport import WfaSession, getConnectionPool
+
+DELETE_SHARE = 'os_delete_nfs_share_cdot'
+DENY_IP = 'os_deny_ip_cdot'
+
+class TestJobHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.mock = WfaMockServer(jobDuration=0.01).start()
+        self.session = WfaSession(self.mock.wfaServer, "user", "pw")
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "history.jsonl")
+        return
+
+    def tearDown(self):
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        shutil.rmtree(self.directory)
+        return
+
+    def _newJobs(self, count, workflowName=DELETE_SHARE):
+        jobs = [self.mock._newJob(self.mock.workflows[workflowName]) for index in range(count)]
+        for job in jobs:
+            job.startTime = job.startTime - 1
+        return(jobs)
+
+    def _hold(self, job):
+        # The job stays scheduled until released.
+        job.startTime = time.time() + 3600
+        return
+
+    def _release(self, job):
+        job.startTime = time.time() - 1
+        return
+
+    def _exportedIds(self):
+        with open(self.path) as exported:
+            return([json.loads(line)['jobId'] for line in exported])
+
+    def testPagesAndFilters(self):
+        self._newJobs(7)
+        self._newJobs(3, DENY_IP)
+        rows = list(iterJobHistory(self.session, pageSize=3))
+        self.assertEqual([row['jobId'] for row in rows], [str(jobId) for jobId in range(1, 11)])
+        self.assertEqual(self.mock.stats['listing'], 4)
+        self.assertEqual(rows[0]['jobStatus'], "COMPLETED")
+        self.assertEqual(rows[0]['workflowName'], DELETE_SHARE)
+        self.assertTrue(rows[0]['duration'] > 0)
+
+        rows = list(iterJobHistory(self.session, workflowName=DENY_IP, afterJobId='8', pageSize=3))
+        self.assertEqual([row['jobId'] for row in rows], ['9', '10'])
+        return
+
+    def testPageIsReadBeforeItsRowsAreYielded(self):
+        self._newJobs(4)
+        pool = getConnectionPool(self.mock.wfaServer)
+        rows = iterJobHistory(self.session, pageSize=2)
+        rows.next()
+        # The connection is back in the pool while the consumer holds the row.
+        self.assertEqual(pool.idleCount(), 1)
+        self.assertEqual(len(list(rows)), 3)
+        return
+
+    def testLoadJobTable(self):
+        jobs = self._newJobs(6)
+        self._newJobs(2, DENY_IP)
+        self._hold(jobs[0])
+        table = loadJobTable(self.session, workflowName=DELETE_SHARE, pageSize=4)
+        self.assertEqual(sorted(table), range(1, 7))
+        self.assertEqual(table.counts(), { 'OK' : 1, 'DONE' : 5 })
+        jobDict = table.jobDict(2)
+        self.assertEqual(jobDict['jobStatus'], "COMPLETED")
+        self.assertEqual(jobDict['returnParams'], dict(jobs[1].returnParams))
+        self.assertEqual(jobDict['jobSelfLink'], "http://" + self.mock.wfaServer + "/rest/workflows/jobs/2")
+
+        # Loading again refreshes the jobs already held and adds the new ones.
+        self._release(jobs[0])
+        self._newJobs(1)
+        self.assertTrue(loadJobTable(self.session, table, DELETE_SHARE) is table)
+        self.assertEqual(len(table), 7)
+        self.assertEqual(table.simpleStatus(1), "DONE")
+        return
+
+    def testResumeCarriesOnPastUnfinishedJobs(self):
+        jobs = self._newJobs(5)
+        self._hold(jobs[1])
+        self.assertEqual(exportJobHistory(self.session, self.path), 4)
+        self.assertEqual(self._exportedIds(), ['1', '3', '4', '5'])
+        with open(self.path + RESUME_SUFFIX) as resumeFile:
+            self.assertEqual(json.load(resumeFile), { 'afterJobId' : '5', 'unfinished' : ['2'] })
+
+        # Still scheduled: nothing to export, and the job is kept for the next export.
+        self.assertEqual(exportJobHistory(self.session, self.path), 0)
+        self._newJobs(1)
+        self._release(jobs[1])
+        self.assertEqual(exportJobHistory(self.session, self.path), 2)
+        self.assertEqual(self._exportedIds(), ['1', '3', '4', '5', '2', '6'])
+        self.assertEqual(exportJobHistory(self.session, self.path), 0)
+        return
+
+    def testUnfinishedJobThatIsGoneIsDropped(self):
+        jobs = self._newJobs(3)
+        self._hold(jobs[0])
+        self.assertEqual(exportJobHistory(self.session, self.path), 2)
+        del self.mock.jobs[jobs[0].jobId]
+        self.assertEqual(exportJobHistory(self.session, self.path), 0)
+        with open(self.path + RESUME_SUFFIX) as resumeFile:
+            self.assertEqual(json.load(resumeFile)['unfinished'], [])
+        return
+
+    def testResumeWithoutStateFile(self):
+        self._newJobs(3)
+        self.assertEqual(exportJobHistory(self.session, self.path, 'csv'), 3)
+        os.remove(self.path + RESUME_SUFFIX)
+        self._newJobs(2)
+        # The export carries on after the last job in the file.
+        self.assertEqual(exportJobHistory(self.session, self.path, 'csv'), 2)
+        with open(self.path) as exported:
+            self.assertEqual([line.split(',')[0] for line in exported], ['jobId', '1', '2', '3', '4', '5'])
+        return
+
+if __name__ == '__main__':
+    unittest.main()
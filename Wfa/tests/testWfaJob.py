@@ -0,0 +1,123 @@
+'''
+Created on Oct 17, 2026
+
+testWfaJob.py - the job dictionary view (WfaJobDict) and the job table (WfaJobTable).
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import collections
+import json
+import unittest
+
+from WfaJob import JOB_DICT_KEYS, WfaJobState, WfaJobTable, jobSimpleStatus, newJobDict
+from WfaParse import WfaJobRecord
+
+def _record(jobId, jobStatus, currentCommandIndex=None, errorMessage=None, returnParams=()):
+    record = WfaJobRecord(jobId)
+    record.jobStatus = jobStatus
+    record.currentCommandIndex = currentCommandIndex
+    record.commandsNumber = 4
+    record.errorMessage = errorMessage
+    record.returnParams = returnParams
+    return(record)
+
+class TestJobDict(unittest.TestCase):
+
+    def setUp(self):
+        self.jobDict = newJobDict()
+        self.jobDict['jobId'] = '42'
+        self.jobDict['jobStatus'] = "EXECUTING"
+        self.jobDict['wfCmdExecuting'] = 2
+        self.jobDict['returnParams']['volume'] = 'vol1'
+        return
+
+    def testBehavesLikeADictionary(self):
+        self.assertTrue(isinstance(self.jobDict, collections.MutableMapping))
+        self.assertEqual(sorted(self.jobDict.keys()), sorted(JOB_DICT_KEYS))
+        self.assertEqual(self.jobDict['jobId'], '42')
+        self.assertEqual(self.jobDict['wfCmdExecuting'], '2')
+        self.assertEqual(self.jobDict.state.jobId, 42)
+        self.assertEqual(jobSimpleStatus(self.jobDict), "OK")
+
+        self.jobDict.update({ 'jobStatus' : "COMPLETED", 'note' : 'extra' })
+        self.assertEqual(self.jobDict.state.jobStatus(), "COMPLETED")
+        self.assertEqual(self.jobDict.setdefault('note', 'other'), 'extra')
+        self.assertEqual(self.jobDict.setdefault('owner', 'manila'), 'manila')
+        self.assertEqual(self.jobDict.pop('owner'), 'manila')
+        self.assertEqual(self.jobDict.pop('owner', None), None)
+        self.assertRaises(KeyError, self.jobDict.pop, 'owner')
+        self.assertEqual(self.jobDict.popitem(), ('note', 'extra'))
+        self.assertRaises(KeyError, self.jobDict.popitem)
+        return
+
+    def testEquality(self):
+        plain = self.jobDict.copy()
+        self.assertTrue(self.jobDict == plain)
+        self.assertTrue(plain == self.jobDict)
+        self.assertFalse(self.jobDict != plain)
+        other = newJobDict()
+        other.update(plain)
+        self.assertEqual(other, self.jobDict)
+        other['pollCount'] = 3
+        self.assertNotEqual(other, self.jobDict)
+        self.assertNotEqual(self.jobDict, None)
+        # The plain copy is what json encodes.
+        self.assertEqual(json.loads(json.dumps(self.jobDict.copy())), json.loads(json.dumps(plain)))
+        return
+
+    def testDeletingResetsDocumentedKeys(self):
+        self.jobDict['note'] = 'extra'
+        del self.jobDict['jobStatus']
+        self.assertEqual(self.jobDict['jobStatus'], None)
+        self.assertTrue('jobStatus' in self.jobDict)
+        del self.jobDict['note']
+        self.assertFalse('note' in self.jobDict)
+        self.assertRaises(KeyError, self.jobDict.__delitem__, 'note')
+
+        self.jobDict.clear()
+        self.assertEqual(self.jobDict, newJobDict())
+        self.jobDict['returnParams']['volume'] = 'vol2'
+        # A reset record does not share its return parameters with another.
+        self.assertEqual(newJobDict()['returnParams'], {})
+        return
+
+class TestJobTable(unittest.TestCase):
+
+    def _state(self, jobId, jobStatus="EXECUTING"):
+        state = WfaJobState()
+        state.jobId = jobId
+        state.jobSelfLink = "http://wfa/rest/workflows/jobs/" + str(jobId)
+        state.setJobStatus(jobStatus)
+        return(state)
+
+    def testStoreAndRead(self):
+        table = WfaJobTable()
+        for jobId in range(1, 6):
+            table.add(self._state(jobId))
+        table.update('3', _record('3', "COMPLETED", 4, returnParams=(('volume', 'vol3'),)))
+        table.update(4, _record('4', "FAILED", 2, errorMessage="no space"))
+        table.update(5, _record('5', "LOST_TRACK"))
+
+        self.assertEqual(len(table), 5)
+        self.assertTrue('2' in table)
+        self.assertEqual(table.counts(), { 'OK' : 2, 'DONE' : 1, 'FAILED' : 1, 'UNKNOWN' : 1 })
+        jobDict = table.jobDict(3)
+        self.assertEqual(jobDict['jobStatus'], "COMPLETED")
+        self.assertEqual(jobDict['wfCmdExecuting'], '4')
+        self.assertEqual(jobDict['returnParams'], { 'volume' : 'vol3' })
+        self.assertEqual(jobDict['jobSelfLink'], "http://wfa/rest/workflows/jobs/3")
+        self.assertEqual(table.jobDict(4)['jobError'], "no space")
+        self.assertEqual(table.jobDict(5)['jobStatus'], "LOST_TRACK")
+        self.assertEqual(table.simpleStatus(1), "OK")
+
+        table.discard(2)
+        self.assertEqual(sorted(table), [1, 3, 4, 5])
+        self.assertEqual(table.jobDict(5)['jobStatus'], "LOST_TRACK")
+        self.assertEqual(table.jobDict(3)['returnParams'], { 'volume' : 'vol3' })
+        self.assertRaises(ValueError, table.add, self._state('job-x'))
+        return
+
+if __name__ == '__main__':
+    unittest.main()
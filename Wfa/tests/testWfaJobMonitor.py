@@ -0,0 +1,112 @@
+'''
+Created on Oct 17, 2026
+
+testWfaJobMonitor.py - WfaJobMonitor against WfaMock: jobs polled one by one or through the jobs listing, the listing
+bounded to the watched jobs, callbacks, and jobs that cannot be polled.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import time
+import unittest
+import urllib2
+import urlparse
+
+from WfaJobMonitor import WfaJobMonitor
+from WfaMock import WfaMockServer
+from WfaTransport import WfaSession, getConnectionPool
+
+WORKFLOW_NAME = 'os_delete_nfs_share_cdot'
+HISTORY = 200
+
+class TestJobMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.mock = WfaMockServer(jobDuration=0.3).start()
+        self.workflow = self.mock.workflows[WORKFLOW_NAME]
+        # Jobs run before the monitor started; they are not watched and must not be read.
+        for index in range(HISTORY):
+            self.mock._newJob(self.workflow)
+        self.monitor = WfaJobMonitor(WfaSession(self.mock.wfaServer, "user", "pw"), 0.05, maxPollInterval=0.1)
+        return
+
+    def tearDown(self):
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        return
+
+    def _watchNew(self, count, callback=None):
+        futures = []
+        for index in range(count):
+            job = self.mock._newJob(self.workflow)
+            futures.append(self.monitor.watch(job.jobId, None, callback))
+        return(futures)
+
+    def _listingQueries(self):
+        return([urlparse.parse_qs(urlparse.urlsplit(path).query) for path in self.mock.users
+                if urlparse.urlsplit(path).path == "/rest/workflows/jobs"])
+
+    def _waitForExit(self):
+        deadline = time.time() + 5
+        while(self.monitor._thread != None and time.time() < deadline):
+            time.sleep(0.02)
+        self.assertEqual(self.monitor._thread, None)
+        return
+
+    def testFewJobsArePolledOneByOne(self):
+        futures = self._watchNew(2)
+        self.assertEqual([future.result(10) for future in futures], ["DONE", "DONE"])
+        self.assertEqual(self.mock.stats['listing'], 0)
+        self.assertTrue(self.mock.stats['job'] >= 2)
+        self.assertEqual(self.monitor.pending(), 0)
+        self._waitForExit()
+        return
+
+    def testListingIsBoundedToTheWatchedJobs(self):
+        futures = self._watchNew(8)
+        self.assertEqual([future.result(10) for future in futures], ["DONE"] * 8)
+        self.assertTrue(self.monitor.listingAvailable)
+        self.assertTrue(self.mock.stats['listing'] > 0)
+        # Only a round run while the first jobs were being watched can have polled them one by one.
+        self.assertTrue(self.mock.stats['job'] < self.monitor.listingThreshold)
+
+        queries = self._listingQueries()
+        self.assertTrue(len(queries) > 0)
+        for query in queries:
+            # Never below the oldest watched job, never past the newest.
+            after = int(query['after'][0])
+            self.assertTrue(after >= HISTORY)
+            self.assertTrue(after + int(query['limit'][0]) <= HISTORY + 8)
+        for future in futures:
+            self.assertEqual(future.jobDict['jobStatus'], "COMPLETED")
+        return
+
+    def testCallbackAndJobDict(self):
+        finished = []
+        futures = self._watchNew(6, lambda jobDict, wfaStatus: finished.append((jobDict['jobId'], wfaStatus)))
+        for future in futures:
+            self.assertEqual(future.result(10), "DONE")
+        self.assertEqual(sorted(finished), sorted([(future.jobDict['jobId'], "DONE") for future in futures]))
+        for future in futures:
+            job = self.mock.jobs[future.jobDict['jobId']]
+            self.assertEqual(dict(future.jobDict['returnParams']), dict(job.returnParams))
+        return
+
+    def testWatchingTwiceSharesTheFuture(self):
+        job = self.mock._newJob(self.workflow)
+        future = self.monitor.watch(job.jobId)
+        self.assertTrue(self.monitor.watch(job.jobId) is future)
+        self.assertEqual(future.result(10), "DONE")
+        return
+
+    def testUnknownJobFails(self):
+        self.monitor.maxErrors = 2
+        future = self.monitor.watch('99999')
+        self.assertEqual(future.exception(10).code, 404)
+        self.assertRaises(urllib2.HTTPError, future.result)
+        self.assertEqual(self.monitor.pending(), 0)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
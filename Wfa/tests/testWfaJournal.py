@@ -0,0 +1,221 @@
+'''
+Created on Oct 17, 2026
+
+testWfaJournal.py - the job journal on a temporary SQLite file: records and lookups, compaction, jobs journaled and
+reattached against WfaMock, and commit failures reported to the callers.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from Wfa import Wfa
+from WfaJournal import COMPACTED, WfaJournal, getJournal, reattachJobs
+from WfaMock import WfaMockServer
+from WfaSchedule import getScheduler
+from WfaTransport import getConnectionPool
+
+DELETE_SHARE = 'os_delete_nfs_share_cdot'
+SERVER = "wfa1:80"
+
+class JournalCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "journal.db")
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        return
+
+    def _failCommits(self):
+        # Every insert is refused until _allowCommits.
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TRIGGER refuse BEFORE INSERT ON events BEGIN SELECT RAISE(ABORT, 'journal full'); END")
+        conn.commit()
+        conn.close()
+        return
+
+    def _allowCommits(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("DROP TRIGGER refuse")
+        conn.commit()
+        conn.close()
+        return
+
+    def _kinds(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            return([row[0] for row in conn.execute("SELECT kind FROM events ORDER BY seq")])
+        finally:
+            conn.close()
+
+class TestJournal(JournalCase):
+
+    def setUp(self):
+        JournalCase.setUp(self)
+        self.journal = WfaJournal(self.path)
+        return
+
+    def _submit(self, jobId, shareName=None, wfaServer=SERVER):
+        self.journal.submitted(wfaServer, jobId, "http://" + wfaServer + "/rest/workflows/jobs/" + str(jobId),
+                               DELETE_SHARE, { 'volName' : shareName }, shareName)
+        return
+
+    def _jobDict(self, jobStatus, returnParams=None):
+        return({ 'jobStatus' : jobStatus, 'jobError' : None, 'returnParams' : returnParams or {} })
+
+    def testRecordsAndLookups(self):
+        self._submit(1, 'share1')
+        self._submit(2, 'share2')
+        self._submit(1, 'share1', "wfa2:80")
+        self.journal.finished(SERVER, 1, "DONE", self._jobDict("COMPLETED", { 'volume' : 'vol1' }))
+        self.journal.flush()
+
+        unfinished = self.journal.unfinished()
+        self.assertEqual([(job['wfaServer'], job['jobId']) for job in unfinished], [(SERVER, '2'), ("wfa2:80", '1')])
+        self.assertEqual([job['jobId'] for job in self.journal.unfinished("wfa2:80")], ['1'])
+
+        job = self.journal.job(1, SERVER)
+        self.assertEqual(job['status'], "DONE")
+        self.assertEqual(job['jobStatus'], "COMPLETED")
+        self.assertEqual(job['returnParams'], { 'volume' : 'vol1' })
+        self.assertEqual(job['paramMap'], { 'volName' : 'share1' })
+        self.assertEqual(job['workflowName'], DELETE_SHARE)
+        self.assertTrue(job['finishTime'] >= job['submitTime'])
+        self.assertEqual(self.journal.job(3), None)
+
+        self.assertEqual([(job['wfaServer'], job['status']) for job in self.journal.jobsForShare('share1')],
+                         [(SERVER, "DONE"), ("wfa2:80", None)])
+        self.assertEqual(self.journal.jobsForShare('share3'), [])
+        return
+
+    def testCompact(self):
+        for jobId in range(1, 5):
+            self._submit(jobId, 'share' + str(jobId))
+        for jobId in (1, 2, 3):
+            self.journal.finished(SERVER, jobId, "DONE", self._jobDict("COMPLETED", { 'volume' : str(jobId) }))
+        # The same job ID on another server has not finished and is left alone.
+        self._submit(1, 'share1', "wfa2:80")
+        before = dict([(jobId, self.journal.job(jobId, SERVER)) for jobId in range(1, 5)])
+
+        # Six records of three finished jobs fold into three.
+        self.assertEqual(self.journal.compact(), 3)
+        self.assertEqual(self._kinds().count(COMPACTED), 3)
+        for jobId in range(1, 5):
+            self.assertEqual(self.journal.job(jobId, SERVER), before[jobId])
+        self.assertEqual([(job['wfaServer'], job['jobId']) for job in self.journal.unfinished()],
+                         [(SERVER, '4'), ("wfa2:80", '1')])
+        self.assertEqual(self.journal.compact(), 0)
+
+        # Compacted jobs past the retention are dropped; unfinished ones never are.
+        time.sleep(0.05)
+        self.assertEqual(self.journal.compact(0.01), 3)
+        self.assertEqual(self.journal.job(1, SERVER), None)
+        self.assertEqual(len(self.journal.unfinished()), 2)
+        return
+
+    def testSubmissionRaisesAFailedCommit(self):
+        self._failCommits()
+        self.assertRaises(sqlite3.IntegrityError, self._submit, 1)
+        # Nobody waited for the result: the next flush raises the error, once.
+        self.journal.finished(SERVER, 2, "DONE")
+        self.assertRaises(sqlite3.IntegrityError, self.journal.flush)
+        self.journal.flush()
+        # Reads wait for the writes but leave the error to flush.
+        self.journal.finished(SERVER, 2, "DONE")
+        self.assertEqual(self.journal.unfinished(), [])
+        self.assertRaises(sqlite3.IntegrityError, self.journal.flush)
+
+        self._allowCommits()
+        self._submit(1)
+        self.journal.flush()
+        self.assertEqual([job['jobId'] for job in self.journal.unfinished()], ['1'])
+        return
+
+class TestJournaledJobs(JournalCase):
+
+    def setUp(self):
+        JournalCase.setUp(self)
+        self.mock = WfaMockServer(jobDuration=0.2).start()
+        self.workflow = self.mock.workflows[DELETE_SHARE]
+        return
+
+    def tearDown(self):
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        JournalCase.tearDown(self)
+        return
+
+    def wfaDict(self, **extra):
+        wfaDict = { 'wfaServer' : self.mock.wfaServer, 'wfaUser' : 'user', 'wfaPw' : 'pw', 'wfaJournal' : self.path,
+                    'wfaPollInterval' : 0.05, 'wfaPollMaxInterval' : 0.1 }
+        wfaDict.update(extra)
+        return(wfaDict)
+
+    def wfa(self, **extra):
+        wfaDict = self.wfaDict(workflowName=DELETE_SHARE, wfaParamMap={ 'volName' : 'share1' }, shareName='share1',
+                               **extra)
+        wfa = Wfa(wfaDict=wfaDict)
+        wfa.setupWorkflow()
+        return(wfa)
+
+    def testExecutionIsJournaled(self):
+        journal = getJournal(self.path)
+        wfa = self.wfa()
+        wfa.executeWorkflow()
+        # The submission is on disk before executeWorkflow returns.
+        self.assertEqual([job['jobId'] for job in WfaJournal(self.path).unfinished(self.mock.wfaServer)],
+                         [wfa.jobDict['jobId']])
+        self.assertEqual(wfa.waitForCompletion(10), "DONE")
+        journal.flush()
+        job = journal.jobsForShare('share1')[0]
+        self.assertEqual((job['jobId'], job['status'], job['paramMap']), (wfa.jobDict['jobId'], "DONE",
+                                                                          { 'volName' : 'share1' }))
+        self.assertEqual(job['returnParams'], dict(wfa.jobDict['returnParams']))
+        self.assertEqual(journal.unfinished(), [])
+        return
+
+    def testReattachJobs(self):
+        journal = getJournal(self.path)
+        jobs = [self.mock._newJob(self.workflow) for index in range(3)]
+        for job in jobs:
+            journal.submitted(self.mock.wfaServer, job.jobId,
+                              "http://" + self.mock.wfaServer + "/rest/workflows/jobs/" + job.jobId, DELETE_SHARE)
+        finished = []
+        futures = reattachJobs(self.wfaDict(), callback=lambda job, jobDict, wfaStatus: finished.append(job['jobId']))
+        self.assertEqual(sorted(futures.keys()), sorted([(self.mock.wfaServer, job.jobId) for job in jobs]))
+        for future in futures.values():
+            self.assertEqual(future.result(10), "DONE")
+        journal.flush()
+        self.assertEqual(sorted(finished), sorted([job.jobId for job in jobs]))
+        self.assertEqual(journal.unfinished(), [])
+        self.assertEqual(journal.job(jobs[0].jobId)['returnParams'], dict(jobs[0].returnParams))
+        # Nothing is left to reattach.
+        self.assertEqual(reattachJobs(self.wfaDict()), {})
+        return
+
+    def testJournalFailureKeepsTheJobAndItsSlot(self):
+        getJournal(self.path)
+        self._failCommits()
+        wfa = self.wfa(wfaSchedule=True)
+        self.assertRaises(sqlite3.IntegrityError, wfa.executeWorkflow)
+        # WFA accepted the job: it is in jobDict and can still be followed.
+        self.assertTrue(wfa.jobDict['jobId'] in self.mock.jobs)
+        self.assertEqual(wfa.waitForCompletion(10), "DONE")
+        scheduler = getScheduler(self.mock.wfaServer)
+        deadline = time.time() + 5
+        while(scheduler.inFlight != 0 and time.time() < deadline):
+            time.sleep(0.02)
+        self.assertEqual(scheduler.inFlight, 0)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
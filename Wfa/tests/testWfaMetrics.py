@@ -0,0 +1,221 @@
+'''
+Created on Oct 17, 2026
+
+testWfaMetrics.py - the metrics of requests and jobs run against WfaMock: request phases and counters, job phases
+with the time per command, the Prometheus text format and the JSON job log sink.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import json
+import logging
+import unittest
+import urllib2
+
+from Wfa import Wfa
+from WfaMetrics import REQUEST_PHASES, WfaJobLogSink, endpointOf, metrics
+from WfaMock import WfaMockServer
+from WfaTransport import WfaSession, getConnectionPool
+
+DELETE_SHARE = 'os_delete_nfs_share_cdot'
+
+class _Records(logging.Handler):
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+        return
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+        return
+
+class MetricsCase(unittest.TestCase):
+
+    def setUp(self):
+        self.mock = WfaMockServer(jobDuration=0.5, commands=4).start()
+        self.session = WfaSession(self.mock.wfaServer, "user", "pw")
+        self.job = self.mock._newJob(self.mock.workflows[DELETE_SHARE])
+        self.jobSelfLink = "http://" + self.mock.wfaServer + "/rest/workflows/jobs/" + self.job.jobId
+        metrics.reset()
+        return
+
+    def tearDown(self):
+        metrics.enabled = True
+        metrics.reset()
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        return
+
+    def _get(self, URL):
+        response = self.session.urlopen(URL)
+        try:
+            return(response.read())
+        finally:
+            response.close()
+
+    def _runJob(self):
+        wfaDict = { 'wfaServer' : self.mock.wfaServer, 'wfaUser' : 'user', 'wfaPw' : 'pw',
+                    'workflowName' : DELETE_SHARE, 'wfaParamMap' : { 'volName' : 'share1' }, 'wfaPollInterval' : 0.02,
+                    'wfaPollMaxInterval' : 0.02 }
+        wfa = Wfa(wfaDict=wfaDict)
+        wfa.setupWorkflow()
+        wfa.executeWorkflow()
+        self.assertEqual(wfa.waitForCompletion(10), "DONE")
+        return(wfa)
+
+class TestRequestMetrics(MetricsCase):
+
+    def testPhasesAndCounters(self):
+        body = self._get(self.jobSelfLink)
+        self._get(self.jobSelfLink)
+        self.assertRaises(urllib2.HTTPError, self._get, self.jobSelfLink + "0")
+
+        stats = metrics.snapshot()['requests'][(self.mock.wfaServer, 'job_status')]
+        self.assertEqual(stats['statuses'], { 200 : 2, 404 : 1 })
+        self.assertEqual(stats['errors'], 1)
+        latency = stats['latency']
+        for phase in ('pool', 'server', 'read', 'total'):
+            self.assertEqual(latency[phase]['count'], 3)
+        # Only the first request opened a connection; the others reused it.
+        self.assertEqual(latency['connect']['count'], 1)
+        self.assertTrue(latency['total']['sum'] >= latency['server']['sum'])
+        self.assertTrue(stats['bytesIn'] >= len(body))
+        self.assertEqual(stats['bytesOut'], 0)
+        return
+
+    def testDisabled(self):
+        metrics.enabled = False
+        self._get(self.jobSelfLink)
+        self.assertEqual(metrics.snapshot()['requests'], {})
+        return
+
+    def testEndpoints(self):
+        self.assertEqual([endpointOf("GET", path) for path in ("/rest/workflows?name=a", "/rest/workflows/",
+                                                               "/rest/workflows/uuid1", "/rest/workflows/jobs?after=3",
+                                                               "/rest/workflows/jobs/12", "/rest/other")],
+                         ["workflow_query", "workflow_list", "workflow", "job_listing", "job_status", "other"])
+        self.assertEqual(endpointOf("POST", "/rest/workflows/uuid1/jobs"), "execute")
+        return
+
+class TestJobMetrics(MetricsCase):
+
+    def testJobPhasesAndCommands(self):
+        summaries = []
+        metrics.addJobSink(summaries.append)
+        try:
+            wfa = self._runJob()
+        finally:
+            metrics.removeJobSink(summaries.append)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['jobs'], { (self.mock.wfaServer, "DONE") : 1 })
+        self.assertEqual(snapshot['jobsInFlight'], 0)
+        for phase in ('queued', 'executing', 'total', 'pollSleep'):
+            self.assertEqual(snapshot['jobPhases'][phase]['count'], 1)
+        self.assertEqual(snapshot['requests'][(self.mock.wfaServer, 'execute')]['statuses'], { 201 : 1 })
+
+        summary = summaries[0]
+        self.assertEqual((summary['jobId'], summary['status'], summary['wfCmdTotal']), (wfa.jobDict['jobId'], "DONE",
+                                                                                         '4'))
+        self.assertEqual(summary['workflowName'], DELETE_SHARE)
+        # The mock spends a fifth of the job scheduled and the rest going through its four commands.
+        self.assertTrue(0.05 < summary['queued'] < 0.3)
+        self.assertTrue(0.2 < summary['executing'] < 0.6)
+        self.assertTrue(summary['total'] >= summary['queued'] + summary['executing'] - 0.001)
+        self.assertTrue(set(summary['commands'].keys()) <= set(['1', '2', '3', '4']))
+        self.assertTrue(len(summary['commands']) >= 3)
+        self.assertAlmostEqual(sum(summary['commands'].values()), summary['executing'], 2)
+        self.assertTrue(summary['pollSleep'] > 0)
+        return
+
+    def testLogSink(self):
+        records = _Records()
+        logger = logging.getLogger("testWfaMetrics")
+        logger.addHandler(records)
+        logger.setLevel(logging.INFO)
+        sink = WfaJobLogSink(logger)
+        metrics.addJobSink(sink)
+        try:
+            wfa = self._runJob()
+        finally:
+            metrics.removeJobSink(sink)
+            logger.removeHandler(records)
+
+        self.assertEqual(len(records.messages), 1)
+        summary = json.loads(records.messages[0])
+        self.assertEqual((summary['jobId'], summary['status'], summary['wfaServer']),
+                         (wfa.jobDict['jobId'], "DONE", self.mock.wfaServer))
+        # One line, keys in order.
+        self.assertFalse("\n" in records.messages[0])
+        self.assertEqual(records.messages[0], json.dumps(summary, sort_keys=True))
+        return
+
+    def testFailingSinkIsIsolated(self):
+        summaries = []
+        def failing(summary):
+            raise Exception("sink down")
+        metrics.addJobSink(failing)
+        metrics.addJobSink(summaries.append)
+        logging.getLogger("WfaMetrics").disabled = True
+        try:
+            self._runJob()
+        finally:
+            logging.getLogger("WfaMetrics").disabled = False
+            metrics.removeJobSink(failing)
+            metrics.removeJobSink(summaries.append)
+        self.assertEqual(len(summaries), 1)
+        return
+
+class TestPrometheusText(MetricsCase):
+
+    def testFormat(self):
+        self._runJob()
+        text = metrics.prometheusText()
+        self.assertTrue(text.endswith("\n"))
+        lines = text.splitlines()
+        samples = {}
+        for line in lines:
+            if(line.startswith('#')):
+                self.assertTrue(line.startswith("# HELP ") or line.startswith("# TYPE "))
+                continue
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+
+        self.assertTrue("# TYPE wfa_request_duration_seconds histogram" in lines)
+        self.assertTrue("# TYPE wfa_requests_total counter" in lines)
+        self.assertTrue("# TYPE wfa_jobs_in_flight gauge" in lines)
+        labels = "endpoint=\"job_status\",phase=\"total\",server=\"" + self.mock.wfaServer + "\""
+        # Buckets are cumulative and the unbounded one holds every observation.
+        buckets = [(name, value) for name, value in samples.items()
+                   if name.startswith("wfa_request_duration_seconds_bucket{" + labels)]
+        counts = [value for name, value in sorted(buckets, key=lambda item: _bound(item[0]))]
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(samples["wfa_request_duration_seconds_bucket{" + labels + ",le=\"+Inf\"}"],
+                         samples["wfa_request_duration_seconds_count{" + labels + "}"])
+        for phase in REQUEST_PHASES:
+            self.assertTrue("wfa_request_duration_seconds_count{endpoint=\"execute\",phase=\"" + phase +
+                            "\",server=\"" + self.mock.wfaServer + "\"}" in samples)
+        self.assertEqual(samples["wfa_requests_total{endpoint=\"execute\",server=\"" + self.mock.wfaServer +
+                                 "\",status=\"201\"}"], 1)
+        self.assertEqual(samples["wfa_jobs_total{server=\"" + self.mock.wfaServer + "\",status=\"DONE\"}"], 1)
+        self.assertEqual(samples["wfa_job_phase_seconds_count{phase=\"executing\"}"], 1)
+        self.assertEqual(samples["wfa_jobs_in_flight"], 0)
+        return
+
+    def testLabelsAreEscaped(self):
+        metrics.finishRequest(metrics.startRequest('wfa"1\\', "GET", "/rest/workflows/jobs/1"), None)
+        text = metrics.prometheusText()
+        self.assertTrue("wfa_requests_total{endpoint=\"job_status\",server=\"wfa\\\"1\\\\\",status=\"none\"} 1"
+                        in text.splitlines())
+        return
+
+def _bound(name):
+    bound = name[name.index("le=\"") + 4:-2]
+    if(bound == "+Inf"):
+        return(float('inf'))
+    return(float(bound))
+
+if __name__ == '__main__':
+    unittest.main()
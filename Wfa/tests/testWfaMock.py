@@ -0,0 +1,241 @@
+'''
+Created on Oct 17, 2026
+
+testWfaMock.py - WfaMock spoken to with plain httplib: authentication, the jobs listing filters and paging, ETags and
+304 replies, response encoding, the error and failure rates, and idle connections closed by the server.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import base64
+import httplib
+import time
+import unittest
+import zlib
+from xml.etree import ElementTree as ET
+
+from WfaMock import WfaMockServer
+
+CREATE_SHARE = 'os_create_nfs_share_cdot'
+DELETE_SHARE = 'os_delete_nfs_share_cdot'
+AUTHORIZATION = "Basic " + base64.b64encode("user:pw")
+
+class MockCase(unittest.TestCase):
+
+    def setUp(self):
+        self.mock = WfaMockServer(jobDuration=10).start()
+        return
+
+    def tearDown(self):
+        self.mock.stop()
+        return
+
+    def _request(self, path, method="GET", headers=None, body=None):
+        # One connection per request; returns (status, headers, body).
+        requestHeaders = { 'Authorization' : AUTHORIZATION }
+        requestHeaders.update(headers or {})
+        conn = httplib.HTTPConnection(self.mock.wfaServer, timeout=10)
+        try:
+            conn.request(method, path, body, requestHeaders)
+            response = conn.getresponse()
+            return((response.status, dict(response.getheaders()), response.read()))
+        finally:
+            conn.close()
+
+    def _listing(self, query=""):
+        status, headers, body = self._request("/rest/workflows/jobs" + query)
+        self.assertEqual(status, 200)
+        return([job.get('jobId') for job in ET.fromstring(body).findall('job')])
+
+    def _execute(self, workflowName):
+        status, headers, body = self._request("/rest/workflows/" + self.mock.workflows[workflowName][1] + "/jobs",
+                                              "POST", { 'Content-Type' : 'application/xml' }, "<workflowInput/>")
+        self.assertEqual(status, 201)
+        return(ET.fromstring(body).get('jobId'))
+
+class TestRequests(MockCase):
+
+    def testAuthentication(self):
+        status, headers, body = self._request("/rest/workflows", headers={ 'Authorization' : "Bearer token" })
+        self.assertEqual((status, headers['www-authenticate']), (401, 'Basic realm="WFA"'))
+        self.assertEqual(self._request("/rest/workflows")[0], 200)
+        self.assertEqual(self.mock.users["/rest/workflows"], set([None, "user"]))
+        jobId = self._execute(DELETE_SHARE)
+        self.assertEqual(self.mock.jobUsers[jobId], "user")
+        return
+
+    def testNotFound(self):
+        for path, method in (("/rest/other", "GET"), ("/rest/workflows/no-such-uuid", "GET"),
+                             ("/rest/workflows/jobs/99", "GET"), ("/rest/workflows/no-such-uuid/jobs", "POST")):
+            self.assertEqual(self._request(path, method, body="" if method == "POST" else None)[0], 404)
+        self.assertEqual((self.mock.stats['error'], self.mock.stats['execute']), (4, 0))
+        return
+
+    def testWorkflowQuery(self):
+        status, headers, body = self._request("/rest/workflows?name=" + DELETE_SHARE)
+        workflows = ET.fromstring(body).findall('workflow')
+        self.assertEqual([workflow.findtext('name') for workflow in workflows], [DELETE_SHARE])
+        self.assertEqual(len(ET.fromstring(self._request("/rest/workflows")[2]).findall('workflow')),
+                         len(self.mock.workflows))
+        self.assertEqual(ET.fromstring(self._request("/rest/workflows?name=os_unknown")[2]).findall('workflow'), [])
+        return
+
+class TestListing(MockCase):
+
+    def setUp(self):
+        MockCase.setUp(self)
+        self.jobs = [self.mock._newJob(self.mock.workflows[(CREATE_SHARE, DELETE_SHARE)[index % 2]])
+                     for index in range(6)]
+        # Jobs 1 and 2 finished long ago and job 2 failed; the others are still scheduled.
+        self.jobs[0].startTime = self.jobs[0].startTime - 100
+        self.jobs[1].startTime = self.jobs[1].startTime - 90
+        self.jobs[1].failed = True
+        self.startTimes = [job.startTime for job in self.jobs]
+        return
+
+    def testPaging(self):
+        self.assertEqual(self._listing(), ['1', '2', '3', '4', '5', '6'])
+        self.assertEqual(self._listing("?limit=4"), ['1', '2', '3', '4'])
+        self.assertEqual(self._listing("?after=4&limit=4"), ['5', '6'])
+        self.assertEqual(self._listing("?after=6"), [])
+        self.assertEqual(self.mock.stats['listing'], 4)
+        return
+
+    def testFilters(self):
+        self.assertEqual(self._listing("?workflow_name=" + DELETE_SHARE), ['2', '4', '6'])
+        self.assertEqual(self._listing("?workflow_name=" + DELETE_SHARE + "&workflow_name=" + CREATE_SHARE),
+                         ['1', '2', '3', '4', '5', '6'])
+        self.assertEqual(self._listing("?status=COMPLETED"), ['1'])
+        self.assertEqual(self._listing("?status=FAILED&status=COMPLETED"), ['1', '2'])
+        self.assertEqual(self._listing("?status=SCHEDULED&workflow_name=" + CREATE_SHARE + "&after=3"), ['5'])
+        # The start time window includes since and excludes until.
+        self.assertEqual(self._listing("?since=" + repr(self.startTimes[1])), ['2', '3', '4', '5', '6'])
+        self.assertEqual(self._listing("?until=" + repr(self.startTimes[1])), ['1'])
+        return
+
+    def testJobStatuses(self):
+        statuses = dict([(job.get('jobId'), job.findtext('jobStatus/jobStatus')) for job in
+                         ET.fromstring(self._request("/rest/workflows/jobs")[2]).findall('job')])
+        self.assertEqual([statuses[str(jobId)] for jobId in range(1, 7)], ["COMPLETED", "FAILED"] + ["SCHEDULED"] * 4)
+        return
+
+class TestETags(MockCase):
+
+    def testNotModified(self):
+        jobPath = "/rest/workflows/jobs/" + self.mock._newJob(self.mock.workflows[DELETE_SHARE]).jobId
+        status, headers, body = self._request(jobPath)
+        etag = headers['etag']
+        self.assertEqual(status, 200)
+        self.assertEqual(self._request(jobPath, headers={ 'If-None-Match' : etag })[0::2], (304, ""))
+        self.assertEqual(self._request(jobPath, headers={ 'If-None-Match' : '"other"' })[0], 200)
+        self.assertEqual(self.mock.stats['notModified'], 1)
+
+        # A job that has moved on has a new ETag.
+        self.mock.jobs[jobPath.split('/')[-1]].startTime -= self.mock.jobDuration
+        status, headers, body = self._request(jobPath, headers={ 'If-None-Match' : etag })
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers['etag'], etag)
+        return
+
+    def testNoETagsOnPost(self):
+        status, headers, body = self._request("/rest/workflows/" + self.mock.workflows[DELETE_SHARE][1] + "/jobs",
+                                              "POST", body="<workflowInput/>")
+        self.assertEqual(status, 201)
+        self.assertFalse('etag' in headers)
+        return
+
+class TestWithoutETags(MockCase):
+
+    def setUp(self):
+        self.mock = WfaMockServer(etags=False, compress=False).start()
+        return
+
+    def testAlwaysTheBody(self):
+        status, headers, body = self._request("/rest/workflows", headers={ 'If-None-Match' : '"anything"',
+                                                                            'Accept-Encoding' : 'gzip' })
+        self.assertEqual(status, 200)
+        self.assertFalse('etag' in headers or 'content-encoding' in headers or 'vary' in headers)
+        self.assertTrue(body.startswith("<collection"))
+        self.assertEqual(self.mock.stats['compressed'], 0)
+        return
+
+class TestEncoding(MockCase):
+
+    def testAcceptEncoding(self):
+        plain = self._request("/rest/workflows")[2]
+        status, headers, body = self._request("/rest/workflows", headers={ 'Accept-Encoding' : 'gzip, deflate' })
+        self.assertEqual(headers['content-encoding'], 'gzip')
+        self.assertEqual(zlib.decompress(body, 16 + zlib.MAX_WBITS), plain)
+        status, headers, body = self._request("/rest/workflows", headers={ 'Accept-Encoding' : 'gzip;q=0, deflate' })
+        self.assertEqual(headers['content-encoding'], 'deflate')
+        self.assertEqual(zlib.decompress(body), plain)
+        status, headers, body = self._request("/rest/workflows", headers={ 'Accept-Encoding' : 'br' })
+        self.assertFalse('content-encoding' in headers)
+        self.assertEqual(body, plain)
+        self.assertEqual(self.mock.stats['compressed'], 2)
+        self.assertEqual(self.mock.stats['bytesBody'], 4 * len(plain))
+        return
+
+class TestRates(MockCase):
+
+    def testEveryRequestFails(self):
+        self.mock.errorRate = 1.0
+        for path in ("/rest/workflows", "/rest/workflows/jobs"):
+            status, headers, body = self._request(path)
+            self.assertEqual((status, body), (503, ""))
+        self.assertEqual(self._request("/rest/workflows/" + self.mock.workflows[DELETE_SHARE][1] + "/jobs", "POST",
+                                       body="<workflowInput/>")[0], 503)
+        self.assertEqual((self.mock.stats['error'], self.mock.stats['execute'], len(self.mock.jobs)), (3, 0, 0))
+        # Authentication is checked first.
+        self.assertEqual(self._request("/rest/workflows", headers={ 'Authorization' : "none" })[0], 401)
+        return
+
+    def _pattern(self, **settings):
+        mock = WfaMockServer(seed=7, **settings).start()
+        try:
+            self.mock, previous = mock, self.mock
+            statuses = [self._request("/rest/workflows/jobs")[0] for index in range(40)]
+            failed = [mock._newJob(mock.workflows[DELETE_SHARE]).failed for index in range(40)]
+        finally:
+            self.mock = previous
+            mock.stop()
+        return(statuses, failed)
+
+    def testSeededRates(self):
+        statuses, failed = self._pattern(errorRate=0.5, failureRate=0.25)
+        self.assertEqual(set(statuses), set([200, 503]))
+        self.assertTrue(5 < statuses.count(503) < 35)
+        self.assertTrue(0 < failed.count(True) < 30)
+        # The same seed gives the same pattern.
+        self.assertEqual(self._pattern(errorRate=0.5, failureRate=0.25), (statuses, failed))
+        self.assertEqual(self._pattern(), ([200] * 40, [False] * 40))
+        return
+
+class TestKeepAlive(MockCase):
+
+    def setUp(self):
+        self.mock = WfaMockServer(keepAliveTimeout=0.2).start()
+        return
+
+    def testIdleConnectionIsClosed(self):
+        conn = httplib.HTTPConnection(self.mock.wfaServer, timeout=10)
+        try:
+            for request in range(2):
+                conn.request("GET", "/rest/workflows", None, { 'Authorization' : AUTHORIZATION })
+                response = conn.getresponse()
+                response.read()
+                self.assertFalse(response.will_close)
+            # Both requests went over one connection.
+            self.assertEqual((self.mock.stats['connections'], self.mock.openConnections), (1, 1))
+            deadline = time.time() + 5
+            while(self.mock.openConnections != 0 and time.time() < deadline):
+                time.sleep(0.02)
+            self.assertEqual(self.mock.openConnections, 0)
+            self.assertEqual(self.mock.stats['peakConnections'], 1)
+        finally:
+            conn.close()
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+'''
+Created on Oct 17, 2026
+
+testWfaOs.py - WfaOs.submitMany against WfaMock: results in input order, per-item errors, the in-flight bound and the
+timeout.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from Wfa import MANILA_WORKFLOWS, WfaOs
+from WfaConcurrent import WfaTimeoutError
+from WfaMock import WfaMockServer
+from WfaSerializer import WfaInputError
+from WfaTransport import getConnectionPool
+from WfaWorkflowCache import uuidTable, workflowCache
+
+class WfaOsCase(unittest.TestCase):
+    jobDuration = 0.3
+
+    def setUp(self):
+        self.mock = WfaMockServer(jobDuration=self.jobDuration).start()
+        return
+
+    def tearDown(self):
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        return
+
+    def wfaOs(self, **extra):
+        wfaDict = { 'wfaServer' : self.mock.wfaServer, 'wfaUser' : 'user', 'wfaPw' : 'pw', 'osProject' : 'manila',
+                    'wfaPlatform' : 'cdot', 'wfaOperation' : 'delete_share', 'wfaExtraSpec' : None,
+                    'wfaPollInterval' : 0.05, 'wfaPollMaxInterval' : 0.1 }
+        wfaDict.update(extra)
+        return(WfaOs(wfaDict))
+
+class TestSubmitMany(WfaOsCase):
+
+    def _maxOverlap(self):
+        # The most mock jobs running at the same moment.
+        events = []
+        for job in self.mock.jobs.values():
+            events.append((job.startTime, 1))
+            events.append((job.startTime + self.mock.jobDuration, -1))
+        running = 0
+        peak = 0
+        for when, change in sorted(events):
+            running = running + change
+            peak = max(peak, running)
+        return(peak)
+
+    def testResultsInInputOrder(self):
+        shares = [{ 'shareName' : 'share' + str(index) } for index in range(10)]
+        results = self.wfaOs().submitMany('delete_share', shares, maxInFlight=4)
+        self.assertEqual([result['status'] for result in results], ["DONE"] * 10)
+        self.assertEqual([result['error'] for result in results], [None] * 10)
+        self.assertEqual(self.mock.stats['execute'], 10)
+        for index, result in enumerate(results):
+            job = self.mock.jobs[result['jobDict']['jobId']]
+            self.assertEqual(job.workflow[0], 'os_delete_nfs_share_cdot')
+            self.assertEqual(result['jobDict']['jobStatus'], "COMPLETED")
+        self.assertEqual(len(set([result['jobDict']['jobId'] for result in results])), 10)
+        return
+
+    def testMaxInFlight(self):
+        shares = [{ 'shareName' : 'share' + str(index) } for index in range(8)]
+        results = self.wfaOs().submitMany('delete_share', shares, maxInFlight=2)
+        self.assertEqual([result['status'] for result in results], ["DONE"] * 8)
+        self.assertEqual(self._maxOverlap(), 2)
+        return
+
+    def testPerItemInputErrors(self):
+        # The instance is set up for another workflow by UUID; the batch still runs grant_ip.
+        deleteUUID = self.mock.workflows['os_delete_nfs_share_cdot'][1]
+        wfa = self.wfaOs(workflowUUID=deleteUUID, wfaExtraSpec={ 'volName' : 'share1', 'protocol' : 'nfs' })
+        requests = [{ 'shareIP' : '10.0.0.1', 'shareName' : 'share1', 'accessType' : 'rw' },
+                    { 'shareIP' : '10.0.0.2', 'shareName' : 'share1', 'accessType' : 'everything' },
+                    { 'shareIP' : '10.0.0.3', 'shareName' : 'share1', 'accessType' : 'ro' }]
+        results = wfa.submitMany('grant_ip', requests, maxInFlight=2)
+        self.assertEqual([result['status'] for result in results], ["DONE", "ERROR", "DONE"])
+        self.assertTrue(isinstance(results[1]['error'], WfaInputError))
+        self.assertEqual(results[1]['jobDict']['jobId'], None)
+        self.assertEqual(self.mock.stats['execute'], 2)
+        for index in (0, 2):
+            self.assertEqual(self.mock.jobs[results[index]['jobDict']['jobId']].workflow[0], 'os_grant_ip_cdot')
+        return
+
+    def testTrackingFailureDoesNotHang(self):
+        def failingWatch(self, callback=None):
+            raise IOError("monitor unavailable")
+        watchJob = WfaOs.watchJob
+        WfaOs.watchJob = failingWatch
+        try:
+            startTime = time.time()
+            results = self.wfaOs().submitMany('delete_share', [{ 'shareName' : 'a' }, { 'shareName' : 'b' }],
+                                              maxInFlight=1, timeout=10)
+        finally:
+            WfaOs.watchJob = watchJob
+        self.assertTrue(time.time() - startTime < 5)
+        self.assertEqual([result['status'] for result in results], ["ERROR", "ERROR"])
+        for result in results:
+            self.assertTrue(isinstance(result['error'], IOError))
+            # The job was submitted; only following it failed.
+            self.assertTrue(result['jobDict']['jobId'] in self.mock.jobs)
+        return
+
+class TestSubmitManyTimeout(WfaOsCase):
+    jobDuration = 1.0
+
+    def testTimeout(self):
+        shares = [{ 'shareName' : 'share' + str(index) } for index in range(6)]
+        startTime = time.time()
+        results = self.wfaOs().submitMany('delete_share', shares, maxInFlight=2, timeout=0.5)
+        self.assertTrue(time.time() - startTime < 0.9)
+        self.assertEqual([result['status'] for result in results[:2]], ["OK", "OK"])
+        self.assertEqual([result['error'] for result in results[:2]], [None, None])
+        for result in results[2:]:
+            self.assertEqual(result['status'], "ERROR")
+            self.assertTrue(isinstance(result['error'], WfaTimeoutError))
+        # Submissions left waiting are dropped, not run later.
+        time.sleep(self.jobDuration + 0.3)
+        self.assertEqual(self.mock.stats['execute'], 2)
+        return
+
+class TestResolveWorkflowUUIDs(WfaOsCase):
+
+    def setUp(self):
+        WfaOsCase.setUp(self)
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "uuids.json")
+        self.filledKey = (self.mock.wfaServer, 'manila', 'cdot')
+        return
+
+    def tearDown(self):
+        # The table and the cache are process wide; forget what this server added to them.
+        for workflowName in dict(MANILA_WORKFLOWS['cdot']).values():
+            uuidTable.remove(self.mock.wfaServer, workflowName)
+        uuidTable._filled.discard(self.filledKey)
+        uuidTable._filled.discard(('file', self.path))
+        workflowCache.invalidate(self.mock.wfaServer)
+        shutil.rmtree(self.directory)
+        WfaOsCase.tearDown(self)
+        return
+
+    def testResolvedOncePerServerAndPlatform(self):
+        wfa = self.wfaOs(wfaResolveUUIDs=True, wfaUUIDTable=self.path)
+        # The mock has every cdot workflow but os_delete_nfs_share_snapshot_cdot, which is skipped.
+        workflowNames = sorted(set(dict(MANILA_WORKFLOWS['cdot']).values()))
+        self.assertEqual(self.mock.stats['workflow'], len(workflowNames))
+        resolved = dict([(name, uuidTable.get(self.mock.wfaServer, name)) for name in workflowNames])
+        self.assertEqual(resolved.pop('os_delete_nfs_share_snapshot_cdot'), None)
+        self.assertEqual(resolved, dict([(name, self.mock.workflows[name][1]) for name in resolved]))
+        self.assertTrue(uuidTable.isFilled(self.filledKey))
+        # The instance itself goes straight to its workflow by UUID.
+        self.assertEqual(wfa.workflowUUID, self.mock.workflows['os_delete_nfs_share_cdot'][1])
+        self.assertTrue(wfa.workflowQueryURI.endswith("/rest/workflows/" + wfa.workflowUUID))
+        with open(self.path) as tableFile:
+            self.assertEqual(json.load(tableFile)[self.mock.wfaServer], resolved)
+
+        # Every later instance, for any operation, finds its definition cached.
+        for operation in ('delete_share', 'grant_ip', 'create_snapshot'):
+            wfa = self.wfaOs(wfaOperation=operation, wfaResolveUUIDs=True)
+            self.assertEqual(wfa.workflowUUID, resolved[wfa.wfaDict['workflowName']])
+            self.assertEqual(wfa.getWorkflowDefinition().uuid, wfa.workflowUUID)
+        self.assertEqual(self.mock.stats['workflow'], len(workflowNames))
+        return
+
+    def testKnownUUIDsAreNotLookedUp(self):
+        uuidTable.put(self.mock.wfaServer, 'os_grant_ip_cdot', self.mock.workflows['os_grant_ip_cdot'][1])
+        self.wfaOs(wfaResolveUUIDs=True)
+        self.assertEqual(self.mock.stats['workflow'], len(set(dict(MANILA_WORKFLOWS['cdot']).values())) - 1)
+        self.assertFalse('/rest/workflows?name=os_grant_ip_cdot' in self.mock.users)
+        self.assertTrue('/rest/workflows?name=os_deny_ip_cdot' in self.mock.users)
+        return
+
+    def testStaleUUIDFallsBackToTheName(self):
+        # A UUID resolved before the workflow was imported again.
+        uuidTable.put(self.mock.wfaServer, 'os_delete_nfs_share_cdot', 'stale-uuid')
+        wfa = self.wfaOs()
+        self.assertEqual(wfa.workflowUUID, 'stale-uuid')
+        workflowDef = wfa.getWorkflowDefinition()
+        self.assertEqual(workflowDef.uuid, self.mock.workflows['os_delete_nfs_share_cdot'][1])
+        self.assertEqual(uuidTable.get(self.mock.wfaServer, 'os_delete_nfs_share_cdot'), workflowDef.uuid)
+        self.assertEqual((self.mock.stats['error'], self.mock.stats['workflow']), (1, 1))
+        return
+
+if __name__ == '__main__':
+    unittest.main()
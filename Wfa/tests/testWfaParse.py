@@ -0,0 +1,174 @@
+'''
+Created on Oct 17, 2026
+
+testWfaParse.py - the streaming parsers on the job documents, job listings and workflow definitions WfaMock
+serves: the fields picked out, collections parsed one job at a time, and responses read through the pooled transport.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import unittest
+from StringIO import StringIO
+
+from WfaMock import WfaMockServer
+from WfaParse import ET, iterJobRecords, parseJobStream, parseWorkflowDef, parseWorkflowStream, readResponse
+from WfaTransport import WfaSession, getConnectionPool
+
+CREATE_SHARE = 'os_create_nfs_share_cdot'
+DELETE_SHARE = 'os_delete_nfs_share_cdot'
+GRANT_IP = 'os_grant_ip_cdot'
+
+class _CountedStream(object):
+    '''
+    _CountedStream - a stream that counts the bytes read from it
+    '''
+
+    def __init__(self, data):
+        self._stream = StringIO(data)
+        self.size = len(data)
+        self.bytesRead = 0
+        return
+
+    def read(self, amt=None):
+        data = self._stream.read(amt)
+        self.bytesRead = self.bytesRead + len(data)
+        return(data)
+
+class ParseCase(unittest.TestCase):
+
+    def setUp(self):
+        self.mock = WfaMockServer(jobDuration=10, commands=4).start()
+        return
+
+    def tearDown(self):
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        return
+
+    def _jobRecord(self, job, elapsed):
+        return(parseJobStream(StringIO(self.mock._jobXml(job, job.startTime + elapsed))))
+
+class TestJobParsers(ParseCase):
+
+    def testJobDocument(self):
+        job = self.mock._newJob(self.mock.workflows[CREATE_SHARE])
+        record = self._jobRecord(job, 0)
+        self.assertEqual((record.jobId, record.jobStatus, record.errorMessage), (job.jobId, "SCHEDULED", None))
+        self.assertEqual((record.currentCommandIndex, record.commandsNumber), (0, 4))
+        self.assertEqual((record.workflowName, record.workflowUUID), self.mock.workflows[CREATE_SHARE][:2])
+        self.assertEqual(record.links, { 'self' : "http://" + self.mock.wfaServer + "/rest/workflows/jobs/" +
+                                                  job.jobId })
+        self.assertEqual((record.returnParams, record.endTime), ((), None))
+        self.assertTrue(record.startTime != None)
+
+        record = self._jobRecord(job, 5)
+        self.assertEqual((record.jobStatus, record.currentCommandIndex), ("EXECUTING", 2))
+
+        record = self._jobRecord(job, 10)
+        self.assertEqual(record.jobStatus, "COMPLETED")
+        self.assertEqual(record.returnParams, job.returnParams)
+        self.assertEqual(record.currentCommandIndex, 4)
+        self.assertTrue(record.endTime != None)
+        return
+
+    def testFailedJob(self):
+        job = self.mock._newJob(self.mock.workflows[DELETE_SHARE])
+        job.failed = True
+        record = self._jobRecord(job, 10)
+        self.assertEqual((record.jobStatus, record.errorMessage), ("FAILED", "Mock failure of job " + job.jobId))
+        self.assertEqual(record.returnParams, ())
+        return
+
+    def testNoJob(self):
+        self.assertRaises(Exception, parseJobStream, StringIO("<collection/>"))
+        return
+
+    def testListingIsParsedOneJobAtATime(self):
+        jobs = [self.mock._newJob(self.mock.workflows[(CREATE_SHARE, DELETE_SHARE)[index % 2]]) for index in range(400)]
+        for job in jobs[:100]:
+            job.startTime = job.startTime - 10
+        now = jobs[-1].startTime
+        stream = _CountedStream("<collection xmlns:atom=\"http://www.w3.org/2005/Atom\">" +
+                                "".join([self.mock._jobXml(job, now, False) for job in jobs]) + "</collection>")
+        records = iterJobRecords(stream)
+        first = next(records)
+        self.assertEqual((first.jobId, first.jobStatus, first.returnParams), ('1', "COMPLETED", jobs[0].returnParams))
+        # The first job is handed out before the rest of the listing has been read.
+        self.assertTrue(stream.bytesRead < stream.size / 2)
+
+        rest = list(records)
+        self.assertEqual(stream.bytesRead, stream.size)
+        self.assertEqual([record.jobId for record in rest], [job.jobId for job in jobs[1:]])
+        self.assertEqual([record.workflowName for record in rest[:2]], [DELETE_SHARE, CREATE_SHARE])
+        self.assertEqual([record.jobStatus for record in rest[98:100]], ["COMPLETED", "SCHEDULED"])
+        # Return parameters and links belong to their own job.
+        self.assertEqual(rest[98].returnParams, jobs[99].returnParams)
+        self.assertEqual(rest[99].returnParams, ())
+        self.assertTrue(rest[-1].links['self'].endswith("/jobs/" + jobs[-1].jobId))
+        return
+
+    def testPooledResponse(self):
+        job = self.mock._newJob(self.mock.workflows[CREATE_SHARE])
+        session = WfaSession(self.mock.wfaServer, "user", "pw")
+        response = session.urlopen("http://" + self.mock.wfaServer + "/rest/workflows/jobs/" + job.jobId)
+        record = readResponse(response, parseJobStream)
+        self.assertEqual((record.jobId, record.jobStatus), (job.jobId, "SCHEDULED"))
+        # The compressed response was read to the end, so its connection went back to the pool.
+        self.assertEqual(self.mock.stats['compressed'], 1)
+        self.assertEqual(getConnectionPool(self.mock.wfaServer).idleCount(), 1)
+
+        response = session.urlopen("http://" + self.mock.wfaServer + "/rest/workflows/jobs?limit=1")
+        self.assertEqual([record.jobId for record in readResponse(response, lambda stream:
+                                                                  list(iterJobRecords(stream)))], [job.jobId])
+        self.assertEqual(getConnectionPool(self.mock.wfaServer).idleCount(), 1)
+        return
+
+class TestWorkflowParsers(ParseCase):
+
+    def _check(self, workflowDef, workflowName):
+        name, uuid, inputs, returnParams = self.mock.workflows[workflowName]
+        self.assertEqual((workflowDef.name, workflowDef.uuid), (name, uuid))
+        self.assertEqual(workflowDef.executeLink, "http://" + self.mock.wfaServer + "/rest/workflows/" + uuid +
+                         "/jobs")
+        self.assertEqual([(userInput.name, userInput.type, userInput.mandatory, userInput.allowedValues)
+                          for userInput in workflowDef.inputs], list(inputs))
+        self.assertEqual(workflowDef.returnParams, returnParams)
+        return
+
+    def testWorkflowDocument(self):
+        workflowDef = parseWorkflowStream(StringIO(self.mock._workflowXml(self.mock.workflows[GRANT_IP])), '"1"',
+                                          "yesterday")
+        self._check(workflowDef, GRANT_IP)
+        self.assertEqual(workflowDef.inputs[3].allowedValues, ('rw', 'ro', 'su'))
+        self.assertEqual((workflowDef.etag, workflowDef.lastModified, workflowDef.serializer), ('"1"', "yesterday",
+                                                                                                 None))
+        return
+
+    def testCollectionTakesTheFirstWorkflow(self):
+        workflows = [self.mock.workflows[name] for name in (CREATE_SHARE, GRANT_IP)]
+        stream = StringIO("<collection xmlns:atom=\"http://www.w3.org/2005/Atom\">" +
+                          "".join([self.mock._workflowXml(workflow, False) for workflow in workflows]) +
+                          "</collection>")
+        workflowDef = parseWorkflowStream(stream)
+        self._check(workflowDef, CREATE_SHARE)
+        self.assertEqual(workflowDef.returnParams, ('export_path',))
+        return
+
+    def testNotFound(self):
+        self.assertRaises(Exception, parseWorkflowStream, StringIO("<collection/>"))
+        return
+
+    def testQueryResponseAndTree(self):
+        session = WfaSession(self.mock.wfaServer, "user", "pw")
+        response = session.urlopen("http://" + self.mock.wfaServer + "/rest/workflows?name=" + DELETE_SHARE)
+        workflowDef = readResponse(response, lambda stream: parseWorkflowStream(stream, response.getheader('ETag')))
+        self._check(workflowDef, DELETE_SHARE)
+        self.assertTrue(workflowDef.etag.startswith('"'))
+        # A tree already parsed gives the same definition.
+        treeDef = parseWorkflowDef(ET.fromstring(self.mock._workflowXml(self.mock.workflows[DELETE_SHARE])))
+        self._check(treeDef, DELETE_SHARE)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
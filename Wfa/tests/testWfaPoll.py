@@ -0,0 +1,88 @@
+'''
+Created on Oct 17, 2026
+
+testWfaPoll.py - change aware job polls against WfaMock: conditional requests, bodies recognised as unchanged, and
+polls paced by the command rate.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import unittest
+
+from WfaMock import WfaMockServer
+from WfaPoll import WfaPollState, pollJob
+from WfaTransport import WfaSession, getConnectionPool
+
+DELETE_SHARE = 'os_delete_nfs_share_cdot'
+
+class PollCase(unittest.TestCase):
+    etags = True
+
+    def setUp(self):
+        self.mock = WfaMockServer(jobDuration=60, etags=self.etags).start()
+        self.session = WfaSession(self.mock.wfaServer, "user", "pw")
+        self.job = self.mock._newJob(self.mock.workflows[DELETE_SHARE])
+        self.jobSelfLink = "http://" + self.mock.wfaServer + "/rest/workflows/jobs/" + self.job.jobId
+        return
+
+    def tearDown(self):
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        return
+
+    def _finish(self):
+        self.job.startTime = self.job.startTime - self.mock.jobDuration
+        return
+
+class TestConditionalPoll(PollCase):
+
+    def testNotModified(self):
+        pollState = WfaPollState()
+        record = pollJob(self.session, self.jobSelfLink, pollState)
+        self.assertEqual(record.jobStatus, "SCHEDULED")
+        self.assertTrue(pollState.etag != None)
+        self.assertEqual(pollJob(self.session, self.jobSelfLink, pollState), None)
+        self.assertEqual((pollState.notModified, pollState.unchanged), (1, 0))
+        self.assertEqual(self.mock.stats['notModified'], 1)
+
+        self._finish()
+        self.assertEqual(pollJob(self.session, self.jobSelfLink, pollState).jobStatus, "COMPLETED")
+        return
+
+class TestFingerprintedPoll(PollCase):
+    etags = False
+
+    def testUnchangedBody(self):
+        pollState = WfaPollState()
+        self.assertEqual(pollJob(self.session, self.jobSelfLink, pollState).jobStatus, "SCHEDULED")
+        self.assertEqual(pollState.requestHeaders(), None)
+        self.assertEqual(pollJob(self.session, self.jobSelfLink, pollState), None)
+        self.assertEqual((pollState.notModified, pollState.unchanged), (0, 1))
+
+        self._finish()
+        record = pollJob(self.session, self.jobSelfLink, pollState)
+        self.assertEqual(record.jobStatus, "COMPLETED")
+        self.assertEqual(record.returnParams, self.job.returnParams)
+        return
+
+class TestPollState(unittest.TestCase):
+
+    def testInterval(self):
+        pollState = WfaPollState()
+        pollState.observeProgress(0, 100.0)
+        self.assertEqual(pollState.interval(1, 30), None)
+        pollState.observeProgress(2, 120.0)
+        self.assertEqual(pollState.commandTime, 10.0)
+        self.assertEqual(pollState.interval(1, 30), 5.0)
+        # The same index again is no progress.
+        pollState.observeProgress(2, 150.0)
+        self.assertEqual(pollState.progressTime, 120.0)
+        pollState.observeProgress(3, 150.0)
+        self.assertEqual(pollState.commandTime, 20.0)
+        self.assertEqual(pollState.interval(1, 8), 8)
+        self.assertEqual(pollState.interval(12, 30), 12)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
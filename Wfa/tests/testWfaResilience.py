@@ -0,0 +1,209 @@
+'''
+Created on Oct 17, 2026
+
+testWfaResilience.py - the circuit breaker state machine, the classification of transient failures, retry delays,
+and sessions against a WfaMock answering 503: GETs retried, POSTs never re-sent, the breaker opening and probing,
+and a job followed to the end through a server failing half of its requests.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import httplib
+import socket
+import time
+import unittest
+import urllib2
+
+from Wfa import Wfa
+from WfaMock import WfaMockServer
+from WfaResilience import (CLOSED, DEFAULT_RETRIES, HALF_OPEN, OPEN, WfaCircuitBreaker, WfaCircuitOpenError,
+                           WfaRequestPolicy, getCircuitBreaker, isTimeout, isTransient, policyFromDict)
+from WfaTransport import WfaSession, getConnectionPool
+
+DELETE_SHARE = 'os_delete_nfs_share_cdot'
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def testOpensAfterConsecutiveFailures(self):
+        breaker = WfaCircuitBreaker("wfa1:80", 3, 60)
+        breaker.failure()
+        breaker.failure()
+        # A success in between starts the count again.
+        breaker.success()
+        breaker.failure()
+        breaker.failure()
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.allow()
+        breaker.failure()
+        self.assertEqual(breaker.state, OPEN)
+        try:
+            breaker.allow()
+            self.fail("an open breaker let a request through")
+        except WfaCircuitOpenError, e:
+            self.assertEqual(e.wfaServer, "wfa1:80")
+            self.assertTrue(59 < e.retryAfter <= 60)
+        return
+
+    def testProbe(self):
+        breaker = WfaCircuitBreaker("wfa1:80", 1, 0.05)
+        breaker.failure()
+        self.assertRaises(WfaCircuitOpenError, breaker.allow)
+        time.sleep(0.1)
+        # One probe goes through once the reset timeout has passed; the others are refused while it runs.
+        breaker.allow()
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertRaises(WfaCircuitOpenError, breaker.allow)
+        breaker.failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertRaises(WfaCircuitOpenError, breaker.allow)
+
+        time.sleep(0.1)
+        breaker.allow()
+        breaker.success()
+        self.assertEqual((breaker.state, breaker.failures), (CLOSED, 0))
+        breaker.allow()
+        breaker.allow()
+        return
+
+    def testRegistry(self):
+        breaker = getCircuitBreaker("testWfaResilience:1", 2, 5)
+        self.assertEqual((breaker.threshold, breaker.resetTimeout), (2, 5))
+        # The settings only count when the breaker is created.
+        self.assertTrue(getCircuitBreaker("testWfaResilience:1", 7, 9) is breaker)
+        self.assertEqual(breaker.threshold, 2)
+        return
+
+class TestClassification(unittest.TestCase):
+
+    def _httpError(self, code):
+        return(urllib2.HTTPError("http://wfa1/rest/workflows", code, "status " + str(code), {}, None))
+
+    def testTransient(self):
+        for code in (502, 503, 504):
+            self.assertTrue(isTransient(self._httpError(code)))
+        # WFA answers bad input with 500; that would only fail again.
+        for code in (400, 401, 404, 500):
+            self.assertFalse(isTransient(self._httpError(code)))
+        for exception in (socket.error(111, "Connection refused"), socket.timeout("timed out"),
+                          httplib.BadStatusLine("")):
+            self.assertTrue(isTransient(exception))
+        self.assertFalse(isTransient(WfaCircuitOpenError("wfa1:80", 1.0)))
+        self.assertFalse(isTransient(ValueError("bad value")))
+        self.assertTrue(isTimeout(socket.timeout("timed out")))
+        self.assertFalse(isTimeout(socket.error(111, "Connection refused")))
+        return
+
+    def testPolicy(self):
+        policy = WfaRequestPolicy(backoff=0.5, maxBackoff=3.0)
+        for attempt, delay in enumerate((0.5, 1.0, 2.0, 3.0, 3.0)):
+            self.assertTrue(0.8 * delay <= policy.delay(attempt) <= 1.2 * delay)
+        policy = policyFromDict({ 'wfaRetries' : 0, 'wfaReadTimeout' : 5, 'wfaCompress' : False })
+        self.assertEqual((policy.retries, policy.readTimeout, policy.compress), (0, 5, False))
+        self.assertEqual(policyFromDict({}).retries, DEFAULT_RETRIES)
+        return
+
+class SessionCase(unittest.TestCase):
+    errorRate = 1.0
+
+    def setUp(self):
+        self.mock = WfaMockServer(jobDuration=0.5, errorRate=self.errorRate, seed=3).start()
+        self.breaker = WfaCircuitBreaker(self.mock.wfaServer, 2, 0.2)
+        self.jobDict = {}
+        return
+
+    def tearDown(self):
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        return
+
+    def _session(self, retries):
+        return(WfaSession(self.mock.wfaServer, "user", "pw", policy=WfaRequestPolicy(retries=retries, backoff=0.01),
+                          breaker=self.breaker))
+
+    def _get(self, session, path="/rest/workflows"):
+        response = session.urlopen("http://" + self.mock.wfaServer + path, jobDict=self.jobDict)
+        try:
+            return(response.read())
+        finally:
+            response.close()
+
+class TestSessionRetries(SessionCase):
+
+    def testGetIsRetried(self):
+        self.breaker.threshold = 10
+        try:
+            self._get(self._session(3))
+            self.fail("a failing GET returned")
+        except urllib2.HTTPError, e:
+            self.assertEqual(e.code, 503)
+        self.assertEqual(self.mock.stats['error'], 4)
+        self.assertEqual(self.jobDict, { 'retryCount' : 3 })
+        self.assertEqual(self.breaker.failures, 4)
+        return
+
+    def testPostIsNotResent(self):
+        self.breaker.threshold = 10
+        uuid = self.mock.workflows[DELETE_SHARE][1]
+        self.assertRaises(urllib2.HTTPError, self._session(3).urlopen,
+                          "http://" + self.mock.wfaServer + "/rest/workflows/" + uuid + "/jobs", "<workflowInput/>",
+                          { 'Content-Type' : 'application/xml' }, self.jobDict)
+        self.assertEqual((self.mock.stats['error'], len(self.mock.jobs)), (1, 0))
+        self.assertEqual(self.jobDict, {})
+        return
+
+    def testBreakerOpensAndProbes(self):
+        session = self._session(0)
+        for attempt in range(2):
+            self.assertRaises(urllib2.HTTPError, self._get, session)
+        self.assertEqual(self.breaker.state, OPEN)
+        # Refused without a request reaching the server.
+        self.assertRaises(WfaCircuitOpenError, self._get, session)
+        self.assertEqual((self.mock.stats['requests'], self.jobDict['circuitRejects']), (2, 1))
+
+        self.mock.errorRate = 0.0
+        time.sleep(0.25)
+        self._get(session)
+        self.assertEqual(self.breaker.state, CLOSED)
+        return
+
+    def testOtherErrorsShowTheServerIsUp(self):
+        self.mock.errorRate = 0.0
+        self.breaker.failure()
+        self.assertRaises(urllib2.HTTPError, self._get, self._session(3), "/rest/workflows/jobs/99")
+        # A 404 is not retried, and resets the count of failures.
+        self.assertEqual((self.mock.stats['error'], self.breaker.failures), (1, 0))
+        self.assertEqual(self.jobDict, {})
+        return
+
+class TestUnreliableServer(SessionCase):
+    errorRate = 0.5
+
+    def testGetsGetThrough(self):
+        self.breaker.threshold = 100
+        session = self._session(20)
+        for request in range(10):
+            self.assertTrue(self._get(session).startswith("<collection"))
+        self.assertTrue(self.mock.stats['error'] > 0)
+        self.assertEqual(self.jobDict['retryCount'], self.mock.stats['error'])
+        return
+
+    def testJobFollowedThroughErrors(self):
+        # The breaker of the server is process wide; let it tolerate the failures of this run.
+        getCircuitBreaker(self.mock.wfaServer, 1000)
+        wfa = Wfa(wfaDict={ 'wfaServer' : self.mock.wfaServer, 'wfaUser' : 'user', 'wfaPw' : 'pw',
+                            'workflowName' : DELETE_SHARE, 'wfaParamMap' : { 'volName' : 'share1' }, 'wfaRetries' : 20,
+                            'wfaRetryBackoff' : 0.01, 'wfaPollInterval' : 0.02, 'wfaPollMaxInterval' : 0.05 })
+        self.mock.errorRate = 0.0
+        wfa.setupWorkflow()
+        wfa.executeWorkflow()
+        # Every status poll may now meet a 503; the GETs are retried and the job is still followed to the end.
+        self.mock.errorRate = 0.5
+        self.assertEqual(wfa.waitForCompletion(10), "DONE")
+        self.assertTrue(self.mock.stats['error'] > 0)
+        self.assertEqual(wfa.jobDict['retryCount'], self.mock.stats['error'])
+        self.assertEqual(self.mock.stats['execute'], 1)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+'''
+Created on Oct 17, 2026
+
+testWfaSchedule.py - WfaScheduler driven through acquire and release: admission order by priority class, round robin
+across tenants, aging, the AIMD limit and admission timeouts.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import collections
+import threading
+import time
+import unittest
+
+from WfaConcurrent import WfaTimeoutError
+from WfaSchedule import (AGING_INTERVAL, PRIORITY_BULK, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_URGENT,
+                         WfaScheduler)
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        # One job in flight at a time, so the queued submissions are admitted one by one.
+        self.scheduler = WfaScheduler("wfa1:80", 1, 1)
+        self.admitted = []
+        self.threads = []
+        return
+
+    def tearDown(self):
+        # Let every waiting submission in, so no thread is left behind.
+        with self.scheduler._lock:
+            self.scheduler.limit = 1000.0
+            self.scheduler._dispatch(time.time())
+        for thread in self.threads:
+            thread.join(5)
+        return
+
+    def _queue(self, priority, tenant, label):
+        # Ask for admission from a thread of its own; the ticket is recorded once admitted.
+        queued = self.scheduler._queued
+        def acquire():
+            ticket = self.scheduler.acquire(priority, tenant, 'workflow')
+            self.admitted.append((label, ticket))
+        thread = threading.Thread(target=acquire)
+        thread.daemon = True
+        thread.start()
+        self.threads.append(thread)
+        self._waitFor(lambda: self.scheduler._queued == queued + 1)
+        return
+
+    def _waitFor(self, condition):
+        deadline = time.time() + 5
+        while(not condition() and time.time() < deadline):
+            time.sleep(0.005)
+        self.assertTrue(condition())
+        return
+
+    def _drain(self, first):
+        # Release tickets one at a time and return the labels in the order the queued submissions were admitted.
+        order = []
+        ticket = first
+        while(len(order) < len(self.threads)):
+            count = len(self.admitted)
+            ticket.release()
+            self._waitFor(lambda: len(self.admitted) == count + 1)
+            label, ticket = self.admitted[-1]
+            order.append(label)
+        ticket.release()
+        return(order)
+
+    def testPriorityOrder(self):
+        first = self.scheduler.acquire(PRIORITY_NORMAL, 'a', 'workflow')
+        self._queue(PRIORITY_BULK, 'a', 'bulk')
+        self._queue(PRIORITY_NORMAL, 'a', 'normal')
+        self._queue(PRIORITY_URGENT, 'a', 'urgent')
+        self._queue(PRIORITY_HIGH, 'a', 'high')
+        self.assertEqual(self.scheduler.stats()['queued'], { 'urgent' : 1, 'high' : 1, 'normal' : 1, 'bulk' : 1 })
+        self.assertEqual(self._drain(first), ['urgent', 'high', 'normal', 'bulk'])
+        return
+
+    def testTenantRoundRobin(self):
+        first = self.scheduler.acquire(PRIORITY_NORMAL, 'a', 'workflow')
+        for label in ('a1', 'a2', 'a3'):
+            self._queue(PRIORITY_NORMAL, 'a', label)
+        for label in ('b1', 'b2'):
+            self._queue(PRIORITY_NORMAL, 'b', label)
+        self._queue(PRIORITY_NORMAL, 'c', 'c1')
+        # One tenant's backlog does not hold the others back.
+        self.assertEqual(self._drain(first), ['a1', 'b1', 'c1', 'a2', 'b2', 'a3'])
+        return
+
+    def testAging(self):
+        first = self.scheduler.acquire(PRIORITY_NORMAL, 'a', 'workflow')
+        self._queue(PRIORITY_BULK, 'a', 'bulk')
+        self._queue(PRIORITY_URGENT, 'b', 'urgent')
+        self._queue(PRIORITY_HIGH, 'c', 'high')
+        # The bulk submission has waited long enough to move past every class.
+        self.scheduler._waiting[PRIORITY_BULK]['a'][0].queuedAt -= 4 * AGING_INTERVAL
+        self.assertEqual(self._drain(first), ['bulk', 'urgent', 'high'])
+        return
+
+    def testLimitDecreasesOncePerGeneration(self):
+        self.scheduler = WfaScheduler("wfa1:80", 8, 8)
+        tickets = [self.scheduler.acquire(PRIORITY_NORMAL, 'a', 'workflow') for index in range(4)]
+        self.assertEqual(self.scheduler.inFlight, 4)
+        tickets[0].release(False)
+        self.assertEqual(self.scheduler.limit, 4.0)
+        # Admitted before the decrease: their failures do not halve the limit again.
+        tickets[1].release(False)
+        tickets[2].release(False)
+        self.assertEqual(self.scheduler.limit, 4.0)
+        time.sleep(0.01)
+        self.scheduler.acquire(PRIORITY_NORMAL, 'a', 'workflow').release(False)
+        self.assertEqual(self.scheduler.limit, 2.0)
+        self.assertEqual(self.scheduler.stats()['decreases'], 2)
+        # Only the first release of a ticket counts.
+        inFlight = self.scheduler.inFlight
+        tickets[0].release(False)
+        self.assertEqual(self.scheduler.inFlight, inFlight)
+        tickets[3].release()
+        self.assertEqual(self.scheduler.inFlight, 0)
+        return
+
+    def _finish(self, key, latency, ok=True):
+        # A job of workflow key that took latency seconds.
+        ticket = self.scheduler.acquire(PRIORITY_NORMAL, 'a', key)
+        ticket.admittedAt = time.time() - latency
+        ticket.release(ok)
+        return
+
+    def testLimitIncreasesAndSlowJobsDecreaseIt(self):
+        self.scheduler = WfaScheduler("wfa1:80", 4, 8)
+        self._finish('workflow', 1.0)
+        self.assertEqual(self.scheduler.limit, 4.25)
+        for index in range(40):
+            self._finish('workflow', 1.0)
+        self.assertEqual(self.scheduler.limit, 8.0)
+        # About limit jobs per step of 1, up to the maximum.
+        self.assertEqual(self.scheduler.stats()['increases'], 24)
+
+        # A job far slower than its workflow usually takes signals congestion.
+        self._finish('workflow', 3.0)
+        self.assertEqual(self.scheduler.limit, 4.0)
+        # Another workflow has its own usual latency.
+        self._finish('other', 3.0)
+        self.assertEqual(self.scheduler.limit, 4.25)
+        return
+
+    def testAdmissionTimeout(self):
+        first = self.scheduler.acquire(PRIORITY_NORMAL, 'a', 'workflow')
+        startTime = time.time()
+        self.assertRaises(WfaTimeoutError, self.scheduler.acquire, PRIORITY_URGENT, 'b', 'workflow', 0.1)
+        self.assertTrue(time.time() - startTime < 1)
+        stats = self.scheduler.stats()
+        self.assertEqual((stats['timeouts'], stats['queued']['urgent'], stats['inFlight']), (1, 0, 1))
+        self.assertEqual(self.scheduler._turns[PRIORITY_URGENT], collections.deque())
+        first.release()
+        self.scheduler.acquire(PRIORITY_URGENT, 'b', 'workflow', 0.1).release()
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+'''
+Created on Oct 17, 2026
+
+testWfaSerializer.py - the compiled workflow input serializer: values converted, validated and escaped.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import unittest
+from xml.etree import cElementTree as ET
+from xml.sax.saxutils import escape
+
+from WfaParse import WfaUserInput, WfaWorkflowDef
+from WfaSerializer import WfaInputError, WfaInputSerializer, _SEARCH_LIMIT, _escapeAttr
+
+ATTR_ENTITIES = { '"' : '&quot;', '\n' : '&#10;', '\r' : '&#13;', '\t' : '&#9;' }
+
+INPUTS = (WfaUserInput('volName', 'String', True), WfaUserInput('volSize', 'Number', True),
+          WfaUserInput('protocol', 'Enum', True, ('cifs', 'nfs')), WfaUserInput('volExists', 'Boolean', False),
+          WfaUserInput('rules', 'Table', False))
+
+class TestSerializer(unittest.TestCase):
+
+    def setUp(self):
+        self.serializer = WfaInputSerializer(WfaWorkflowDef('test', None, None, INPUTS, ()))
+        return
+
+    def values(self, xml):
+        root = ET.fromstring(xml)
+        return(dict([(entry.get('key'), entry.get('value')) for entry in root.iter('userInputEntry')]))
+
+    def testValues(self):
+        xml = self.serializer.serialize({ 'volName' : u'share\xe9', 'volSize' : 10, 'protocol' : 'nfs',
+                                          'volExists' : True, 'rules' : [['10.0.0.1', 'rw'], ['10.0.0.2', 'ro']],
+                                          'unknown' : 'ignored' })
+        self.assertEqual(self.values(xml), { 'volName' : u'share\xe9', 'volSize' : '10', 'protocol' : 'nfs',
+                                             'volExists' : 'true', 'rules' : '10.0.0.1~rw,10.0.0.2~ro' })
+        return
+
+    def testNoneIsLeftOut(self):
+        xml = self.serializer.serialize({ 'volName' : 'a', 'volSize' : 1, 'protocol' : 'cifs', 'volExists' : None,
+                                          'rules' : None })
+        self.assertEqual(sorted(self.values(xml).keys()), ['protocol', 'volName', 'volSize'])
+        self.assertRaises(KeyError, self.serializer.serialize, { 'volName' : 'a' })
+        return
+
+    def testValidation(self):
+        values = { 'volName' : 'a', 'volSize' : 1, 'protocol' : 'smb', 'volExists' : None, 'rules' : None }
+        self.assertRaises(WfaInputError, self.serializer.serialize, values)
+        values['protocol'] = 'nfs'
+        values['volExists'] = 'yes'
+        self.assertRaises(WfaInputError, self.serializer.serialize, values)
+        return
+
+    def testEscaping(self):
+        special = 'a&b<c>d"e\nf\rg\th'
+        for value in (special, 'plain', special * 20, 'x' * (_SEARCH_LIMIT * 4), 'x' * (_SEARCH_LIMIT * 4) + '&'):
+            self.assertEqual(_escapeAttr(value), escape(value, ATTR_ENTITIES))
+            xml = self.serializer.serialize({ 'volName' : value, 'volSize' : 1, 'protocol' : 'nfs',
+                                              'volExists' : None, 'rules' : value })
+            # Whatever the value, it comes back from an XML parser unchanged.
+            self.assertEqual(self.values(xml)['volName'], value)
+            self.assertEqual(self.values(xml)['rules'], value)
+        plain = 'x' * 10
+        self.assertTrue(_escapeAttr(plain) is plain)
+        return
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,247 @@
+'''
+Created on Oct 16, 2026
+
+testWfaTransport.py - the pooled transport under concurrent load, and its recovery from keep-alive connections the
+server has closed.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import threading
+import time
+import unittest
+import urllib2
+
+from Wfa import Wfa
+from WfaMock import WfaMockServer
+from WfaParse import parseJobStream, readResponse
+from WfaTransport import WfaSession, _sameServer, getConnectionPool
+
+POOL_SIZE = 4
+THREADS = 24
+REQUESTS = 12
+WORKFLOW_NAME = 'os_delete_nfs_share_cdot'
+
+class _CountedPool(object):
+    '''
+    _CountedPool - counts the connections checked out of a pool, and the most checked out at once
+    '''
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.checkedOut = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        checkout = pool._checkout
+        checkin = pool._checkin
+
+        def counted(key):
+            result = checkout(key)
+            with self._lock:
+                self.checkedOut = self.checkedOut + 1
+                self.peak = max(self.peak, self.checkedOut)
+            return(result)
+
+        def released(key, conn, reusable):
+            with self._lock:
+                self.checkedOut = self.checkedOut - 1
+            checkin(key, conn, reusable)
+            return
+
+        pool._checkout = counted
+        pool._checkin = released
+        return
+
+def _runThreads(target, count):
+    errors = []
+    def run(index):
+        try:
+            target(index)
+        except Exception, e:
+            errors.append(e)
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+    return(errors)
+
+class TestPoolUnderLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.mock = WfaMockServer(latency=0.005, jobDuration=0.1).start()
+        self.pool = getConnectionPool(self.mock.wfaServer, POOL_SIZE)
+        self.counted = _CountedPool(self.pool)
+        self.workflow = self.mock.workflows[WORKFLOW_NAME]
+        return
+
+    def tearDown(self):
+        self.pool.evictIdle(True)
+        self.mock.stop()
+        return
+
+    def testSessionsShareTheBoundedPool(self):
+        path = "/rest/workflows/" + self.workflow[1] + "?client="
+        expected = self.mock._workflowXml(self.workflow)
+        bodies = []
+
+        def fetch(index):
+            session = WfaSession(self.mock.wfaServer, "user" + str(index), "pw")
+            for request in range(REQUESTS):
+                bodies.append(session.urlopen("http://" + self.mock.wfaServer + path + str(index)).read())
+
+        self.assertEqual(_runThreads(fetch, THREADS), [])
+        self.assertEqual(len(bodies), THREADS * REQUESTS)
+        for body in bodies:
+            self.assertEqual(body, expected)
+        # Every request of a thread carried that thread's credential, and no other.
+        for index in range(THREADS):
+            self.assertEqual(self.mock.users[path + str(index)], set(["user" + str(index)]))
+        self.assertTrue(self.counted.peak <= POOL_SIZE)
+        self.assertEqual(self.counted.checkedOut, 0)
+        self.assertTrue(self.mock.stats['peakConnections'] <= POOL_SIZE)
+        self.assertTrue(self.pool.idleCount() <= POOL_SIZE)
+        return
+
+    def testWfaInstancesShareTheBoundedPool(self):
+        results = {}
+
+        def execute(index):
+            wfa = Wfa(wfaDict={ 'wfaServer' : self.mock.wfaServer, 'wfaUser' : "user" + str(index), 'wfaPw' : 'pw',
+                                'workflowName' : WORKFLOW_NAME, 'wfaParamMap' : { 'volName' : 'vol' + str(index) },
+                                'wfaPollInterval' : 0.02, 'wfaPollMaxInterval' : 0.05 })
+            wfa.setupWorkflow()
+            wfa.executeWorkflow()
+            results[index] = (wfa.waitForCompletion(30), wfa.jobDict['jobId'])
+            # The job document is read back through the same pool.
+            record = readResponse(wfa._session.urlopen(wfa.jobDict['jobSelfLink']), parseJobStream)
+            self.assertEqual(record.jobId, wfa.jobDict['jobId'])
+
+        self.assertEqual(_runThreads(execute, THREADS), [])
+        self.assertEqual(sorted(results.keys()), range(THREADS))
+        self.assertEqual([status for status, jobId in results.values()], ["DONE"] * THREADS)
+        self.assertEqual(len(set([jobId for status, jobId in results.values()])), THREADS)
+        self.assertEqual(self.mock.stats['execute'], THREADS)
+        self.assertTrue(self.counted.peak <= POOL_SIZE)
+        self.assertTrue(self.mock.stats['peakConnections'] <= POOL_SIZE)
+        # Each job was started and polled with the credential of the instance that owns it.
+        for index in results:
+            user = "user" + str(index)
+            jobId = results[index][1]
+            self.assertEqual(self.mock.jobUsers[jobId], user)
+            self.assertEqual(self.mock.users["/rest/workflows/jobs/" + jobId], set([user]))
+        return
+
+class TestStaleKeepAlive(unittest.TestCase):
+
+    def setUp(self):
+        self.mock = WfaMockServer(keepAliveTimeout=0.2).start()
+        self.pool = getConnectionPool(self.mock.wfaServer, POOL_SIZE)
+        self.workflow = self.mock.workflows[WORKFLOW_NAME]
+        self.session = WfaSession(self.mock.wfaServer, "user", "pw")
+        self.url = "http://" + self.mock.wfaServer + "/rest/workflows/" + self.workflow[1]
+        return
+
+    def tearDown(self):
+        self.pool.evictIdle(True)
+        self.mock.stop()
+        return
+
+    def _waitForServerClose(self):
+        deadline = time.time() + 5
+        while(self.mock.openConnections > 0 and time.time() < deadline):
+            time.sleep(0.05)
+        self.assertEqual(self.mock.openConnections, 0)
+        return
+
+    def testGetIsRetriedOnAFreshConnection(self):
+        expected = self.mock._workflowXml(self.workflow)
+        self.assertEqual(self.session.urlopen(self.url).read(), expected)
+        self.assertEqual(self.pool.idleCount(), 1)
+        self._waitForServerClose()
+
+        # The pooled connection is still idle on the client, but the server has closed it.  The pool re-issues the GET
+        # on a fresh connection itself, without the session having to retry it.
+        self.assertEqual(self.pool.idleCount(), 1)
+        jobDict = {}
+        self.assertEqual(self.session.urlopen(self.url, jobDict=jobDict).read(), expected)
+        self.assertEqual(jobDict.get('retryCount', 0), 0)
+        self.assertEqual(self.mock.stats['connections'], 2)
+        self.assertEqual(self.mock.stats['workflow'], 2)
+        return
+
+    def testExecuteAfterTheServerClosedTheConnection(self):
+        wfa = Wfa(wfaDict={ 'wfaServer' : self.mock.wfaServer, 'wfaUser' : 'user', 'wfaPw' : 'pw',
+                            'workflowName' : WORKFLOW_NAME, 'wfaParamMap' : { 'volName' : 'vol1' } })
+        wfa.setupWorkflow()
+        self.session.urlopen(self.url).read()
+        self._waitForServerClose()
+
+        # A POST cannot be re-sent once written, so the closed connection must not be used for it at all.
+        self.assertEqual(self.pool.idleCount(), 1)
+        wfa.executeWorkflow()
+        self.assertTrue(wfa.jobDict['jobId'] in self.mock.jobs)
+        self.assertEqual(self.mock.stats['execute'], 1)
+        self.assertEqual(wfa.jobDict['retryCount'], 0)
+        return
+
+    def testConcurrentGetsOverStaleConnections(self):
+        expected = self.mock._workflowXml(self.workflow)
+        self.assertEqual(_runThreads(lambda index: self.session.urlopen(self.url).read(), POOL_SIZE * 2), [])
+        self._waitForServerClose()
+        stale = self.pool.idleCount()
+        self.assertTrue(stale > 0)
+
+        bodies = []
+        jobDict = {}
+        def fetch(index):
+            for request in range(3):
+                bodies.append(self.session.urlopen(self.url, jobDict=jobDict).read())
+        self.assertEqual(_runThreads(fetch, POOL_SIZE * 2), [])
+        self.assertEqual(bodies, [expected] * (POOL_SIZE * 2 * 3))
+        self.assertEqual(jobDict.get('retryCount', 0), 0)
+        return
+
+class TestCredentialScope(unittest.TestCase):
+
+    def setUp(self):
+        self.mock = WfaMockServer().start()
+        self.other = WfaMockServer().start()
+        self.session = WfaSession(self.mock.wfaServer, "user", "pw")
+        return
+
+    def tearDown(self):
+        for mock in (self.mock, self.other):
+            getConnectionPool(mock.wfaServer).evictIdle(True)
+            mock.stop()
+        return
+
+    def testCredentialOnlyGoesToTheSessionServer(self):
+        path = "/rest/workflows/" + self.mock.workflows[WORKFLOW_NAME][1]
+        self.session.urlopen("http://" + self.mock.wfaServer + path).read()
+        self.assertEqual(self.mock.users[path], set(["user"]))
+
+        # A link to another server is followed without the credential, which that server then asks for.
+        try:
+            self.session.urlopen("http://" + self.other.wfaServer + path)
+            self.fail("the other server accepted a request without credentials")
+        except urllib2.HTTPError, e:
+            self.assertEqual(e.code, 401)
+        self.assertEqual(self.other.users[path], set([None]))
+        return
+
+    def testSameServer(self):
+        self.assertTrue(_sameServer("http://wfa.example.com/rest/workflows", "wfa.example.com"))
+        self.assertTrue(_sameServer("http://WFA.example.com:80/rest/workflows", "wfa.example.com"))
+        self.assertTrue(_sameServer("https://wfa.example.com/rest/workflows", "wfa.example.com"))
+        self.assertTrue(_sameServer("http://wfa.example.com:8080/rest", "wfa.example.com:8080"))
+        self.assertFalse(_sameServer("http://wfa.example.com:8080/rest", "wfa.example.com"))
+        self.assertFalse(_sameServer("http://wfa.example.com/rest", "wfa.example.com:8080"))
+        self.assertFalse(_sameServer("http://evil.example.com/rest", "wfa.example.com"))
+        self.assertFalse(_sameServer("http://wfa.example.com.evil.com/rest", "wfa.example.com"))
+        self.assertFalse(_sameServer("/rest/workflows", "wfa.example.com"))
+        return
+
+if __name__ == '__main__':
+    unittest.main()
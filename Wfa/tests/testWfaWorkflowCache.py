@@ -0,0 +1,173 @@
+'''
+Created on Oct 17, 2026
+
+testWfaWorkflowCache.py - the workflow definition cache against WfaMock (hits, TTL expiry and revalidation, LRU
+eviction, invalidation) and the name -> UUID resolution table with its JSON file.
+
+*** REQUIRES Python 2.7.x and above ***
+*** IS NOT TESTED WITH Python 3.x ***
+'''
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import urllib
+
+from Wfa import Wfa
+from WfaMock import WfaMockServer
+from WfaTransport import WfaSession, getConnectionPool
+from WfaWorkflowCache import WfaUUIDTable, WfaWorkflowCache, uuidTable, workflowCache
+
+CREATE_SHARE = 'os_create_nfs_share_cdot'
+DELETE_SHARE = 'os_delete_nfs_share_cdot'
+GRANT_IP = 'os_grant_ip_cdot'
+
+class TestWorkflowCache(unittest.TestCase):
+
+    def setUp(self):
+        self.mock = WfaMockServer().start()
+        self.session = WfaSession(self.mock.wfaServer, "user", "pw")
+        return
+
+    def tearDown(self):
+        getConnectionPool(self.mock.wfaServer).evictIdle(True)
+        self.mock.stop()
+        return
+
+    def _lookup(self, cache, workflowName):
+        queryURI = "http://" + self.mock.wfaServer + "/rest/workflows?name=" + urllib.quote_plus(workflowName)
+        return(cache.lookup(self.session, self.mock.wfaServer, workflowName, queryURI))
+
+    def testHit(self):
+        cache = WfaWorkflowCache()
+        workflowDef = self._lookup(cache, DELETE_SHARE)
+        self.assertEqual((workflowDef.name, workflowDef.uuid), self.mock.workflows[DELETE_SHARE][:2])
+        self.assertTrue(workflowDef.etag != None)
+        self.assertTrue(self._lookup(cache, DELETE_SHARE) is workflowDef)
+        self.assertEqual(self.mock.stats['workflow'], 1)
+        return
+
+    def testExpiry(self):
+        cache = WfaWorkflowCache(ttl=0.05)
+        workflowDef = self._lookup(cache, DELETE_SHARE)
+        time.sleep(0.1)
+        # Without revalidation an expired definition is fetched and parsed again.
+        self.assertFalse(self._lookup(cache, DELETE_SHARE) is workflowDef)
+        self.assertEqual((self.mock.stats['workflow'], self.mock.stats['notModified']), (2, 0))
+        return
+
+    def testRevalidation(self):
+        cache = WfaWorkflowCache(ttl=0.05, revalidate=True)
+        workflowDef = self._lookup(cache, DELETE_SHARE)
+        time.sleep(0.1)
+        # A 304 renews the entry as it is.
+        self.assertTrue(self._lookup(cache, DELETE_SHARE) is workflowDef)
+        self.assertEqual((self.mock.stats['workflow'], self.mock.stats['notModified']), (2, 1))
+        self.assertTrue(self._lookup(cache, DELETE_SHARE) is workflowDef)
+        self.assertEqual(self.mock.stats['workflow'], 2)
+        return
+
+    def testLeastRecentlyUsedIsEvicted(self):
+        cache = WfaWorkflowCache(maxEntries=2)
+        self._lookup(cache, CREATE_SHARE)
+        self._lookup(cache, DELETE_SHARE)
+        self._lookup(cache, CREATE_SHARE)
+        self._lookup(cache, GRANT_IP)
+        self.assertEqual(self.mock.stats['workflow'], 3)
+        # The delete definition was used least recently, so it made room for the grant.
+        self._lookup(cache, CREATE_SHARE)
+        self.assertEqual(self.mock.stats['workflow'], 3)
+        self._lookup(cache, DELETE_SHARE)
+        self.assertEqual(self.mock.stats['workflow'], 4)
+        self.assertEqual(cache._entries.keys(), [(self.mock.wfaServer, name) for name in (CREATE_SHARE, DELETE_SHARE)])
+        return
+
+    def testInvalidate(self):
+        cache = WfaWorkflowCache()
+        for workflowName in (CREATE_SHARE, DELETE_SHARE):
+            self._lookup(cache, workflowName)
+        cache.put("wfa2:80", DELETE_SHARE, cache._entries[(self.mock.wfaServer, DELETE_SHARE)][0])
+        cache.invalidate(self.mock.wfaServer, DELETE_SHARE)
+        self.assertEqual(cache._entries.keys(), [(self.mock.wfaServer, CREATE_SHARE), ("wfa2:80", DELETE_SHARE)])
+        cache.invalidate(self.mock.wfaServer)
+        self.assertEqual(cache._entries.keys(), [("wfa2:80", DELETE_SHARE)])
+        cache.clear()
+        self.assertEqual(len(cache._entries), 0)
+        return
+
+    def testWfaInstancesShareTheCache(self):
+        workflowCache.clear()
+        uuidTable.remove(self.mock.wfaServer, DELETE_SHARE)
+        try:
+            for index in range(3):
+                wfa = Wfa(wfaDict={ 'wfaServer' : self.mock.wfaServer, 'wfaUser' : 'user', 'wfaPw' : 'pw',
+                                    'workflowName' : DELETE_SHARE, 'wfaParamMap' : { 'volName' : 'share1' } })
+                wfa.setupWorkflow()
+            self.assertEqual(self.mock.stats['workflow'], 1)
+            # The UUID learnt from the first query is remembered for the server.
+            self.assertEqual(uuidTable.get(self.mock.wfaServer, DELETE_SHARE), self.mock.workflows[DELETE_SHARE][1])
+        finally:
+            workflowCache.invalidate(self.mock.wfaServer)
+            uuidTable.remove(self.mock.wfaServer, DELETE_SHARE)
+        return
+
+class TestUUIDTable(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "uuids.json")
+        self.table = WfaUUIDTable()
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        return
+
+    def testServerEntriesComeFirst(self):
+        self.table.preload({ DELETE_SHARE : 'uuid-any', CREATE_SHARE : 'uuid-create' })
+        self.table.put("wfa1:80", DELETE_SHARE, 'uuid-wfa1')
+        self.assertEqual(self.table.get("wfa1:80", DELETE_SHARE), 'uuid-wfa1')
+        self.assertEqual(self.table.get("wfa2:80", DELETE_SHARE), 'uuid-any')
+        self.assertEqual(self.table.get("wfa1:80", CREATE_SHARE), 'uuid-create')
+        self.assertEqual(self.table.get("wfa1:80", GRANT_IP), None)
+        # A stale UUID is forgotten for the server and for every server.
+        self.table.remove("wfa1:80", DELETE_SHARE)
+        self.assertEqual(self.table.get("wfa2:80", DELETE_SHARE), None)
+        return
+
+    def testSaveAndLoad(self):
+        self.table.preload({ DELETE_SHARE : 'uuid-any' })
+        self.table.preload({ CREATE_SHARE : 'uuid-create' }, "wfa1:80")
+        self.table.save(self.path)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        with open(self.path) as tableFile:
+            self.assertEqual(json.load(tableFile), { "*" : { DELETE_SHARE : 'uuid-any' },
+                                                     "wfa1:80" : { CREATE_SHARE : 'uuid-create' } })
+
+        table = WfaUUIDTable()
+        table.load(self.path)
+        self.assertEqual(table._uuids, self.table._uuids)
+        # Names and UUIDs come back as str, not as the unicode json reads.
+        for (wfaServer, workflowName), uuid in table._uuids.items():
+            self.assertEqual([type(value) for value in (wfaServer or "", workflowName, uuid)], [str, str, str])
+        return
+
+    def testLoadOnce(self):
+        # A missing file is no error.
+        self.table.load(self.path)
+        self.assertEqual(self.table._uuids, {})
+        with open(self.path, 'w') as tableFile:
+            json.dump({ "*" : { DELETE_SHARE : 'uuid1' } }, tableFile)
+        self.table.loadOnce(self.path)
+        with open(self.path, 'w') as tableFile:
+            json.dump({ "*" : { DELETE_SHARE : 'uuid2' } }, tableFile)
+        self.table.loadOnce(self.path)
+        self.assertEqual(self.table.get("wfa1:80", DELETE_SHARE), 'uuid1')
+        self.assertTrue(self.table.isFilled(('file', self.path)))
+        return
+
+if __name__ == '__main__':
+    unittest.main()